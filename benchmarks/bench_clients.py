@@ -0,0 +1,93 @@
+# ✍️ Motley Fool AI Copywriter — client / connection‑pool benchmark
+# ----------------------------------------------------------
+# Several copywriters (threads) each trigger reruns that make a few
+# API calls.  Compares a fresh OpenAI client per rerun (the old
+# module‑level client) with the shared pooled client from
+# mf_copy.clients, against the offline stand‑in with a per‑connection
+# handshake delay standing in for TCP + TLS setup.  The async modes run
+# each rerun's calls concurrently, as the app's stages do: asyncio.run()
+# per rerun (a fresh loop, so a fresh AsyncOpenAI, closed as the loop
+# ends) vs llm_async.run() on the shared loop (one AsyncOpenAI for the
+# process).
+#
+#   python -m benchmarks.bench_clients --users 8 --reruns 5 --calls 3 --handshake 0.05
+# ----------------------------------------------------------
+
+import argparse, asyncio, statistics, sys, time
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import OpenAI
+
+from mf_copy import clients, llm_async
+from mf_copy.fake_openai import serve_in_thread
+
+MESSAGES = [{"role": "user", "content": "say OK"}]
+
+def _call(client) -> float:
+    t0 = time.perf_counter()
+    client.chat.completions.create(model="gpt-4.1", messages=MESSAGES, max_tokens=16)
+    return time.perf_counter() - t0
+
+async def _acall(base_url) -> float:
+    t0 = time.perf_counter()
+    client = clients.get_async_client(api_key="bench", base_url=base_url)
+    await client.chat.completions.create(model="gpt-4.1", messages=MESSAGES, max_tokens=16)
+    return time.perf_counter() - t0
+
+async def _arerun(base_url, calls, close=False) -> list[float]:
+    latencies = list(await asyncio.gather(*(_acall(base_url) for _ in range(calls))))
+    if close:
+        await clients.get_async_client(api_key="bench", base_url=base_url).close()
+    return latencies
+
+def run(mode, base_url, users, reruns, calls):
+    def user(_):
+        latencies, rerun_s = [], []
+        for _ in range(reruns):
+            t0 = time.perf_counter()
+            if mode == "async_per_loop":
+                latencies += asyncio.run(_arerun(base_url, calls, close=True))
+            elif mode == "async_shared":
+                latencies += llm_async.run(_arerun, base_url, calls)
+            else:
+                client = (OpenAI(api_key="bench", base_url=base_url, max_retries=0)
+                          if mode == "per_rerun" else
+                          clients.get_client(api_key="bench", base_url=base_url))
+                latencies += [_call(client) for _ in range(calls)]
+            rerun_s.append(time.perf_counter() - t0)
+        return latencies, rerun_s
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(users) as pool:
+        results = list(pool.map(user, range(users)))
+    return (time.perf_counter() - t0, [x for xs, _ in results for x in xs],
+            [x for _, xs in results for x in xs])
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Shared connection pool vs client per rerun.")
+    ap.add_argument("--users", type=int, default=8, help="concurrent copywriters")
+    ap.add_argument("--reruns", type=int, default=5, help="script reruns per copywriter")
+    ap.add_argument("--calls", type=int, default=3, help="API calls per rerun")
+    ap.add_argument("--handshake", type=float, default=0.05, help="seconds per new connection")
+    ap.add_argument("--modes", default="per_rerun,shared,async_per_loop,async_shared")
+    a = ap.parse_args(argv)
+
+    total = a.users * a.reruns * a.calls
+    print(f"{total} calls · {a.users} users × {a.reruns} reruns × {a.calls} calls · "
+          f"handshake {a.handshake * 1000:.0f} ms · http2 {clients.HTTP2}")
+    print(f"{'mode':<16}{'wall_s':>9}{'p50_ms':>9}{'p95_ms':>9}{'mean_ms':>9}"
+          f"{'rerun_ms':>10}{'conns':>8}")
+    for mode in a.modes.split(","):
+        srv = serve_in_thread(ttft=0.02, token_latency=0.0, handshake_latency=a.handshake)
+        wall, lat, reruns = run(mode, srv.base_url, a.users, a.reruns, a.calls)
+        lat_ms = sorted(x * 1000 for x in lat)
+        print(f"{mode:<16}{wall:>9.2f}{lat_ms[len(lat_ms) // 2]:>9.1f}"
+              f"{lat_ms[int(len(lat_ms) * 0.95)]:>9.1f}{statistics.mean(lat_ms):>9.1f}"
+              f"{statistics.mean(reruns) * 1000:>10.1f}"
+              f"{srv.stats.snapshot()['connections']:>8}")
+        srv.shutdown()
+    print("pool:", clients.get_pool_stats().stats())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# ✍️ Motley Fool AI Copywriter — export renders & bulk ZIP
+# ----------------------------------------------------------
+# Times mf_copy.export on offline sample copy: cold vs cached renders
+# per format, then a bulk ZIP of N pieces — streamed member by member
+# (write_zip / iter_zip) against rendering every file into memory
+# first.  Peak Python heap comes from tracemalloc.
+#
+#   python -m benchmarks.bench_export --pieces 300 --formats docx,html
+# ----------------------------------------------------------
+
+import argparse, io, os, random, sys, tempfile, time, tracemalloc, zipfile
+
+from mf_copy import export
+
+WORDS = ("investors growth dividend stocks analysts membership opportunity market returns "
+         "portfolio compounding valuation earnings momentum wealth retirement income").split()
+
+def sample_copy(rng: random.Random, words: int) -> str:
+    """Copy shaped like the engine's: headings, bold, bullets, italic disclaimer."""
+    parts, per = ["### Subject Line", "**Don't miss** the *next* 3 stocks"], words // 5
+    for s in range(4):
+        parts += ["", f"### Section {s + 1}",
+                  " ".join(rng.choices(WORDS, k=per // 2)) + " **up 73%** since launch.",
+                  *(f"- {' '.join(rng.choices(WORDS, k=8))}" for _ in range(3)),
+                  " ".join(rng.choices(WORDS, k=per // 2))]
+    return "\n".join(parts + ["", "*Past performance is not a reliable indicator of "
+                                   "future results.*"])
+
+def peak(fn):
+    """(seconds, peak MB) of fn() — timed untraced, then re‑run under tracemalloc."""
+    t0 = time.perf_counter()
+    fn()
+    secs = time.perf_counter() - t0
+    tracemalloc.start()
+    fn()
+    top = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return secs, top / 1e6
+
+def in_memory(pieces, formats):
+    """The naive bulk export: every file rendered, then zipped in a BytesIO."""
+    files = [(f"{i}.{f}", export.render(p["copy"], f, cache=False))
+             for i, p in enumerate(pieces) for f in formats]
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in files:
+            zf.writestr(name, data)
+    return buf.getvalue()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export render / bulk ZIP cost.")
+    ap.add_argument("--pieces", type=int, default=300)
+    ap.add_argument("--formats", default="docx,html")
+    ap.add_argument("--repeat", type=int, default=20)
+    a = ap.parse_args(argv)
+    formats = a.formats.split(",")
+
+    rng = random.Random(7)
+    copy = sample_copy(rng, 900)
+    print(f"{'format':<8}{'cold_ms':>9}{'cached_ms':>11}{'bytes':>9}")
+    for fmt in export.FORMATS:
+        t0 = time.perf_counter()
+        for _ in range(a.repeat):
+            data = export.render(copy, fmt, cache=False)
+        cold = (time.perf_counter() - t0) * 1000 / a.repeat
+        export.render(copy, fmt)
+        t0 = time.perf_counter()
+        for _ in range(a.repeat):
+            export.render(copy, fmt)
+        warm = (time.perf_counter() - t0) * 1000 / a.repeat
+        print(f"{fmt:<8}{cold:>9.2f}{warm:>11.4f}{len(data):>9}")
+
+    pieces = [{"copy": sample_copy(rng, 300), "country": "Canada", "title": f"Piece {i}"}
+              for i in range(a.pieces)]
+    path = os.path.join(tempfile.mkdtemp(prefix="mf_export_"), "bulk.zip")
+
+    def to_file():
+        with open(path, "wb") as f:
+            return export.write_zip(pieces, f, formats)
+
+    def to_chunks():
+        return sum(len(c) for c in export.iter_zip(pieces, formats))
+
+    print(f"\n{a.pieces} pieces × {','.join(formats)}")
+    print(f"{'mode':<22}{'seconds':>9}{'files/s':>9}{'peak_MB':>9}")
+    for name, fn in (("in memory (naive)", lambda: in_memory(pieces, formats)),
+                     ("write_zip → file", to_file), ("iter_zip → chunks", to_chunks)):
+        secs, mb = peak(fn)
+        print(f"{name:<22}{secs:>9.2f}{a.pieces * len(formats) / secs:>9.0f}{mb:>9.1f}")
+    print(f"zip size {os.path.getsize(path) / 1e6:.1f} MB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
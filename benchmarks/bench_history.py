@@ -0,0 +1,82 @@
+# ✍️ Motley Fool AI Copywriter — history store at volume
+# ----------------------------------------------------------
+# Fills a throwaway mf_copy.history database with synthetic pieces
+# (realistic brief + ~300‑word copy) and times inserts, the History
+# tab's listing / filter / full‑text queries and single‑piece loads.
+#
+#   python -m benchmarks.bench_history --pieces 50000
+# ----------------------------------------------------------
+
+import argparse, os, random, sys, tempfile, time
+
+from mf_copy.engine import COUNTRY_RULES, LENGTH_RULES, TRAIT_DEFAULTS
+from mf_copy.history import History
+
+WORDS = ("investors growth dividend stocks analysts membership opportunity market returns "
+         "portfolio technology healthcare energy banking retail mining lithium semiconductor "
+         "cloud software compounding valuation earnings momentum recession inflation rates "
+         "wealth retirement income founder moat buyback midnight deadline offer discount").split()
+HOOKS = ("AI boom", "lithium rush", "dividend kings", "rate cuts", "cloud giants",
+         "retirement income", "small caps", "energy transition", "bank stocks", "healthcare")
+
+def fake_piece(rng: random.Random, i: int) -> dict:
+    hook = f"{rng.choice(HOOKS)} #{i}"
+    copy = "\n\n".join(f"## Section {s}\n" + " ".join(rng.choices(WORDS, k=60))
+                       for s in range(5))
+    return {"kind": rng.choice(("generate", "generate", "update", "adapt")), "copy": copy,
+            "copy_type": rng.choice(("📧 Email", "📝 Sales Page")),
+            "country": rng.choice(list(COUNTRY_RULES)),
+            "length": rng.choice(list(LENGTH_RULES)),
+            "brief": {"hook": hook, "details": " ".join(rng.choices(WORDS, k=12))},
+            "traits": TRAIT_DEFAULTS, "plan": " ".join(rng.choices(WORDS, k=30)),
+            "variants": {"headlines": [hook], "ctas": ["Join now"]},
+            "usage": {"prompt_tokens": 1800, "completion_tokens": 600, "cost_usd": 0.0084}}
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    return times[len(times) // 2], times[int(len(times) * 0.95)], out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="History store insert / query latency.")
+    ap.add_argument("--pieces", type=int, default=50_000)
+    ap.add_argument("--repeat", type=int, default=50)
+    a = ap.parse_args(argv)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="mf_hist_"), "history.sqlite3")
+    h, rng = History(path), random.Random(7)
+    t0 = time.perf_counter()
+    for i in range(a.pieces):
+        p = fake_piece(rng, i)
+        h.save(p.pop("kind"), p.pop("copy"), **p)
+    secs = time.perf_counter() - t0
+    h.optimize()
+    print(f"{a.pieces:,} pieces · {a.pieces / secs:,.0f} inserts/s "
+          f"({secs * 1e6 / a.pieces:.0f} µs each) · {h.stats()['size_mb']} MB")
+
+    week = time.time() - 7 * 86400
+    ids = [rng.randrange(1, a.pieces + 1) for _ in range(a.repeat)]
+    queries = {
+        "list newest 50":           lambda: h.search(),
+        "country + type filter":    lambda: h.search(country="Canada", copy_type="📧 Email"),
+        "country + last 7 days":    lambda: h.search(country="Australia", since=week),
+        "fts rare (hook #12345)":   lambda: h.search("12345"),
+        "fts common (dividend)":    lambda: h.search("dividend"),
+        "fts prefix (lith)":        lambda: h.search("lith"),
+        "fts two words + country":  lambda: h.search("lithium deadline", country="Canada"),
+        "count fts (dividend)":     lambda: h.count("dividend"),
+        "get one piece":            lambda: h.get(ids[rng.randrange(len(ids))]),
+    }
+    print(f"{'query':<26}{'p50_ms':>9}{'p95_ms':>9}{'rows':>7}")
+    for name, fn in queries.items():
+        p50, p95, out = timed(fn, a.repeat)
+        rows = out if isinstance(out, int) else (len(out) if isinstance(out, list) else 1)
+        print(f"{name:<26}{p50:>9.2f}{p95:>9.2f}{rows:>7}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+# ✍️ Motley Fool AI Copywriter — pipeline latency benchmark
+# ----------------------------------------------------------
+# Runs generate (single draft and best‑of‑3, as 3 concurrent calls or
+# one n=3 call) / self_qa / generate_variants / adapt (single market,
+# sequential and fanned out to every market) / a trait sweep (every
+# cell one after another vs collapsed to unique prompts, concurrent) /
+# a 3000+‑word sales page (one JSON reply vs long‑form sections, one
+# at a time and in parallel)
+# against the offline stand‑in (mf_copy.fake_openai) and reports p50 / p95
+# latency, API calls per operation, completion tokens / second and the
+# share of prompt tokens served from the provider's prefix cache.
+#
+#   python -m benchmarks.bench_pipeline --layout legacy --json legacy.json
+#   python -m benchmarks.bench_pipeline --layout prefix --compare legacy.json
+#
+#   python -m benchmarks.bench_pipeline -n 20 --json bench.json
+#   python -m benchmarks.bench_pipeline -n 20 --compare bench.json
+#
+#   python -m benchmarks.bench_pipeline --only generate,generate_best_of \
+#       --draft-miss-rate 0.5 --draft-length-jitter 0.5
+# ----------------------------------------------------------
+
+import argparse, itertools, json, os, statistics, sys, tempfile, time
+
+# Benchmarks must never read or pollute the real response cache, and cold
+# runs (the default) measure every API call rather than cache hits.
+os.environ.setdefault("MF_COPY_CACHE_PATH",
+                      os.path.join(tempfile.mkdtemp(prefix="mf_bench_"), "cache.sqlite3"))
+if "--warm" not in sys.argv:
+    os.environ["MF_COPY_CACHE"] = "off"
+
+from mf_copy import engine, llm_async, sweep                 # noqa: E402
+from mf_copy.engine import TRAIT_DEFAULTS, make_brief        # noqa: E402
+from mf_copy.fake_openai import serve_in_thread              # noqa: E402
+
+EMAIL = "📧 Email"
+LENGTH = "📐 Medium (200–500 words)"
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+# ────────────────────────────────────────────────────────────
+# 1.  Scenarios  (nonce keeps every call a cache miss unless --warm)
+# ────────────────────────────────────────────────────────────
+def _brief(nonce):
+    return make_brief(country="Australia", hook=f"Midnight deadline {nonce}",
+                      details="Stock Advisor membership", offer_price="$119",
+                      retail_price="$199", offer_term="1 year")
+
+_MARKETS = itertools.cycle(engine.COUNTRY_RULES)
+
+def _market_brief(nonce):
+    return {**_brief(nonce), "country": next(_MARKETS)}
+
+_TARGETS = [c for c in engine.COUNTRY_RULES if c != "Australia"]
+
+def _best_of(nonce, mode, n=3):
+    engine.BEST_OF_MODE = mode
+    return engine.generate(EMAIL, TRAIT_DEFAULTS, _brief(nonce), LENGTH, best_of=n)
+
+def _sample_copy(nonce):
+    return engine.generate(EMAIL, TRAIT_DEFAULTS, _brief(f"seed {nonce}"), LENGTH)["copy"]
+
+# Urgency × Social Proof: 15 cells, but the band logic only tells 6 apart
+_GRID = {"Urgency": ["low", "mid", "high", 9, 10], "Social_Proof": ["low", "high", 7]}
+
+def _sweep_every_cell(nonce):
+    """The grid as asked — one pipeline per cell at its own scores, in turn."""
+    levels = [[(name, engine.band_score(name, l) if isinstance(l, str) else l) for l in ls]
+              for name, ls in _GRID.items()]
+    return [engine.generate(EMAIL, {**TRAIT_DEFAULTS, **dict(combo)}, _brief(nonce), LENGTH)
+            for combo in itertools.product(*levels)]
+
+SALES = "📝 Sales Page"
+MONSTER = "📜 Scrolling Monster (3000+ words)"
+
+def _monster(nonce, longform=True, parallel=None):
+    lengths, width = engine.LONGFORM_LENGTHS, engine.LONGFORM_PARALLEL
+    engine.LONGFORM_LENGTHS = (MONSTER,) if longform else ()
+    engine.LONGFORM_PARALLEL = parallel or width
+    try:
+        return engine.generate(SALES, TRAIT_DEFAULTS, _brief(nonce), MONSTER)
+    finally:
+        engine.LONGFORM_LENGTHS, engine.LONGFORM_PARALLEL = lengths, width
+
+SCENARIOS = {
+    "generate":          lambda nonce, copy: engine.generate(EMAIL, TRAIT_DEFAULTS,
+                                                             _brief(nonce), LENGTH),
+    "generate_markets":  lambda nonce, copy: engine.generate(EMAIL, TRAIT_DEFAULTS,
+                                                             _market_brief(nonce), LENGTH),
+    "generate_best_of":  lambda nonce, copy: _best_of(nonce, "parallel"),
+    "generate_best_of_n": lambda nonce, copy: _best_of(nonce, "n"),
+    "self_qa":           lambda nonce, copy: engine.self_qa(f"{nonce}\n{copy}", EMAIL, LENGTH,
+                                                            TRAIT_DEFAULTS),
+    "generate_variants": lambda nonce, copy: engine.generate_variants(f"{nonce}\n{copy}"),
+    "adapt":             lambda nonce, copy: engine.adapt(f"{nonce}\n{copy}", "United Kingdom"),
+    # Australian original → every other market: one call after another vs fanned out
+    "adapt_sequential":  lambda nonce, copy: [engine.adapt(f"{nonce}\n{copy}", c)
+                                              for c in _TARGETS],
+    "adapt_markets":     lambda nonce, copy: llm_async.run(
+                             engine.aadapt_markets, f"{nonce}\n{copy}", _TARGETS),
+    "sweep_every_cell":  lambda nonce, copy: _sweep_every_cell(nonce),
+    "sweep":             lambda nonce, copy: sweep.sweep(EMAIL, TRAIT_DEFAULTS, _brief(nonce),
+                                                         LENGTH, _GRID),
+    "monster_single":    lambda nonce, copy: _monster(nonce, longform=False),
+    "monster_longform_serial": lambda nonce, copy: _monster(nonce, parallel=1),
+    "monster_longform":  lambda nonce, copy: _monster(nonce),
+}
+
+def run_scenario(name, srv, iterations, warm):
+    fn, copy = SCENARIOS[name], _sample_copy(name)
+    before = srv.stats.snapshot()
+    timings = []
+    t_all = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn("" if warm else f"#{i}", copy)
+        timings.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - t_all
+    after = srv.stats.snapshot()
+    return {"p50_ms": round(percentile(timings, 50) * 1000, 1),
+            "p95_ms": round(percentile(timings, 95) * 1000, 1),
+            "mean_ms": round(statistics.mean(timings) * 1000, 1),
+            "calls_per_op": round((after["requests"] - before["requests"]) / iterations, 2),
+            "tokens_per_s": round((after["completion_tokens"] - before["completion_tokens"])
+                                  / wall, 1),
+            "cached_pct": round(100 * (after["cached_tokens"] - before["cached_tokens"])
+                                / max(1, after["prompt_tokens"] - before["prompt_tokens"]), 1)}
+
+# ────────────────────────────────────────────────────────────
+# 2.  Reporting
+# ────────────────────────────────────────────────────────────
+COLS = ("p50_ms", "p95_ms", "mean_ms", "calls_per_op", "tokens_per_s", "cached_pct")
+
+def report(results, baseline=None):
+    print(f"{'scenario':<20}" + "".join(f"{c:>16}" for c in COLS))
+    for name, row in results.items():
+        cells = []
+        for c in COLS:
+            cell = f"{row[c]:g}"
+            old = (baseline or {}).get(name, {}).get(c)
+            if old:
+                cell += f" ({(row[c] - old) / old:+.0%})"
+            cells.append(f"{cell:>16}")
+        print(f"{name:<20}" + "".join(cells))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("-n", "--iterations", type=int, default=10)
+    ap.add_argument("--only", help="comma list of scenarios")
+    ap.add_argument("--ttft", type=float, default=0.05)
+    ap.add_argument("--token-latency", type=float, default=0.0005)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--qa-fail-rate", type=float, default=0.0)
+    ap.add_argument("--prefill-latency", type=float, default=0.00005,
+                    help="seconds per uncached prompt token")
+    ap.add_argument("--layout", choices=("prefix", "legacy"), default=engine.PROMPT_LAYOUT)
+    ap.add_argument("--runaway-rate", type=float, default=0.0,
+                    help="share of replies that ramble until max_tokens stops them")
+    ap.add_argument("--draft-miss-rate", type=float, default=0.0,
+                    help="share of drafts missing a section or the disclaimer")
+    ap.add_argument("--draft-length-jitter", type=float, default=0.0,
+                    help="drafts land within ±this share of the asked length")
+    ap.add_argument("--fixed-budget", action="store_true",
+                    help="send MAX_OUTPUT_TOKENS on every call (pre‑budget behaviour)")
+    ap.add_argument("--warm", action="store_true", help="repeat identical calls (cache hits)")
+    ap.add_argument("--json", help="write results to this file")
+    ap.add_argument("--compare", help="baseline JSON from an earlier --json run")
+    a = ap.parse_args(argv)
+
+    srv = serve_in_thread(ttft=a.ttft, token_latency=a.token_latency,
+                          error_rate=a.error_rate, qa_fail_rate=a.qa_fail_rate,
+                          prefill_latency=a.prefill_latency, runaway_rate=a.runaway_rate,
+                          draft_miss_rate=a.draft_miss_rate,
+                          draft_length_jitter=a.draft_length_jitter)
+    engine.configure(api_key="bench", base_url=srv.base_url)
+    engine.PROMPT_LAYOUT = a.layout
+    engine.ADAPTIVE_BUDGET = not a.fixed_budget
+
+    names = a.only.split(",") if a.only else list(SCENARIOS)
+    results = {n: run_scenario(n, srv, a.iterations, a.warm) for n in names}
+
+    baseline = json.loads(open(a.compare).read()) if a.compare else None
+    report(results, baseline)
+    if a.json:
+        with open(a.json, "w") as f:
+            json.dump(results, f, indent=2)
+    srv.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
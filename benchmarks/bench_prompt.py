@@ -0,0 +1,121 @@
+# ✍️ Motley Fool AI Copywriter — prompt assembly micro‑benchmark
+# ----------------------------------------------------------
+# Compares the per‑rerun cost of the original prompt path (re‑read
+# traits_config.json, loop the config dicts, re‑join exemplars) with the
+# compiled tables + pre‑rendered fragments in mf_copy.engine, and checks
+# both produce byte‑identical prompts.
+#
+#   python -m benchmarks.bench_prompt -n 20000
+# ----------------------------------------------------------
+
+import argparse, itertools, json, pathlib, sys, timeit
+
+from mf_copy import engine
+from mf_copy.engine import (EMAIL_MICRO, EMAIL_STRUCT, EMAIL_WINNER, LENGTH_RULES, SALES_MICRO,
+                            SALES_STRUCT, SALES_WINNER, SYSTEM_PROMPT, COUNTRY_RULES,
+                            TRAIT_DEFAULTS, TRAIT_EXAMPLES, TRAITS_PATH, line, make_brief)
+
+# ────────────────────────────────────────────────────────────
+# 1.  The pre‑compilation implementation, kept verbatim for comparison
+# ────────────────────────────────────────────────────────────
+def legacy_rerun(copy_type, traits, brief, length_choice):
+    TRAIT_CFG = json.loads(pathlib.Path(TRAITS_PATH).read_text())   # every script run
+
+    def trait_rules(traits):
+        out = []
+        for name, score in traits.items():
+            cfg = TRAIT_CFG.get(name)
+            if not cfg:
+                continue
+            if score >= cfg["high_threshold"]:
+                out.append(cfg["high_rule"])
+            elif score <= cfg["low_threshold"]:
+                out.append(cfg["low_rule"])
+            else:
+                mid_rule = cfg.get("mid_rule")
+                if mid_rule:
+                    out.append(mid_rule)
+        return out
+
+    def allow_exemplar(traits):
+        for name, score in traits.items():
+            cfg = TRAIT_CFG.get(name, {})
+            if cfg.get("high_exemplar_allowed") and score >= cfg["high_threshold"]:
+                return True
+        return False
+
+    def trait_guide(traits):
+        out = []
+        for i, (name, score) in enumerate(traits.items(), 1):
+            shots = 3 if score >= 8 else 2 if score >= 4 else 1
+            examples = " / ".join(f"“{s}”" for s in TRAIT_EXAMPLES[name][:shots])
+            out.append(f"{i}. {name.replace('_',' ')} ({score}/10) — e.g. {examples}")
+        return "\n".join(out)
+
+    copy_struct = EMAIL_STRUCT if copy_type.startswith("📧") else SALES_STRUCT
+    exemplar = EMAIL_MICRO if copy_type.startswith("📧") else SALES_MICRO
+    if allow_exemplar(traits):
+        exemplar += "\n\n" + (SALES_WINNER if copy_type == "📝 Sales Page" else EMAIL_WINNER)
+    hard_list = trait_rules(traits)
+    hard_block = "#### Hard Requirements\n" + "\n".join(hard_list) if hard_list else ""
+    min_len, max_len = LENGTH_RULES[length_choice]
+    length_block = (f"#### Length Requirement\nWrite between **{min_len} and {max_len} words**."
+                    if max_len else
+                    f"#### Length Requirement\nWrite **at least {min_len} words**.")
+    system = SYSTEM_PROMPT.format(country_rules=COUNTRY_RULES[brief["country"]])
+    user = f"""
+{trait_guide(traits)}
+
+{exemplar}
+
+#### Structure to Follow
+{copy_struct}
+
+{hard_block}
+
+#### Campaign Brief
+{line('Hook', brief['hook'])}{line('Details', brief['details'])}{line('Offer', f"Special {brief['offer_price']} (Retail {brief['retail_price']}), Term {brief['offer_term']}")}{line('Reports', brief['reports'])}{line('Stocks to Tease', brief['stocks_to_tease'])}{line('Quotes/News', brief['quotes_news'])}
+
+{length_block}
+
+Please limit bullet lists to three or fewer and favour full‑sentence paragraphs elsewhere.
+
+### END INSTRUCTIONS
+""".strip()
+    return system, user
+
+def compiled_rerun(copy_type, traits, brief, length_choice):
+    system = engine.system_prompt(brief["country"])
+    user = engine.build_prompt(copy_type, engine.copy_structure(copy_type),
+                               traits, brief, length_choice)
+    return system, user
+
+# ────────────────────────────────────────────────────────────
+# 2.  Run
+# ────────────────────────────────────────────────────────────
+def cases():
+    brief = make_brief(hook="Midnight deadline", details="Stock Advisor", offer_price="$119",
+                       retail_price="$199", offer_term="1 year", reports="Top 5 ASX")
+    for copy_type, length, urgency, data in itertools.product(
+            ["📧 Email", "📝 Sales Page"], LENGTH_RULES, (1, 5, 9), (2, 7)):
+        yield copy_type, {**TRAIT_DEFAULTS, "Urgency": urgency, "Data_Richness": data}, brief, length
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Prompt assembly micro-benchmark.")
+    ap.add_argument("-n", "--number", type=int, default=5000)
+    a = ap.parse_args(argv)
+
+    all_cases = list(cases())
+    engine.PROMPT_LAYOUT = "legacy"          # the reference reproduces the legacy ordering
+    for c in all_cases:
+        assert legacy_rerun(*c) == compiled_rerun(*c), f"prompt drift for {c[0]} / {c[3]}"
+    print(f"{len(all_cases)} trait/length/type combinations produce identical prompts")
+
+    case = all_cases[0]
+    for label, fn in (("legacy", legacy_rerun), ("compiled", compiled_rerun)):
+        secs = min(timeit.repeat(lambda: fn(*case), number=a.number, repeat=3))
+        print(f"{label:<9} {secs / a.number * 1e6:8.1f} µs per rerun")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
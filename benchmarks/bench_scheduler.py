@@ -0,0 +1,82 @@
+# ✍️ Motley Fool AI Copywriter — request scheduler benchmark
+# ----------------------------------------------------------
+# Many concurrent callers against the offline stand‑in with an
+# enforced requests‑per‑minute limit.  Compares the shared scheduler
+# (token bucket + Retry‑After + jitter) with the old per‑call loop
+# (catch‑all, sleep 2**attempt, five tries, then None).
+#
+#   python -m benchmarks.bench_scheduler --rpm 600 --users 40 --calls 5
+# ----------------------------------------------------------
+
+import argparse, asyncio, os, sys, time
+
+os.environ["MF_COPY_CACHE"] = "off"
+
+from openai import AsyncOpenAI                              # noqa: E402
+
+from mf_copy.fake_openai import serve_in_thread             # noqa: E402
+from mf_copy.llm_async import arun_chat                     # noqa: E402
+from mf_copy.scheduler import LLMError, get_scheduler       # noqa: E402
+
+MODEL = "fake"
+
+def _messages(user, i):
+    return [{"role": "user", "content": f"user {user} call {i}: say OK"}]
+
+# ────────────────────────────────────────────────────────────
+# 1.  Callers
+# ────────────────────────────────────────────────────────────
+async def legacy_call(client, messages):
+    """The pre‑scheduler loop, verbatim in behaviour."""
+    for attempt in range(5):
+        try:
+            resp = await client.chat.completions.create(model=MODEL, messages=messages)
+            return resp.choices[0].message.content.strip()
+        except Exception:
+            await asyncio.sleep(2 ** attempt)
+    return None
+
+async def scheduled_call(client, messages):
+    try:
+        return await arun_chat(client, MODEL, messages, label="bench")
+    except LLMError:
+        return None
+
+async def run(mode, base_url, users, calls):
+    client = AsyncOpenAI(api_key="bench", base_url=base_url, max_retries=0)
+    fn = scheduled_call if mode == "scheduler" else legacy_call
+
+    async def user(u):
+        return [await fn(client, _messages(u, i)) for i in range(calls)]
+
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(user(u) for u in range(users)))
+    return time.perf_counter() - t0, sum(r is None for rs in results for r in rs)
+
+# ────────────────────────────────────────────────────────────
+# 2.  Main
+# ────────────────────────────────────────────────────────────
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Rate-limit scheduler benchmark.")
+    ap.add_argument("--rpm", type=int, default=600, help="limit enforced by the stand-in")
+    ap.add_argument("--users", type=int, default=40, help="concurrent callers")
+    ap.add_argument("--calls", type=int, default=5, help="sequential calls per caller")
+    ap.add_argument("--modes", default="legacy,scheduler")
+    a = ap.parse_args(argv)
+
+    total = a.users * a.calls
+    print(f"{total} calls · {a.users} concurrent callers · limit {a.rpm} req/min")
+    print(f"{'mode':<11}{'wall_s':>9}{'req/min':>10}{'of limit':>10}{'429s':>7}{'failed':>8}")
+    for mode in a.modes.split(","):
+        srv = serve_in_thread(ttft=0.02, token_latency=0.0, rpm=a.rpm)
+        wall, failed = asyncio.run(run(mode, srv.base_url, a.users, a.calls))
+        stats = srv.stats.snapshot()
+        rate = (total - failed) / wall * 60
+        print(f"{mode:<11}{wall:>9.1f}{rate:>10.0f}{rate / a.rpm:>10.0%}"
+              f"{stats['rate_limited']:>7}{failed:>8}")
+        srv.shutdown()
+    print("scheduler:", get_scheduler().stats())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
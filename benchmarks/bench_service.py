@@ -0,0 +1,93 @@
+# ✍️ Motley Fool AI Copywriter — HTTP service throughput
+# ----------------------------------------------------------
+# Starts mf_copy.service (on its own loop / thread) in front of the
+# offline stand‑in and fires POST /v1/generate from many concurrent
+# clients: completed jobs / second, p50 / p95 latency and how many
+# requests the bounded queue turned away with 503.  The scheduler's
+# token budget is off by default so the service itself is measured.
+#
+#   python -m benchmarks.bench_service --clients 32 --requests 200 --workers 8 --queue 16
+# ----------------------------------------------------------
+
+import argparse, asyncio, os, statistics, sys, tempfile, threading, time
+
+os.environ.setdefault("MF_COPY_CACHE_PATH",
+                      os.path.join(tempfile.mkdtemp(prefix="mf_bench_"), "cache.sqlite3"))
+os.environ["MF_COPY_CACHE"] = "off"
+os.environ["MF_COPY_TRACE_PATH"] = ""
+
+import httpx                                                   # noqa: E402
+
+from mf_copy import engine, llm_async, scheduler, service     # noqa: E402
+from mf_copy.fake_openai import serve_in_thread                # noqa: E402
+
+def start_service(workers, queue, max_calls) -> str:
+    llm_async.DEFAULT_CONCURRENCY = max_calls
+    ready = threading.Event()
+    box = {}
+
+    def on_ready(server):
+        box["port"] = server.sockets[0].getsockname()[1]
+        ready.set()
+
+    threading.Thread(target=lambda: asyncio.run(service.serve("127.0.0.1", 0, workers, queue,
+                                                              ready=on_ready)),
+                     daemon=True).start()
+    ready.wait(10)
+    return f"http://127.0.0.1:{box['port']}"
+
+async def fire(base, clients, requests):
+    statuses: dict[int, int] = {}
+    latencies = []
+    counter = iter(range(requests))
+
+    async def client(http):
+        for i in counter:
+            t0 = time.perf_counter()
+            r = await http.post(f"{base}/v1/generate",
+                                json={"hook": f"Deadline #{i}", "details": "Stock Advisor",
+                                      "copy_type": "email", "length": "short"})
+            statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+            if r.status_code == 200:
+                latencies.append(time.perf_counter() - t0)
+
+    limits = httpx.Limits(max_connections=clients)
+    async with httpx.AsyncClient(timeout=300, limits=limits) as http:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(clients)))
+        return time.perf_counter() - t0, statuses, sorted(latencies)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="mf_copy HTTP service throughput.")
+    ap.add_argument("--clients", type=int, default=32, help="concurrent HTTP clients")
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--queue", type=int, default=64)
+    ap.add_argument("--max-calls", type=int, default=16, help="concurrent API calls per model")
+    ap.add_argument("--tpm", type=int, default=0,
+                    help="scheduler tokens/min (0 = unlimited; the default account budget "
+                         f"is {scheduler.TPM})")
+    ap.add_argument("--ttft", type=float, default=0.05)
+    ap.add_argument("--token-latency", type=float, default=0.0005)
+    a = ap.parse_args(argv)
+
+    scheduler._SCHEDULER = scheduler.Scheduler(rpm=0, tpm=a.tpm)
+    fake = serve_in_thread(ttft=a.ttft, token_latency=a.token_latency)
+    engine.configure(api_key="bench", base_url=fake.base_url)
+    base = start_service(a.workers, a.queue, a.max_calls)
+
+    wall, statuses, lat = asyncio.run(fire(base, a.clients, a.requests))
+    ok = statuses.get(200, 0)
+    print(f"{a.requests} requests · {a.clients} clients · {a.workers} workers · "
+          f"queue {a.queue} · {a.max_calls} calls/model · tpm {a.tpm or '∞'}")
+    print(f"wall {wall:.2f}s · {ok / wall:.1f} jobs/s · statuses {statuses}")
+    if lat:
+        print(f"p50 {lat[len(lat) // 2] * 1000:.0f} ms · p95 {lat[int(len(lat) * 0.95)] * 1000:.0f} ms"
+              f" · mean {statistics.mean(lat) * 1000:.0f} ms")
+    print("service:", {k: v for k, v in httpx.get(f"{base}/v1/stats").json().items()
+                       if k != "usage"})
+    fake.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
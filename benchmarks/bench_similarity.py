@@ -0,0 +1,63 @@
+# ✍️ Motley Fool AI Copywriter — similarity checks at volume
+# ----------------------------------------------------------
+# Fills a throwaway history with synthetic pieces (bench_history's
+# generator), then times what a Generate adds: the exemplar check, the
+# history overlap lookup for a fresh draft and for one that reuses a
+# paragraph of a stored piece (is it found?), and variant dedupe.
+#
+#   python -m benchmarks.bench_similarity --pieces 50000
+# ----------------------------------------------------------
+
+import argparse, os, random, sys, tempfile, time
+
+from benchmarks.bench_history import fake_piece, timed
+from mf_copy import engine
+from mf_copy.history import History
+from mf_copy.similarity import diverse
+
+HEADLINES = ["Don't miss these 3 AI stocks", "Don't miss these 3 AI stocks!",
+             "Don't miss these 5 AI stocks", "The lithium rush starts tonight",
+             "Why our analysts love this dividend play", "Last chance: 50% off Stock Advisor",
+             "3 AI stocks to buy before midnight", "Is this the next big lithium winner?",
+             "Our top dividend pick is out", "Last chance: 60% off Stock Advisor"]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Originality / dedupe latency.")
+    ap.add_argument("--pieces", type=int, default=50_000)
+    ap.add_argument("--repeat", type=int, default=50)
+    a = ap.parse_args(argv)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="mf_sim_"), "history.sqlite3")
+    h, rng = History(path), random.Random(7)
+    t0 = time.perf_counter()
+    for i in range(a.pieces):
+        p = fake_piece(rng, i)
+        h.save(p.pop("kind"), p.pop("copy"), **p)
+    secs = time.perf_counter() - t0
+    rows = h._db.execute("SELECT COUNT(*) FROM shingles").fetchone()[0]
+    print(f"{a.pieces:,} pieces · {secs * 1e6 / a.pieces:.0f} µs per save (fingerprints "
+          f"included) · {rows:,} fingerprints · {h.stats()['size_mb']} MB")
+
+    fresh = fake_piece(random.Random(99), 0)["copy"]
+    source = h.get(a.pieces // 2)
+    paragraph = source["copy"].split("\n\n")[2]
+    reuse = "\n\n".join(fresh.split("\n\n")[:3] + [paragraph])     # 1 of 4 sections copied
+    exemplar = fresh + "\n\nTime’s ticking — when the clock hits zero tonight, you’re out of luck."
+
+    checks = {
+        "exemplar check":          lambda: engine.exemplar_index().check(exemplar),
+        "history, fresh draft":    lambda: h.overlaps(fresh),
+        "history, reused section": lambda: h.overlaps(reuse, threshold=0.15),
+        "diverse 10 → 5":          lambda: diverse(HEADLINES, 5),
+        "diverse 40 → 5":          lambda: diverse(HEADLINES * 4, 5),
+    }
+    print(f"{'check':<26}{'p50_ms':>9}{'p95_ms':>9}  result")
+    for name, fn in checks.items():
+        p50, p95, out = timed(fn, a.repeat)
+        shown = ", ".join(o if isinstance(o, str) else f"{o.ref} {o.score:.0%}" for o in out)
+        print(f"{name:<26}{p50:>9.2f}{p95:>9.2f}  {shown[:60] or '—'}")
+    print(f"(reused section came from #{source['id']})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+"""
+Motley Fool AI Copywriter — the copy engine behind the Streamlit app,
+usable headless: mf_copy.api (functions), python -m mf_copy (CLI) and
+mf_copy.service (HTTP).  Importing it has no side effects.
+"""
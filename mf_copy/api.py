@@ -0,0 +1,223 @@
+# ✍️ Motley Fool AI Copywriter — headless API
+# ----------------------------------------------------------
+# The app's operations as plain functions over JSON‑able dicts, shared
+# by scripts, the CLI (python -m mf_copy) and the HTTP service
+# (mf_copy.service):
+# • build_prompt → the exact messages Generate would send (no API call)
+# • generate · self_qa · generate_variants · adapt (one or many markets)
+# • Forgiving inputs: "email" / "sales", "short" / "long", country
+#   fragments ("uk", "canada"), partial traits (defaults fill the rest)
+# • sweep: one generation request × a trait grid → A/B test matrix
+#   (mf_copy.sweep); dry_run plans it without an API call
+# • Each call has an async twin (a…) — the service awaits those
+# • Bad input raises RequestError (HTTP 400 / CLI exit 2); API failures
+#   surface as mf_copy.scheduler.LLMError
+# ----------------------------------------------------------
+
+import re
+
+from mf_copy import engine, llm_async, sweep
+from mf_copy.budget import ContextOverflowError
+from mf_copy.engine import (BRIEF_FIELDS, COUNTRY_RULES, LENGTH_RULES, TRAIT_DEFAULTS,
+                            make_brief)
+
+COPY_TYPES = ["📧 Email", "📝 Sales Page"]
+DEFAULTS = {"copy_type": "Email", "length": "Short", "country": "Australia"}
+_ALIASES = {"uk": "United Kingdom", "gb": "United Kingdom", "us": "United States",
+            "usa": "United States", "au": "Australia", "ca": "Canada"}
+
+class RequestError(ValueError):
+    """The request can't be run as given (unknown option, missing field …)."""
+
+# ────────────────────────────────────────────────────────────
+# 1.  Request normalisation
+# ────────────────────────────────────────────────────────────
+def resolve(options, value, kind: str) -> str:
+    """
+    Exact key, else the one option containing *value* (case‑insensitive);
+    "long" picks "📖 Long …" over "📚 Extra Long …" (label starts with it).
+    """
+    if value in options:
+        return value
+    frag = _ALIASES.get(str(value).strip().lower(), str(value)).strip().lower()
+    hits = [o for o in options if frag and frag in o.lower()]
+    if len(hits) > 1:
+        hits = [o for o in hits if re.sub(r"^\W+", "", o.lower()).startswith(frag)] or hits
+    if len(hits) != 1:
+        raise RequestError(f"{'Ambiguous' if hits else 'Unknown'} {kind}: {value!r} "
+                           f"(options: {', '.join(options)})")
+    return hits[0]
+
+def _traits(raw) -> dict:
+    if raw is None:
+        return dict(TRAIT_DEFAULTS)
+    if not isinstance(raw, dict):
+        raise RequestError("traits must be an object {trait: 1–10}")
+    traits = dict(TRAIT_DEFAULTS)
+    for name, score in raw.items():
+        key = resolve(TRAIT_DEFAULTS, name, "trait")
+        if not isinstance(score, int) or not 1 <= score <= 10:
+            raise RequestError(f"{key}: score must be an integer 1–10 (got {score!r})")
+        traits[key] = score
+    return traits
+
+def _text(req: dict, key="copy") -> str:
+    text = req.get(key)
+    if not isinstance(text, str) or not text.strip():
+        raise RequestError(f"{key!r} (non‑empty string) is required")
+    return text
+
+def normalise(req: dict) -> dict:
+    """
+    Generation request → engine arguments.  Brief fields may sit at the top
+    level or under "brief"; copy_type / length / country accept fragments.
+    """
+    if not isinstance(req, dict):
+        raise RequestError("request body must be a JSON object")
+    brief = req.get("brief") or {}
+    if not isinstance(brief, dict):
+        raise RequestError("brief must be an object {hook, details, …}")
+    fields = {**{k: req[k] for k in BRIEF_FIELDS if k in req}, **brief}
+    fields["country"] = resolve(COUNTRY_RULES, fields.get("country") or DEFAULTS["country"],
+                                "country")
+    if not (fields.get("hook") or fields.get("details")):
+        raise RequestError("brief needs at least a hook or details")
+    best_of = req.get("best_of")
+    if best_of is not None and (not isinstance(best_of, int) or not 1 <= best_of <= 10):
+        raise RequestError("best_of must be an integer 1–10")
+    return {"copy_type": resolve(COPY_TYPES, req.get("copy_type") or DEFAULTS["copy_type"],
+                                 "copy type"),
+            "traits": _traits(req.get("traits")),
+            "brief": make_brief(**fields),
+            "length": resolve(LENGTH_RULES, req.get("length") or DEFAULTS["length"], "length"),
+            "original": req.get("original") or None,
+            "critique": bool(req.get("critique")), "variants": bool(req.get("variants")),
+            "best_of": best_of}
+
+# ────────────────────────────────────────────────────────────
+# 2.  Operations  (async first; sync wrappers below)
+# ────────────────────────────────────────────────────────────
+def build_prompt(req: dict) -> dict:
+    """
+    {messages, max_tokens} exactly as the draft call would send them (the
+    outline call for long‑form lengths).
+    """
+    n = normalise(req)
+    if engine.uses_longform(n["length"], n["original"]):
+        msgs, budget = engine.plan_budget(engine.outline_messages(
+            n["copy_type"], n["traits"], n["brief"], n["length"]), "outline")
+        return {"model": engine.OPENAI_MODEL, "messages": msgs, "max_tokens": budget}
+    msgs = engine.generation_messages(n["copy_type"], n["traits"], n["brief"], n["length"],
+                                      n["original"])
+    msgs, budget = engine.plan_budget(msgs, "draft", n["length"])
+    return {"model": engine.OPENAI_MODEL, "messages": msgs, "max_tokens": budget}
+
+async def agenerate(req: dict) -> dict:
+    """{plan, draft, copy, critique, variants, qa[, candidates | sections]}."""
+    n = normalise(req)
+    return await engine.agenerate(n["copy_type"], n["traits"], n["brief"], n["length"],
+                                  n["original"], n["critique"], n["variants"],
+                                  best_of=n["best_of"])
+
+async def aself_qa(req: dict) -> dict:
+    """
+    Local QA report for "copy"; unless fix=false, failing copy is patched.
+    → {copy, qa, changed}.
+    """
+    copy = _text(req)
+    copy_type = resolve(COPY_TYPES, req.get("copy_type") or DEFAULTS["copy_type"], "copy type")
+    length = resolve(LENGTH_RULES, req["length"], "length") if req.get("length") else None
+    traits = _traits(req.get("traits"))
+    report = engine.qa_check(copy, copy_type, length, traits)
+    fixed = copy
+    if req.get("fix", True) and not report.passed:
+        fixed = await engine.aself_qa(copy, copy_type, length, traits, report)
+    return {"copy": fixed, "qa": report.as_dict(), "changed": fixed != copy}
+
+async def agenerate_variants(req: dict) -> dict:
+    """{headlines: [...], ctas: [...]} for "copy"."""
+    n = req.get("n", 5)
+    if not isinstance(n, int) or not 1 <= n <= 20:
+        raise RequestError("n must be an integer 1–20")
+    return await engine.agenerate_variants(_text(req), n)
+
+async def aadapt(req: dict) -> dict:
+    """
+    "copy" into "targets" (list or comma string; default every other market).
+    → {market: {copy} | {error}} — one market failing doesn't sink the rest.
+    """
+    copy = _text(req)
+    source = resolve(COUNTRY_RULES, req["source"], "country") if req.get("source") else None
+    raw = req.get("targets") or req.get("target")
+    if isinstance(raw, str):
+        raw = [t for t in raw.split(",") if t.strip()]
+    targets = ([resolve(COUNTRY_RULES, t, "country") for t in raw] if raw else
+               [c for c in COUNTRY_RULES if c != (source or DEFAULTS["country"])])
+    mode = req.get("mode")
+    if mode not in (None, "prepass", "only", "off"):
+        raise RequestError("mode must be prepass, only or off")
+    out = await engine.aadapt_markets(copy, targets, source_c=source, mode=mode)
+    return {c: ({"error": str(r)} if isinstance(r, Exception) else {"copy": r})
+            for c, r in out.items()}
+
+def _grid(raw) -> dict:
+    if not raw or not isinstance(raw, (dict, list, str)):
+        raise RequestError('grid is required, e.g. {"Urgency": ["low", "high"]}')
+    try:
+        parsed = sweep.parse_grid(raw)
+    except ValueError as e:
+        raise RequestError(f"grid: {e}") from None
+    grid = {resolve(TRAIT_DEFAULTS, name, "trait"): levels for name, levels in parsed.items()}
+    try:
+        sweep.cells(sweep.axes(grid))
+    except ValueError as e:
+        raise RequestError(f"grid: {e}") from None
+    return grid
+
+async def asweep(req: dict) -> dict:
+    """
+    A generation request plus "grid" {trait: [low|mid|high|1–10, …]} →
+    {axes, cells, prompts} (see mf_copy.sweep).  dry_run=true → the plan only.
+    """
+    n = normalise(req)
+    grid = _grid(req.get("grid"))
+    if req.get("dry_run"):
+        return sweep.plan(n["copy_type"], n["traits"], n["brief"], n["length"], grid,
+                          n["original"])
+    workers = req.get("workers") or sweep.WORKERS
+    if not isinstance(workers, int) or not 1 <= workers <= 16:
+        raise RequestError("workers must be an integer 1–16")
+    return await sweep.asweep(n["copy_type"], n["traits"], n["brief"], n["length"], grid,
+                              n["original"], n["critique"], n["variants"], n["best_of"],
+                              workers=workers)
+
+async def abuild_prompt(req: dict) -> dict:
+    return build_prompt(req)
+
+OPERATIONS = {"prompt": abuild_prompt, "generate": agenerate, "qa": aself_qa,
+              "variants": agenerate_variants, "adapt": aadapt, "sweep": asweep}
+LOCAL_OPERATIONS = {"prompt"}          # never call the API
+
+async def arun(op: str, req: dict) -> dict:
+    if op not in OPERATIONS:
+        raise RequestError(f"Unknown operation {op!r} (options: {', '.join(OPERATIONS)})")
+    try:
+        return await OPERATIONS[op](req)
+    except ContextOverflowError as e:            # brief / copy too long for the model
+        raise RequestError(str(e)) from None
+
+def run(op: str, req: dict) -> dict:
+    """Blocking entry point for scripts: run("generate", {...}) (on the shared loop)."""
+    return llm_async.run(arun, op, req)
+
+def generate(req: dict) -> dict:
+    return run("generate", req)
+
+def self_qa(req: dict) -> dict:
+    return run("qa", req)
+
+def generate_variants(req: dict) -> dict:
+    return run("variants", req)
+
+def adapt(req: dict) -> dict:
+    return run("adapt", req)
@@ -0,0 +1,222 @@
+# ✍️ Motley Fool AI Copywriter — batch campaign runner
+# ----------------------------------------------------------
+# • Briefs from CSV / JSONL × countries × lengths × trait presets
+# • Concurrent worker pool on the async engine
+# • Rate‑limit‑aware pacing (slows down after failures)
+# • Resumable: finished job IDs in the output file are skipped
+# • Results streamed to JSONL as each job completes
+#
+#   python -m mf_copy.batch briefs.csv -o results.jsonl \
+#       --countries all --lengths Short,Medium --presets presets.json
+# ----------------------------------------------------------
+
+import argparse, asyncio, csv, hashlib, itertools, json, pathlib, sys, time
+
+from mf_copy import engine
+from mf_copy.api import COPY_TYPES, RequestError, resolve
+from mf_copy.engine import COUNTRY_RULES, LENGTH_RULES, TRAIT_DEFAULTS, make_brief
+
+# ────────────────────────────────────────────────────────────
+# 1.  Inputs
+# ────────────────────────────────────────────────────────────
+def load_briefs(path) -> list[dict]:
+    """Rows from a .csv (header row) or .jsonl file."""
+    path = pathlib.Path(path)
+    with path.open(newline="", encoding="utf-8") as f:
+        if path.suffix.lower() == ".csv":
+            return [dict(r) for r in csv.DictReader(f)]
+        return [json.loads(l) for l in f if l.strip()]
+
+def load_presets(path=None) -> dict[str, dict]:
+    """{preset_name: {trait: score}}; missing traits fall back to TRAIT_DEFAULTS."""
+    if not path:
+        return {"default": dict(TRAIT_DEFAULTS)}
+    raw = json.loads(pathlib.Path(path).read_text())
+    return {name: {**TRAIT_DEFAULTS, **scores} for name, scores in raw.items()}
+
+def _pick(options, wanted: str | None, kind: str) -> list[str]:
+    """
+    Resolve 'all' or a comma list of fragments to option keys (api.resolve:
+    aliases such as "us", "Long" ≠ "Extra Long"); ambiguous or unknown
+    fragments stop the run rather than quietly adding or dropping jobs.
+    """
+    if not wanted:
+        return []
+    if wanted.strip().lower() == "all":
+        return list(options)
+    out = []
+    for frag in (w.strip() for w in wanted.split(",") if w.strip()):
+        try:
+            hit = resolve(options, frag, kind)
+        except RequestError as e:
+            raise SystemExit(str(e)) from None
+        if hit not in out:
+            out.append(hit)
+    return out
+
+# ────────────────────────────────────────────────────────────
+# 2.  Job expansion
+# ────────────────────────────────────────────────────────────
+def expand_jobs(briefs, presets, countries=None, lengths=None, copy_types=None) -> list[dict]:
+    """
+    Cross every brief with countries × lengths × presets × copy types.
+    CLI selections override per‑row values; otherwise the row's own
+    country / length / copy_type are used (with app defaults as fallback).
+    """
+    jobs = []
+    for i, row in enumerate(briefs):
+        row_countries = countries or _pick(COUNTRY_RULES, row.get("country") or "Australia", "country")
+        row_lengths   = lengths or _pick(LENGTH_RULES, row.get("length") or "Short", "length")
+        row_types     = copy_types or _pick(COPY_TYPES, row.get("copy_type") or "Email", "copy type")
+        brief_id = row.get("id") or f"brief{i + 1}"
+
+        for country, length, (preset, traits), copy_type in itertools.product(
+                row_countries, row_lengths, presets.items(), row_types):
+            brief = make_brief(**{**row, "country": country})
+            key = json.dumps([brief_id, brief, length, traits, copy_type], sort_keys=True)
+            jobs.append({"job_id": hashlib.sha1(key.encode()).hexdigest()[:16],
+                         "brief_id": brief_id, "country": country, "length": length,
+                         "preset": preset, "copy_type": copy_type,
+                         "traits": traits, "brief": brief})
+    return jobs
+
+def completed_ids(out_path) -> set[str]:
+    """Job IDs already written successfully (checkpoint for resume)."""
+    path = pathlib.Path(out_path)
+    if not path.exists():
+        return set()
+    done = set()
+    for l in path.read_text(encoding="utf-8").splitlines():
+        try:
+            rec = json.loads(l)
+        except json.JSONDecodeError:
+            continue                      # torn last line from an interrupted run
+        if rec.get("status") == "ok":
+            done.add(rec["job_id"])
+    return done
+
+# ────────────────────────────────────────────────────────────
+# 3.  Pacing
+# ────────────────────────────────────────────────────────────
+class Pacer:
+    """
+    Spaces job starts to stay under a jobs‑per‑minute budget.
+    Failures (usually 429s surfacing as exhausted retries) double the
+    spacing; each success eases it back toward the configured rate.
+    """
+
+    def __init__(self, per_minute: float):
+        self.base = 60.0 / per_minute if per_minute else 0.0
+        self.interval = self.base
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def failed(self):
+        self.interval = min(max(self.interval * 2, 1.0), 60.0)
+
+    def succeeded(self):
+        self.interval = max(self.base, self.interval * 0.8)
+
+# ────────────────────────────────────────────────────────────
+# 4.  Worker pool
+# ────────────────────────────────────────────────────────────
+async def run_job(job, critique=False, variants=False) -> dict:
+    t0 = time.perf_counter()
+    try:
+        out = await engine.agenerate(job["copy_type"], job["traits"], job["brief"],
+                                     job["length"], critique=critique, variants=variants)
+        rec = {"status": "ok", **out}
+    except Exception as e:
+        rec = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+    rec["seconds"] = round(time.perf_counter() - t0, 2)
+    return {**{k: job[k] for k in ("job_id", "brief_id", "country", "length",
+                                   "preset", "copy_type", "traits")}, **rec}
+
+async def run_batch(jobs, out_path, workers=4, per_minute=30, critique=False,
+                    variants=False, log=print) -> dict:
+    """Run *jobs* through a pool of *workers*, appending one JSON line per result."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    pacer = Pacer(per_minute)
+    counts = {"ok": 0, "error": 0}
+
+    with open(out_path, "a", encoding="utf-8") as out:
+        async def worker():
+            while True:
+                try:
+                    job = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await pacer.wait()
+                rec = await run_job(job, critique, variants)
+                (pacer.succeeded if rec["status"] == "ok" else pacer.failed)()
+                counts[rec["status"]] += 1
+                out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                out.flush()
+                log(f"[{counts['ok'] + counts['error']}/{len(jobs)}] {rec['status']:5} "
+                    f"{job['brief_id']} · {job['country']} · {job['length']} · "
+                    f"{job['preset']} ({rec['seconds']}s)")
+
+        await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+    return counts
+
+# ────────────────────────────────────────────────────────────
+# 5.  CLI
+# ────────────────────────────────────────────────────────────
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate copy for many briefs overnight.")
+    ap.add_argument("briefs", help="CSV or JSONL file of briefs")
+    ap.add_argument("-o", "--out", default="batch_results.jsonl", help="JSONL results (appended)")
+    ap.add_argument("--countries", help="'all' or comma list, e.g. 'Australia,Canada'")
+    ap.add_argument("--lengths", help="'all' or comma list of fragments, e.g. 'Short,Long'")
+    ap.add_argument("--copy-types", help="'all', 'Email' or 'Sales'")
+    ap.add_argument("--presets", help="JSON file {name: {trait: score}}")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--per-minute", type=float, default=30, help="max job starts per minute")
+    ap.add_argument("--model", help="OpenAI model (default: engine default)")
+    ap.add_argument("--critique", action="store_true")
+    ap.add_argument("--variants", action="store_true")
+    ap.add_argument("--dry-run", action="store_true", help="list jobs and exit")
+    args = ap.parse_args(argv)
+
+    engine.configure(model=args.model)
+    jobs = expand_jobs(load_briefs(args.briefs), load_presets(args.presets),
+                       _pick(COUNTRY_RULES, args.countries, "country"),
+                       _pick(LENGTH_RULES, args.lengths, "length"),
+                       _pick(COPY_TYPES, args.copy_types, "copy type"))
+    done = completed_ids(args.out)
+    todo = [j for j in jobs if j["job_id"] not in done]
+    print(f"{len(jobs)} jobs · {len(jobs) - len(todo)} already done · {len(todo)} to run",
+          file=sys.stderr)
+
+    if args.dry_run:
+        for j in todo:
+            print(json.dumps({k: j[k] for k in ("job_id", "brief_id", "country",
+                                                "length", "preset", "copy_type")},
+                             ensure_ascii=False))
+        return 0
+
+    async def run_and_close():
+        try:
+            return await run_batch(todo, args.out, args.workers, args.per_minute,
+                                   args.critique, args.variants,
+                                   log=lambda m: print(m, file=sys.stderr))
+        finally:                            # its connections die with this loop
+            from mf_copy.clients import aclose_clients
+            await aclose_clients()
+
+    counts = asyncio.run(run_and_close())
+    print(f"done · {counts['ok']} ok · {counts['error']} failed", file=sys.stderr)
+    return 1 if counts["error"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+# ✍️ Motley Fool AI Copywriter — token budgets
+# ----------------------------------------------------------
+# • Input tokens per message list (tiktoken; a word/punctuation
+#   estimate, reported by token_counter(), when it isn't usable)
+# • Tight max_tokens per call type, sized from the LENGTH_RULES
+#   bucket or from the copy the call has to echo back
+# • Context‑window check that pre‑trims the embedded ORIGINAL
+#   COPY (with a warning) instead of letting the API reject it
+# ----------------------------------------------------------
+
+import math, re, warnings
+from functools import lru_cache
+
+try:                                    # in requirements.txt — exact counts for OpenAI models
+    import tiktoken
+except ImportError:                     # pragma: no cover — estimate instead
+    tiktoken = None
+
+# ────────────────────────────────────────────────────────────
+# 0.  Model limits & sizing constants
+# ────────────────────────────────────────────────────────────
+CONTEXT_WINDOWS = {
+    "gpt-4.1": 1_047_576, "gpt-4.1-mini": 1_047_576, "gpt-4.1-nano": 1_047_576,
+    "gpt-4o": 128_000, "gpt-4o-mini": 128_000, "gpt-4-turbo": 128_000,
+    "gpt-4-32k": 32_768, "gpt-4": 8_192, "gpt-3.5-turbo": 16_385,
+}
+DEFAULT_CONTEXT = 128_000
+MSG_OVERHEAD = 3            # tokens per message for role / separators
+REPLY_PRIMING = 3           # every reply is primed with <|assistant|>
+
+TOKENS_PER_WORD = 1.4       # marketing Markdown: headings, bullets, £/$ figures
+HEADROOM = 1.25             # slack over the bucket ceiling before we cut a reply
+PLAN_TOKENS = 400           # the JSON "plan" field in a draft
+MIN_OUTPUT = 256
+FIXED_BUDGETS = {"qa": 400, "critique": 300, "outline": 1500}   # independent of length
+VARIANT_TOKENS = 40         # per headline / CTA idea, JSON included
+ECHO_LABELS = {"rewrite", "adapt", "patch", "update"}   # reply ≈ the copy they were sent
+
+class ContextOverflowWarning(UserWarning):
+    """The prompt had to be trimmed (or max_tokens cut) to fit the context window."""
+
+class ContextOverflowError(ValueError):
+    """Even after trimming, the prompt leaves no room for a useful reply."""
+
+class TokenEstimateWarning(UserWarning):
+    """tiktoken is installed but couldn't load its encoding — counts are estimated."""
+
+# ────────────────────────────────────────────────────────────
+# 1.  Counting
+# ────────────────────────────────────────────────────────────
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+@lru_cache(maxsize=8)
+def _encoder(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except (OSError, ValueError) as e:  # encodings download on first use — offline hosts can't
+        warnings.warn(f"tiktoken couldn't load an encoding for {model} ({e}); "
+                      "token counts are estimated.", TokenEstimateWarning, stacklevel=3)
+        return None
+
+def token_counter(model: str = "gpt-4.1") -> str:
+    """"tiktoken", or why counts are estimated — budgets and trimming are only as good."""
+    if tiktoken is None:
+        return "estimate (tiktoken not installed — pip install -r requirements.txt)"
+    return "tiktoken" if _encoder(model) else "estimate (tiktoken couldn't load its encoding)"
+
+def count_tokens(text: str, model: str = "gpt-4.1") -> int:
+    enc = _encoder(model)
+    if enc is not None:
+        return len(enc.encode(text or "", disallowed_special=()))
+    # ~1 token per short word or symbol, long words split every 4 characters
+    return sum(max(1, math.ceil(len(w) / 4)) for w in _WORD_RE.findall(text or ""))
+
+def message_tokens(messages: list[dict], model: str = "gpt-4.1") -> int:
+    return REPLY_PRIMING + sum(MSG_OVERHEAD + count_tokens(m.get("content") or "", model)
+                               for m in messages)
+
+def context_window(model: str) -> int:
+    # longest matching prefix so dated snapshots ("gpt-4o-2024-08-06") resolve
+    for name in sorted(CONTEXT_WINDOWS, key=len, reverse=True):
+        if model.startswith(name):
+            return CONTEXT_WINDOWS[name]
+    return DEFAULT_CONTEXT
+
+# ────────────────────────────────────────────────────────────
+# 2.  Embedded copy (what gets echoed back / trimmed)
+# ────────────────────────────────────────────────────────────
+# (start marker, end marker) — None = runs to the end of the message
+EMBEDS = (("### ORIGINAL COPY\n", "\n### END ORIGINAL"),
+          ("--- ORIGINAL COPY START ---\n", "\n--- ORIGINAL COPY END ---"),
+          ("### ORIGINAL\n", None),
+          ("### SECTION\n", None),
+          ("--- COPY ---\n", "--- END"))
+
+def embedded_span(messages: list[dict]) -> tuple[int, int, int] | None:
+    """(message index, start, end) of the copy embedded in the last user message."""
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i]["role"] != "user":
+            continue
+        content = messages[i].get("content") or ""
+        for start_mark, end_mark in EMBEDS:
+            at = content.find(start_mark)
+            if at < 0:
+                continue
+            start = at + len(start_mark)
+            end = content.find(end_mark, start) if end_mark else len(content)
+            return i, start, (end if end >= 0 else len(content))
+        return None
+    return None
+
+def embedded_copy(messages: list[dict]) -> str:
+    span = embedded_span(messages)
+    return messages[span[0]]["content"][span[1]:span[2]] if span else ""
+
+# ────────────────────────────────────────────────────────────
+# 3.  Output budgets
+# ────────────────────────────────────────────────────────────
+def words_budget(bounds) -> int:
+    """Tokens for a piece in a LENGTH_RULES bucket (open‑ended → 1.5× the floor)."""
+    lo, hi = bounds
+    return math.ceil((hi or lo * 1.5) * TOKENS_PER_WORD * HEADROOM)
+
+def output_budget(label: str, messages: list[dict] | None = None, bounds=None,
+                  n: int = 5, model: str = "gpt-4.1", ceiling: int = 10_000) -> int:
+    """
+    max_tokens for one call.  *bounds* is the (min, max) word bucket when the
+    reply is a whole piece (draft, full rewrite); echo calls are sized from
+    the copy they carry; qa / critique / variants get small fixed budgets.
+    """
+    if label in FIXED_BUDGETS:
+        budget = FIXED_BUDGETS[label]
+    elif label == "variants":
+        budget = 2 * n * VARIANT_TOKENS + 60
+    elif label == "draft" and bounds:
+        budget = words_budget(bounds) + PLAN_TOKENS
+    elif label in ECHO_LABELS and messages:
+        echo = embedded_copy(messages)
+        budget = math.ceil(count_tokens(echo, model) * HEADROOM) + 150 if echo else 2 * MIN_OUTPUT
+        if bounds:                              # rewrites may need to grow to the bucket
+            budget = max(budget, words_budget(bounds))
+    else:
+        return ceiling
+    return max(MIN_OUTPUT, min(ceiling, budget))
+
+# ────────────────────────────────────────────────────────────
+# 4.  Context‑window fit
+# ────────────────────────────────────────────────────────────
+TRIM_MARK = "\n\n[… trimmed to fit the context window …]\n\n"
+
+def fit_context(messages: list[dict], max_tokens: int, model: str = "gpt-4.1"):
+    """
+    → (messages, max_tokens) that fit *model*'s window.  Over‑long prompts get
+    the middle of their embedded copy cut out until the reply has its budget
+    (or half the window, whichever is smaller); the reply budget then takes
+    what is left.  Both cases warn; no room at all raises.
+    """
+    window = context_window(model)
+    used = message_tokens(messages, model)
+    if used + max_tokens <= window:
+        return messages, max_tokens
+
+    span = embedded_span(messages)
+    over = used + min(max_tokens, window // 2) - window
+    if span and over > 0:
+        i, start, end = span
+        content = messages[i]["content"]
+        copy = content[start:end]
+        keep = max(0, len(copy) - math.ceil(over * len(copy) / max(1, count_tokens(copy, model)))
+                   - len(TRIM_MARK) * 2)
+        if keep < len(copy):
+            head, tail = copy[:keep * 2 // 3], copy[len(copy) - keep // 3:] if keep // 3 else ""
+            messages = [*messages[:i],
+                        {**messages[i], "content": content[:start] + head + TRIM_MARK + tail
+                                                   + content[end:]},
+                        *messages[i + 1:]]
+            warnings.warn(f"Prompt is {used} tokens; trimmed the embedded copy to fit "
+                          f"{model}'s {window}-token window.", ContextOverflowWarning, stacklevel=2)
+            used = message_tokens(messages, model)
+
+    room = window - used
+    if room < MIN_OUTPUT:
+        raise ContextOverflowError(f"Prompt needs {used} of {model}'s {window} tokens — "
+                                   "no room left for the reply.")
+    if room < max_tokens:
+        warnings.warn(f"max_tokens cut from {max_tokens} to {room} to fit {model}'s window.",
+                      ContextOverflowWarning, stacklevel=2)
+        max_tokens = room
+    return messages, max_tokens
@@ -0,0 +1,160 @@
+# ✍️ Motley Fool AI Copywriter — LLM response cache
+# ----------------------------------------------------------
+# • Content‑addressed key: model + canonical messages + params
+# • In‑memory LRU in front of an on‑disk SQLite store
+# • TTL & size eviction, hit / miss counters
+# • Sampled calls (temperature set) bypass the cache
+# ----------------------------------------------------------
+
+import hashlib, json, os, sqlite3, threading, time, unicodedata
+from collections import OrderedDict
+
+# ────────────────────────────────────────────────────────────
+# 0.  Defaults
+# ────────────────────────────────────────────────────────────
+CACHE_ENABLED = os.environ.get("MF_COPY_CACHE", "on").lower() not in ("0", "off", "false")
+CACHE_PATH   = os.environ.get("MF_COPY_CACHE_PATH", ".cache/llm_responses.sqlite3")
+CACHE_TTL    = 7 * 24 * 3600   # seconds an entry stays valid
+MEM_ITEMS    = 256             # hot entries kept in the LRU
+DISK_ITEMS   = 20_000          # rows kept in SQLite before eviction
+EVICT_EVERY  = 50              # run disk eviction every N writes
+
+# ────────────────────────────────────────────────────────────
+# 1.  Key derivation
+# ────────────────────────────────────────────────────────────
+def _canon_text(text: str) -> str:
+    text = unicodedata.normalize("NFC", text or "")
+    return text.replace("\r\n", "\n").replace("\r", "\n").strip()
+
+def canonical_messages(messages: list[dict]) -> list[dict]:
+    """Messages reduced to role + normalised content (key order independent)."""
+    return [{"role": m["role"], "content": _canon_text(m.get("content"))}
+            for m in messages]
+
+def cache_key(model: str, messages: list[dict], **params) -> str:
+    """sha256 over model, canonical messages and the non‑None sampling params."""
+    payload = {"model": model,
+               "messages": canonical_messages(messages),
+               "params": {k: v for k, v in params.items() if v is not None}}
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def is_cacheable(temperature=None, n=None, **_) -> bool:
+    """Sampled calls must stay fresh — any explicit temperature or n>1 bypasses."""
+    return CACHE_ENABLED and temperature is None and (n is None or n == 1)
+
+# ────────────────────────────────────────────────────────────
+# 2.  Two‑tier store
+# ────────────────────────────────────────────────────────────
+class ResponseCache:
+    """In‑memory LRU backed by SQLite; safe to share across Streamlit sessions."""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL,
+                 mem_items=MEM_ITEMS, disk_items=DISK_ITEMS):
+        self.path, self.ttl = path, ttl
+        self.mem_items, self.disk_items = mem_items, disk_items
+        self._mem: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.counters = {"hits": 0, "mem_hits": 0, "disk_hits": 0,
+                         "misses": 0, "writes": 0, "evictions": 0}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS responses (
+                              key      TEXT PRIMARY KEY,
+                              model    TEXT,
+                              value    TEXT NOT NULL,
+                              created  REAL NOT NULL,
+                              accessed REAL NOT NULL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+        self._db.commit()
+
+    # ---- lookups ------------------------------------------------
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit and now - hit[0] <= self.ttl:
+                self._mem.move_to_end(key)
+                self.counters["hits"] += 1; self.counters["mem_hits"] += 1
+                return hit[1]
+            if hit:                                   # expired in memory
+                del self._mem[key]
+
+            row = self._db.execute("SELECT value, created FROM responses WHERE key=?",
+                                   (key,)).fetchone()
+            if row and now - row[1] <= self.ttl:
+                self._db.execute("UPDATE responses SET accessed=? WHERE key=?", (now, key))
+                self._db.commit()
+                self._remember(key, row[1], row[0])
+                self.counters["hits"] += 1; self.counters["disk_hits"] += 1
+                return row[0]
+
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, key: str, value: str, model: str = "") -> None:
+        if not value:
+            return
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?,?,?,?,?)",
+                             (key, model, value, now, now))
+            self._db.commit()
+            self.counters["writes"] += 1
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self._evict_disk(now)
+
+    # ---- maintenance --------------------------------------------
+    def _remember(self, key, created, value):
+        self._mem[key] = (created, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.mem_items:
+            self._mem.popitem(last=False)
+
+    def _evict_disk(self, now):
+        cur = self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        evicted = cur.rowcount
+        cur = self._db.execute("""DELETE FROM responses WHERE key IN (
+                                    SELECT key FROM responses ORDER BY accessed DESC
+                                    LIMIT -1 OFFSET ?)""", (self.disk_items,))
+        evicted += cur.rowcount
+        self._db.commit()
+        self.counters["evictions"] += max(evicted, 0)
+
+    def evict(self) -> None:
+        with self._lock:
+            self._evict_disk(time.time())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {**self.counters,
+                    "hit_rate": self.counters["hits"] / lookups if lookups else 0.0,
+                    "mem_items": len(self._mem), "disk_items": rows}
+
+# ────────────────────────────────────────────────────────────
+# 3.  Process‑wide instance
+# ────────────────────────────────────────────────────────────
+_CACHE: ResponseCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+def get_cache() -> ResponseCache:
+    """Lazily opened singleton — one store per server process."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = ResponseCache()
+        return _CACHE
@@ -0,0 +1,181 @@
+# ✍️ Motley Fool AI Copywriter — command line
+# ----------------------------------------------------------
+# Headless entry points over mf_copy.api (no Streamlit, no browser):
+#
+#   python -m mf_copy generate --brief brief.json [--best-of 3] [--json]
+#   python -m mf_copy prompt   --brief brief.json         (no API call)
+#   python -m mf_copy qa       copy.md --length medium [--check-only]
+#   python -m mf_copy variants copy.md -n 5
+#   python -m mf_copy adapt    copy.md --to uk,canada [--mode only]
+#   python -m mf_copy sweep    --brief brief.json --grid Urgency=low,high \
+#                              --grid FOMO=low,mid,high --matrix matrix.csv
+#   python -m mf_copy serve    --port 8080 --workers 8    (HTTP API)
+#   python -m mf_copy batch    briefs.csv -o results.jsonl
+#   python -m mf_copy export   results.jsonl -o copy.zip --formats docx,html
+#
+# brief.json holds brief fields plus optional copy_type, length,
+# traits …; flags override it.  "-" reads stdin.  Copy goes to stdout
+# (--json for the full result).  Exit 2 = bad input, 1 = API failure.
+# Credentials: OPENAI_API_KEY / OPENAI_BASE_URL or --api-key / --base-url.
+# ----------------------------------------------------------
+
+import argparse, json, pathlib, sys
+
+from mf_copy import api, batch, engine, export, service, sweep
+from mf_copy.scheduler import LLMError
+
+def _read(path: str) -> str:
+    return sys.stdin.read() if path == "-" else pathlib.Path(path).read_text(encoding="utf-8")
+
+def _load_json(path: str | None) -> dict:
+    if not path:
+        return {}
+    try:
+        data = json.loads(_read(path))
+    except (OSError, json.JSONDecodeError) as e:
+        raise api.RequestError(f"{path}: {e}") from None
+    if not isinstance(data, dict):
+        raise api.RequestError(f"{path}: expected a JSON object")
+    return data
+
+def _flags(args, *names) -> dict:
+    return {n: getattr(args, n) for n in names if getattr(args, n, None) not in (None, False)}
+
+# ────────────────────────────────────────────────────────────
+# 1.  Requests from arguments
+# ────────────────────────────────────────────────────────────
+def generation_request(args) -> dict:
+    req = _load_json(args.brief)
+    if args.traits:
+        req["traits"] = {**(req.get("traits") or {}), **_load_json(args.traits)}
+    if args.original:
+        req["original"] = _read(args.original)
+    req = {**req, **_flags(args, "copy_type", "length", "country", "best_of",
+                           "critique", "variants")}
+    if args.command == "sweep":
+        req = {**req, "grid": args.grid or req.get("grid"), **_flags(args, "workers", "dry_run")}
+    return req
+
+def copy_request(args, *names) -> dict:
+    return {"copy": _read(args.copy), **_flags(args, *names)}
+
+def request_for(args) -> dict:
+    if args.command in ("generate", "prompt", "sweep"):
+        return generation_request(args)
+    if args.command == "qa":
+        req = copy_request(args, "copy_type", "length")
+        if args.traits:
+            req["traits"] = _load_json(args.traits)
+        return {**req, "fix": not args.check_only}
+    if args.command == "variants":
+        return copy_request(args, "n")
+    return {**copy_request(args, "source", "mode"), "targets": args.to}
+
+def render(command: str, out: dict) -> str:
+    """Plain‑text output: the copy (or what stands in for it)."""
+    if command == "prompt":
+        return "\n\n".join(f"### {m['role']}\n{m['content']}" for m in out["messages"])
+    if command == "variants":
+        return "\n".join(["# Headlines", *out["headlines"], "", "# CTAs", *out["ctas"]])
+    if command == "sweep":
+        return (sweep.to_markdown(sweep.grid(out)) + f"\n\n{len(out['cells'])} cells · "
+                f"{len(out['prompts'])} unique prompts")
+    if command == "adapt":
+        return "\n\n".join(f"===== {c} =====\n{r.get('copy') or 'ERROR: ' + r['error']}"
+                           for c, r in out.items())
+    return out["copy"]
+
+# ────────────────────────────────────────────────────────────
+# 2.  Parser
+# ────────────────────────────────────────────────────────────
+def parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m mf_copy",
+                                 description="Motley Fool AI Copywriter — headless.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--model", help="OpenAI model (default: engine default)")
+    common.add_argument("--api-key", help="default: OPENAI_API_KEY")
+    common.add_argument("--base-url", help="default: OPENAI_BASE_URL / api.openai.com")
+    common.add_argument("--json", action="store_true", help="print the full result as JSON")
+    common.add_argument("-o", "--out", help="write output here instead of stdout")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    for name, help_ in (("generate", "plan, draft, QA and polish new copy"),
+                        ("prompt", "print the draft prompt (no API call)"),
+                        ("sweep", "one brief × a trait grid → comparison grid & test matrix")):
+        p = sub.add_parser(name, parents=[common], help=help_)
+        p.add_argument("--brief", required=True, help="brief JSON file ('-' = stdin)")
+        p.add_argument("--copy-type", help="email | sales")
+        p.add_argument("--length", help="short | medium | long | extra | monster")
+        p.add_argument("--country")
+        p.add_argument("--traits", help="JSON file {trait: 1–10}; merged over the brief's")
+        p.add_argument("--original", help="copy file to revise instead of writing fresh")
+        if name in ("generate", "sweep"):
+            p.add_argument("--best-of", type=int, help="draft N candidates, keep the best")
+            p.add_argument("--critique", action="store_true")
+            p.add_argument("--variants", action="store_true")
+        if name == "sweep":
+            p.add_argument("--grid", action="append", metavar="TRAIT=LEVELS",
+                           help="e.g. Urgency=low,mid,high or FOMO=2,9 (repeat per trait)")
+            p.add_argument("--workers", type=int, help=f"prompts in flight "
+                                                       f"(default {sweep.WORKERS})")
+            p.add_argument("--matrix", help="write the test matrix here (.csv or .jsonl)")
+            p.add_argument("--dry-run", action="store_true",
+                           help="show the cells → unique prompts plan (no API call)")
+
+    p = sub.add_parser("qa", parents=[common], help="local QA report; patch what fails")
+    p.add_argument("copy", help="copy file ('-' = stdin)")
+    p.add_argument("--copy-type", help="email | sales")
+    p.add_argument("--length")
+    p.add_argument("--traits", help="JSON file {trait: 1–10}")
+    p.add_argument("--check-only", action="store_true", help="report only, no API call")
+
+    p = sub.add_parser("variants", parents=[common], help="alternative headlines & CTAs")
+    p.add_argument("copy", help="copy file ('-' = stdin)")
+    p.add_argument("-n", type=int, default=5)
+
+    p = sub.add_parser("adapt", parents=[common], help="adapt copy for other markets")
+    p.add_argument("copy", help="copy file ('-' = stdin)")
+    p.add_argument("--to", help="comma list of markets (default: every other market)")
+    p.add_argument("--source", help="market the copy was written for (default: detected)")
+    p.add_argument("--mode", choices=("prepass", "only", "off"),
+                   help="rule pre‑pass + LLM (default), rules only, or LLM only")
+
+    service.add_arguments(sub.add_parser("serve", parents=[common], help="run the HTTP API"))
+    sub.add_parser("batch", add_help=False, help="many briefs → JSONL (see batch --help)")
+    sub.add_parser("export", add_help=False,
+                   help="results / history → ZIP of DOCX, HTML … (see export --help)")
+    return ap
+
+# ────────────────────────────────────────────────────────────
+# 3.  Entry point
+# ────────────────────────────────────────────────────────────
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["batch"]:
+        return batch.main(argv[1:])
+    if argv[:1] == ["export"]:
+        return export.main(argv[1:])
+
+    args = parser().parse_args(argv)
+    engine.configure(api_key=args.api_key, model=args.model, base_url=args.base_url)
+    if args.command == "serve":
+        return service.run(args)
+
+    try:
+        out = api.run(args.command, request_for(args))
+    except api.RequestError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    except LLMError as e:
+        print(f"API error: {e}", file=sys.stderr)
+        return 1
+
+    if getattr(args, "matrix", None):
+        n = sweep.save_matrix(out, args.matrix)
+        print(f"{n} cells → {args.matrix}", file=sys.stderr)
+    text = json.dumps(out, ensure_ascii=False, indent=2) if args.json else render(args.command, out)
+    if args.out:
+        pathlib.Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
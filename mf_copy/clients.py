@@ -0,0 +1,173 @@
+# ✍️ Motley Fool AI Copywriter — shared OpenAI clients
+# ----------------------------------------------------------
+# • One OpenAI client per process (per credentials), so every
+#   Streamlit session and rerun shares its keep‑alive pool
+# • One AsyncOpenAI per event loop — async pools can't cross loops;
+#   blocking callers share one long‑lived loop (llm_async.run), so in
+#   practice one async pool per process too
+# • Tuned httpx pool: connection caps, keep‑alive expiry, split
+#   connect / read / write / pool timeouts (env‑configurable)
+# • HTTP/2 when the optional h2 package is installed
+# • Pool metrics: new vs reused connections, connect time and
+#   HTTP version per request
+# ----------------------------------------------------------
+
+import asyncio, os, threading, time
+from importlib.util import find_spec
+from weakref import WeakKeyDictionary
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+# ────────────────────────────────────────────────────────────
+# 0.  Pool & timeout settings
+# ────────────────────────────────────────────────────────────
+def _env(name, default):
+    return type(default)(os.environ.get(name, default))
+
+MAX_CONNECTIONS = _env("MF_COPY_POOL_SIZE", 32)        # per client, all hosts
+MAX_KEEPALIVE = _env("MF_COPY_POOL_KEEPALIVE", 16)     # idle connections kept warm
+KEEPALIVE_EXPIRY = _env("MF_COPY_KEEPALIVE_EXPIRY", 90.0)
+CONNECT_TIMEOUT = _env("MF_COPY_CONNECT_TIMEOUT", 5.0)
+READ_TIMEOUT = _env("MF_COPY_READ_TIMEOUT", 120.0)     # long copy streams slowly
+WRITE_TIMEOUT = _env("MF_COPY_WRITE_TIMEOUT", 30.0)
+POOL_TIMEOUT = _env("MF_COPY_POOL_TIMEOUT", 30.0)      # waiting for a free connection
+HTTP2 = (os.environ.get("MF_COPY_HTTP2", "on").lower() not in ("0", "off", "false")
+         and find_spec("h2") is not None)
+
+def limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=MAX_CONNECTIONS,
+                        max_keepalive_connections=MAX_KEEPALIVE,
+                        keepalive_expiry=KEEPALIVE_EXPIRY)
+
+def timeout() -> httpx.Timeout:
+    return httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT,
+                         write=WRITE_TIMEOUT, pool=POOL_TIMEOUT)
+
+# ────────────────────────────────────────────────────────────
+# 1.  Connection‑reuse metrics
+# ────────────────────────────────────────────────────────────
+class PoolStats:
+    """Per‑request connection outcome, fed by httpx trace events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.requests = self.new_connections = 0
+        self.connect_s = 0.0
+        self.versions: dict[str, int] = {}
+
+    def record(self, new: bool, connect_s: float, version: str):
+        with self._lock:
+            self.requests += 1
+            self.new_connections += new
+            self.connect_s += connect_s
+            self.versions[version] = self.versions.get(version, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            reused = self.requests - self.new_connections
+            return {"requests": self.requests, "new_connections": self.new_connections,
+                    "reused": reused,
+                    "reuse_rate": reused / self.requests if self.requests else 0.0,
+                    "avg_connect_ms": round(self.connect_s * 1000 / self.new_connections, 1)
+                                      if self.new_connections else 0.0,
+                    "http_versions": dict(self.versions)}
+
+_POOL_STATS = PoolStats()
+
+def get_pool_stats() -> PoolStats:
+    return _POOL_STATS
+
+class _ConnTrace:
+    """httpcore "trace" extension: notes whether this request opened a connection."""
+    __slots__ = ("new", "started", "connect_s")
+
+    def __init__(self):
+        self.new, self.started, self.connect_s = False, 0.0, 0.0
+
+    def note(self, event):
+        if event == "connection.connect_tcp.started":
+            self.new, self.started = True, time.perf_counter()
+        elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            self.connect_s = time.perf_counter() - self.started
+
+    def __call__(self, event, info):
+        self.note(event)
+
+class _AsyncConnTrace(_ConnTrace):
+    __slots__ = ()
+
+    async def __call__(self, event, info):
+        self.note(event)
+
+def _on_response(response):
+    trace = response.request.extensions.get("trace")
+    if isinstance(trace, _ConnTrace):
+        _POOL_STATS.record(trace.new, trace.connect_s, response.http_version)
+
+def _on_request(request):
+    request.extensions["trace"] = _ConnTrace()
+
+async def _aon_request(request):
+    request.extensions["trace"] = _AsyncConnTrace()
+
+async def _aon_response(response):
+    _on_response(response)
+
+# ────────────────────────────────────────────────────────────
+# 2.  Client factory
+# ────────────────────────────────────────────────────────────
+_SYNC: dict[tuple, OpenAI] = {}
+_ASYNC: "WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, AsyncOpenAI]]" \
+    = WeakKeyDictionary()
+_CLIENTS_LOCK = threading.Lock()
+
+def _kwargs(api_key, base_url) -> dict:
+    # max_retries=0: mf_copy.scheduler owns retries
+    return {"max_retries": 0, "timeout": timeout(),
+            **{k: v for k, v in {"api_key": api_key, "base_url": base_url}.items() if v}}
+
+def get_client(api_key=None, base_url=None) -> OpenAI:
+    """Process‑wide OpenAI client for these credentials (SDK env defaults otherwise)."""
+    key = (api_key, base_url)
+    with _CLIENTS_LOCK:
+        if key not in _SYNC:
+            http = httpx.Client(http2=HTTP2, limits=limits(), timeout=timeout(),
+                                event_hooks={"request": [_on_request],
+                                             "response": [_on_response]})
+            _SYNC[key] = OpenAI(http_client=http, **_kwargs(api_key, base_url))
+        return _SYNC[key]
+
+def get_async_client(api_key=None, base_url=None) -> AsyncOpenAI:
+    """AsyncOpenAI for the running loop; reused by every call made on that loop."""
+    per_loop = _ASYNC.setdefault(asyncio.get_running_loop(), {})
+    key = (api_key, base_url)
+    if key not in per_loop:
+        http = httpx.AsyncClient(http2=HTTP2, limits=limits(), timeout=timeout(),
+                                 event_hooks={"request": [_aon_request],
+                                              "response": [_aon_response]})
+        per_loop[key] = AsyncOpenAI(http_client=http, **_kwargs(api_key, base_url))
+    return per_loop[key]
+
+def close_clients(keep: tuple | None = None):
+    """
+    Close pooled clients (all but *keep*), e.g. after credentials change.
+    Async ones are closed on their own loop (the shared one, in practice);
+    those of a loop that is no longer running are just dropped.
+    """
+    with _CLIENTS_LOCK:
+        for key in [k for k in _SYNC if k != keep]:
+            _SYNC.pop(key).close()
+        for loop, per_loop in list(_ASYNC.items()):
+            for key in [k for k in per_loop if k != keep]:
+                client = per_loop.pop(key)
+                if loop.is_running() and not loop.is_closed():
+                    asyncio.run_coroutine_threadsafe(client.close(), loop)
+
+async def aclose_clients():
+    """Close the running loop's AsyncOpenAI clients — await before a private loop ends."""
+    for client in _ASYNC.pop(asyncio.get_running_loop(), {}).values():
+        await client.close()
@@ -0,0 +1,1087 @@
+# ✍️ Motley Fool AI Copywriter — copy engine
+# ----------------------------------------------------------
+# • Prompt building, draft generation, QA and variants
+# • No Streamlit dependency — importable by the app, the
+#   batch runner and any other automation
+# • configure() binds the OpenAI credentials / model (pooled,
+#   process‑wide clients live in mf_copy.clients)
+# • Each stage is a span in mf_copy.tracing (draft, polish, qa …)
+# • Import is cheap and side‑effect free: the OpenAI SDK / httpx load
+#   on the first API call, traits_config.json on first use
+# ----------------------------------------------------------
+
+import asyncio, hashlib, time, json, pathlib, re, sqlite3, sys
+from functools import lru_cache
+from textwrap import dedent
+from typing import TYPE_CHECKING
+
+from mf_copy import longform
+from mf_copy.budget import fit_context, message_tokens, output_budget, words_budget
+from mf_copy.cache import cache_key, get_cache, is_cacheable
+from mf_copy.history import HISTORY_ENABLED, get_history
+from mf_copy.patching import (join_disclaimer, plan_patches, section_messages,
+                              splice, split_disclaimer)
+from mf_copy.qa_rules import MAX_BULLET_LISTS, QAReport, Violation, check_copy, score_copy
+from mf_copy.scheduler import LLMError, StreamInterrupted, classify, get_scheduler
+from mf_copy.similarity import ExemplarIndex, diverse
+from mf_copy.sections import find_section, heading_matches, split_sections, struct_headings
+from mf_copy.llm_async import arun_chat, astream_chat, run, run_stages
+from mf_copy.localise import MARKETS, localise
+from mf_copy.stream_json import JsonFieldStream
+from mf_copy.tracing import annotate, annotate_usage, span, traced
+from mf_copy.trait_tables import TraitTables, WatchedTables
+from mf_copy.usage import get_usage
+
+if TYPE_CHECKING:                      # the SDK is imported lazily by mf_copy.clients
+    from openai import AsyncOpenAI, OpenAI
+
+# ────────────────────────────────────────────────────────────
+# 0.  Global toggles
+# ────────────────────────────────────────────────────────────
+AUTO_QA = True       # self‑critique & auto‑fix loop
+QA_MODE = "local"    # "local": rule engine only · "hybrid": + LLM check when rules pass
+PATCH_MODE = "section"   # "section": patch only failing sections · "full": rewrite everything
+PROMPT_LAYOUT = "prefix" # "prefix": stable → volatile for provider prompt caching · "legacy"
+ADAPTIVE_BUDGET = True   # size max_tokens per call type / length bucket (False → ceiling)
+LOCAL_ADAPT = "prepass"  # "prepass": rule pass, then LLM for tone · "only": rules alone · "off"
+LOCAL_ONLY_WORDS = 0     # prepass: pieces of at most this many words skip the LLM (0 = never)
+BEST_OF = 1              # drafts per Generate; >1 → scored locally, only the best goes to QA
+BEST_OF_MODE = "parallel"  # "parallel": N concurrent calls · "n": one call with the API's n
+BEST_OF_TEMPERATURE = 0.9  # candidates must differ, so they are sampled (never cached)
+VARIANT_POOL = 2         # variants: ask for n × this, keep the n most diverse (1 = as returned)
+ORIGINALITY_CHECK = True # flag copy reusing exemplar lines / past pieces (local, milliseconds)
+LONGFORM_LENGTHS = ("📜 Scrolling Monster (3000+ words)",)  # outline → sections in parallel (() = one reply)
+LONGFORM_PARALLEL = 4    # section calls in flight per piece (also capped per model by llm_async)
+
+# ---- Model & token ceiling ---------------------------------
+MAX_OUTPUT_TOKENS = 10_000   # ceiling; per‑call budgets come from mf_copy.budget
+
+# ---- Length buckets (words) --------------------------------
+LENGTH_RULES = {
+    "📏 Short (100–200 words)":        (100, 220),
+    "📐 Medium (200–500 words)":       (200, 550),
+    "📖 Long (500–1500 words)":        (500, 1600),
+    "📚 Extra Long (1500–3000 words)": (1500, 3200),
+    "📜 Scrolling Monster (3000+ words)": (3000, None),  # None = open‑ended
+}
+
+# ────────────────────────────────────────────────────────────
+# 1.  OpenAI client & config
+# ────────────────────────────────────────────────────────────
+OPENAI_MODEL = "gpt-4.1"
+_SETTINGS: dict = {"api_key": None, "base_url": None}
+
+def configure(api_key=None, model=None, base_url=None):
+    """
+    Bind credentials / model for every helper below.  Safe to call on each
+    Streamlit rerun — the pooled clients (mf_copy.clients) are shared by
+    every session and only replaced when the settings change.
+    Without a call, the OpenAI SDK defaults (OPENAI_API_KEY etc.) apply.
+    """
+    global OPENAI_MODEL
+    if model:
+        OPENAI_MODEL = model
+    settings = {"api_key": api_key, "base_url": base_url}
+    if settings != _SETTINGS:
+        _SETTINGS.update(settings)
+        if "mf_copy.clients" in sys.modules:      # nothing pooled yet otherwise
+            sys.modules["mf_copy.clients"].close_clients(keep=(api_key, base_url))
+
+def get_client() -> "OpenAI":
+    from mf_copy import clients
+    return clients.get_client(**_SETTINGS)
+
+def get_async_client() -> "AsyncOpenAI":
+    """One AsyncOpenAI per event loop — pooled connections can't cross loops."""
+    from mf_copy import clients
+    return clients.get_async_client(**_SETTINGS)
+
+# ────────────────────────────────────────────────────────────
+# 1A.  Load slider‑rule configuration
+# ────────────────────────────────────────────────────────────
+# Validated & compiled once per process; re‑read only when the file's mtime
+# changes (see trait_tables()).  TRAIT_EXAMPLES feed the guide table below.
+TRAITS_PATH = pathlib.Path(__file__).resolve().parent.parent / "traits_config.json"
+
+# Slider defaults used by the app (and by batch runs without a preset)
+TRAIT_DEFAULTS = {"Urgency": 8, "Data_Richness": 7, "Social_Proof": 6,
+                  "Comparative_Framing": 6, "Imagery": 7,
+                  "Conversational_Tone": 8, "FOMO": 7, "Repetition": 5}
+
+# ────────────────────────────────────────────────────────────
+# 3.  Brief helpers
+# ────────────────────────────────────────────────────────────
+BRIEF_FIELDS = ("country", "hook", "details", "offer_price", "retail_price",
+                "offer_term", "reports", "stocks_to_tease", "quotes_news")
+
+def make_brief(**fields) -> dict:
+    """Brief dict with every field build_prompt expects (blank when missing)."""
+    brief = {k: str(fields.get(k) or "") for k in BRIEF_FIELDS}
+    brief["country"] = brief["country"] or "Australia"
+    return brief
+
+def line(label: str, value: str) -> str:
+    return f"- {label}: {value}\n" if value.strip() else ""
+
+# ────────────────────────────────────────────────────────────
+# 3A.  Slider‑rule helpers (json‑driven)
+# ────────────────────────────────────────────────────────────
+def trait_band(name: str, score: int) -> str | None:
+    """"high" / "mid" / "low" for a slider score (None for unknown traits)."""
+    t = trait_tables()
+    return t.at("band", name, score) if name in t.band else None
+
+def band_score(name: str, band: str) -> int:
+    """A representative slider score for *band* — the middle of its range."""
+    cfg = trait_tables().cfg[name]
+    lo, hi = cfg["low_threshold"], cfg["high_threshold"]
+    first, last = {"low": (1, lo), "mid": (lo + 1, hi - 1), "high": (hi, 10)}[band]
+    if first > last:
+        raise ValueError(f"{name} has no {band} band (thresholds {lo} / {hi})")
+    return (first + last + 1) // 2
+
+def trait_rules(traits: dict) -> list[str]:
+    """
+    Return Hard‑Requirement rule strings triggered by slider settings.
+    Implements 3‑band logic (high / medium / low) based on traits_config.json
+    """
+    return list(_trait_fragments(trait_tables(), tuple(traits.items()))[1])
+
+def allow_exemplar(traits: dict) -> bool:
+    """True if *any* trait permits high‑level exemplars and slider meets threshold."""
+    return _trait_fragments(trait_tables(), tuple(traits.items()))[2]
+
+@lru_cache(maxsize=4096)
+def _trait_fragments(t, items) -> tuple[str, tuple, bool]:
+    """(guide, rules, exemplars allowed) per slider combination — tables change → new key."""
+    guide = "\n".join(f"{i}. {t.at('guide', name, score)}" for i, (name, score) in enumerate(items, 1))
+    rules = tuple(rule for name, score in items
+                  if name in t.rule and (rule := t.at("rule", name, score)))   # mid‑band optional
+    allowed = any(t.at("exemplar", name, score) for name, score in items if name in t.exemplar)
+    return guide, rules, allowed
+
+# ────────────────────────────────────────────────────────────
+# 4.  Prompt components
+# ────────────────────────────────────────────────────────────
+COUNTRY_RULES = {
+    "Australia":      "Use Australian English, prices in AUD, reference the ASX.",
+    "United Kingdom": "Use British English, prices in GBP, reference the FTSE.",
+    "Canada":         "Use Canadian English, prices in CAD, reference the TSX.",
+    "United States":  "Use American English, prices in USD, reference the S&P 500.",
+}
+
+SYSTEM_PROMPT = dedent("""
+You are The Motley Fool’s senior direct‑response copy chief.
+
+• Voice: plain English, optimistic, inclusive, lightly playful but always expert.
+• Draw from Ogilvy clarity, Sugarman narrative, Halbert urgency, Cialdini persuasion.
+• Use **Markdown headings** (##, ###) and standard `-` bullets for lists.
+• Never promise guaranteed returns; keep compliance in mind.
+• The reference examples are for inspiration only — do NOT reuse phrases verbatim.
+• Return ONLY the requested copy – no meta commentary, no code fences.
+
+{country_rules}
+
+At the very end of the piece, append this italic line (no quotes):
+*Past performance is not a reliable indicator of future results.*
+""").strip()
+
+# --- Trait exemplars (3 each) --------------------------------
+TRAIT_EXAMPLES = {
+    "Urgency": [
+        "This isn't a drill — once midnight hits, your chance to secure these savings is gone forever.",
+        "Time’s ticking — when the clock hits zero tonight, you’re out of luck.",
+        "You have exactly one shot. Miss today’s deadline, and it's gone forever."
+    ],
+    "Data_Richness": [
+        "Last year alone, our recommendations averaged returns 220% higher than the market average.",
+        "Our analysis has identified 73% higher returns than the average ASX investor over three consecutive years.",
+        "More than 85% of our recommended stocks outperformed the market last fiscal year alone."
+    ],
+    "Social_Proof": [
+        "Thousands of investors trust Motley Fool every year to transform their financial future.",
+        "Australia’s leading financial experts have rated us #1 three years in a row.",
+        "Join over 125,000 smart investors who rely on Motley Fool’s stock advice every month."
+    ],
+    "Comparative_Framing": [
+        "Think back to those who seized early opportunities in the smartphone revolution.",
+        "Imagine being among the first to see Netflix’s potential in 2002. That’s the kind of opportunity we’re talking about.",
+        "Just like the early days of Tesla, these stocks could define your investing success for years."
+    ],
+    "Imagery": [
+        "When that switch flips, the next phase could accelerate even faster.",
+        "Think of it as a snowball rolling downhill—small at first, but soon unstoppable.",
+        "Like a rocket on the launch pad, the countdown has begun and liftoff is imminent."
+    ],
+    "Conversational_Tone": [
+        "Look — investing can feel complicated, but what if it didn't have to be?",
+        "We get it—investing can seem overwhelming. But what if you had someone guiding you every step of the way?",
+        "Here’s the truth: investing doesn’t have to be complicated. Let’s simplify this together."
+    ],
+    "FOMO": [
+        "Opportunities like these pass quickly — and regret can last forever.",
+        "Don’t be the one who has to tell their friends, ‘I missed out when I had the chance.’",
+        "By tomorrow, your chance to act will be history. Don’t live with that regret."
+    ],
+    "Repetition": [
+        "This offer is for today only. Today only means exactly that: today only.",
+        "Act now. This offer expires tonight. Again, it expires tonight—no exceptions.",
+        "This is a limited-time deal. Limited-time means exactly that: limited-time."
+    ],
+}
+
+_TABLES = WatchedTables(TRAITS_PATH, TRAIT_EXAMPLES)
+
+def trait_tables() -> TraitTables:
+    return _TABLES.get()
+
+def trait_guide(traits: dict) -> str:
+    return _trait_fragments(trait_tables(), tuple(traits.items()))[0]
+
+# --- Micro demos --------------------------------------------
+EMAIL_MICRO = """
+### Example Email
+**Subject Line:** Last chance to lock in $119 Motley Fool membership  
+**Greeting:** Hi Sarah,  
+**Body:** Tonight at midnight, your opportunity to save 60 % disappears. Thousands of Australians already rely on our ASX stock tips—now it’s your turn. Click before the timer hits zero and start investing smarter.  
+**CTA:** Activate my membership  
+**Sign‑off:** The Motley Fool Australia Team
+""".strip()
+
+SALES_MICRO = """
+### Example Sales Page
+## Headline  
+One Day Only—Unlock the Silver Pass for $119  
+
+### Introduction  
+Imagine having two extra experts on your side every month…
+
+### Key Benefits  
+- Double the stock picks, triple the insight  
+- ASX, growth & dividend coverage in one pass  
+- 400,000+ Aussie investors already on board  
+
+### Detailed Body  
+Scroll down and you’ll see why the Silver Pass could be your portfolio’s inflection point. But remember—the $119 price tag vanishes at 11:59 pm tonight.  
+
+### CTA  
+**Yes! Secure My Pass Now**
+""".strip()
+
+# --- Reference winners (few‑shot exemplars) -----------------
+SALES_WINNER = """(same as before)""".strip()
+EMAIL_WINNER = """(same as before)""".strip()
+
+# --- Structural skeletons -----------------------------------
+EMAIL_STRUCT = """
+### Subject Line
+### Greeting
+### Body (benefits, urgency, proofs)
+### Call‑to‑Action
+### Sign‑off
+""".strip()
+
+SALES_STRUCT = """
+## Headline
+### Introduction
+### Key Benefit Paragraphs
+### Detailed Body
+### Call‑to‑Action
+""".strip()
+
+# ────────────────────────────────────────────────────────────
+# 5.  Prompt builder
+# ────────────────────────────────────────────────────────────
+# --- Pre‑rendered fragments (static for the life of the process) ---
+_EXEMPLARS = {
+    (is_email, is_sales, winners):
+        (EMAIL_MICRO if is_email else SALES_MICRO)
+        + ("\n\n" + (SALES_WINNER if is_sales else EMAIL_WINNER) if winners else "")
+    for is_email in (True, False) for is_sales in (True, False) for winners in (True, False)
+}
+_LENGTH_BLOCKS = {
+    choice: (f"#### Length Requirement\nWrite between **{lo} and {hi} words**." if hi else
+             f"#### Length Requirement\nWrite **at least {lo} words**.")
+    for choice, (lo, hi) in LENGTH_RULES.items()
+}
+_SYSTEM_PROMPTS = {c: SYSTEM_PROMPT.format(country_rules=r) for c, r in COUNTRY_RULES.items()}
+# Prefix layout: one byte‑identical system prompt for every market — the
+# country rules move down next to the brief.
+_STATIC_SYSTEM = SYSTEM_PROMPT.replace("{country_rules}\n\n", "")
+_BULLET_NOTE = "\n\nPlease limit bullet lists to three or fewer and favour full‑sentence paragraphs elsewhere."
+
+def system_prompt(country: str) -> str:
+    return _STATIC_SYSTEM if PROMPT_LAYOUT == "prefix" else _SYSTEM_PROMPTS[country]
+
+def market_block(country: str) -> str:
+    return f"#### Market\n{COUNTRY_RULES[country]}"
+
+def brief_block(brief: dict) -> str:
+    return (line('Hook', brief['hook']) + line('Details', brief['details'])
+            + line('Offer', f"Special {brief['offer_price']} (Retail {brief['retail_price']}), "
+                            f"Term {brief['offer_term']}")
+            + line('Reports', brief['reports']) + line('Stocks to Tease', brief['stocks_to_tease'])
+            + line('Quotes/News', brief['quotes_news']))
+
+def build_prompt(copy_type, copy_struct, traits, brief, length_choice, original=None):
+    guide, hard_list, winners = _trait_fragments(trait_tables(), tuple(traits.items()))
+    exemplar = _EXEMPLARS[copy_type.startswith("📧"), copy_type == "📝 Sales Page", winners]
+
+    hard_block = "#### Hard Requirements\n" + "\n".join(hard_list) if hard_list else ""
+    edit_block = f"\n\n### ORIGINAL COPY\n{original}\n### END ORIGINAL" if original else ""
+
+    return "".join((
+        guide, "\n\n",
+        exemplar, "\n\n",
+        "#### Structure to Follow\n", copy_struct, "\n\n",
+        hard_block, "\n\n",
+        "#### Campaign Brief\n", brief_block(brief), "\n\n",
+        _LENGTH_BLOCKS[length_choice],
+        _BULLET_NOTE, edit_block,
+        "\n\n### END INSTRUCTIONS",
+    )).strip()
+
+def build_prompt_prefix(copy_type, copy_struct, traits, brief, length_choice, original=None):
+    """
+    Same content as build_prompt, ordered from most to least stable so the
+    provider's automatic prefix cache can reuse everything up to the first
+    segment that differs: static exemplars & structure → length → trait
+    rules (change per band) → trait guide (changes per score) → market,
+    brief and original copy (change per request).
+    """
+    guide, hard_list, winners = _trait_fragments(trait_tables(), tuple(traits.items()))
+    exemplar = _EXEMPLARS[copy_type.startswith("📧"), copy_type == "📝 Sales Page", winners]
+
+    hard_block = "#### Hard Requirements\n" + "\n".join(hard_list) if hard_list else ""
+    edit_block = f"\n\n### ORIGINAL COPY\n{original}\n### END ORIGINAL" if original else ""
+
+    return "".join((
+        exemplar, "\n\n",
+        "#### Structure to Follow\n", copy_struct, "\n\n",
+        _LENGTH_BLOCKS[length_choice], _BULLET_NOTE, "\n\n",
+        hard_block, "\n\n",
+        "#### Trait Guide\n", guide, "\n\n",
+        market_block(brief["country"]), "\n\n",
+        "#### Campaign Brief\n", brief_block(brief),
+        edit_block,
+        "\n\n### END INSTRUCTIONS",
+    )).strip()
+
+# ────────────────────────────────────────────────────────────
+# 6.  Unified LLM helper
+# ────────────────────────────────────────────────────────────
+def plan_budget(messages, label, length_choice=None, max_tokens=None, n=5):
+    """
+    → (messages, max_tokens).  Without an explicit max_tokens the budget is
+    sized for the call type (and length bucket); either way the prompt is
+    checked against the model's context window and pre‑trimmed if needed.
+    """
+    if max_tokens is None:
+        max_tokens = (output_budget(label, messages, LENGTH_RULES.get(length_choice), n,
+                                    OPENAI_MODEL, MAX_OUTPUT_TOKENS)
+                      if ADAPTIVE_BUDGET else MAX_OUTPUT_TOKENS)
+    return fit_context(messages, max_tokens, OPENAI_MODEL)
+
+def run_chat(messages, stream=False, expect_json=False, max_tokens=None,
+             temperature=None, use_cache=True, on_text=None, label="chat",
+             length_choice=None):
+    """
+    Single entry point for chat completions (retries, rate limits and the
+    circuit breaker live in mf_copy.scheduler; a final failure raises LLMError).
+    Deterministic calls are served from / written to the response cache;
+    anything with an explicit temperature (or use_cache=False) always hits the API.
+    With stream=True, on_text(text_so_far) is called as tokens arrive.
+    *label* names the call type in the usage counters (mf_copy.usage) and,
+    with *length_choice*, sizes max_tokens when none is given.
+    """
+    with span(f"llm.{label}", label=label, model=OPENAI_MODEL, stream=stream):
+        messages, max_tokens = plan_budget(messages, label, length_choice, max_tokens)
+        annotate(max_tokens=max_tokens)
+        cache = get_cache() if use_cache and is_cacheable(temperature) else None
+        key = cache_key(OPENAI_MODEL, messages, max_tokens=max_tokens,
+                        response_format="json_object" if expect_json else None) if cache else None
+        if cache:
+            hit = cache.get(key)
+            annotate(cache_hit=hit is not None)
+            if hit is not None:
+                if stream and on_text:
+                    on_text(hit)
+                return hit
+
+        client = get_client()
+        kwargs = {"max_tokens": max_tokens}
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        if expect_json:
+            kwargs["response_format"] = {"type": "json_object"}
+
+        def send():
+            t0 = time.perf_counter()
+            if not stream:
+                raw = client.chat.completions.with_raw_response.create(model=OPENAI_MODEL,
+                                                                       messages=messages,
+                                                                       **kwargs)
+                resp = raw.parse()
+                get_usage().record(label, resp.usage, time.perf_counter() - t0)
+                annotate_usage(OPENAI_MODEL, resp.usage)
+                return (resp.choices[0].message.content or "").strip(), raw.headers
+
+            raw = client.chat.completions.with_raw_response.create(
+                model=OPENAI_MODEL, messages=messages, stream=True,
+                stream_options={"include_usage": True}, **kwargs)
+            text, first = "", None
+            try:
+                for c in raw.parse():
+                    if c.usage:
+                        get_usage().record(label, c.usage, (first or time.perf_counter()) - t0)
+                        annotate_usage(OPENAI_MODEL, c.usage, (first or time.perf_counter()) - t0)
+                    if not c.choices:
+                        continue
+                    first = first or time.perf_counter()
+                    text += c.choices[0].delta.content or ""
+                    if on_text:
+                        on_text(text)
+            except Exception as e:
+                if text and classify(e):            # already shown — don't replay
+                    raise StreamInterrupted(f"{label} stream broke mid‑reply: {e}",
+                                            label, "interrupted") from e
+                raise
+            return text.strip(), raw.headers
+
+        text = get_scheduler().call(send, OPENAI_MODEL, label,
+                                    message_tokens(messages, OPENAI_MODEL) + max_tokens)
+        if cache:
+            cache.put(key, text, OPENAI_MODEL)
+        return text
+
+# ────────────────────────────────────────────────────────────
+# 6A.  Async twin (concurrent stages)
+# ────────────────────────────────────────────────────────────
+async def achat(messages, expect_json=False, max_tokens=None, temperature=None,
+                label="chat", length_choice=None, n=1):
+    messages, max_tokens = plan_budget(messages, label, length_choice, max_tokens)
+    return await arun_chat(get_async_client(), OPENAI_MODEL, messages, expect_json=expect_json,
+                           max_tokens=max_tokens, temperature=temperature, label=label, n=n)
+
+async def astream(messages, on_delta, expect_json=False, max_tokens=None,
+                  label="chat", length_choice=None):
+    messages, max_tokens = plan_budget(messages, label, length_choice, max_tokens)
+    return await astream_chat(get_async_client(), OPENAI_MODEL, messages, on_delta,
+                              expect_json=expect_json, max_tokens=max_tokens, label=label)
+
+# ────────────────────────────────────────────────────────────
+# 7.  Stage prompts (shared by sync & async paths)
+# ────────────────────────────────────────────────────────────
+def qa_messages(draft, copy_type):
+    return [{"role":"system","content":"You are an obsessive editorial QA bot."},
+            {"role":"user","content":f"""
+Check copy for:
+• Hard requirements
+• Structure matches {copy_type}
+• Disclaimer present
+Return ONLY “PASS” or bullet fixes.
+--- COPY ---
+{draft}
+--- END ---
+"""}]
+
+def patch_messages(crit, draft):
+    return [{"role":"system","content":"Revise copy to address feedback."},
+            {"role":"user","content":f"""
+Apply fixes, output full revised copy ONLY.
+### FIXES
+{crit}
+### ORIGINAL
+{draft}
+"""}]
+
+def critique_messages(draft):
+    return [{"role": "system", "content": "Give concise, constructive feedback."},
+            {"role": "user", "content": f"""
+        In 3 bullets – one strength, one weakness, one improvement.
+        --- COPY ---
+        {draft}
+        --- END ---
+        """}]
+
+def variant_messages(base_copy, n):
+    prompt = f"""
+Write {n} alternative subject‑line/headline ideas AND {n} alternative CTA button labels
+for the copy below, preserving tone and urgency.
+Return JSON: {{ "headlines": [...], "ctas": [...] }}
+
+--- COPY ---
+{base_copy}
+--- END COPY ---
+"""
+    return [{"role":"system","content":"You are a world‑class copywriter."},
+            {"role":"user","content":prompt}]
+
+def qa_check(draft, copy_type, length_choice=None, traits=None) -> QAReport:
+    """Local rule engine — milliseconds, no API call."""
+    bands = {k: trait_band(k, v) for k, v in (traits or {}).items() if trait_band(k, v)}
+    return check_copy(draft, copy_structure(copy_type),
+                      LENGTH_RULES.get(length_choice), bands)
+
+# ────────────────────────────────────────────────────────────
+# 7A.  AI Pair‑editor
+# ────────────────────────────────────────────────────────────
+def plan_fix(draft, report, copy_type):
+    """
+    → (body, jobs, fixes).  The disclaimer is split off and restored locally;
+    jobs is a list of section patches, or None when a full rewrite is needed
+    (whole‑piece checks, PATCH_MODE="full", or LLM review feedback).
+    """
+    body, _ = split_disclaimer(draft)
+    rest = [v for v in report.violations if v.check != "disclaimer"]
+    if PATCH_MODE != "section" or not report.violations:
+        return body, None, rest
+    return body, plan_patches(body, rest, copy_structure(copy_type)), rest
+
+@traced("qa")
+def self_qa(draft, copy_type, length_choice=None, traits=None, report=None):
+    """
+    Rule engine first; the LLM is only called to patch the sections whose
+    checks failed (or, in hybrid mode, to review what the rules can't see).
+    """
+    if not AUTO_QA:
+        return draft
+
+    report = report or qa_check(draft, copy_type, length_choice, traits)
+    annotate(passed=report.passed, failed=",".join(report.failed_checks))
+    if report.passed:
+        if QA_MODE != "hybrid":
+            return draft
+        crit = run_chat(qa_messages(draft, copy_type), label="qa")
+        if "PASS" in crit.upper():
+            return draft
+    else:
+        crit = report.as_fixes()
+
+    body, jobs, rest = plan_fix(draft, report, copy_type)
+    if report.violations and not rest:
+        return join_disclaimer(body)                       # disclaimer only — no call
+    annotate(fix="sections" if jobs is not None else "rewrite")
+    if jobs is not None:
+        replies = [run_chat(section_messages(j), label="patch") for j in jobs]
+        return join_disclaimer(splice(body, jobs, replies))
+    rewrite = run_chat(patch_messages(crit, draft), label="rewrite", length_choice=length_choice)
+    return join_disclaimer(split_disclaimer(rewrite)[0])
+
+@traced("qa")
+async def aself_qa(draft, copy_type, length_choice=None, traits=None, report=None):
+    if not AUTO_QA:
+        return draft
+
+    report = report or qa_check(draft, copy_type, length_choice, traits)
+    annotate(passed=report.passed, failed=",".join(report.failed_checks))
+    if report.passed:
+        if QA_MODE != "hybrid":
+            return draft
+        crit = await achat(qa_messages(draft, copy_type), label="qa")
+        if "PASS" in crit.upper():
+            return draft
+    else:
+        crit = report.as_fixes()
+
+    body, jobs, rest = plan_fix(draft, report, copy_type)
+    if report.violations and not rest:
+        return join_disclaimer(body)
+    annotate(fix="sections" if jobs is not None else "rewrite")
+    if jobs is not None:
+        replies = await asyncio.gather(*(achat(section_messages(j), label="patch") for j in jobs))
+        return join_disclaimer(splice(body, jobs, replies))
+    rewrite = await achat(patch_messages(crit, draft), label="rewrite",
+                          length_choice=length_choice)
+    return join_disclaimer(split_disclaimer(rewrite)[0])
+
+# ────────────────────────────────────────────────────────────
+# 7B.  Variant generator helper
+# ────────────────────────────────────────────────────────────
+# temperature → always a fresh sample (bypasses the response cache).
+# Sampled lists repeat themselves, so VARIANT_POOL × n are requested and
+# near duplicates dropped locally (mf_copy.similarity.diverse).
+def _pick_variants(raw: dict, n: int) -> dict:
+    out = {k: diverse(raw.get(k) or [], n) for k in ("headlines", "ctas")}
+    annotate(pool=sum(len(raw.get(k) or []) for k in out),
+             kept=sum(len(v) for v in out.values()))
+    return out
+
+@traced("variants")
+def generate_variants(base_copy: str, n: int = 5):
+    pool = max(n, round(n * VARIANT_POOL))
+    msgs, budget = plan_budget(variant_messages(base_copy, pool), "variants", n=pool)
+    return _pick_variants(json.loads(run_chat(msgs, expect_json=True, max_tokens=budget,
+                                              temperature=0.8, label="variants")), n)
+
+@traced("variants")
+async def agenerate_variants(base_copy: str, n: int = 5):
+    pool = max(n, round(n * VARIANT_POOL))
+    msgs, budget = plan_budget(variant_messages(base_copy, pool), "variants", n=pool)
+    return _pick_variants(json.loads(await achat(msgs, expect_json=True, max_tokens=budget,
+                                                 temperature=0.8, label="variants")), n)
+
+# ────────────────────────────────────────────────────────────
+# 7C.  Originality  (the prompt says "don't reuse exemplars" — check it)
+# ────────────────────────────────────────────────────────────
+@lru_cache(maxsize=1)
+def exemplar_index() -> ExemplarIndex:
+    """Trait examples and demo / winner lines the prompts show the model."""
+    lines = {f"{name} #{i}": text for name, shots in TRAIT_EXAMPLES.items()
+             for i, text in enumerate(shots, 1)}
+    for label, demo in (("email demo", EMAIL_MICRO), ("sales demo", SALES_MICRO),
+                        ("email winner", EMAIL_WINNER), ("sales winner", SALES_WINNER)):
+        for i, line in enumerate(demo.splitlines(), 1):
+            # drop Markdown markers and "**Subject Line:**"‑style labels
+            lines[f"{label} line {i}"] = re.sub(r"^[#>*\-\s]+|\*\*[^*]+:\*\*", "", line).strip()
+    return ExemplarIndex(lines)
+
+@traced("originality")
+def originality(copy: str, exclude=(), source=None) -> list[dict]:
+    """
+    Exemplar lines and stored pieces (mf_copy.history) that *copy* reuses →
+    [{source, ref, text, score}].  *exclude*: history ids it may repeat
+    (with their ancestors); *source*: its brief_key — earlier runs of the
+    same brief aren't reuse either.
+    """
+    hits = exemplar_index().check(copy)
+    if HISTORY_ENABLED:
+        try:
+            hits += get_history().overlaps(copy, exclude, source)
+        except sqlite3.Error as e:        # a locked / broken store mustn't sink the run
+            annotate(history_error=str(e))
+    annotate(hits=len(hits))
+    return [h.as_dict() for h in hits]
+
+# ────────────────────────────────────────────────────────────
+# 8.  Generation pipeline
+# ────────────────────────────────────────────────────────────
+GEN_TASK = dedent("""
+### TASK
+1. Create a concise INTERNAL bullet plan covering:
+   • Hook & opening flow
+   • Placement of proof, urgency, CTA
+   • Any standout stats, metaphors, social proof you intend to use
+2. Then write the final copy.
+
+Respond ONLY as valid JSON with exactly two keys:
+{
+  "plan": "<the bullet outline>",
+  "copy": "<the finished marketing copy>"
+}
+""").strip()
+
+def copy_structure(copy_type: str) -> str:
+    return EMAIL_STRUCT if copy_type.startswith("📧") else SALES_STRUCT
+
+def generation_messages(copy_type, traits, brief, length_choice, original=None):
+    build = build_prompt_prefix if PROMPT_LAYOUT == "prefix" else build_prompt
+    prompt_core = build(copy_type, copy_structure(copy_type),
+                        traits, brief, length_choice, original)
+    return [
+        {"role":"system",
+         "content": system_prompt(brief["country"])},
+        {"role":"user",
+         "content": GEN_TASK + "\n\n" + prompt_core}
+    ]
+
+def parse_draft(raw_json: str) -> dict:
+    """
+    {plan, copy} from the JSON reply.  A reply cut off at max_tokens keeps
+    whatever its fields held so far; non‑JSON replies become the copy.
+    """
+    try:
+        data = json.loads(raw_json)
+    except json.JSONDecodeError:
+        fields = JsonFieldStream()
+        fields.feed(raw_json)
+        data = ({"plan": fields.get("plan") or "", "copy": fields.get("copy")}
+                if fields.get("copy") else {"plan": "", "copy": raw_json})
+    return {"plan": (data.get("plan") or "").strip(),
+            "copy": (data.get("copy") or "").strip()}
+
+@traced("draft")
+async def adraft(copy_type, traits, brief, length_choice, original=None,
+                 on_copy=None, on_copy_done=None) -> dict:
+    """
+    Stage 1 — the JSON plan + copy draft.
+    Passing on_copy / on_copy_done switches to streaming: the `copy` field
+    is decoded as tokens arrive (on_copy(text_so_far)) and on_copy_done(text)
+    fires the moment its closing quote lands, before the reply has ended.
+    """
+    msgs = generation_messages(copy_type, traits, brief, length_choice, original)
+    if on_copy is None and on_copy_done is None:
+        return parse_draft(await achat(msgs, expect_json=True, label="draft",
+                                       length_choice=length_choice))
+
+    fields = JsonFieldStream()
+    def on_delta(chunk):
+        for key, value, done in fields.feed(chunk):
+            if key != "copy":
+                continue
+            if on_copy:
+                on_copy(value)
+            if done and on_copy_done:
+                on_copy_done(value.strip())
+
+    return parse_draft(await astream(msgs, on_delta, expect_json=True, label="draft",
+                                     length_choice=length_choice))
+
+@traced("best_of")
+async def abest_draft(copy_type, traits, brief, length_choice, original=None,
+                      n=None, mode=None) -> dict:
+    """
+    Stage 1, best‑of‑N — sample n drafts (n concurrent calls, or one call
+    with the API's n parameter), score each with the local rule engine and
+    keep the best: {plan, copy, candidates: [{score, words, failed}, …]}.
+    Latency ≈ one draft call; cost ≈ n drafts.
+    """
+    n, mode = n or BEST_OF, mode or BEST_OF_MODE
+    msgs = generation_messages(copy_type, traits, brief, length_choice, original)
+    sample = dict(expect_json=True, temperature=BEST_OF_TEMPERATURE, label="draft",
+                  length_choice=length_choice)
+    if mode == "n" and n > 1:
+        raws = await achat(msgs, n=n, **sample)
+    else:
+        raws = await asyncio.gather(*(achat(msgs, **sample) for _ in range(n)))
+
+    drafts = [parse_draft(r) for r in raws]
+    bounds = LENGTH_RULES.get(length_choice)
+    scored = []
+    for d in drafts:
+        report = qa_check(d["copy"], copy_type, length_choice, traits)
+        scored.append({"score": score_copy(d["copy"], report, bounds),
+                       "words": len(d["copy"].split()), "failed": report.failed_checks})
+    best = max(range(len(drafts)), key=lambda i: scored[i]["score"])   # ties → earliest
+    annotate(n=n, mode=mode, best=best, scores=",".join(str(c["score"]) for c in scored))
+    return {**drafts[best], "candidates": [{**c, "chosen": i == best}
+                                           for i, c in enumerate(scored)]}
+
+@traced("polish")
+async def apolish(draft, copy_type, length_choice, critique=False, variants=False,
+                  traits=None, handled=(), exclude=(), source=None) -> dict:
+    """
+    Stage 2 — QA, critique and variants; all only need the draft, so run together.
+    Checks in *handled* were dealt with upstream (long‑form sizes its own
+    chunks and budgets their bullet lists): still reported, never sent back
+    for a rewrite.  *exclude* / *source*: see originality.
+    """
+    report = qa_check(draft, copy_type, length_choice, traits)
+    fix = QAReport([v for v in report.violations if v.check not in handled], report.checks,
+                   report.elapsed_ms) if handled else report
+    stages = {"final": aself_qa(draft, copy_type, length_choice, traits, fix)}
+    if critique:
+        stages["critique"] = achat(critique_messages(draft), label="critique")
+    if variants:
+        stages["variants"] = agenerate_variants(draft)
+    out = await run_stages(**stages)
+    qa = report.as_dict()
+    if ORIGINALITY_CHECK:
+        qa["overlaps"] = originality(out["final"], exclude, source)
+    return {"copy": out["final"], "critique": out.get("critique"),
+            "variants": out.get("variants"), "qa": qa}
+
+@traced("generate")
+async def agenerate(copy_type, traits, brief, length_choice, original=None,
+                    critique=False, variants=False, on_copy=None, best_of=None,
+                    exclude=()) -> dict:
+    """
+    Full pipeline → {plan, draft, copy, critique, variants}.
+    With on_copy the draft is streamed and stage 2 starts as soon as the
+    copy field is complete, overlapping with the tail of the stream.
+    best_of > 1 (default BEST_OF) drafts several candidates instead — no
+    streaming; on_copy receives the winner — and adds "candidates".
+    LONGFORM_LENGTHS buckets (fresh pieces only) are written section by
+    section instead (see alongform) and add "sections"; best_of is ignored.
+    *exclude*: history ids the piece continues (the one it updates or forks).
+    """
+    keep = {"exclude": exclude, "source": brief_key(copy_type, brief, length_choice)}
+    if uses_longform(length_choice, original):
+        d = await alongform(copy_type, traits, brief, length_choice, on_copy)
+        out = await apolish(d["copy"], copy_type, length_choice, critique, variants, traits,
+                            handled=("length", "bullets"), **keep)
+        return {"plan": d["plan"], "draft": d["copy"], "sections": d["sections"], **out}
+
+    if (best_of or BEST_OF) > 1:
+        d = await abest_draft(copy_type, traits, brief, length_choice, original, best_of)
+        if on_copy:
+            on_copy(d["copy"])
+        out = await apolish(d["copy"], copy_type, length_choice, critique, variants, traits,
+                            **keep)
+        return {"plan": d["plan"], "draft": d["copy"], "candidates": d["candidates"], **out}
+
+    if on_copy is None:
+        d = await adraft(copy_type, traits, brief, length_choice, original)
+        out = await apolish(d["copy"], copy_type, length_choice, critique, variants, traits,
+                            **keep)
+        return {"plan": d["plan"], "draft": d["copy"], **out}
+
+    ready = asyncio.get_running_loop().create_future()
+    def copy_done(text):
+        if not ready.done():
+            ready.set_result(text)
+
+    async def polish():
+        return await apolish(await ready, copy_type, length_choice, critique, variants, traits,
+                             **keep)
+
+    polish_task = asyncio.create_task(polish())
+    try:
+        d = await adraft(copy_type, traits, brief, length_choice, original,
+                         on_copy=on_copy, on_copy_done=copy_done)
+    except BaseException:
+        polish_task.cancel()
+        raise
+    copy_done(d["copy"])                  # reply wasn't JSON — polish what we got
+    out = await polish_task
+    return {"plan": d["plan"], "draft": await ready, **out}
+
+def generate(copy_type, traits, brief, length_choice, original=None,
+             critique=False, variants=False, on_copy=None, best_of=None) -> dict:
+    """Blocking wrapper around agenerate for scripts (on the shared loop)."""
+    return run(agenerate, copy_type, traits, brief, length_choice, original,
+               critique, variants, on_copy=on_copy, best_of=best_of)
+
+# ────────────────────────────────────────────────────────────
+# 8A.  Long‑form: outline → sections in parallel → stitch
+# ────────────────────────────────────────────────────────────
+# A 3000+‑word piece as one JSON reply takes as long as its tokens, is
+# easily cut off and, if short, comes back whole through "Please
+# expand".  Here the plan becomes an outline, every chunk is written
+# concurrently from the same context and the seams are checked locally
+# (mf_copy.longform), so latency follows chunks ÷ parallelism instead.
+def uses_longform(length_choice, original=None) -> bool:
+    """Fresh pieces in a LONGFORM_LENGTHS bucket (updates keep one rewrite)."""
+    return length_choice in LONGFORM_LENGTHS and original is None
+
+def outline_messages(copy_type, traits, brief, length_choice):
+    build = build_prompt_prefix if PROMPT_LAYOUT == "prefix" else build_prompt
+    task = longform.OUTLINE_TASK.format(words=longform.target_words(LENGTH_RULES[length_choice]),
+                                        chunk=longform.CHUNK_WORDS, lists=MAX_BULLET_LISTS)
+    core = build(copy_type, copy_structure(copy_type), traits, brief, length_choice)
+    return [{"role": "system", "content": system_prompt(brief["country"])},
+            {"role": "user", "content": task + "\n\n" + core}]
+
+def section_context(traits, brief) -> str:
+    """
+    Everything a chunk shares with its siblings: rules, tone, market, brief.
+    No bullet note — each chunk's task carries its share of the list budget.
+    """
+    guide, hard_list, _ = _trait_fragments(trait_tables(), tuple(traits.items()))
+    hard_block = "#### Hard Requirements\n" + "\n".join(hard_list) if hard_list else ""
+    return "".join((
+        hard_block, "\n\n",
+        "#### Trait Guide\n", guide, "\n\n",
+        market_block(brief["country"]), "\n\n",
+        "#### Campaign Brief\n", brief_block(brief),
+    )).strip()
+
+def chunk_messages(cs, i, context, country):
+    """Identical up to the task line for every chunk — one cached prefix."""
+    return [{"role": "system", "content": system_prompt(country)},
+            {"role": "user", "content": context + "\n\n" + longform.chunk_task(cs, i)}]
+
+@traced("longform")
+async def alongform(copy_type, traits, brief, length_choice, on_copy=None,
+                    parallel=None) -> dict:
+    """
+    Stage 1 for long‑form buckets → {plan, copy, sections}.  One outline
+    call, every chunk concurrently (at most *parallel*, default
+    LONGFORM_PARALLEL), then one revision round for the chunks whose seams
+    or length fail the local check.  on_copy(text) gets the piece as far
+    as it is written in order.
+    """
+    total = longform.target_words(LENGTH_RULES[length_choice])
+    raw = await achat(outline_messages(copy_type, traits, brief, length_choice),
+                      expect_json=True, label="outline")
+    plan, sections = longform.parse_outline(raw, copy_structure(copy_type), total)
+    cs = longform.chunks(longform.allocate(sections, total))
+    context = section_context(traits, brief) + "\n\n" + longform.outline_block(cs)
+    gate = asyncio.Semaphore(max(1, parallel or LONGFORM_PARALLEL))
+    shown = 0
+
+    async def call(i, messages, label):
+        async with gate:
+            reply = await achat(messages, label=label,
+                                max_tokens=words_budget((cs[i].words, None)))
+        return longform.clean(cs[i], reply)
+
+    async def write(i):
+        nonlocal shown
+        cs[i].text = await call(i, chunk_messages(cs, i, context, brief["country"]), "section")
+        done = next((k for k, c in enumerate(cs) if not c.text), len(cs))
+        if on_copy and done > shown:
+            shown = done
+            on_copy(longform.stitch(cs, done))
+
+    await asyncio.gather(*(write(i) for i in range(len(cs))))
+    issues = longform.seam_issues(cs)
+    fixed = await asyncio.gather(*(call(i, longform.fix_messages(cs, i, f), "patch")
+                                   for i, f in issues.items()))
+    for i, text in zip(issues, fixed):
+        cs[i].text = text
+    copy = longform.stitch(cs)
+    annotate(chunks=len(cs), revised=len(issues), words=len(copy.split()))
+    if on_copy:
+        on_copy(copy)
+    return {"plan": plan, "copy": copy,
+            "sections": [{**c.as_dict(), "fixes": issues.get(i, [])} for i, c in enumerate(cs)]}
+
+# ────────────────────────────────────────────────────────────
+# 9.  Adaptation
+# ────────────────────────────────────────────────────────────
+def adapt_messages(original_text, target_c, prepassed=False):
+    task = ("Spelling, currency and index names are already converted — keep them; adapt tone, "
+            "idiom & cultural references; preserve structure." if prepassed else
+            "Update spelling, currency, market references; preserve tone & structure.")
+    if PROMPT_LAYOUT == "prefix":
+        # source first, market last — every target shares the cached prefix
+        user = ("Adapt the following marketing copy for the target market given at the end.\n"
+                f"{task}\n\n"
+                "--- ORIGINAL COPY START ---\n"
+                f"{original_text}\n"
+                "--- ORIGINAL COPY END ---\n\n"
+                f"{market_block(target_c)}\n"
+                f"Target market: {target_c}\n"
+                "### END INSTRUCTIONS")
+    else:
+        user = (f"Adapt the following marketing copy for a {target_c} audience.\n"
+                f"{task}\n\n"
+                "--- ORIGINAL COPY START ---\n"
+                f"{original_text}\n"
+                "--- ORIGINAL COPY END ---\n"
+                "### END INSTRUCTIONS")
+    return [
+        {"role":"system",
+         "content": system_prompt(target_c)},
+        {"role":"user",
+         "content": user}
+    ]
+
+def source_hash(text: str) -> str:
+    """Key for "this original" — adaptations are memoised per (source_hash, target)."""
+    return hashlib.sha256(text.strip().encode()).hexdigest()[:16]
+
+def brief_key(copy_type, brief, length_choice) -> str:
+    """
+    source_hash for generated pieces: one brief → one key, whatever the
+    traits, so reruns and sweeps of a brief aren't flagged as reusing each other.
+    """
+    return source_hash(json.dumps([copy_type, brief, length_choice], sort_keys=True,
+                                  ensure_ascii=False, default=str))
+
+def local_pass(original_text, target_c, source_c=None, mode=None) -> tuple[str, bool, bool]:
+    """
+    Rule‑based spelling / currency / index conversion (mf_copy.localise).
+    → (copy, prepassed, done) — done means the rules are the whole adaptation.
+    """
+    mode = mode or LOCAL_ADAPT
+    if mode == "off" or target_c not in MARKETS:
+        return original_text, False, False
+    loc = localise(original_text, target_c, source_c)
+    annotate(local_changes=loc.total, local_ms=loc.elapsed_ms)
+    return loc.text, True, mode == "only" or len(original_text.split()) <= LOCAL_ONLY_WORDS
+
+@traced("adapt")
+def adapt(original_text, target_c, source_c=None, mode=None):
+    text, prepassed, done = local_pass(original_text, target_c, source_c, mode)
+    if done:
+        return text
+    return run_chat(adapt_messages(text, target_c, prepassed), label="adapt")
+
+@traced("adapt")
+async def aadapt(original_text, target_c, source_c=None, mode=None):
+    text, prepassed, done = local_pass(original_text, target_c, source_c, mode)
+    if done:
+        return text
+    return await achat(adapt_messages(text, target_c, prepassed), label="adapt")
+
+@traced("adapt_markets")
+async def aadapt_markets(original_text, targets, on_done=None, source_c=None, mode=None) -> dict:
+    """
+    Fan one original out to every target market concurrently → {country: copy}.
+    A market whose call fails maps to its LLMError instead of sinking the
+    rest; on_done(country, copy_or_error) fires as each one lands.
+    """
+    async def one(target):
+        try:
+            out = await aadapt(original_text, target, source_c, mode)
+        except LLMError as e:
+            out = e
+        if on_done:
+            on_done(target, out)
+        return target, out
+
+    return dict(await asyncio.gather(*(one(t) for t in targets)))
+
+# ────────────────────────────────────────────────────────────
+# 10.  Incremental "Update Copy"
+# ────────────────────────────────────────────────────────────
+def changed_bands(old_traits: dict, new_traits: dict) -> dict[str, tuple]:
+    """{trait: (old_band, new_band)} for traits whose band actually changed."""
+    return {name: (trait_band(name, old_traits.get(name, score)), trait_band(name, score))
+            for name, score in new_traits.items()
+            if trait_band(name, old_traits.get(name, score)) != trait_band(name, score)}
+
+def update_targets(changes: dict, copy_type: str) -> dict[str, list[str]] | None:
+    """
+    {structure heading: [edit instructions]} for the sections the changed
+    traits touch (per the "sections" list in traits_config.json).
+    None means a change touches the whole piece ("*").
+    """
+    required = struct_headings(copy_structure(copy_type))
+    targets: dict[str, list[str]] = {}
+    for name, (old, new) in changes.items():
+        cfg = trait_tables().cfg[name]
+        wanted = cfg.get("sections", ["*"])
+        if "*" in wanted:
+            return None
+        fix = (cfg.get(f"{new}_rule") or "").lstrip("- ").strip()
+        if cfg.get(f"{old}_rule"):
+            fix += f" (This replaces the earlier rule: {cfg[f'{old}_rule'].lstrip('- ').strip()})"
+        for h in required:
+            if any(heading_matches(w, h) for w in wanted):
+                targets.setdefault(h, []).append(fix)
+    return targets
+
+@traced("update")
+async def aupdate(copy, copy_type, old_traits, new_traits, brief, length_choice,
+                  exclude=(), variants=False) -> dict:
+    """
+    Re‑edit only what the slider move affects.  *exclude*: the piece's
+    history id(s), so it isn't flagged as reusing itself.
+    → {copy, changed, sections, mode, qa} where mode is "skipped" (no band
+    crossed, qa None), "sections" (targeted edits) or "full" (whole‑piece
+    regeneration, which also returns its plan, and with *variants* fresh
+    headlines & CTAs — else variants is None).
+    """
+    changes = changed_bands(old_traits, new_traits)
+    if not changes:
+        return {"copy": copy, "changed": {}, "sections": [], "mode": "skipped", "qa": None}
+
+    targets = update_targets(changes, copy_type)
+    body, _ = split_disclaimer(copy)
+    jobs = None
+    if targets:
+        present = split_sections(body)
+        violations = [Violation("trait", fix, heading)
+                      for heading, fixes in targets.items() if find_section(present, heading)
+                      for fix in fixes]
+        if violations:
+            jobs = plan_patches(body, violations, copy_structure(copy_type))
+
+    if jobs is None:
+        out = await agenerate(copy_type, new_traits, brief, length_choice, original=copy,
+                              variants=variants, exclude=exclude)
+        return {"copy": out["copy"], "changed": changes, "sections": [], "mode": "full",
+                "qa": out["qa"], "plan": out["plan"], "variants": out["variants"]}
+
+    replies = await asyncio.gather(*(achat(section_messages(j), label="update") for j in jobs))
+    edited = join_disclaimer(splice(body, jobs, replies))
+    report = qa_check(edited, copy_type, length_choice, new_traits)
+    final = await aself_qa(edited, copy_type, length_choice, new_traits, report)
+    qa = report.as_dict()
+    if ORIGINALITY_CHECK:
+        qa["overlaps"] = originality(final, exclude, brief_key(copy_type, brief, length_choice))
+    return {"copy": final, "changed": changes,
+            "sections": [j.heading for j in jobs], "mode": "sections", "qa": qa}
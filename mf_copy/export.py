@@ -0,0 +1,431 @@
+# ✍️ Motley Fool AI Copywriter — export
+# ----------------------------------------------------------
+# • Markdown structure → DOCX, HTML, Markdown or plain text: headings,
+#   bullets, numbered lists, **bold** / *italic* (nested), links, rules
+#   and the italic disclaimer (set small and grey)
+# • render() is cached per content hash (bytes‑bounded LRU), so
+#   download buttons cost nothing on Streamlit reruns
+# • Bulk: many pieces → one ZIP written member by member, to a file or
+#   as a chunk iterator (HTTP) — one document in memory at a time
+#
+#   python -m mf_copy export results.jsonl -o copy.zip --formats docx,html
+#   python -m mf_copy export --history "ai boom" --country Canada -o ai.zip
+# ----------------------------------------------------------
+
+import argparse, csv, hashlib, html, io, json, re, sys, threading, time, zipfile
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from mf_copy.qa_rules import DISCLAIMER_TEXT
+
+CACHE_BYTES = 32 * 1024 * 1024          # rendered files kept for repeat downloads
+CHUNK = 64 * 1024                       # iter_zip() yields at least this much at a time
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+SAFE_SCHEMES = {"http", "https", "mailto"}      # other links (javascript:, data: …) → text
+
+# ────────────────────────────────────────────────────────────
+# 1.  Markdown → blocks → inline spans
+# ────────────────────────────────────────────────────────────
+@dataclass
+class Block:
+    kind: str           # heading | bullet | number | para | rule | disclaimer
+    text: str = ""
+    level: int = 0      # heading level; list indent depth
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_BULLET  = re.compile(r"^(\s*)[-*+•]\s+(.*)$")
+_NUMBER  = re.compile(r"^(\s*)\d+[.)]\s+(.*)$")
+_RULE    = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_INLINE  = re.compile(r"\*\*\*(?P<bi>.+?)\*\*\*|\*\*(?P<b>.+?)\*\*|__(?P<b2>.+?)__"
+                      r"|\*(?!\s)(?P<i>.+?)(?<!\s)\*|(?<!\w)_(?!\s)(?P<i2>.+?)(?<!\s)_(?!\w)"
+                      r"|\[(?P<label>[^\]]+)\]\((?P<url>(?:[^()\s]|\([^()\s]*\))+)\)")
+
+def blocks(md: str) -> list[Block]:
+    """One block per non‑blank line (copy uses line breaks deliberately)."""
+    out = []
+    for line in (md or "").replace("\r\n", "\n").split("\n"):
+        if not line.strip():
+            continue
+        if DISCLAIMER_TEXT in re.sub(r"[*_]", "", line).lower():
+            out.append(Block("disclaimer", re.sub(r"^[*_\s]+|[*_\s]+$", "", line)))
+        elif m := _HEADING.match(line):
+            out.append(Block("heading", m[2], len(m[1])))
+        elif _RULE.match(line):
+            out.append(Block("rule"))
+        elif m := _BULLET.match(line):
+            out.append(Block("bullet", m[2], len(m[1].expandtabs(4)) // 2))
+        elif m := _NUMBER.match(line):
+            out.append(Block("number", m[2], len(m[1].expandtabs(4)) // 2))
+        else:
+            out.append(Block("para", line.strip()))
+    return out
+
+def spans(text: str, bold=False, italic=False, url=None) -> list[tuple[str, bool, bool, str | None]]:
+    """Inline markup → [(text, bold, italic, url)]; markers nest (**a *b* c**)."""
+    out, pos = [], 0
+    for m in _INLINE.finditer(text):
+        if m.start() > pos:
+            out.append((text[pos:m.start()], bold, italic, url))
+        g = m.groupdict()
+        if g["bi"] is not None:
+            out += spans(g["bi"], True, True, url)
+        elif g["b"] is not None or g["b2"] is not None:
+            out += spans(g["b"] or g["b2"], True, italic, url)
+        elif g["i"] is not None or g["i2"] is not None:
+            out += spans(g["i"] or g["i2"], bold, True, url)
+        else:
+            out += spans(g["label"], bold, italic, g["url"])
+        pos = m.end()
+    if pos < len(text):
+        out.append((text[pos:], bold, italic, url))
+    return out
+
+def _plain(text: str) -> str:
+    return "".join(t for t, *_ in spans(text))
+
+def title_of(md: str) -> str:
+    """
+    First text line as plain text — the subject / headline, since copy
+    opens with a "### Subject Line" or "### Headline" label — else the
+    first heading.
+    """
+    bs = blocks(md)
+    first = (next((b for b in bs if b.kind == "para"), None)
+             or next((b for b in bs if b.kind == "heading"), None))
+    return _plain(first.text)[:120] if first else ""
+
+# ────────────────────────────────────────────────────────────
+# 2.  Renderers  (copy, title) → bytes
+# ────────────────────────────────────────────────────────────
+def to_markdown(md: str, title=None) -> bytes:
+    return (md or "").replace("\r\n", "\n").strip().encode() + b"\n"
+
+def to_text(md: str, title=None) -> bytes:
+    lines, n = [], 0
+    for b in blocks(md):
+        n = n + 1 if b.kind == "number" else 0
+        text = _plain(b.text)
+        if b.kind == "heading":
+            lines += ["", text.upper() if b.level <= 2 else text, ""]
+        elif b.kind in ("bullet", "number"):
+            lines.append("  " * b.level + ("• " if b.kind == "bullet" else f"{n}. ") + text)
+        elif b.kind == "rule":
+            lines.append("—" * 20)
+        else:
+            lines.append(text)
+    return ("\n".join(lines).strip() + "\n").encode()
+
+_CSS = ("body{font-family:Georgia,serif;max-width:42em;margin:2em auto;line-height:1.5;"
+        "color:#222}h1,h2,h3{font-family:Helvetica,Arial,sans-serif}"
+        "strong{color:#CF7F00}.disclaimer{font-size:.85em;color:#666}")
+
+def _safe_url(url: str) -> bool:
+    try:
+        return urlsplit(url).scheme.lower() in SAFE_SCHEMES
+    except ValueError:
+        return False
+
+def _html_inline(text: str) -> str:
+    out = []
+    for t, bold, italic, url in spans(text):
+        if url and not _safe_url(url):                   # shown, never clickable
+            t, url = t + (f" ({url})" if url != t else ""), None
+        t = html.escape(t)
+        if italic:
+            t = f"<em>{t}</em>"
+        if bold:
+            t = f"<strong>{t}</strong>"
+        if url:
+            t = f'<a href="{html.escape(url)}">{t}</a>'
+        out.append(t)
+    return "".join(out)
+
+def to_html(md: str, title=None) -> bytes:
+    body, open_list = [], None
+    for b in blocks(md):
+        tag = {"bullet": "ul", "number": "ol"}.get(b.kind)
+        if open_list and tag != open_list:
+            body.append(f"</{open_list}>")
+            open_list = None
+        if tag and not open_list:
+            body.append(f"<{tag}>")
+            open_list = tag
+        if tag:
+            body.append(f"<li>{_html_inline(b.text)}</li>")
+        elif b.kind == "heading":
+            body.append(f"<h{b.level}>{_html_inline(b.text)}</h{b.level}>")
+        elif b.kind == "rule":
+            body.append("<hr>")
+        elif b.kind == "disclaimer":
+            body.append(f'<p class="disclaimer"><em>{html.escape(b.text)}</em></p>')
+        else:
+            body.append(f"<p>{_html_inline(b.text)}</p>")
+    if open_list:
+        body.append(f"</{open_list}>")
+    title = html.escape(title or title_of(md) or "Motley Fool copy")
+    return (f'<!DOCTYPE html>\n<html lang="en"><head><meta charset="utf-8">'
+            f"<title>{title}</title><style>{_CSS}</style></head>\n<body>\n"
+            + "\n".join(body) + "\n</body></html>\n").encode()
+
+def _docx_runs(p, text, size=None, color=None):
+    for t, bold, italic, url in spans(text):
+        run = p.add_run(t + (f" ({url})" if url and url != t else ""))
+        run.bold = bold or None
+        run.italic = italic or None
+        if size:
+            run.font.size = size
+        if color:
+            run.font.color.rgb = color
+
+def _docx_rule(p):
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+    border, bottom = OxmlElement("w:pBdr"), OxmlElement("w:bottom")
+    for k, v in (("w:val", "single"), ("w:sz", "6"), ("w:space", "1"), ("w:color", "auto")):
+        bottom.set(qn(k), v)
+    border.append(bottom)
+    p._p.get_or_add_pPr().append(border)
+
+_STYLE_IDS: dict[str, str] = {}
+
+def _style_id(doc, name: str) -> str:
+    """
+    Style name → id, resolved once per process (every document comes from
+    the same default template).  python‑docx looks names up by scanning all
+    styles on each paragraph, which was most of a render.
+    """
+    if name not in _STYLE_IDS:
+        _STYLE_IDS[name] = doc.styles[name].style_id
+    return _STYLE_IDS[name]
+
+def _docx_style(block: Block) -> str | None:
+    if block.kind == "heading":
+        return f"Heading {min(block.level, 9)}"
+    if block.kind in ("bullet", "number"):
+        name = "List Bullet" if block.kind == "bullet" else "List Number"
+        return name + (f" {block.level + 1}" if 0 < block.level < 3 else "")
+    return None
+
+def to_docx(md: str, title=None) -> bytes:
+    from docx import Document                       # optional: only DOCX needs python‑docx
+    from docx.shared import Pt, RGBColor
+
+    doc = Document()
+    doc.core_properties.title = title or title_of(md)
+    for b in blocks(md):
+        p = doc.add_paragraph()
+        if style := _docx_style(b):
+            p._p.style = _style_id(doc, style)
+        if b.kind == "rule":
+            _docx_rule(p)
+        elif b.kind == "disclaimer":
+            _docx_runs(p, f"*{b.text}*", size=Pt(9), color=RGBColor(0x66, 0x66, 0x66))
+        else:
+            _docx_runs(p, b.text)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+# name → (renderer, file extension, MIME type)
+FORMATS = {"docx": (to_docx, "docx", DOCX_MIME),
+           "html": (to_html, "html", "text/html"),
+           "md":   (to_markdown, "md", "text/markdown"),
+           "txt":  (to_text, "txt", "text/plain")}
+
+# ────────────────────────────────────────────────────────────
+# 3.  Cached single render
+# ────────────────────────────────────────────────────────────
+class RenderCache:
+    """Rendered bytes keyed by sha256(format, title, copy); LRU bounded by total size."""
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes, self.size = max_bytes, 0
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0}
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._items.get(key)
+            self.counters["hits" if data is not None else "misses"] += 1
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes):
+        with self._lock:
+            if key in self._items or len(data) > self.max_bytes:
+                return
+            self._items[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                self.size -= len(self._items.popitem(last=False)[1])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "items": len(self._items), "bytes": self.size}
+
+_CACHE = RenderCache()
+
+def get_render_cache() -> RenderCache:
+    return _CACHE
+
+def content_hash(copy: str, fmt: str, title=None) -> str:
+    return hashlib.sha256(f"{fmt}\0{title or ''}\0{copy}".encode()).hexdigest()
+
+def render(copy: str, fmt: str = "docx", title: str | None = None, cache: bool = True) -> bytes:
+    """*copy* (Markdown) as a *fmt* file; identical requests come from the cache."""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    key = content_hash(copy, fmt, title) if cache else None
+    if key and (data := _CACHE.get(key)) is not None:
+        return data
+    data = FORMATS[fmt][0](copy, title)
+    if key:
+        _CACHE.put(key, data)
+    return data
+
+def file_name(stem: str, fmt: str) -> str:
+    return f"{stem}.{FORMATS[fmt][1]}"
+
+def mime(fmt: str) -> str:
+    return FORMATS[fmt][2]
+
+# ────────────────────────────────────────────────────────────
+# 4.  Bulk ZIP
+# ────────────────────────────────────────────────────────────
+def slug(text: str, limit=48) -> str:
+    """"AI boom: 3 stocks!" → "ai_boom_3_stocks", cut at a word boundary."""
+    s = re.sub(r"[^a-z0-9]+", "_", (text or "").lower()).strip("_")
+    if len(s) > limit:
+        s = s[:limit + 1].rsplit("_", 1)[0] if "_" in s[:limit + 1] else s[:limit]
+    return s or "copy"
+
+def member_stem(piece: dict, i: int) -> str:
+    """"0007_canada_ai_boom_stocks" — ordered, unique, readable."""
+    parts = [f"{i:04d}", piece.get("country") or "", piece.get("title") or title_of(piece["copy"])]
+    return "_".join(slug(p, 40) for p in parts if p)
+
+def _zip(pieces: Iterable[dict], fileobj, formats) -> Iterator[int]:
+    """Write the ZIP member by member, yielding the running file count after each."""
+    formats = list(formats)
+    for fmt in formats:
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    manifest = io.StringIO()
+    rows = csv.writer(manifest)
+    rows.writerow(["file", "id", "kind", "country", "copy_type", "length", "title"])
+    written = 0
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i, piece in enumerate((p for p in pieces if p.get("copy")), 1):
+            stem = member_stem(piece, i)
+            for fmt in formats:
+                name = file_name(stem, fmt)
+                # bulk renders skip the cache: they'd only evict the hot single downloads
+                zf.writestr(name, render(piece["copy"], fmt, piece.get("title"), cache=False))
+                rows.writerow([name, piece.get("id") or piece.get("job_id") or "",
+                               piece.get("kind") or "", piece.get("country") or "",
+                               piece.get("copy_type") or "", piece.get("length") or "",
+                               piece.get("title") or title_of(piece["copy"])])
+                written += 1
+                yield written
+        zf.writestr("manifest.csv", manifest.getvalue())
+    yield written
+
+def write_zip(pieces: Iterable[dict], fileobj, formats=("docx",)) -> int:
+    """
+    Pieces ({copy, title?, country?, …}) → ZIP on *fileobj*, one member at a
+    time; a manifest.csv of every file closes it.  Pieces with no copy
+    (failed batch jobs) are skipped.  → files written.
+    """
+    written = 0
+    for written in _zip(pieces, fileobj, formats):
+        pass
+    return written
+
+class _Chunks(io.RawIOBase):
+    """Write‑only, unseekable sink — zipfile then streams (data descriptors)."""
+
+    def __init__(self):
+        self.parts: list[bytes] = []
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.parts.append(bytes(b))
+        self.size += len(b)
+        return len(b)
+
+    def drain(self) -> bytes:
+        data, self.parts, self.size = b"".join(self.parts), [], 0
+        return data
+
+def iter_zip(pieces: Iterable[dict], formats=("docx",), chunk=CHUNK) -> Iterator[bytes]:
+    """write_zip() as a generator of byte chunks (for chunked HTTP responses)."""
+    sink = _Chunks()
+    for _ in _zip(pieces, sink, formats):
+        if sink.size >= chunk:
+            yield sink.drain()
+    if sink.size:
+        yield sink.drain()
+
+# ────────────────────────────────────────────────────────────
+# 5.  Sources & CLI
+# ────────────────────────────────────────────────────────────
+def jsonl_pieces(path) -> Iterator[dict]:
+    """Batch results (or any JSONL of {copy, …}) read lazily, line by line."""
+    with (sys.stdin if path == "-" else open(path, encoding="utf-8")) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def history_pieces(ids: Iterable[int], history=None) -> Iterator[dict]:
+    """Stored pieces loaded one at a time (listings carry no copy bodies)."""
+    from mf_copy.history import get_history
+    history = history or get_history()
+    for piece_id in ids:
+        if piece := history.get(piece_id):
+            yield piece
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m mf_copy export",
+                                 description="Package copy into one ZIP of DOCX / HTML / MD / TXT.")
+    ap.add_argument("source", nargs="?", help="JSONL of results, e.g. batch output ('-' = stdin)")
+    ap.add_argument("--history", nargs="?", const="", metavar="QUERY",
+                    help="export saved pieces instead (optional full‑text query)")
+    ap.add_argument("--country")
+    ap.add_argument("--kind")
+    ap.add_argument("--days", type=float, help="history: only the last N days")
+    ap.add_argument("--limit", type=int, default=500, help="history: at most N pieces")
+    ap.add_argument("--formats", default="docx", help=f"comma list of {', '.join(FORMATS)}")
+    ap.add_argument("-o", "--out", required=True, help="ZIP file ('-' = stdout)")
+    a = ap.parse_args(argv)
+
+    formats = [f.strip().lower() for f in a.formats.split(",") if f.strip()]
+    if bad := [f for f in formats if f not in FORMATS]:
+        ap.error(f"unknown format {', '.join(bad)} (options: {', '.join(FORMATS)})")
+    if a.history is not None:
+        from mf_copy.history import get_history
+        since = time.time() - a.days * 86400 if a.days else None
+        rows = get_history().search(a.history or None, country=a.country, kind=a.kind,
+                                    since=since, limit=a.limit)
+        pieces = history_pieces(r["id"] for r in rows)
+    elif a.source:
+        pieces = jsonl_pieces(a.source)
+    else:
+        ap.error("give a JSONL file or --history")
+
+    if a.out == "-":
+        n = write_zip(pieces, sys.stdout.buffer, formats)         # unseekable: streamed
+    else:
+        with open(a.out, "wb") as out:
+            n = write_zip(pieces, out, formats)
+    print(f"{n} files → {a.out}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,475 @@
+# ✍️ Motley Fool AI Copywriter — offline OpenAI stand‑in
+# ----------------------------------------------------------
+# • Local /v1/chat/completions for OpenAI(base_url=…)
+# • Configurable first‑token + per‑token latency
+# • Streaming (SSE) chunks, JSON‑mode {plan, copy} / variants
+# • Injected 429 / 5xx errors (429s carry Retry‑After)
+# • Optional requests‑per‑minute limit with x‑ratelimit‑* headers
+# • PASS / bullet‑fix replies for the self_qa path
+# • Provider‑style prefix cache: ≥1024‑token prompt prefixes seen
+#   before are reported as usage.prompt_tokens_details.cached_tokens
+#   and skip the prefill delay
+# • max_tokens honoured (finish_reason "length"); optional runaway
+#   replies that ramble on until they hit it
+# • Optional per‑connection handshake delay (stands in for TCP + TLS
+#   setup) and a count of connections opened
+# • Optional imperfect drafts (dropped section / disclaimer, length
+#   off target) so best‑of‑N has something to choose between
+# • Long‑form outline (JSON sections) and section replies of the
+#   asked length, worded at random so chunks don't repeat each other
+# • Request & token counters for the benchmarks
+#
+#   python -m mf_copy.fake_openai --port 8765 --token-latency 0.002
+#   OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=x streamlit run …
+# ----------------------------------------------------------
+
+import argparse, hashlib, json, random, re, threading, time, uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ────────────────────────────────────────────────────────────
+# 0.  Behaviour knobs
+# ────────────────────────────────────────────────────────────
+@dataclass
+class FakeConfig:
+    ttft: float = 0.05             # seconds before the first token
+    token_latency: float = 0.001   # seconds per completion token
+    error_rate: float = 0.0        # share of requests answered with an error
+    error_codes: tuple = (429, 500, 503)
+    retry_after: float = 1.0       # Retry‑After seconds on 429s
+    rpm: int = 0                   # enforced requests per minute (0 = unlimited)
+    qa_fail_rate: float = 0.0      # share of QA checks answered with fixes
+    prefill_latency: float = 0.00005   # seconds per *uncached* prompt token
+    runaway_rate: float = 0.0      # share of replies that ramble past their natural end
+    runaway_tokens: int = 6000     # how far a runaway goes when max_tokens doesn't stop it
+    handshake_latency: float = 0.0 # seconds added to the first request on each new connection
+    draft_miss_rate: float = 0.0   # share of drafts missing a section or the disclaimer
+    draft_length_jitter: float = 0.0   # drafts land within ±this share of the asked length
+    seed: int = 7
+
+@dataclass
+class FakeStats:
+    requests: int = 0
+    connections: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+    by_kind: dict = field(default_factory=dict)
+
+    def snapshot(self) -> dict:
+        return {"requests": self.requests, "connections": self.connections,
+                "errors": self.errors,
+                "rate_limited": self.rate_limited,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "completion_tokens": self.completion_tokens,
+                "by_kind": dict(self.by_kind)}
+
+def count_tokens(text: str) -> int:
+    """~4 characters per token — close enough for latency modelling."""
+    return max(1, len(text) // 4)
+
+# Prefix caching as the real API does it: only prompts of 1024+ tokens,
+# matched in 128‑token increments from the very first token.
+CACHE_MIN_TOKENS, CACHE_STEP, CACHE_ENTRIES = 1024, 128, 10_000
+
+def _serialise(messages) -> str:
+    return "".join(f"<|{m['role']}|>{m.get('content') or ''}" for m in messages)
+
+class PrefixCache:
+    def __init__(self):
+        self._seen: dict[bytes, None] = {}          # insertion‑ordered → FIFO trim
+        self._lock = threading.Lock()
+
+    def lookup_and_store(self, messages) -> int:
+        """Cached prompt tokens for this request; remembers its prefixes."""
+        text = _serialise(messages)
+        bounds = range(CACHE_MIN_TOKENS, count_tokens(text) + 1, CACHE_STEP)
+        keys = [hashlib.sha1(text[:n * 4].encode()).digest() for n in bounds]
+        with self._lock:
+            hit = 0
+            for n, k in zip(bounds, keys):
+                if k not in self._seen:
+                    break
+                hit = n
+            for k in keys:
+                self._seen[k] = None
+            while len(self._seen) > CACHE_ENTRIES:
+                del self._seen[next(iter(self._seen))]
+        return hit
+
+# ────────────────────────────────────────────────────────────
+# 1.  Canned replies
+# ────────────────────────────────────────────────────────────
+DISCLAIMER = "*Past performance is not a reliable indicator of future results.*"
+FILLER = ("Investors who act early often capture the biggest share of the upside, "
+          "and our analysts have spent years finding those moments before the crowd. ")
+
+TOPICS = ("AI", "lithium", "dividend")
+HEADLINES = ("Don't miss these {k} {topic} stocks", "Don't miss these {k} {topic} stocks!",
+             "The {topic} rush starts tonight", "Why our analysts love this {topic} play",
+             "Last chance: {pct}% off Stock Advisor", "{k} {topic} stocks to buy before midnight",
+             "Is this the next big {topic} winner?", "Our top {topic} pick is out")
+CTAS = ("Join now", "Join now!", "Join Stock Advisor today", "Claim my {pct}% discount",
+        "Start investing smarter", "Yes, I want in", "Get the {topic} report", "Unlock my picks")
+
+def _kind(body: dict) -> str:
+    system = body["messages"][0]["content"]
+    user = body["messages"][-1]["content"]
+    if "QA bot" in system:
+        return "qa"
+    if "Revise copy" in system:
+        return "patch"
+    if "constructive feedback" in system:
+        return "critique"
+    if "headline ideas" in user or '"headlines"' in user:
+        return "variants"
+    if "Adapt the following" in user:
+        return "adapt"
+    if "### WRITE THIS SECTION" in user:
+        return "section"
+    if body.get("response_format", {}).get("type") == "json_object":
+        return "outline" if '"sections"' in user else "draft"
+    return "chat"
+
+def _between(text, start, end):
+    m = re.search(re.escape(start) + r"\n?(.*?)\n?" + re.escape(end), text, re.S)
+    return m.group(1) if m else ""
+
+def _fake_copy(prompt: str, rng: random.Random | None = None,
+               cfg: FakeConfig | None = None) -> str:
+    """
+    Markdown copy that honours the prompt's structure and length request —
+    unless cfg asks for imperfect drafts (a dropped section or disclaimer,
+    a length off target), as sampled drafts sometimes are.
+    """
+    heads = re.findall(r"^(#{2,3} .+)$", _between(prompt, "#### Structure to Follow",
+                                                   "####") or "## Headline", re.M)
+    m = re.search(r"between \*\*(\d+) and (\d+) words|at least (\d+) words", prompt)
+    target = int(m.group(1) or m.group(3)) + 20 if m else 150
+    disclaimer = DISCLAIMER
+    if cfg and cfg.draft_length_jitter:
+        target = round(target * (1 + rng.uniform(-1, 1) * cfg.draft_length_jitter))
+    if cfg and cfg.draft_miss_rate:
+        if rng.random() < cfg.draft_miss_rate:
+            if len(heads) > 1 and rng.random() < 0.5:
+                heads.pop(rng.randrange(1, len(heads)))
+            else:
+                disclaimer = ""
+    per = max(1, target // max(1, len(heads)))
+    body = []
+    for h in heads or ["## Headline"]:
+        words = (FILLER * (per // len(FILLER.split()) + 1)).split()[:per]
+        body.append(f"{h}\n{' '.join(words)}")
+    return "\n\n".join(body) + ("\n\n" + disclaimer if disclaimer else "")
+
+VOCAB = ("shares", "growth", "margin", "analysts", "decade", "cash", "market", "returns",
+         "investors", "earnings", "moat", "founder", "pricing", "demand", "chips", "cloud",
+         "customers", "runway", "valuation", "dividend", "portfolio", "patience", "signal",
+         "quarter", "revenue", "leaders", "risk", "upside", "research", "conviction",
+         "compounding", "software", "energy", "batteries", "payments", "members", "picks",
+         "timing", "crowd", "opportunity", "record", "profit", "scale", "network", "insiders")
+
+def _prose(words: int, rng: random.Random) -> str:
+    """*words* words of random sentences — no two replies share long runs."""
+    out, n = [], 0
+    while n < words:
+        k = min(rng.randint(8, 16), words - n) or 1
+        s = " ".join(rng.choice(VOCAB) for _ in range(k))
+        out.append(s[0].upper() + s[1:] + ".")
+        n += k
+    return " ".join(out)
+
+def _fake_outline(prompt: str) -> str:
+    """The structure's headings; body sections split into #### parts."""
+    heads = re.findall(r"^(#{2,3} .+)$", _between(prompt, "#### Structure to Follow",
+                                                   "####") or "## Headline", re.M)
+    total = int((re.search(r"about (\d+) words", prompt) or [0, 3000])[1])
+    chunk = int((re.search(r"exceeds (\d+) words", prompt) or [0, 600])[1])
+    body = [h for h in heads if "Body" in h or "Benefit" in h] or heads[-1:]
+    short = 40
+    long_ = max(chunk, (total - short * (len(heads) - len(body))) // len(body))
+    sections = []
+    for h in heads:
+        if h not in body:
+            sections.append({"heading": h, "points": f"{h.lstrip('# ')} beat", "words": short})
+            continue
+        parts = -(-long_ // chunk)
+        sections.append({"heading": h, "points": "Set up the thesis", "words": long_ // parts})
+        sections += [{"heading": f"#### Part {k}", "points": f"Proof point {k}",
+                      "words": long_ // parts} for k in range(2, parts + 1)]
+    return json.dumps({"plan": "- Hook on the deadline\n- Proof in every part\n- CTA twice",
+                       "sections": sections})
+
+def _fake_section(prompt: str, rng: random.Random) -> str:
+    words = int((re.search(r"— about (\d+) words", prompt) or [0, 150])[1])
+    m = re.search(r"heading line `(#+ [^`]+)`", prompt)
+    return (f"{m.group(1)}\n" if m else "") + _prose(words, rng)
+
+def _ramble(text: str, tokens: int) -> str:
+    loop = FILLER * (tokens * 4 // len(FILLER) + 1)
+    return f"{text}\n\n{loop[:tokens * 4]}"
+
+def reply_for(body: dict, rng: random.Random, cfg: FakeConfig) -> str:
+    kind = _kind(body)
+    user = body["messages"][-1]["content"]
+    if kind == "draft":
+        copy = _fake_copy(user, rng, cfg)
+        if rng.random() < cfg.runaway_rate:
+            copy = _ramble(copy, cfg.runaway_tokens)
+        return json.dumps({"plan": "- Hook on the deadline\n- Proof mid‑way\n- CTA twice",
+                           "copy": copy})
+    if kind not in ("variants", "qa") and rng.random() < cfg.runaway_rate:
+        return _ramble(_reply_text(kind, user, rng, cfg), cfg.runaway_tokens)
+    return _reply_text(kind, user, rng, cfg)
+
+def _reply_text(kind, user, rng, cfg) -> str:
+    if kind == "qa":
+        if rng.random() < cfg.qa_fail_rate:
+            return "- Add the disclaimer as the final italic line.\n- Strengthen the CTA."
+        return "PASS"
+    if kind == "patch":
+        if "### SECTION" in user:                     # section‑level patch
+            section = user.split("### SECTION", 1)[-1].strip()
+            return f"{section} Up 73% since launch — offer ends at midnight tonight."
+        m = re.search(r"heading line `(#+ [^`]+)`", user)
+        if m:                                         # missing section insert
+            return f"{m.group(1)}\n{FILLER.strip()}"
+        original = user.split("### ORIGINAL", 1)[-1].strip()
+        return original if DISCLAIMER in original else f"{original}\n\n{DISCLAIMER}"
+    if kind == "critique":
+        return "- Strength: clear hook\n- Weakness: proof is thin\n- Improvement: add a stat"
+    if kind == "variants":
+        # sampled from small phrase banks, so repeats / near‑repeats happen as they do live
+        n = int((re.search(r"Write (\d+)", user) or [0, 5])[1])
+        fill = lambda t: t.format(topic=rng.choice(TOPICS), k=rng.choice((3, 5)),
+                                  pct=rng.choice((50, 60)))
+        return json.dumps({"headlines": [fill(rng.choice(HEADLINES)) for _ in range(n)],
+                           "ctas": [fill(rng.choice(CTAS)) for _ in range(n)]})
+    if kind == "adapt":
+        return _between(user, "--- ORIGINAL COPY START ---", "--- ORIGINAL COPY END ---")
+    if kind == "outline":
+        return _fake_outline(user)
+    if kind == "section":
+        return _fake_section(user, rng)
+    return "OK"
+
+# ────────────────────────────────────────────────────────────
+# 2.  HTTP handler
+# ────────────────────────────────────────────────────────────
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"          # keep‑alive, like the real API
+    server: "FakeOpenAIServer"
+
+    def log_message(self, *args):          # keep benchmark output clean
+        pass
+
+    def setup(self):                       # once per TCP connection
+        super().setup()
+        with self.server.lock:
+            self.server.stats.connections += 1
+        if self.server.config.handshake_latency:
+            time.sleep(self.server.config.handshake_latency)
+
+    def _limit_headers(self):
+        rpm = self.server.config.rpm
+        if not rpm:
+            return
+        self.send_header("x-ratelimit-limit-requests", str(rpm))
+        self.send_header("x-ratelimit-remaining-requests", str(max(0, int(self.server.allowance))))
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self._limit_headers()
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            return self._send_json(200, self.server.stats.snapshot())
+        self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send_json(404, {"error": {"message": "not found"}})
+        body = json.loads(raw)
+        srv, cfg = self.server, self.server.config
+
+        wait = srv.take_request()
+        if wait:
+            with srv.lock:
+                srv.stats.rate_limited += 1
+            return self._send_json(429, {"error": {"message": "Rate limit reached for requests",
+                                                   "type": "requests", "code": "rate_limit_exceeded"}},
+                                   {"retry-after": f"{max(1, round(wait))}",
+                                    "retry-after-ms": f"{wait * 1000:.0f}",
+                                    "x-ratelimit-reset-requests": f"{wait * 1000:.0f}ms"})
+
+        digest = hashlib.sha256(json.dumps(body["messages"], sort_keys=True).encode()).digest()
+        with srv.lock:
+            srv.stats.requests += 1
+            fail = srv.rng.random() < cfg.error_rate
+            # same prompt → same reply, unless sampled: then every request differs
+            sample = srv.stats.requests if body.get("temperature") else 0
+        rng = random.Random((int.from_bytes(digest[:8], "big") ^ cfg.seed) + sample)
+
+        if fail:
+            code = srv.rng.choice(cfg.error_codes)
+            with srv.lock:
+                srv.stats.errors += 1
+            headers = {"Retry-After": f"{cfg.retry_after:g}"} if code == 429 else {}
+            kind = "rate_limit_error" if code == 429 else "server_error"
+            return self._send_json(code, {"error": {"message": f"injected {code}",
+                                                    "type": kind, "code": kind}}, headers)
+
+        n = int(body.get("n") or 1)
+        texts = [reply_for(body, random.Random(rng.random()), cfg) for _ in range(n)]
+        limit = body.get("max_tokens") or body.get("max_completion_tokens")
+        finish = ["length" if limit and count_tokens(t) > limit else "stop" for t in texts]
+        texts = [t[:limit * 4] if f == "length" else t for t, f in zip(texts, finish)]
+        prompt_tokens = count_tokens(_serialise(body["messages"]))
+        cached_tokens = srv.prefixes.lookup_and_store(body["messages"])
+        completion_tokens = sum(count_tokens(t) for t in texts)
+        with srv.lock:
+            srv.stats.prompt_tokens += prompt_tokens
+            srv.stats.cached_tokens += cached_tokens
+            srv.stats.completion_tokens += completion_tokens
+            kind = _kind(body)
+            srv.stats.by_kind[kind] = srv.stats.by_kind.get(kind, 0) + 1
+
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens,
+                 "prompt_tokens_details": {"cached_tokens": cached_tokens}}
+        meta = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "created": int(time.time()),
+                "model": body.get("model", "fake")}
+
+        time.sleep(cfg.ttft + cfg.prefill_latency * (prompt_tokens - cached_tokens))
+        if body.get("stream"):
+            return self._stream(texts[0], meta, usage, body, finish[0])
+
+        # n choices are sampled side by side: latency follows the longest one
+        time.sleep(cfg.token_latency * max(count_tokens(t) for t in texts))
+        self._send_json(200, {**meta, "object": "chat.completion",
+                              "choices": [{"index": i, "finish_reason": f, "logprobs": None,
+                                           "message": {"role": "assistant", "content": t}}
+                                          for i, (t, f) in enumerate(zip(texts, finish))],
+                              "usage": usage})
+
+    def _stream(self, text, meta, usage, body, finish="stop"):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self._limit_headers()
+        self.end_headers()
+
+        def emit(payload):
+            data = f"data: {payload}\n\n".encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def chunk(delta, finish=None):
+            return json.dumps({**meta, "object": "chat.completion.chunk",
+                               "choices": [{"index": 0, "delta": delta,
+                                            "finish_reason": finish}]})
+
+        emit(chunk({"role": "assistant", "content": ""}))
+        for piece in re.findall(r"\S*\s*", text):
+            if not piece:
+                continue
+            time.sleep(self.server.config.token_latency * count_tokens(piece))
+            emit(chunk({"content": piece}))
+        emit(chunk({}, finish))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            emit(json.dumps({**meta, "object": "chat.completion.chunk",
+                             "choices": [], "usage": usage}))
+        emit("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+# ────────────────────────────────────────────────────────────
+# 3.  Server helpers
+# ────────────────────────────────────────────────────────────
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128               # the default backlog of 5 drops connect bursts (1 s SYN retry)
+
+    def __init__(self, addr, config: FakeConfig):
+        super().__init__(addr, FakeHandler)
+        self.config, self.stats = config, FakeStats()
+        self.lock = threading.Lock()
+        self.rng = random.Random(config.seed)
+        self.prefixes = PrefixCache()
+        self.allowance, self._stamp = max(1.0, config.rpm / 60), time.monotonic()
+
+    def take_request(self) -> float:
+        """0 if the request fits the RPM bucket, else seconds until it would."""
+        rpm = self.config.rpm
+        if not rpm:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            depth = max(1.0, rpm / 60)
+            self.allowance = min(depth, self.allowance + (now - self._stamp) * rpm / 60)
+            self._stamp = now
+            if self.allowance >= 1:
+                self.allowance -= 1
+                return 0.0
+            return (1 - self.allowance) * 60 / rpm
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+def serve_in_thread(host="127.0.0.1", port=0, **config) -> FakeOpenAIServer:
+    """Start a server on a background thread (port 0 = any free port)."""
+    srv = FakeOpenAIServer((host, port), FakeConfig(**config))
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Offline OpenAI chat-completions stand-in.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--ttft", type=float, default=FakeConfig.ttft)
+    ap.add_argument("--token-latency", type=float, default=FakeConfig.token_latency)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--error-codes", default="429,500,503")
+    ap.add_argument("--retry-after", type=float, default=FakeConfig.retry_after)
+    ap.add_argument("--rpm", type=int, default=0, help="enforced requests per minute")
+    ap.add_argument("--qa-fail-rate", type=float, default=0.0)
+    ap.add_argument("--prefill-latency", type=float, default=FakeConfig.prefill_latency)
+    ap.add_argument("--runaway-rate", type=float, default=0.0)
+    ap.add_argument("--handshake-latency", type=float, default=0.0,
+                    help="seconds added per new connection (TLS stand-in)")
+    ap.add_argument("--draft-miss-rate", type=float, default=0.0,
+                    help="share of drafts missing a section or the disclaimer")
+    ap.add_argument("--draft-length-jitter", type=float, default=0.0,
+                    help="drafts land within ±this share of the asked length")
+    ap.add_argument("--seed", type=int, default=FakeConfig.seed)
+    a = ap.parse_args(argv)
+
+    cfg = FakeConfig(ttft=a.ttft, token_latency=a.token_latency, error_rate=a.error_rate,
+                     error_codes=tuple(int(c) for c in a.error_codes.split(",")),
+                     retry_after=a.retry_after, rpm=a.rpm, qa_fail_rate=a.qa_fail_rate,
+                     prefill_latency=a.prefill_latency, runaway_rate=a.runaway_rate,
+                     handshake_latency=a.handshake_latency,
+                     draft_miss_rate=a.draft_miss_rate,
+                     draft_length_jitter=a.draft_length_jitter, seed=a.seed)
+    srv = FakeOpenAIServer((a.host, a.port), cfg)
+    print(f"Fake OpenAI listening on {srv.base_url}")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+# ✍️ Motley Fool AI Copywriter — generation history
+# ----------------------------------------------------------
+# • Every Generate / Update / Adapt result kept in SQLite: brief,
+#   trait scores, country, copy type, length, plan, final copy,
+#   variants, QA report and token usage / cost
+# • FTS5 index (porter stemming) over title, brief, plan and copy,
+#   kept in step by triggers; bm25 ranking + highlighted snippets
+#   (broad terms matching more than RANK_LIMIT pieces list newest
+#   first instead — ranking 50k hits costs ~200 ms, streaming 5 ms)
+# • Filters by kind, country, copy type, length and date — each
+#   backed by a (column, created) index, so listing stays in the
+#   milliseconds with tens of thousands of pieces
+# • Listings carry no copy bodies; get() loads one piece
+# • parent_id links forks / updates / adaptations to their source
+# • Sampled shingle fingerprints per piece (mf_copy.similarity) →
+#   overlaps() finds past pieces a new draft reuses, in milliseconds
+#   (its own lineage and earlier runs of its brief excepted);
+#   phrases in more than COMMON_DF pieces count as house style
+#
+#   python -m mf_copy.history "ai boom" --country Canada --limit 5
+# ----------------------------------------------------------
+
+import argparse, json, math, os, re, sqlite3, sys, threading, time
+
+from mf_copy.similarity import HISTORY_OVERLAP, Overlap, fingerprints
+
+HISTORY_ENABLED = os.environ.get("MF_COPY_HISTORY", "on").lower() not in ("0", "off", "false")
+HISTORY_PATH = os.environ.get("MF_COPY_HISTORY_PATH", ".cache/history.sqlite3")
+KINDS = ("generate", "update", "adapt")
+SCHEMA_VERSION = 1                    # PRAGMA user_version; 1 = shingle fingerprints
+COMMON_DF = 50                        # a fingerprint in more pieces than this isn't indexed
+MIN_FINGERPRINTS = 5                  # shorter copy is too little to call it reuse
+RANK_LIMIT = 2000                     # more matches than this → newest first, not bm25
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pieces (
+    id                INTEGER PRIMARY KEY,
+    created           REAL NOT NULL,
+    kind              TEXT NOT NULL,
+    copy_type         TEXT,
+    country           TEXT,
+    length            TEXT,
+    title             TEXT,
+    brief             TEXT,          -- JSON
+    brief_text        TEXT,          -- brief values, for the full‑text index
+    traits            TEXT,          -- JSON
+    plan              TEXT,
+    copy              TEXT NOT NULL,
+    variants          TEXT,          -- JSON
+    qa                TEXT,          -- JSON
+    words             INTEGER,
+    model             TEXT,
+    prompt_tokens     INTEGER DEFAULT 0,
+    cached_tokens     INTEGER DEFAULT 0,
+    completion_tokens INTEGER DEFAULT 0,
+    cost_usd          REAL,
+    parent_id         INTEGER REFERENCES pieces(id) ON DELETE SET NULL,
+    source_hash       TEXT
+);
+CREATE INDEX IF NOT EXISTS pieces_created   ON pieces(created);
+CREATE INDEX IF NOT EXISTS pieces_country   ON pieces(country, created);
+CREATE INDEX IF NOT EXISTS pieces_copy_type ON pieces(copy_type, created);
+CREATE INDEX IF NOT EXISTS pieces_kind      ON pieces(kind, created);
+CREATE INDEX IF NOT EXISTS pieces_parent    ON pieces(parent_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS pieces_fts USING fts5(
+    title, brief_text, plan, copy,
+    content='pieces', content_rowid='id', tokenize='porter unicode61');
+
+CREATE TRIGGER IF NOT EXISTS pieces_ai AFTER INSERT ON pieces BEGIN
+    INSERT INTO pieces_fts(rowid, title, brief_text, plan, copy)
+    VALUES (new.id, new.title, new.brief_text, new.plan, new.copy);
+END;
+CREATE TRIGGER IF NOT EXISTS pieces_ad AFTER DELETE ON pieces BEGIN
+    INSERT INTO pieces_fts(pieces_fts, rowid, title, brief_text, plan, copy)
+    VALUES ('delete', old.id, old.title, old.brief_text, old.plan, old.copy);
+END;
+
+-- sampled word‑shingle hashes per piece, and how many pieces have each
+CREATE TABLE IF NOT EXISTS shingles (
+    hash     INTEGER NOT NULL,
+    piece_id INTEGER NOT NULL REFERENCES pieces(id) ON DELETE CASCADE,
+    PRIMARY KEY (hash, piece_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS shingles_piece ON shingles(piece_id);
+CREATE TABLE IF NOT EXISTS shingle_df (
+    hash INTEGER PRIMARY KEY,
+    df   INTEGER NOT NULL
+);
+"""
+
+# Listing columns — everything but the large text / JSON bodies
+SUMMARY = ("id", "created", "kind", "copy_type", "country", "length", "title", "words",
+           "prompt_tokens", "completion_tokens", "cost_usd", "parent_id")
+JSON_COLUMNS = ("brief", "traits", "variants", "qa")
+
+def fts_query(text: str) -> str | None:
+    """
+    Free text → safe FTS5 query: every word must match, the last as a
+    prefix ("ai boo" finds "boom").  Quotes / operators are never parsed.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return None
+    return " ".join(f'"{w}"' for w in words[:-1]) + f' "{words[-1]}"*'
+
+def _title(brief: dict | None, copy: str) -> str:
+    hook = (brief or {}).get("hook", "").strip()
+    first = next((l.strip("#* ").strip() for l in copy.splitlines() if l.strip("#* ").strip()), "")
+    return (hook or first)[:120]
+
+# ────────────────────────────────────────────────────────────
+# 1.  Store
+# ────────────────────────────────────────────────────────────
+class History:
+    """SQLite history; one connection shared across Streamlit sessions under a lock."""
+
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        if self._db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._migrate()
+
+    def _migrate(self):
+        """Fingerprint pieces saved before the shingle tables existed."""
+        with self._db:
+            done = {r[0] for r in self._db.execute("SELECT DISTINCT piece_id FROM shingles")}
+            for piece_id, copy in self._db.execute("SELECT id, copy FROM pieces").fetchall():
+                if piece_id not in done:
+                    self._index(piece_id, copy)
+            self._db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def _index(self, piece_id: int, copy: str):
+        """Store *copy*'s fingerprints (caller holds the transaction)."""
+        fps = list(fingerprints(copy))
+        self._db.executemany("INSERT INTO shingle_df(hash, df) VALUES (?, 1) "
+                             "ON CONFLICT(hash) DO UPDATE SET df = df + 1",
+                             [(h,) for h in fps])
+        self._db.executemany("INSERT OR IGNORE INTO shingles(hash, piece_id) "
+                             "SELECT hash, ? FROM shingle_df WHERE hash = ? AND df <= ?",
+                             [(piece_id, h, COMMON_DF) for h in fps])
+
+    # ---- writes -------------------------------------------------
+    def save(self, kind: str, copy: str, *, copy_type=None, country=None, length=None,
+             brief=None, traits=None, plan=None, variants=None, qa=None, usage=None,
+             model=None, parent_id=None, source_hash=None) -> int:
+        """Store one result → its id.  *usage* as from tracing.totals()."""
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {KINDS}")
+        usage = usage or {}
+        row = {"created": time.time(), "kind": kind, "copy_type": copy_type,
+               "country": country, "length": length, "title": _title(brief, copy),
+               "brief": json.dumps(brief, ensure_ascii=False) if brief else None,
+               "brief_text": " ".join(str(v) for v in (brief or {}).values() if v),
+               "traits": json.dumps(traits) if traits else None,
+               "plan": plan or "", "copy": copy,
+               "variants": json.dumps(variants, ensure_ascii=False) if variants else None,
+               "qa": json.dumps(qa, ensure_ascii=False) if qa else None,
+               "words": len(copy.split()), "model": model,
+               "prompt_tokens": usage.get("prompt_tokens") or 0,
+               "cached_tokens": usage.get("cached_tokens") or 0,
+               "completion_tokens": usage.get("completion_tokens") or 0,
+               "cost_usd": usage.get("cost_usd"),
+               "parent_id": parent_id, "source_hash": source_hash}
+        with self._lock, self._db:
+            cur = self._db.execute(f"INSERT INTO pieces ({', '.join(row)}) "
+                                   f"VALUES ({', '.join('?' * len(row))})", tuple(row.values()))
+            self._index(cur.lastrowid, copy)
+            return cur.lastrowid
+
+    def _unindex(self, copy: str):
+        """Take *copy*'s fingerprints back out of shingle_df (caller holds the transaction)."""
+        fps = [(h,) for h in fingerprints(copy)]
+        self._db.executemany("UPDATE shingle_df SET df = df - 1 WHERE hash = ?", fps)
+        self._db.executemany("DELETE FROM shingle_df WHERE hash = ? AND df <= 0", fps)
+
+    def delete(self, piece_id: int) -> bool:
+        with self._lock, self._db:
+            row = self._db.execute("SELECT copy FROM pieces WHERE id=?", (piece_id,)).fetchone()
+            if row is None:
+                return False
+            self._unindex(row["copy"])          # shingles rows go with ON DELETE CASCADE
+            self._db.execute("DELETE FROM pieces WHERE id=?", (piece_id,))
+            return True
+
+    # ---- reads --------------------------------------------------
+    def get(self, piece_id: int) -> dict | None:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM pieces WHERE id=?", (piece_id,)).fetchone()
+        if row is None:
+            return None
+        out = dict(row)
+        for k in JSON_COLUMNS:
+            out[k] = json.loads(out[k]) if out[k] else None
+        out.pop("brief_text")
+        return out
+
+    def _where(self, kind, country, copy_type, length, since, until, parent_id):
+        clauses, args = [], []
+        for col, value in (("kind", kind), ("country", country), ("copy_type", copy_type),
+                           ("length", length), ("parent_id", parent_id)):
+            if value is None or value == []:
+                continue
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            clauses.append(f"p.{col} IN ({', '.join('?' * len(values))})")
+            args.extend(values)
+        if since is not None:
+            clauses.append("p.created >= ?"); args.append(since)
+        if until is not None:
+            clauses.append("p.created < ?"); args.append(until)
+        return clauses, args
+
+    def search(self, query: str | None = None, *, kind=None, country=None, copy_type=None,
+               length=None, since: float | None = None, until: float | None = None,
+               parent_id=None, limit: int = 50, offset: int = 0,
+               order: str = "auto") -> list[dict]:
+        """
+        Summary rows, best match first with a query (bm25; title and brief
+        weigh more than body copy), newest first without.  order="auto"
+        ranks only when the query matches ≤ RANK_LIMIT pieces; "rank" /
+        "newest" force either.  Filters take a value or a list; since /
+        until are epoch seconds.
+        """
+        clauses, args = self._where(kind, country, copy_type, length, since, until, parent_id)
+        cols = ", ".join(f"p.{c}" for c in SUMMARY)
+        match = fts_query(query) if query else None
+        if match:
+            if order == "auto":
+                order = "rank" if self._matches(match, RANK_LIMIT + 1) <= RANK_LIMIT else "newest"
+            rank = ("bm25(pieces_fts, 4.0, 2.0, 1.0, 1.0)" if order == "rank"
+                    else "pieces_fts.rowid DESC")
+            sql = (f"SELECT {cols}, snippet(pieces_fts, 3, '**', '**', '…', 16) AS snippet "
+                   "FROM pieces_fts JOIN pieces p ON p.id = pieces_fts.rowid "
+                   f"WHERE pieces_fts MATCH ?{''.join(' AND ' + c for c in clauses)} "
+                   f"ORDER BY {rank} LIMIT ? OFFSET ?")
+            args = [match, *args]
+        else:
+            sql = (f"SELECT {cols}, NULL AS snippet FROM pieces p"
+                   f"{' WHERE ' + ' AND '.join(clauses) if clauses else ''} "
+                   "ORDER BY p.created DESC LIMIT ? OFFSET ?")
+        with self._lock:
+            return [dict(r) for r in self._db.execute(sql, (*args, limit, offset))]
+
+    def _matches(self, match: str, cap: int) -> int:
+        """FTS hits for *match*, counting no further than *cap*."""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM (SELECT rowid FROM pieces_fts "
+                                    "WHERE pieces_fts MATCH ? LIMIT ?)", (match, cap)).fetchone()[0]
+
+    def count(self, query: str | None = None, **filters) -> int:
+        clauses, args = self._where(*(filters.get(k) for k in (
+            "kind", "country", "copy_type", "length", "since", "until", "parent_id")))
+        match = fts_query(query) if query else None
+        if match and not clauses:
+            return self._matches(match, -1)
+        if match:
+            sql = ("SELECT COUNT(*) FROM pieces_fts JOIN pieces p ON p.id = pieces_fts.rowid "
+                   f"WHERE pieces_fts MATCH ?{''.join(' AND ' + c for c in clauses)}")
+            args = [match, *args]
+        else:
+            sql = ("SELECT COUNT(*) FROM pieces p"
+                   + (" WHERE " + " AND ".join(clauses) if clauses else ""))
+        with self._lock:
+            return self._db.execute(sql, args).fetchone()[0]
+
+    def lineage(self, ids) -> set[int]:
+        """*ids* plus every piece they descend from (the parent_id chain)."""
+        ids = [i for i in ids if i is not None]
+        if not ids:
+            return set()
+        with self._lock:
+            rows = self._db.execute(
+                "WITH RECURSIVE up(id) AS ("
+                f"SELECT id FROM pieces WHERE id IN ({', '.join('?' * len(ids))}) "
+                "UNION SELECT p.parent_id FROM pieces p JOIN up ON p.id = up.id "
+                "WHERE p.parent_id IS NOT NULL) SELECT id FROM up", ids).fetchall()
+        return set(ids) | {r[0] for r in rows}
+
+    def overlaps(self, copy: str, exclude=(), source: str | None = None,
+                 threshold: float = HISTORY_OVERLAP, limit: int = 3) -> list[Overlap]:
+        """
+        Stored pieces holding at least *threshold* of *copy*'s fingerprints
+        (house‑style phrases ignored), most overlap first.  *exclude*: ids
+        it may legitimately repeat — the piece it updates or forks — and
+        their ancestors; *source*: skip pieces saved under the same
+        source_hash (earlier runs of the same brief).
+        """
+        fps = list(fingerprints(copy))
+        if not fps:
+            return []
+        skip = self.lineage(exclude)
+        marks = ", ".join("?" * len(fps))
+        same = "AND p.source_hash IS NOT ? " if source else ""
+        with self._lock:
+            common = self._db.execute(f"SELECT COUNT(*) FROM shingle_df WHERE hash IN ({marks}) "
+                                      "AND df > ?", (*fps, COMMON_DF)).fetchone()[0]
+            total = len(fps) - common
+            if total < MIN_FINGERPRINTS:
+                return []
+            rows = self._db.execute(
+                "SELECT s.piece_id, COUNT(*) AS hits, p.title FROM shingles s "
+                "JOIN shingle_df d ON d.hash = s.hash AND d.df <= ? "
+                "JOIN pieces p ON p.id = s.piece_id "
+                f"WHERE s.hash IN ({marks}) {same}GROUP BY s.piece_id HAVING hits >= ? "
+                "ORDER BY hits DESC LIMIT ?",
+                (COMMON_DF, *fps, *([source] if source else []), math.ceil(threshold * total),
+                 limit + len(skip))).fetchall()
+        return [Overlap("history", f"#{pid}", title or "", round(hits / total, 2))
+                for pid, hits, title in rows if pid not in skip][:limit]
+
+    def stats(self) -> dict:
+        with self._lock:
+            n, cost, tokens = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(cost_usd), 0), "
+                "COALESCE(SUM(prompt_tokens + completion_tokens), 0) FROM pieces").fetchone()
+        size = os.path.getsize(self.path) if self.path != ":memory:" else 0
+        return {"pieces": n, "cost_usd": round(cost, 4), "tokens": tokens,
+                "size_mb": round(size / 1e6, 2)}
+
+    def optimize(self):
+        """Merge FTS segments (worth running after bulk imports)."""
+        with self._lock, self._db:
+            self._db.execute("INSERT INTO pieces_fts(pieces_fts) VALUES ('optimize')")
+
+# ────────────────────────────────────────────────────────────
+# 2.  Process‑wide instance
+# ────────────────────────────────────────────────────────────
+_HISTORY: History | None = None
+_HISTORY_LOCK = threading.Lock()
+
+def get_history() -> History:
+    """Lazily opened singleton — one store per server process."""
+    global _HISTORY
+    with _HISTORY_LOCK:
+        if _HISTORY is None:
+            _HISTORY = History()
+        return _HISTORY
+
+# ────────────────────────────────────────────────────────────
+# 3.  CLI
+# ────────────────────────────────────────────────────────────
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Search saved copy (newest first without a query).")
+    ap.add_argument("query", nargs="?")
+    ap.add_argument("--path", default=HISTORY_PATH)
+    ap.add_argument("--kind", choices=KINDS)
+    ap.add_argument("--country")
+    ap.add_argument("--days", type=float, help="only the last N days")
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--show", type=int, metavar="ID", help="print one piece in full")
+    a = ap.parse_args(argv)
+
+    h = History(a.path)
+    if a.show:
+        piece = h.get(a.show)
+        if piece is None:
+            print(f"no piece {a.show}", file=sys.stderr)
+            return 1
+        print(piece["copy"])
+        return 0
+    since = time.time() - a.days * 86400 if a.days else None
+    for r in h.search(a.query, kind=a.kind, country=a.country, since=since, limit=a.limit):
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(r["created"]))
+        print(f"{r['id']:>7}  {when}  {r['kind']:<8} {r['country'] or '':<15} "
+              f"{r['words']:>5}w  {r['title']}")
+        if r["snippet"]:
+            print(f"{'':>9}{r['snippet']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
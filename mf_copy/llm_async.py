@@ -0,0 +1,208 @@
+# ✍️ Motley Fool AI Copywriter — async LLM orchestration
+# ----------------------------------------------------------
+# • arun_chat: AsyncOpenAI twin of run_chat (same cache keys); n>1
+#   returns every choice from one request
+# • astream_chat: token stream with a per‑delta callback
+# • Bounded semaphore per model (per event loop)
+# • run_stages: fire independent stages concurrently
+# • run(): blocking entry point on one shared, long‑lived event loop, so
+#   its AsyncOpenAI pool (mf_copy.clients) survives between calls; on_*
+#   callbacks fire back on the caller's thread (Streamlit draws there)
+# • Every reply's usage (incl. cached prompt tokens) → mf_copy.usage
+# • Retries, rate limiting & circuit breaking → mf_copy.scheduler
+# • Each call is an llm.<label> span (tokens, TTFT, cost) → mf_copy.tracing
+# ----------------------------------------------------------
+
+import asyncio, os, queue, threading, time
+from weakref import WeakKeyDictionary
+
+from mf_copy.budget import message_tokens
+from mf_copy.cache import cache_key, get_cache, is_cacheable
+from mf_copy.scheduler import StreamInterrupted, classify, get_scheduler
+from mf_copy.tracing import annotate, annotate_usage, span
+from mf_copy.usage import get_usage
+
+# ────────────────────────────────────────────────────────────
+# 0.  Concurrency limits
+# ────────────────────────────────────────────────────────────
+DEFAULT_CONCURRENCY = 4          # in‑flight calls per model
+SHARED_CONCURRENCY = int(os.environ.get("MF_COPY_SHARED_CONCURRENCY", 16))
+                                 # … on the shared loop, which every app session uses
+MODEL_CONCURRENCY: dict[str, int] = {}   # per‑model overrides
+
+_SEMAPHORES: "WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" \
+    = WeakKeyDictionary()
+
+def model_semaphore(model: str) -> asyncio.Semaphore:
+    """Semaphore for *model* on the running loop (see run() for the shared one)."""
+    loop = asyncio.get_running_loop()
+    per_loop = _SEMAPHORES.setdefault(loop, {})
+    if model not in per_loop:
+        per_loop[model] = asyncio.BoundedSemaphore(MODEL_CONCURRENCY.get(
+            model, SHARED_CONCURRENCY if loop is _LOOP else DEFAULT_CONCURRENCY))
+    return per_loop[model]
+
+# ────────────────────────────────────────────────────────────
+# 1.  Async chat helper
+# ────────────────────────────────────────────────────────────
+async def arun_chat(aclient, model, messages, expect_json=False, max_tokens=None,
+                    temperature=None, use_cache=True, label="chat", n=1):
+    """
+    Async counterpart of run_chat.  Shares the response cache, so a draft
+    produced here is a cache hit for the sync path and vice versa.
+    With n > 1 the API samples n choices in one request and a list is
+    returned (never cached).  Raises LLMError once the scheduler gives up.
+    """
+    with span(f"llm.{label}", label=label, model=model, max_tokens=max_tokens,
+              **({"n": n} if n > 1 else {})):
+        cache = (get_cache() if use_cache and n == 1 and is_cacheable(temperature)
+                 else None)
+        key = cache_key(model, messages, max_tokens=max_tokens,
+                        response_format="json_object" if expect_json else None) if cache else None
+        if cache:
+            hit = cache.get(key)
+            annotate(cache_hit=hit is not None)
+            if hit is not None:
+                return hit
+
+        kwargs = {}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        if expect_json:
+            kwargs["response_format"] = {"type": "json_object"}
+        if n > 1:
+            kwargs["n"] = n
+
+        async def send():
+            t0 = time.perf_counter()
+            raw = await aclient.chat.completions.with_raw_response.create(model=model,
+                                                                          messages=messages,
+                                                                          **kwargs)
+            resp = raw.parse()
+            get_usage().record(label, resp.usage, time.perf_counter() - t0)
+            annotate_usage(model, resp.usage)
+            texts = [(c.message.content or "").strip()
+                     for c in sorted(resp.choices, key=lambda c: c.index)]
+            return (texts if n > 1 else texts[0]), raw.headers
+
+        async with model_semaphore(model):
+            text = await get_scheduler().acall(send, model, label,
+                                               message_tokens(messages, model)
+                                               + (max_tokens or 0) * n)
+        if cache:
+            cache.put(key, text, model)
+        return text
+
+async def astream_chat(aclient, model, messages, on_delta, expect_json=False,
+                       max_tokens=None, temperature=None, use_cache=True, label="chat"):
+    """
+    Streaming variant: on_delta(text_chunk) fires as tokens arrive and the
+    full text is returned.  A cache hit is delivered as a single chunk.
+    Retries only happen before the first chunk — once text has reached the
+    caller a failure is raised (StreamInterrupted) rather than replayed.
+    """
+    with span(f"llm.{label}", label=label, model=model, max_tokens=max_tokens, stream=True):
+        cache = get_cache() if use_cache and is_cacheable(temperature) else None
+        key = cache_key(model, messages, max_tokens=max_tokens,
+                        response_format="json_object" if expect_json else None) if cache else None
+        if cache:
+            hit = cache.get(key)
+            annotate(cache_hit=hit is not None)
+            if hit is not None:
+                on_delta(hit)
+                return hit
+
+        kwargs = {}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        if expect_json:
+            kwargs["response_format"] = {"type": "json_object"}
+
+        async def send():
+            parts: list[str] = []
+            t0, first = time.perf_counter(), None
+            raw = await aclient.chat.completions.with_raw_response.create(
+                model=model, messages=messages, stream=True,
+                stream_options={"include_usage": True}, **kwargs)
+            try:
+                async for c in raw.parse():
+                    if c.usage:                       # final chunk; latency = time to first token
+                        get_usage().record(label, c.usage, (first or time.perf_counter()) - t0)
+                        annotate_usage(model, c.usage, (first or time.perf_counter()) - t0)
+                    delta = c.choices[0].delta.content if c.choices else None
+                    if delta:
+                        first = first or time.perf_counter()
+                        parts.append(delta)
+                        on_delta(delta)
+            except Exception as e:
+                if parts and classify(e):
+                    raise StreamInterrupted(f"{label} stream broke after {len(parts)} chunks: {e}",
+                                            label, "interrupted") from e
+                raise
+            return "".join(parts).strip(), raw.headers
+
+        async with model_semaphore(model):
+            text = await get_scheduler().acall(send, model, label,
+                                               message_tokens(messages, model) + (max_tokens or 0))
+        if cache:
+            cache.put(key, text, model)
+        return text
+
+# ────────────────────────────────────────────────────────────
+# 2.  Stage runner
+# ────────────────────────────────────────────────────────────
+async def run_stages(**stages) -> dict:
+    """
+    Await independent coroutines concurrently and return {name: result}.
+    Latency is the slowest stage, not the sum of all of them.
+    """
+    names = list(stages)
+    results = await asyncio.gather(*stages.values())
+    return dict(zip(names, results))
+
+# ────────────────────────────────────────────────────────────
+# 3.  Shared event loop (blocking callers)
+# ────────────────────────────────────────────────────────────
+# asyncio.run() per click built a fresh loop — and with it a fresh
+# AsyncOpenAI, TLS handshakes included — that was never closed.  Blocking
+# callers (the app, scripts) submit to one loop on a daemon thread
+# instead, so one client and its keep‑alive pool serve the whole process.
+_LOOP: asyncio.AbstractEventLoop | None = None
+_LOOP_LOCK = threading.Lock()
+_DONE = object()
+
+def shared_loop() -> asyncio.AbstractEventLoop:
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None or _LOOP.is_closed():
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, name="mf-copy-loop", daemon=True).start()
+        return _LOOP
+
+def run(fn, *args, **kwargs):
+    """
+    fn(*args, **kwargs) on the shared loop; blocks until it returns.
+    Callable on_* keyword arguments (on_copy, on_done …) are queued and
+    called on this thread.  Anything raised here — a Streamlit rerun
+    stopping the script, Ctrl‑C — cancels the coroutine.
+    """
+    loop = shared_loop()
+    if threading.current_thread().name == "mf-copy-loop":
+        raise RuntimeError("run() called from the shared loop — await the coroutine instead")
+    calls: queue.SimpleQueue = queue.SimpleQueue()
+    for name, cb in kwargs.items():
+        if name.startswith("on_") and callable(cb):
+            kwargs[name] = lambda *a, _cb=cb: calls.put((_cb, a))
+    fut = asyncio.run_coroutine_threadsafe(fn(*args, **kwargs), loop)
+    fut.add_done_callback(lambda _: calls.put(_DONE))
+    try:
+        while (item := calls.get()) is not _DONE:   # callbacks always precede _DONE
+            item[0](*item[1])
+        return fut.result()
+    except BaseException:
+        fut.cancel()
+        raise
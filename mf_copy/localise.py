@@ -0,0 +1,275 @@
+# ✍️ Motley Fool AI Copywriter — local market pre‑adaptation
+# ----------------------------------------------------------
+# The mechanical part of "Adapt", done with rules instead of a round trip:
+# • spelling system per market (colour/color, organise/organize,
+#   centre/center, travelled/traveled …; Canada mixes the two)
+# • currency symbols & codes on prices ($119 → £119, AUD → GBP)
+# • flagship index / exchange / account names (ASX 200 → FTSE 100)
+# One compiled regex per pass (the spelling table as a trie), cached
+# per (source, target);
+# every substitution is reported back.  Keys match engine.COUNTRY_RULES.
+# ----------------------------------------------------------
+
+import re, time
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+
+# ────────────────────────────────────────────────────────────
+# 0.  Market data
+# ────────────────────────────────────────────────────────────
+@dataclass(frozen=True)
+class Market:
+    code: str                       # ISO currency code
+    symbol: str                     # how local copy writes a price
+    symbols: tuple                  # price prefixes that mean this currency
+    money_word: str                 # "dollars" / "pounds"
+    index: str                      # flagship index
+    index_aliases: tuple
+    market: str                     # shorthand for "the local market"
+    market_aliases: tuple
+    exchange: str                   # full exchange name
+    retirement: str                 # everyday retirement‑account term
+    retirement_aliases: tuple
+    spelling: dict                  # category → "uk" | "us"
+
+_UK = dict.fromkeys(("our", "ise", "re", "ll", "ence", "yse", "misc"), "uk")
+_US = dict.fromkeys(_UK, "us")
+
+MARKETS = {
+    "Australia": Market(
+        "AUD", "$", ("A$", "AU$", "AUD$"), "dollars",
+        "S&P/ASX 200", ("S&P/ASX 200", "ASX 200", "ASX200"),
+        "ASX", ("ASX",), "Australian Securities Exchange",
+        "superannuation", ("superannuation", "super fund"), _UK),
+    "United Kingdom": Market(
+        "GBP", "£", ("£",), "pounds",
+        "FTSE 100", ("FTSE 100", "FTSE100"),
+        "FTSE", ("FTSE",), "London Stock Exchange",
+        "pension", ("SIPP",), _UK),
+    "Canada": Market(
+        "CAD", "$", ("C$", "CA$", "CAD$"), "dollars",
+        "S&P/TSX Composite", ("S&P/TSX Composite", "TSX Composite"),
+        "TSX", ("TSX",), "Toronto Stock Exchange",
+        "RRSP", ("RRSP",), {**_UK, "ise": "us", "yse": "us"}),
+    "United States": Market(
+        "USD", "$", ("US$", "USD$"), "dollars",
+        "S&P 500", ("S&P 500", "S&P500"),
+        "NYSE", ("NYSE", "Wall Street"), "New York Stock Exchange",
+        "401(k)", ("401(k)", "401k"), _US),
+}
+
+# ────────────────────────────────────────────────────────────
+# 1.  Spelling tables  (British form, American form, category)
+# ────────────────────────────────────────────────────────────
+_ISE_STEMS = ("organ real recogn maxim minim capital priorit optim special custom personal "
+              "util summar emphas apolog author categor critic final modern stabil visual "
+              "standard subsid monet general central commercial global familiar memor energ "
+              "symbol mobil neutral harmon revolution popular legal normal character "
+              "industrial material social scrutin incentiv digit monopol synchron tantal "
+              "jeopard item econom theor").split()
+_ISE_SUFFIXES = ("ise", "ised", "ises", "ising", "isation", "isations", "iser", "isers")
+_OUR_STEMS = ("col fav behavi hon lab neighb harb rum hum flav endeav vap splend val sav "
+              "clam arm").split()
+_OUR_SUFFIXES = ("", "s", "ed", "ing", "ful", "fully", "able", "ably", "ite", "ites", "al",
+                 "ally", "hood", "hoods", "less", "er", "ers", "y")
+_RE_STEMS = ("cent theat fib lit calib somb lust spect").split()
+_RE_SUFFIXES = (("re", "er"), ("res", "ers"), ("red", "ered"), ("ring", "ering"))
+_LL = [("travelled", "traveled"), ("travelling", "traveling"), ("traveller", "traveler"),
+       ("travellers", "travelers"), ("cancelled", "canceled"), ("cancelling", "canceling"),
+       ("modelled", "modeled"), ("modelling", "modeling"), ("labelled", "labeled"),
+       ("labelling", "labeling"), ("fuelled", "fueled"), ("fuelling", "fueling"),
+       ("signalled", "signaled"), ("totalled", "totaled"), ("levelled", "leveled"),
+       ("marvellous", "marvelous"), ("channelled", "channeled"), ("counsellor", "counselor"),
+       ("jewellery", "jewelry"), ("enrol", "enroll"), ("enrolment", "enrollment"),
+       ("enrolments", "enrollments"), ("fulfil", "fulfill"), ("fulfilment", "fulfillment"),
+       ("instalment", "installment"), ("instalments", "installments"),
+       ("skilful", "skillful"), ("wilful", "willful")]
+_ENCE = [("defence", "defense"), ("defences", "defenses"), ("offence", "offense"),
+         ("offences", "offenses"), ("pretence", "pretense")]
+_YSE = [("analyse", "analyze"), ("analysed", "analyzed"), ("analysing", "analyzing"),
+        ("paralyse", "paralyze"), ("paralysed", "paralyzed"), ("catalyse", "catalyze")]
+_MISC = [("catalogue", "catalog"), ("catalogues", "catalogs"), ("grey", "gray"),
+         ("ageing", "aging"), ("sceptical", "skeptical"), ("sceptic", "skeptic"),
+         ("sceptics", "skeptics"), ("manoeuvre", "maneuver"), ("aluminium", "aluminum"),
+         ("judgement", "judgment"), ("acknowledgement", "acknowledgment"),
+         ("artefact", "artifact"), ("cosy", "cozy"), ("mould", "mold"), ("plough", "plow"),
+         ("moustache", "mustache"), ("pyjamas", "pajamas")]
+
+def _spelling_pairs() -> list[tuple[str, str, str]]:
+    pairs = [(s + suf, s + suf.replace("is", "iz", 1), "ise")
+             for s in _ISE_STEMS for suf in _ISE_SUFFIXES]
+    pairs += [(s + "our" + suf, s + "or" + suf, "our") for s in _OUR_STEMS for suf in _OUR_SUFFIXES]
+    pairs += [(s + uk, s + us, "re") for s in _RE_STEMS for uk, us in _RE_SUFFIXES]
+    for cat, table in (("ll", _LL), ("ence", _ENCE), ("yse", _YSE), ("misc", _MISC)):
+        pairs += [(uk, us, cat) for uk, us in table]
+    return pairs
+
+SPELLING = _spelling_pairs()
+
+# ────────────────────────────────────────────────────────────
+# 2.  Report types
+# ────────────────────────────────────────────────────────────
+@dataclass
+class Change:
+    kind: str               # "spelling" | "currency" | "index" | "market" | "account"
+    before: str
+    after: str
+    count: int = 1
+
+@dataclass
+class Localised:
+    text: str
+    source: tuple           # markets whose names / prices were converted
+    target: str
+    changes: list[Change] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return sum(c.count for c in self.changes)
+
+    def counts(self) -> dict[str, int]:
+        out: dict[str, int] = {}
+        for c in self.changes:
+            out[c.kind] = out.get(c.kind, 0) + c.count
+        return out
+
+    def summary(self) -> str:
+        return " · ".join(f"{k} {n}" for k, n in self.counts().items()) or "no changes"
+
+    def as_dict(self) -> dict:
+        return {"target": self.target, "source": list(self.source), "total": self.total,
+                "counts": self.counts(), "changes": [asdict(c) for c in self.changes],
+                "elapsed_ms": self.elapsed_ms}
+
+# ────────────────────────────────────────────────────────────
+# 3.  Compiled passes
+# ────────────────────────────────────────────────────────────
+_AMOUNT = r"\s?\d[\d,]*(?:\.\d+)?(?:\s?(?:k|m|bn|million|billion)\b)?"
+
+def _match_case(src: str, repl: str) -> str:
+    if src.isupper() and len(src) > 1:
+        return repl.upper()
+    if src[:1].isupper():
+        return repl[:1].upper() + repl[1:]
+    return repl
+
+def _alternation(words) -> str:
+    # longest first so "ASX 200" wins over "ASX"
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+def _trie(words) -> str:
+    """
+    Regex for a large word table, factored as a trie ("colo(?:ur(?:s|ed)?)")
+    so each position costs a few character tests instead of one attempt per
+    word — ~20× faster than a flat alternation over the spelling table.
+    """
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        alts = [re.escape(ch) + build(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+@dataclass(frozen=True)
+class _Pass:
+    regex: re.Pattern
+    table: dict             # matched text (lower‑cased if fold) → (kind, replacement)
+    fold: bool = False
+
+@lru_cache(maxsize=64)
+def compile_passes(source: tuple, target: str) -> tuple[_Pass, ...]:
+    """Regex passes that turn *source* market copy into *target* market copy."""
+    t = MARKETS[target]
+    src = [MARKETS[s] for s in source if s != target]
+    passes = []
+
+    names = {}
+    for s in src:
+        names.update({a: ("index", t.index) for a in s.index_aliases})
+        names.update({a: ("market", t.market) for a in s.market_aliases})
+        names[s.exchange] = ("market", t.exchange)
+        names.update({a: ("account", t.retirement) for a in s.retirement_aliases})
+    names = {k: v for k, v in names.items() if k != v[1]}
+    if names:
+        passes.append(_Pass(re.compile(rf"(?<![\w&/])(?:{_alternation(names)})(?![\w&])"),
+                            names))
+
+    money = {}
+    for s in src:
+        money.update({p: t.symbol for p in s.symbols if p != t.symbol})
+        money[s.code] = t.code
+    if src and all(s.symbol == src[0].symbol for s in src) and src[0].symbol != t.symbol:
+        money[src[0].symbol] = t.symbol            # bare "$" only when it can't be ours
+    money = {k: v for k, v in money.items() if k != v}
+    if money:
+        prefixes = _alternation(k for k in money if not k.isalpha())
+        codes = _alternation(k for k in money if k.isalpha())
+        parts = []
+        if prefixes:
+            parts.append(rf"(?<![A-Za-z$£])(?:{prefixes})(?={_AMOUNT})")
+        if codes:
+            parts.append(rf"\b(?:{codes})\b")
+        words = {s.money_word for s in src} - {t.money_word}
+        if words:
+            parts.append(rf"(?<=\d )(?:{_alternation(words)})\b")
+            money.update({w: t.money_word for w in words})
+        passes.append(_Pass(re.compile("|".join(parts)),
+                            {k: ("currency", v) for k, v in money.items()}))
+
+    if any(s.spelling != t.spelling for s in src):
+        spell = {(us if t.spelling[cat] == "uk" else uk): ("spelling",
+                                                            uk if t.spelling[cat] == "uk" else us)
+                 for uk, us, cat in SPELLING}
+        passes.append(_Pass(re.compile(rf"\b(?:{_trie(spell)})\b", re.I),
+                            spell, fold=True))
+    return tuple(passes)
+
+# ────────────────────────────────────────────────────────────
+# 4.  Entry points
+# ────────────────────────────────────────────────────────────
+def detect_market(text: str) -> str | None:
+    """Best guess at the market a piece was written for (None if no signal)."""
+    scores = {}
+    for name, m in MARKETS.items():
+        signals = (*m.symbols, m.code, *m.index_aliases, *m.market_aliases, m.exchange,
+                   *m.retirement_aliases)
+        scores[name] = sum(text.count(s) for s in signals if len(s) > 1)
+    best = max(scores, key=scores.get)
+    return best if scores[best] else None
+
+def localise(text: str, target: str, source: str | None = None) -> Localised:
+    """
+    *text* rewritten for *target* by rule.  *source* (a COUNTRY_RULES key)
+    limits conversion to that market's names and prices; without it the
+    source is detected, falling back to every other market.
+    """
+    t0 = time.perf_counter()
+    source = source or detect_market(text)
+    sources = (source,) if source else tuple(m for m in MARKETS if m != target)
+    seen: dict[tuple, Change] = {}
+
+    for p in compile_passes(sources, target):
+        def swap(m, p=p):
+            before = m.group(0)
+            kind, after = p.table[before.lower() if p.fold else before]
+            if p.fold:
+                after = _match_case(before, after)
+            if (kind, before, after) in seen:
+                seen[kind, before, after].count += 1
+            else:
+                seen[kind, before, after] = Change(kind, before, after)
+            return after
+        text = p.regex.sub(swap, text)
+
+    return Localised(text, sources, target, list(seen.values()),
+                     round((time.perf_counter() - t0) * 1000, 2))
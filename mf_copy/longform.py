@@ -0,0 +1,273 @@
+# ✍️ Motley Fool AI Copywriter — long‑form (chunked) generation
+# ----------------------------------------------------------
+# One 3000+‑word JSON reply is slow, often cut off at max_tokens and,
+# when it comes up short, sent back whole for "Please expand".  Instead:
+# • an outline call turns the plan into sections with word targets
+# • sections longer than CHUNK_WORDS are split into parts
+# • every chunk is written from the same shared block (brief, tone,
+#   market, outline) plus the outline's view of its neighbours — what
+#   comes before, what comes next — so no chunk waits for another
+# • chunks are stitched locally and the seams checked: openers that
+#   restate the previous chunk, material repeated from earlier chunks,
+#   chunks well off their word target; only those chunks are revised
+# • bullet lists are budgeted across the outline: at most
+#   MAX_BULLET_LISTS chunks may hold one, the rest are told (and
+#   checked) to stay in paragraphs — so the stitched piece passes the
+#   whole‑piece bullets check without a full rewrite
+# Latency ≈ outline + ⌈chunks / parallelism⌉ × one chunk, whatever
+# the total length.  Prompts & parsing live here; mf_copy.engine
+# makes the calls.
+# ----------------------------------------------------------
+
+import json, math, re
+from dataclasses import asdict, dataclass
+
+from mf_copy.patching import BODY_HEADINGS, join_disclaimer, split_disclaimer
+from mf_copy.qa_rules import MAX_BULLET_LISTS, count_bullet_lists
+from mf_copy.sections import heading_matches
+from mf_copy.similarity import containment, shingles
+
+CHUNK_WORDS = 600         # longest chunk one call writes
+MIN_WORDS = 12            # floor for one‑line sections (subject, sign‑off)
+ONE_LINE = 2 * MIN_WORDS  # targets up to this are one‑liners: never expanded / tightened
+BODY_SHARE = 0.85         # fallback outline: share of the words the body sections get
+OPENER_REPEAT = 0.5       # opener shingles already in the previous chunk → restated
+DUPLICATE_SHARE = 0.25    # chunk shingles already used by earlier chunks → repeated
+SHORT_SHARE = 0.7         # under this share of its target → expand
+LONG_SHARE = 1.6          # over this share of its target → tighten
+
+OUTLINE_TASK = """
+### TASK
+Plan a long‑form piece of about {words} words that will be written section by section.
+Respond ONLY as valid JSON:
+{{
+  "plan": "<bullet outline: hook & opening flow, where proof, urgency and the CTA land>",
+  "sections": [
+    {{"heading": "<Markdown heading line>", "points": "<what it covers, 1–2 sentences>",
+      "words": <word target>, "list": <true if this section needs a bullet list>}}
+  ]
+}}
+Rules:
+• Keep every heading from the Structure to Follow, in order, at its Markdown level.
+• Split long parts into #### sub‑sections so no section exceeds {chunk} words.
+• Word targets add up to about {words}.
+• Points must not overlap — each section moves the reader one step further.
+• At most {lists} sections are "list": true — the only places a bullet list may go.
+""".strip()
+
+@dataclass
+class Chunk:
+    heading: str          # Markdown heading line; "" for a continuation part
+    points: str           # what it covers (from the outline)
+    words: int            # target
+    section: str          # the outline heading it belongs to
+    part: int = 1
+    parts: int = 1
+    lists: int = 0        # bullet lists it may hold (the outline's budget)
+    text: str = ""
+
+    def as_dict(self) -> dict:
+        d = asdict(self)
+        d["written"] = len(d.pop("text").split())
+        return d
+
+# ────────────────────────────────────────────────────────────
+# 1.  Outline
+# ────────────────────────────────────────────────────────────
+def target_words(bounds) -> int:
+    """Middle of the bucket; open‑ended buckets aim 10 % over the floor."""
+    lo, hi = bounds
+    return round((lo + hi) / 2) if hi else round(lo * 1.1)
+
+def structure(copy_struct: str) -> list[str]:
+    """Heading lines of a skeleton such as EMAIL_STRUCT ("### Subject Line" …)."""
+    return [l.strip() for l in copy_struct.splitlines() if l.strip().startswith("#")]
+
+def _text(line: str) -> str:
+    return line.lstrip("#").strip()
+
+def _is_body(line: str) -> bool:
+    return any(heading_matches(b, _text(line)) for b in (*BODY_HEADINGS, "Key Benefit Paragraphs"))
+
+def fallback_outline(copy_struct: str, total: int) -> list[dict]:
+    """
+    The skeleton itself: body sections share BODY_SHARE of the words and
+    are the ones that may hold a bullet list.
+    """
+    heads = structure(copy_struct)
+    body = [h for h in heads if _is_body(h)] or heads[-1:]
+    short = max(MIN_WORDS, round(total * (1 - BODY_SHARE) / max(1, len(heads) - len(body))))
+    return [{"heading": h, "points": "", "list": h in body,
+             "words": round(total * BODY_SHARE / len(body)) if h in body else short}
+            for h in heads]
+
+def parse_outline(raw: str, copy_struct: str, total: int) -> tuple[str, list[dict]]:
+    """
+    (plan, sections) from the outline reply.  Skeleton headings keep their
+    exact line and missing ones are put back in order; anything unusable
+    → fallback_outline.
+    """
+    try:
+        data = json.loads(raw)
+        plan, got = str(data.get("plan") or "").strip(), data.get("sections")
+    except (json.JSONDecodeError, AttributeError):
+        return "", fallback_outline(copy_struct, total)
+    sections = []
+    for s in got if isinstance(got, list) else []:
+        if not isinstance(s, dict) or not str(s.get("heading") or "").strip():
+            continue
+        heading = str(s["heading"]).strip()
+        try:
+            words = int(s.get("words") or 0)
+        except (TypeError, ValueError):
+            words = 0
+        sections.append({"heading": heading if heading.startswith("#") else f"#### {heading}",
+                         "points": str(s.get("points") or "").strip(), "words": words,
+                         "list": s.get("list") is True})
+    if not sections:
+        return plan, fallback_outline(copy_struct, total)
+
+    at = 0
+    for req in structure(copy_struct):
+        hit = next((i for i, s in enumerate(sections)
+                    if heading_matches(_text(req), _text(s["heading"]))), None)
+        if hit is None:
+            sections.insert(at, {"heading": req, "points": "", "words": 0, "list": False})
+            hit = at
+        sections[hit]["heading"] = req                  # the skeleton's exact line
+        at = max(at, hit + 1)
+    return plan, sections
+
+def allocate(sections: list[dict], total: int) -> list[dict]:
+    """Word targets scaled to *total*; sections without one share the average."""
+    given = [s["words"] for s in sections if s["words"] > 0]
+    fill = sum(given) / len(given) if given else total / max(1, len(sections))
+    raw = [s["words"] if s["words"] > 0 else fill for s in sections]
+    scale = total / max(1, sum(raw))
+    return [{**s, "words": max(MIN_WORDS, round(w * scale))} for s, w in zip(sections, raw)]
+
+def chunks(sections: list[dict], limit: int = CHUNK_WORDS,
+           lists: int = MAX_BULLET_LISTS) -> list[Chunk]:
+    """
+    One chunk per section; longer sections → equal parts of at most *limit*.
+    The first part of the first *lists* "list" sections may hold one bullet list.
+    """
+    out = []
+    for s in sections:
+        parts = max(1, math.ceil(s["words"] / limit))
+        allowed = int(bool(s.get("list")) and lists > 0)
+        lists -= allowed
+        for k in range(1, parts + 1):
+            out.append(Chunk(s["heading"] if k == 1 else "", s["points"],
+                             round(s["words"] / parts), s["heading"], k, parts,
+                             allowed if k == 1 else 0))
+    return out
+
+# ────────────────────────────────────────────────────────────
+# 2.  Chunk prompts
+# ────────────────────────────────────────────────────────────
+def outline_block(cs: list[Chunk]) -> str:
+    lines = []
+    for c in cs:
+        if c.part == 1:
+            lines.append(f"{len(lines) + 1}. {c.section} — {c.points or 'as the structure says'} "
+                         f"(~{c.words * c.parts} words)")
+    return "#### Outline\n" + "\n".join(lines)
+
+def _label(c: Chunk) -> str:
+    return f"`{c.section}`" + (f" (part {c.part} of {c.parts})" if c.parts > 1 else "")
+
+def chunk_task(cs: list[Chunk], i: int) -> str:
+    c = cs[i]
+    prev = cs[i - 1] if i else None
+    nxt = cs[i + 1] if i + 1 < len(cs) else None
+    start = (f"Start with the heading line `{c.heading}`." if c.heading else
+             f"No heading line — continue straight on from part {c.part - 1}.")
+    share = (f" This is part {c.part} of {c.parts}: cover the next share of those points, "
+             "not all of them." if c.parts > 1 else "")
+    bullets = ("At most one short bullet list here; full‑sentence paragraphs otherwise."
+               if c.lists else "No bullet lists — full‑sentence paragraphs only.")
+    return "\n".join([
+        "### WRITE THIS SECTION",
+        f"Section {i + 1} of {len(cs)}: {_label(c)} — about {c.words} words.",
+        f"Covers: {c.points or 'what the structure calls for here'}.{share}",
+        bullets,
+        f"Comes after: {_label(prev) + ' — ' + (prev.points or '…') if prev else 'nothing — it opens the piece'}.",
+        f"Leads into: {_label(nxt) + ' — ' + (nxt.points or '…') if nxt else 'nothing — it closes the piece'}.",
+        f"{start} Open by picking up from what comes before and end on a line that hands "
+        "over to what comes next. Write ONLY this section, in Markdown: don't cover other "
+        "sections' points, no disclaimer, no JSON.",
+    ])
+
+def clean(c: Chunk, reply: str) -> str:
+    """Reply → chunk text: fences and disclaimers dropped, heading line ensured."""
+    text = re.sub(r"^```\w*\n|\n```$", "", (reply or "").strip()).strip()
+    text, _ = split_disclaimer(text)
+    if c.heading and not text.lstrip().startswith("#"):
+        text = f"{c.heading}\n{text}"
+    if not c.heading and text.startswith("#") and _text(text.splitlines()[0]) == _text(c.section):
+        text = text.split("\n", 1)[1] if "\n" in text else ""        # repeated heading
+    return text.strip()
+
+def stitch(cs: list[Chunk], done: int | None = None) -> str:
+    """Chunks in order (the first *done* only, for progress) + the disclaimer."""
+    body = "\n\n".join(c.text for c in cs[:done] if c.text)
+    return join_disclaimer(body) if done is None else body
+
+# ────────────────────────────────────────────────────────────
+# 3.  Seam checks & fixes
+# ────────────────────────────────────────────────────────────
+def _opener(text: str) -> str:
+    body = "\n".join(l for l in text.splitlines() if not l.lstrip().startswith("#"))
+    return " ".join(re.split(r"(?<=[.!?])\s+", body.strip())[:2])
+
+def seam_issues(cs: list[Chunk]) -> dict[int, list[str]]:
+    """
+    {chunk index: [fixes]} for chunks that restate, repeat, miss their word
+    target (one‑liners excepted) or go over their bullet‑list budget.
+    """
+    issues: dict[int, list[str]] = {}
+    seen: set[int] = set()
+    for i, c in enumerate(cs):
+        sh = shingles(c.text)
+        n = len(c.text.split())
+        fixes = []
+        if i and containment(shingles(_opener(c.text)), shingles(cs[i - 1].text)) >= OPENER_REPEAT:
+            fixes.append("The opening restates the end of the previous section — open with a "
+                         "transition that moves the reader on instead.")
+        if seen and containment(sh, seen) >= DUPLICATE_SHARE:
+            fixes.append("Large parts repeat material from earlier sections — replace them "
+                         "with new points from this section's brief.")
+        sized = c.words > ONE_LINE
+        if sized and n < c.words * SHORT_SHARE:
+            fixes.append(f"Expand to about {c.words} words (it has {n}) with substance, not filler.")
+        elif sized and n > c.words * LONG_SHARE:
+            fixes.append(f"Tighten to about {c.words} words (it has {n}).")
+        lists = count_bullet_lists(c.text)
+        if lists > c.lists:
+            fixes.append("Turn the bullet lists into full‑sentence paragraphs." if not c.lists else
+                         f"Keep one bullet list (it has {lists}); turn the rest into "
+                         "full‑sentence paragraphs.")
+        if fixes:
+            issues[i] = fixes
+        seen |= sh
+    return issues
+
+def fix_messages(cs: list[Chunk], i: int, fixes: list[str]) -> list[dict]:
+    c = cs[i]
+    before = cs[i - 1].text[-400:] if i else ""
+    after = cs[i + 1].text[:400] if i + 1 < len(cs) else ""
+    keep = "Keep its heading line and tone." if c.heading else "Keep its tone; no heading line."
+    fix_list = "\n".join(f"- {f}" for f in fixes)
+    return [{"role": "system", "content": "Revise copy to address feedback."},
+            {"role": "user", "content": f"""
+Revise ONLY the section below to apply the fixes. {keep} Output the revised section ONLY.
+### FIXES
+{fix_list}
+### CONTEXT BEFORE
+…{before.strip()}
+### CONTEXT AFTER
+{after.strip()}…
+### SECTION
+{c.text}
+"""}]
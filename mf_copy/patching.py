@@ -0,0 +1,142 @@
+# ✍️ Motley Fool AI Copywriter — section‑level patching
+# ----------------------------------------------------------
+# Instead of asking for the "full revised copy", failed QA checks are
+# routed to the sections they concern:
+# • disclaimer fixes are applied locally (no API call)
+# • section fixes send only that section + a small context window
+# • missing headings are written as new sections and inserted
+# • whole‑piece problems (length, bullet count) fall back to a rewrite
+# ----------------------------------------------------------
+
+import re
+from dataclasses import dataclass
+
+from mf_copy.qa_rules import DISCLAIMER_TEXT, Violation
+from mf_copy.sections import find_section, split_sections, struct_headings
+
+DISCLAIMER_LINE = "*Past performance is not a reliable indicator of future results.*"
+CONTEXT_CHARS = 400                       # neighbouring text sent with each section
+WHOLE_PIECE = {"length", "bullets"}       # checks that need the full draft
+BODY_HEADINGS = ("Body (benefits, urgency, proofs)", "Detailed Body")
+
+@dataclass
+class PatchJob:
+    heading: str            # section heading ("" never happens for jobs)
+    start: int              # splice range in the body text (start == end → insert)
+    end: int
+    original: str           # section text being replaced ("" for inserts)
+    fixes: list[str]
+    before: str             # context preceding the section
+    after: str              # context following the section
+    level: str = "###"      # heading markup for inserted sections
+
+# ────────────────────────────────────────────────────────────
+# 1.  Local fixes
+# ────────────────────────────────────────────────────────────
+def _is_disclaimer(line: str) -> bool:
+    return DISCLAIMER_TEXT in re.sub(r"[*_]", "", line).lower()
+
+def split_disclaimer(copy: str) -> tuple[str, str]:
+    """(body, disclaimer) with every disclaimer line pulled out of the body."""
+    lines = copy.rstrip().splitlines()
+    body = "\n".join(l for l in lines if not _is_disclaimer(l)).rstrip()
+    return body, DISCLAIMER_LINE
+
+def join_disclaimer(body: str, disclaimer: str = DISCLAIMER_LINE) -> str:
+    return f"{body.rstrip()}\n\n{disclaimer}"
+
+# ────────────────────────────────────────────────────────────
+# 2.  Planning
+# ────────────────────────────────────────────────────────────
+def plan_patches(body: str, violations: list[Violation], copy_struct: str) -> list[PatchJob] | None:
+    """
+    Group fixes by section.  Returns None when any fix needs the whole piece,
+    in which case the caller should fall back to a full rewrite.
+    """
+    if any(v.check in WHOLE_PIECE for v in violations):
+        return None
+
+    sections = split_sections(body)
+    required = struct_headings(copy_struct)
+    jobs: dict[str, PatchJob] = {}
+
+    def ctx(start, end):
+        return body[max(0, start - CONTEXT_CHARS):start], body[end:end + CONTEXT_CHARS]
+
+    for v in violations:
+        if v.check == "disclaimer":
+            continue                                   # handled locally
+        target = v.section or (BODY_HEADINGS[0] if BODY_HEADINGS[0] in required
+                               else BODY_HEADINGS[1])
+        sec = find_section(sections, target)
+        if sec:
+            key = sec.heading
+            if key not in jobs:
+                jobs[key] = PatchJob(sec.heading, sec.start, sec.end, sec.text, [],
+                                     *ctx(sec.start, sec.end))
+        elif v.check == "heading":
+            at = _insert_point(body, sections, required, target)
+            key = f"+{target}"
+            level = re.search(rf"^(#+)\s+{re.escape(target)}", copy_struct, re.M)
+            jobs.setdefault(key, PatchJob(target, at, at, "", [], *ctx(at, at),
+                                          level.group(1) if level else "###"))
+        else:
+            return None                                # nowhere sensible to aim it
+        jobs[key].fixes.append(v.fix)
+    return list(jobs.values())
+
+def _insert_point(body, sections, required, missing) -> int:
+    """Offset after the nearest earlier structure heading present in the body."""
+    idx = required.index(missing) if missing in required else len(required)
+    for prev in reversed(required[:idx]):
+        sec = find_section(sections, prev)
+        if sec:
+            return sec.end
+    first = next((s for s in sections if s.heading), None)
+    return first.start if first else 0
+
+# ────────────────────────────────────────────────────────────
+# 3.  Prompts & splicing
+# ────────────────────────────────────────────────────────────
+def section_messages(job: PatchJob) -> list[dict]:
+    fixes = "\n".join(f"- {f}" for f in job.fixes)
+    if job.original:
+        task = ("Revise ONLY the section below to apply the fixes. Keep its heading line, "
+                "tone and length roughly the same. Output the revised section ONLY.")
+        target = f"### SECTION\n{job.original.strip()}"
+    else:
+        task = (f"Write the missing “{job.heading}” section so it flows between the "
+                f"surrounding text. Start with the heading line `{job.level} {job.heading}`. "
+                "Output the new section ONLY.")
+        target = ""
+    return [{"role":"system","content":"Revise copy to address feedback."},
+            {"role":"user","content":f"""
+{task}
+### FIXES
+{fixes}
+### CONTEXT BEFORE
+…{job.before.strip()[-CONTEXT_CHARS:]}
+### CONTEXT AFTER
+{job.after.strip()[:CONTEXT_CHARS]}…
+{target}
+"""}]
+
+def _clean(job: PatchJob, text: str) -> str:
+    text = (text or "").strip()
+    if job.original:
+        head = job.original.strip().splitlines()[0]
+        if not text.startswith(head.split()[0]):        # model dropped the heading
+            text = f"{head}\n{text}"
+        trailing = job.original[len(job.original.rstrip()):]
+        return text + (trailing or "\n\n")
+    return text + "\n\n"
+
+def splice(body: str, jobs: list[PatchJob], replies: list[str]) -> str:
+    """Apply replies to their ranges, last range first so offsets stay valid."""
+    for job, reply in sorted(zip(jobs, replies), key=lambda jr: jr[0].start, reverse=True):
+        new = _clean(job, reply)
+        if job.start == job.end and job.start:          # insert: keep one blank line
+            head = body[:job.start].rstrip(" \t")
+            new = ("" if head.endswith("\n\n") else "\n" if head.endswith("\n") else "\n\n") + new
+        body = body[:job.start] + new + body[job.end:]
+    return body
@@ -0,0 +1,202 @@
+# ✍️ Motley Fool AI Copywriter — local QA rule engine
+# ----------------------------------------------------------
+# Deterministic checks that used to cost an LLM round trip:
+# • word count vs the LENGTH_RULES bucket
+# • required headings from EMAIL_STRUCT / SALES_STRUCT
+# • the "Past performance…" disclaimer as the closing line
+# • deadline phrases per Urgency band
+# • numeric figures per Data_Richness band
+# • bullet‑list limit
+# Each failure is a Violation phrased as a fix for the patch prompt;
+# score_copy ranks best‑of‑N drafts from the same report.
+# ----------------------------------------------------------
+
+import re, time
+from dataclasses import asdict, dataclass, field
+
+from mf_copy.sections import find_section, split_sections, struct_headings
+
+DISCLAIMER_TEXT = "past performance is not a reliable indicator of future results"
+MAX_BULLET_LISTS = 3
+
+DEADLINE_RE = re.compile(
+    r"\b(midnight|tonight|today only|deadline|expires?|expiring|last chance|"
+    r"final hours?|hours? left|countdown|ends? (?:today|tonight|soon|on|at|this)|"
+    r"\d{1,2}(?::\d{2})?\s?(?:am|pm)|"
+    r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.? \d{1,2}(?:st|nd|rd|th)?)\b",
+    re.I)
+HARD_DEADLINE_RE = re.compile(
+    r"\b(midnight|today only|countdown|\d{1,2}(?::\d{2})?\s?(?:am|pm)|"
+    r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.? \d{1,2}(?:st|nd|rd|th)?)\b",
+    re.I)
+STAT_RE = re.compile(
+    r"\d[\d,]*(?:\.\d+)?\s?(?:%|per ?cent\b)|"                # 73%, 12 per cent
+    r"\b\d{1,3}(?:,\d{3})+\+?(?!\d)|"                         # 125,000
+    r"\b\d+(?:\.\d+)?x\b|"                                    # 3x
+    r"\b\d+\+? (?:members|investors|subscribers|years|stocks|picks|experts)\b",
+    re.I)
+BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+\S")
+
+# ────────────────────────────────────────────────────────────
+# 1.  Report types
+# ────────────────────────────────────────────────────────────
+@dataclass
+class Violation:
+    check: str              # e.g. "length", "heading", "disclaimer"
+    fix: str                # instruction for the patch prompt
+    section: str = ""       # heading the fix applies to ("" = whole piece)
+
+@dataclass
+class QAReport:
+    violations: list[Violation] = field(default_factory=list)
+    checks: list[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return not self.violations
+
+    @property
+    def failed_checks(self) -> list[str]:
+        return sorted({v.check for v in self.violations})
+
+    def as_fixes(self) -> str:
+        """Bullet list for the patch prompt."""
+        return "\n".join(f"- {v.fix}" for v in self.violations)
+
+    def as_dict(self) -> dict:
+        return {"passed": self.passed, "failed": self.failed_checks,
+                "violations": [asdict(v) for v in self.violations],
+                "checks": self.checks, "elapsed_ms": self.elapsed_ms}
+
+# ────────────────────────────────────────────────────────────
+# 2.  Individual checks  (each returns a list of Violations)
+# ────────────────────────────────────────────────────────────
+def check_length(copy, bounds):
+    min_len, max_len = bounds or (0, None)
+    n = len(copy.split())
+    if min_len and n < min_len:
+        return [Violation("length", f"Draft is only {n} words (< {min_len}). Please expand.")]
+    if max_len and n > max_len:
+        return [Violation("length", f"Draft is {n} words (> {max_len}). Tighten it to "
+                                    f"{max_len} words or fewer.")]
+    return []
+
+def check_headings(sections, copy_struct):
+    return [Violation("heading", f"Add the missing “{h}” section as a Markdown heading.", h)
+            for h in struct_headings(copy_struct) if not find_section(sections, h)]
+
+def check_disclaimer(copy):
+    flat = re.sub(r"[*_]", "", copy).lower()
+    if DISCLAIMER_TEXT not in flat:
+        return [Violation("disclaimer", "Append the italic line *Past performance is not "
+                                        "a reliable indicator of future results.* at the very end.")]
+    last = next((l for l in reversed(copy.strip().splitlines()) if l.strip()), "")
+    if DISCLAIMER_TEXT not in re.sub(r"[*_]", "", last).lower():
+        return [Violation("disclaimer", "Move the past‑performance disclaimer so it is the final line.")]
+    return []
+
+def check_urgency(copy, sections, band):
+    if band == "high":
+        out = []
+        for label, stems in (("headline/subject", ("Headline", "Subject Line")),
+                             ("CTA", ("Call‑to‑Action",))):
+            sec = next((s for s in (find_section(sections, h) for h in stems) if s), None)
+            if sec and not DEADLINE_RE.search(sec.text):
+                out.append(Violation("urgency", f"Add a clear deadline phrase (e.g. “midnight”, "
+                                                f"an explicit date, “today only”) to the {label}.",
+                                     sec.heading))
+        if not out and not DEADLINE_RE.search(copy):
+            out.append(Violation("urgency", "Add a clear deadline phrase to the headline and CTA."))
+        return out
+    if band == "mid":
+        hits = sorted({m.group(0).lower() for m in HARD_DEADLINE_RE.finditer(copy)})
+        if hits:
+            return [Violation("urgency", f"Remove hard deadlines/countdowns ({', '.join(hits)}); "
+                                         "refer to timing once, softly.")]
+        return []
+    hits = sorted({m.group(0).lower() for m in DEADLINE_RE.finditer(copy)})
+    if hits:
+        return [Violation("urgency", f"Remove deadline / time‑pressure wording ({', '.join(hits)}).")]
+    return []
+
+def check_data(copy, band):
+    stats = [m.group(0) for m in STAT_RE.finditer(copy)]
+    if band == "high" and not stats:
+        return [Violation("data", "Cite at least one specific numeric performance figure "
+                                  "(percentage return, member count, etc.).")]
+    if band == "mid" and len(stats) > 1:
+        return [Violation("data", f"Keep to one light data point; remove extra figures "
+                                  f"({', '.join(stats[1:4])}).")]
+    if band == "low" and stats:
+        return [Violation("data", f"Remove statistics and figures ({', '.join(stats[:3])}); "
+                                  "rely on qualitative proof.")]
+    return []
+
+def count_bullet_lists(text: str) -> int:
+    """Runs of bullet lines (blank lines inside a list don't split it)."""
+    lists, in_list = 0, False
+    for l in text.splitlines():
+        is_bullet = bool(BULLET_RE.match(l))
+        if is_bullet and not in_list:
+            lists += 1
+        in_list = is_bullet or (in_list and not l.strip())
+    return lists
+
+def check_bullets(copy):
+    lists = count_bullet_lists(copy)
+    if lists > MAX_BULLET_LISTS:
+        return [Violation("bullets", f"Reduce to {MAX_BULLET_LISTS} or fewer bullet lists "
+                                     f"(found {lists}); turn the rest into full sentences.")]
+    return []
+
+# ────────────────────────────────────────────────────────────
+# 3.  Entry point
+# ────────────────────────────────────────────────────────────
+def check_copy(copy: str, copy_struct: str, length_bounds=None, bands=None) -> QAReport:
+    """
+    Run every mechanical check.  *bands* maps trait name → "high" | "mid" | "low"
+    (as computed from traits_config.json); traits not present are skipped.
+    """
+    t0 = time.perf_counter()
+    bands = bands or {}
+    sections = split_sections(copy)
+    report = QAReport()
+
+    def run(name, violations):
+        report.checks.append(name)
+        report.violations.extend(violations)
+
+    run("length", check_length(copy, length_bounds))
+    run("heading", check_headings(sections, copy_struct))
+    run("disclaimer", check_disclaimer(copy))
+    if "Urgency" in bands:
+        run("urgency", check_urgency(copy, sections, bands["Urgency"]))
+    if "Data_Richness" in bands:
+        run("data", check_data(copy, bands["Data_Richness"]))
+    run("bullets", check_bullets(copy))
+
+    report.elapsed_ms = round((time.perf_counter() - t0) * 1000, 3)
+    return report
+
+# ────────────────────────────────────────────────────────────
+# 4.  Candidate scoring (best‑of‑N drafts)
+# ────────────────────────────────────────────────────────────
+# What each failed check would cost to fix: the disclaimer is restored
+# locally for free, headings / trait checks need a section patch, and a
+# length miss usually means a full rewrite.
+PENALTIES = {"length": 4.0, "heading": 3.0, "urgency": 2.0, "data": 2.0,
+             "bullets": 1.0, "disclaimer": 0.1}
+
+def score_copy(copy: str, report: QAReport, length_bounds=None) -> float:
+    """
+    0 is a clean pass; each violation subtracts its PENALTIES weight.
+    Distance from the middle of the length bucket breaks ties (always < 1,
+    so it never outranks a real violation).
+    """
+    penalty = sum(PENALTIES.get(v.check, 1.0) for v in report.violations)
+    min_len, max_len = length_bounds or (0, None)
+    if max_len:
+        mid = (min_len + max_len) / 2
+        penalty += min(0.99, abs(len(copy.split()) - mid) / mid)
+    return round(-penalty, 3)
@@ -0,0 +1,344 @@
+# ✍️ Motley Fool AI Copywriter — request scheduler
+# ----------------------------------------------------------
+# Every chat completion (sync, async, streamed) goes through here:
+# • Token bucket for requests / tokens per minute, shared by all
+#   sessions in the process and re‑sized from x‑ratelimit‑* headers
+# • Per‑error‑class policies (429, quota, 5xx, timeouts, 4xx …)
+# • Jittered exponential backoff that honours Retry‑After hints;
+#   a 429 pauses the whole bucket so waiting callers don't stampede
+# • Circuit breaker per model after repeated server failures
+# • Failures surface as LLMError — never a silent None
+# ----------------------------------------------------------
+
+import asyncio, email.utils, os, random, re, threading, time
+from dataclasses import dataclass
+
+from mf_copy.tracing import annotate
+
+# ────────────────────────────────────────────────────────────
+# 0.  Defaults  (override per deployment / account tier)
+# ────────────────────────────────────────────────────────────
+RPM = int(os.environ.get("MF_COPY_RPM", 500))         # requests per minute (0 = unlimited)
+TPM = int(os.environ.get("MF_COPY_TPM", 450_000))     # tokens per minute (0 = unlimited)
+BURST_SECONDS = 2.0          # bucket depth: this many seconds' worth of quota at once
+BACKOFF_BASE = 0.5           # seconds; doubles per attempt …
+BACKOFF_CAP = 30.0           # … up to this, with full jitter
+BREAKER_THRESHOLD = 5        # consecutive server‑side failures that open the circuit
+BREAKER_COOLDOWN = 30.0      # seconds before a half‑open probe is allowed
+
+# ────────────────────────────────────────────────────────────
+# 1.  Errors & policies
+# ────────────────────────────────────────────────────────────
+class LLMError(RuntimeError):
+    """A chat call failed for good; *kind* is the error class that ended it."""
+
+    def __init__(self, message, label="chat", kind="unknown", attempts=0):
+        super().__init__(message)
+        self.label, self.kind, self.attempts = label, kind, attempts
+
+class CircuitOpenError(LLMError):
+    """The model's circuit is open — calls fail fast until the cooldown ends."""
+
+class StreamInterrupted(LLMError):
+    """The stream broke after text reached the caller, so it can't be replayed."""
+
+@dataclass(frozen=True)
+class Policy:
+    retry: bool
+    max_attempts: int = 6
+    trips_breaker: bool = False     # counts toward opening the circuit
+    pause_all: bool = False         # server hint pauses every caller, not just this one
+
+POLICIES = {
+    "rate_limit":  Policy(retry=True, max_attempts=8, pause_all=True),
+    "quota":       Policy(retry=False),                      # insufficient_quota — won't clear
+    "server":      Policy(retry=True, trips_breaker=True),
+    "timeout":     Policy(retry=True, max_attempts=3, trips_breaker=True),
+    "connection":  Policy(retry=True, max_attempts=4, trips_breaker=True),
+    "auth":        Policy(retry=False),
+    "bad_request": Policy(retry=False),
+    "interrupted": Policy(retry=False),
+}
+
+def classify(exc: BaseException) -> str | None:
+    """Error class for *exc*; None = not an API error (bugs, callbacks) → re‑raised as is."""
+    if isinstance(exc, StreamInterrupted):
+        return "interrupted"
+    import openai                           # deferred: keeps `import mf_copy.*` fast
+    if isinstance(exc, openai.RateLimitError):
+        return "quota" if getattr(exc, "code", None) == "insufficient_quota" else "rate_limit"
+    if isinstance(exc, openai.APITimeoutError):
+        return "timeout"
+    if isinstance(exc, openai.APIConnectionError):
+        return "connection"
+    if isinstance(exc, (openai.AuthenticationError, openai.PermissionDeniedError)):
+        return "auth"
+    if isinstance(exc, openai.APIStatusError):
+        return "server" if exc.status_code >= 500 or exc.status_code == 409 else "bad_request"
+    return None
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNIT = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+def parse_duration(value: str | None) -> float | None:
+    """'20ms' / '1.5s' / '6m0s' (x‑ratelimit‑reset‑*) → seconds."""
+    parts = _DURATION_RE.findall(value or "")
+    return sum(float(n) * _UNIT[u] for n, u in parts) if parts else None
+
+def server_hint(exc) -> float | None:
+    """Seconds the server asked us to wait (Retry‑After or rate‑limit reset headers)."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    if headers.get("retry-after-ms"):
+        return float(headers["retry-after-ms"]) / 1000
+    after = headers.get("retry-after")
+    if after:
+        try:
+            return max(0.0, float(after))
+        except ValueError:
+            when = email.utils.parsedate_to_datetime(after)
+            return max(0.0, when.timestamp() - time.time()) if when else None
+    resets = [parse_duration(headers.get(h)) for h in ("x-ratelimit-reset-requests",
+                                                       "x-ratelimit-reset-tokens")]
+    resets = [r for r in resets if r is not None]
+    return max(resets) if resets else None
+
+def backoff(attempt: int, hint: float | None = None) -> float:
+    """Full‑jitter exponential backoff; a server hint sets the floor."""
+    if hint is not None:
+        return hint + random.uniform(0, min(1.0, 0.1 * hint + 0.05))
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (attempt - 1)))
+
+# ────────────────────────────────────────────────────────────
+# 2.  Token bucket & circuit breaker
+# ────────────────────────────────────────────────────────────
+class TokenBucket:
+    """
+    Requests‑ and tokens‑per‑minute bucket.  reserve() books capacity up
+    front (levels may go negative) and returns how long the caller must wait,
+    so concurrent callers are spaced out instead of released together.
+    """
+
+    def __init__(self, rpm=RPM, tpm=TPM):
+        self._lock = threading.Lock()
+        self.rpm, self.tpm = rpm, tpm
+        self._req, self._tok = self._depth(rpm), self._depth(tpm)
+        self._stamp = time.monotonic()
+        self._paused_until = 0.0
+
+    @staticmethod
+    def _depth(per_minute) -> float:
+        return max(1.0, per_minute * BURST_SECONDS / 60) if per_minute else 0.0
+
+    def _refill(self, now):
+        dt, self._stamp = now - self._stamp, now
+        if self.rpm:
+            self._req = min(self._depth(self.rpm), self._req + dt * self.rpm / 60)
+        if self.tpm:
+            self._tok = min(self._depth(self.tpm), self._tok + dt * self.tpm / 60)
+
+    def reserve(self, tokens: int = 0) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, self._paused_until - now)
+            if self.rpm:
+                self._req -= 1
+                wait = max(wait, -self._req * 60 / self.rpm)
+            if self.tpm:
+                self._tok -= min(tokens, self.tpm)
+                wait = max(wait, -self._tok * 60 / self.tpm)
+            return wait
+
+    def pause(self, seconds: float):
+        """Server said slow down: hold everyone and drain the burst allowance."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._req, self._tok = min(self._req, 0.0), min(self._tok, 0.0)
+
+    def update_limits(self, headers):
+        """Adopt the account's real limits from x‑ratelimit‑limit‑* headers."""
+        try:
+            rpm = int(headers.get("x-ratelimit-limit-requests") or 0)
+            tpm = int(headers.get("x-ratelimit-limit-tokens") or 0)
+        except ValueError:
+            return
+        with self._lock:
+            if rpm and rpm != self.rpm:
+                self.rpm, self._req = rpm, min(self._req, self._depth(rpm))
+            if tpm and tpm != self.tpm:
+                self.tpm, self._tok = tpm, min(self._tok, self._depth(tpm))
+
+class CircuitBreaker:
+    """closed → open after THRESHOLD server failures → half‑open probe after COOLDOWN."""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold, self.cooldown = threshold, cooldown
+        self.state, self.failures, self.trips = "closed", 0, 0
+        self._opened = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before(self, label, model) -> bool:
+        """Raise while open; True when this caller is the half‑open probe."""
+        with self._lock:
+            if self.state == "closed":
+                return False
+            left = self.cooldown - (time.monotonic() - self._opened)
+            if self.state == "open" and left <= 0:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True                 # this caller is the probe
+                return True
+            raise CircuitOpenError(f"{model} circuit is open after {self.failures} failures; "
+                                   f"retry in {max(left, 0):.0f}s", label, "circuit_open")
+
+    def success(self):
+        with self._lock:
+            self.state, self.failures, self._probing = "closed", 0, False
+
+    def release(self):
+        """
+        The probe ended without a verdict on server health — an error that
+        doesn't count, a non‑API exception or a cancellation.  Without this
+        the breaker would wait forever for a probe that never reports back.
+        """
+        with self._lock:
+            self._probing = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.threshold:
+                if self.state != "open":
+                    self.trips += 1
+                self.state, self._opened, self._probing = "open", time.monotonic(), False
+
+# ────────────────────────────────────────────────────────────
+# 3.  Scheduler
+# ────────────────────────────────────────────────────────────
+class Scheduler:
+    """
+    call(send, …) / acall(send, …) run *send* (a zero‑arg callable / coroutine
+    factory issuing one request) under the bucket, policies and breaker.
+    """
+
+    def __init__(self, rpm=RPM, tpm=TPM):
+        self.bucket = TokenBucket(rpm, tpm)
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "retries": 0, "failures": 0, "throttled_s": 0.0}
+        self.errors: dict[str, int] = {}
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        with self._lock:
+            return self._breakers.setdefault(model, CircuitBreaker())
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.counters[key] += n
+
+    def _start(self, model, label, tokens) -> tuple[float, bool]:
+        """→ (seconds to wait, whether this attempt is the breaker's probe)."""
+        probe = self.breaker(model).before(label, model)
+        wait = self.bucket.reserve(tokens)
+        self._count("requests")
+        if wait:
+            self._count("throttled_s", wait)
+        return wait, probe
+
+    def _succeeded(self, model, headers):
+        self.breaker(model).success()
+        if headers is not None:
+            self.bucket.update_limits(headers)
+
+    def _failed(self, exc, attempt, model, label, probe=False) -> float:
+        """
+        Delay before the next attempt, or raise when the policy says stop.
+        Either way a probe is settled (failed or released) before returning.
+        """
+        kind = classify(exc)
+        if kind is None:
+            if probe:
+                self.breaker(model).release()
+            raise exc
+        with self._lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+        policy = POLICIES[kind]
+        if policy.trips_breaker:
+            self.breaker(model).failure()
+        elif probe:
+            self.breaker(model).release()
+        hint = server_hint(exc)
+        if policy.pause_all and hint:
+            self.bucket.pause(hint)
+        if not policy.retry or attempt >= policy.max_attempts:
+            self._count("failures")
+            if isinstance(exc, LLMError):
+                raise exc
+            raise LLMError(f"{label} call failed after {attempt} attempt(s) [{kind}]: {exc}",
+                           label, kind, attempt) from exc
+        self._count("retries")
+        return backoff(attempt, hint)
+
+    def call(self, send, model, label="chat", tokens=0):
+        attempt, waited = 0, 0.0
+        while True:
+            attempt += 1
+            wait, probe = self._start(model, label, tokens)
+            try:
+                time.sleep(wait)
+                waited += wait
+                annotate(attempts=attempt, throttled_ms=round(waited * 1000, 1))
+                result, headers = send()
+            except Exception as exc:
+                wait = self._failed(exc, attempt, model, label, probe)
+                time.sleep(wait)
+                waited += wait
+                continue
+            except BaseException:                    # KeyboardInterrupt, SystemExit …
+                if probe:
+                    self.breaker(model).release()
+                raise
+            self._succeeded(model, headers)
+            return result
+
+    async def acall(self, send, model, label="chat", tokens=0):
+        attempt, waited = 0, 0.0
+        while True:
+            attempt += 1
+            wait, probe = self._start(model, label, tokens)
+            try:
+                await asyncio.sleep(wait)
+                waited += wait
+                annotate(attempts=attempt, throttled_ms=round(waited * 1000, 1))
+                result, headers = await send()
+            except Exception as exc:
+                wait = self._failed(exc, attempt, model, label, probe)
+                await asyncio.sleep(wait)
+                waited += wait
+                continue
+            except BaseException:                    # cancelled (rerun, gather) …
+                if probe:
+                    self.breaker(model).release()
+                raise
+            self._succeeded(model, headers)
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "throttled_s": round(self.counters["throttled_s"], 2),
+                    "errors": dict(self.errors), "rpm": self.bucket.rpm, "tpm": self.bucket.tpm,
+                    "breakers": {m: b.state for m, b in self._breakers.items()}}
+
+_SCHEDULER: Scheduler | None = None
+_SCHEDULER_LOCK = threading.Lock()
+
+def get_scheduler() -> Scheduler:
+    """Process‑wide instance — every Streamlit session shares one rate budget."""
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = Scheduler()
+        return _SCHEDULER
@@ -0,0 +1,61 @@
+# ✍️ Motley Fool AI Copywriter — Markdown section helpers
+# ----------------------------------------------------------
+# • Split copy on Markdown headings / bold labels
+# • Match draft headings to EMAIL_STRUCT / SALES_STRUCT entries
+# ----------------------------------------------------------
+
+import re
+from dataclasses import dataclass
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$"           # ## Heading
+                        r"|^\*\*([^*\n]{2,40}?)(?::\*\*|\*\*:)",   # **Label:** text
+                        re.M)
+
+@dataclass
+class Section:
+    heading: str        # heading text without markup ("" for the preamble)
+    start: int          # offset of the heading line in the copy
+    end: int            # offset where the next section starts
+    text: str           # full section text, heading line included
+
+def split_sections(copy: str) -> list[Section]:
+    """Sections in order; text before the first heading becomes a "" section."""
+    marks = [(m.start(), (m.group(2) or m.group(3)).strip()) for m in HEADING_RE.finditer(copy)]
+    out = []
+    if not marks or marks[0][0] > 0:
+        first = marks[0][0] if marks else len(copy)
+        if copy[:first].strip():
+            out.append(Section("", 0, first, copy[:first]))
+    for i, (start, heading) in enumerate(marks):
+        end = marks[i + 1][0] if i + 1 < len(marks) else len(copy)
+        out.append(Section(heading, start, end, copy[start:end]))
+    return out
+
+# ────────────────────────────────────────────────────────────
+# Heading matching
+# ────────────────────────────────────────────────────────────
+_DASHES = str.maketrans({"‑": " ", "‐": " ", "–": " ", "—": " ", "-": " "})
+_SKIP = {"key", "the", "a", "your", "main"}
+ALIASES = {"call": ("cta",)}
+
+def _words(text: str) -> list[str]:
+    text = re.sub(r"\(.*?\)", "", text.translate(_DASHES).lower())
+    return re.findall(r"[a-z0-9]+", text)
+
+def struct_headings(copy_struct: str) -> list[str]:
+    """Heading texts listed in a structural skeleton such as EMAIL_STRUCT."""
+    return [m.group(2).strip() for m in HEADING_RE.finditer(copy_struct) if m.group(2)]
+
+def heading_stem(required: str) -> str:
+    """Matching stem: first significant word, clipped so plurals / variants still match."""
+    words = [w for w in _words(required) if w not in _SKIP] or _words(required)
+    return words[0][:5] if words else ""
+
+def heading_matches(required: str, heading: str) -> bool:
+    stem = heading_stem(required)
+    words = _words(heading)
+    return any(w.startswith(stem) for w in words) or \
+        any(a in words for a in ALIASES.get(stem, ()))
+
+def find_section(sections: list[Section], required: str) -> Section | None:
+    return next((s for s in sections if s.heading and heading_matches(required, s.heading)), None)
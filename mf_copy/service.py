@@ -0,0 +1,293 @@
+# ✍️ Motley Fool AI Copywriter — HTTP service
+# ----------------------------------------------------------
+# • POST /v1/{prompt,generate,qa,variants,adapt,sweep} — JSON in, JSON out
+#   (request bodies as in mf_copy.api)
+# • Bounded job queue + fixed worker pool: at most `workers` operations
+#   in flight; when the queue is full the answer is 503 + Retry‑After
+#   instead of an ever‑growing backlog
+# • /v1/prompt runs inline (no API call, never queued)
+# • POST /v1/export — {pieces: [{copy, …}] | ids: [history ids],
+#   formats} → ZIP streamed back with chunked encoding as it's built
+# • GET /healthz · GET /v1/stats (queue, in flight, latency, tokens,
+#   scheduler counters)
+# • Stdlib asyncio only — one event loop, so pooled connections and
+#   the per‑model call limits (mf_copy.llm_async) are shared by all jobs
+#
+#   python -m mf_copy serve --port 8080 --workers 8 --queue 64
+# ----------------------------------------------------------
+
+import argparse, asyncio, json, os, statistics, sys, time
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from mf_copy import api, engine, export, llm_async
+from mf_copy.scheduler import LLMError, get_scheduler
+from mf_copy.usage import get_usage
+
+WORKERS = int(os.environ.get("MF_COPY_WORKERS", 8))        # operations in flight
+QUEUE_SIZE = int(os.environ.get("MF_COPY_QUEUE", 64))      # waiting beyond that → 503
+JOB_TIMEOUT = float(os.environ.get("MF_COPY_JOB_TIMEOUT", 300))
+MAX_BODY = 2 * 1024 * 1024
+RETRY_AFTER = 5                                            # seconds, on 503
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 502: "Bad Gateway",
+           503: "Service Unavailable", 504: "Gateway Timeout"}
+
+@dataclass
+class Stream:
+    """A response body produced piece by piece (sent with chunked encoding)."""
+    content_type: str
+    chunks: Iterator[bytes]
+    filename: str = ""
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: dict | None = None):
+        super().__init__(message)
+        self.status, self.headers = status, headers or {}
+
+# ────────────────────────────────────────────────────────────
+# 1.  Job queue & workers
+# ────────────────────────────────────────────────────────────
+class Service:
+    def __init__(self, workers=WORKERS, queue_size=QUEUE_SIZE, timeout=JOB_TIMEOUT):
+        self.workers, self.timeout = workers, timeout
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.in_flight = 0
+        self.counts = {"accepted": 0, "done": 0, "failed": 0, "rejected": 0, "timed_out": 0}
+        self.latency: deque = deque(maxlen=1000)        # seconds, queue wait included
+        self._tasks: list[asyncio.Task] = []
+        self.started = time.time()
+
+    async def submit(self, op: str, req: dict) -> dict:
+        """Queue *op* and wait for its result (HTTPError 503 when the queue is full)."""
+        if op in api.LOCAL_OPERATIONS:
+            return await api.arun(op, req)
+        fut = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((op, req, fut, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.counts["rejected"] += 1
+            raise HTTPError(503, f"queue full ({self.queue.maxsize} waiting)",
+                            {"Retry-After": str(RETRY_AFTER)}) from None
+        self.counts["accepted"] += 1
+        return await fut
+
+    async def _worker(self):
+        while True:
+            op, req, fut, t0 = await self.queue.get()
+            self.in_flight += 1
+            try:
+                result = await asyncio.wait_for(api.arun(op, req), self.timeout)
+            except asyncio.TimeoutError:
+                self.counts["timed_out"] += 1
+                result = HTTPError(504, f"{op} took longer than {self.timeout:g}s")
+            except Exception as e:                       # delivered to the waiting request
+                self.counts["failed"] += 1
+                result = e
+            else:
+                self.counts["done"] += 1
+            finally:
+                self.in_flight -= 1
+                self.queue.task_done()
+            self.latency.append(time.perf_counter() - t0)
+            if not fut.done():                           # client may have gone away
+                (fut.set_exception if isinstance(result, Exception) else fut.set_result)(result)
+
+    def start_workers(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        lat = sorted(self.latency)
+        return {"workers": self.workers, "queued": self.queue.qsize(),
+                "queue_size": self.queue.maxsize, "in_flight": self.in_flight,
+                **self.counts,
+                "p50_ms": round(lat[len(lat) // 2] * 1000, 1) if lat else None,
+                "p95_ms": round(lat[int(len(lat) * 0.95)] * 1000, 1) if lat else None,
+                "mean_ms": round(statistics.mean(lat) * 1000, 1) if lat else None,
+                "uptime_s": round(time.time() - self.started),
+                "model": engine.OPENAI_MODEL,
+                "usage": get_usage().stats(), "scheduler": get_scheduler().stats()}
+
+# ────────────────────────────────────────────────────────────
+# 2.  Minimal HTTP/1.1 (keep‑alive, Content‑Length bodies, chunked streams)
+# ────────────────────────────────────────────────────────────
+async def _read_request(reader) -> tuple[str, str, dict, bytes] | None:
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "malformed request line") from None
+    headers = {}
+    while (h := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        name, _, value = h.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY:
+        raise HTTPError(413, f"body over {MAX_BODY} bytes")
+    return method, path.split("?", 1)[0], headers, await reader.readexactly(length)
+
+def _response(status: int, payload, headers=None, keep_alive=True) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode()
+    head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json", f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+            *(f"{k}: {v}" for k, v in (headers or {}).items())]
+    return ("\r\n".join(head) + "\r\n\r\n").encode() + body
+
+def export_stream(req: dict) -> Stream:
+    """/v1/export: validate up front — once the ZIP starts, the status is sent."""
+    formats = req.get("formats") or ["docx"]
+    if isinstance(formats, str):
+        formats = [f.strip() for f in formats.split(",") if f.strip()]
+    if bad := [f for f in formats if f not in export.FORMATS]:
+        raise HTTPError(400, f"unknown format {', '.join(map(str, bad))} "
+                             f"(options: {', '.join(export.FORMATS)})")
+    if isinstance(req.get("pieces"), list):
+        pieces = req["pieces"]
+        # pieces without copy (failed batch jobs) are skipped, like in the CLI
+        if not all(isinstance(p, dict) and isinstance(p.get("copy") or "", str) for p in pieces):
+            raise HTTPError(400, "pieces must be objects {copy, …} with copy a string")
+    elif isinstance(req.get("ids"), list) and all(isinstance(i, int) for i in req["ids"]):
+        pieces = export.history_pieces(req["ids"])
+    else:
+        raise HTTPError(400, "give 'pieces' (list of {copy, …}) or 'ids' (history ids)")
+    return Stream("application/zip", export.iter_zip(pieces, formats), "mf_copy_export.zip")
+
+async def dispatch(service: Service, method: str, path: str, body: bytes) -> dict | Stream:
+    path = path.rstrip("/")
+    if path in ("/healthz", "/v1/stats"):
+        if method != "GET":
+            raise HTTPError(405, "use GET")
+        return {"ok": True} if path == "/healthz" else service.stats()
+    op = path.removeprefix("/v1/")
+    if not path.startswith("/v1/") or op not in (*api.OPERATIONS, "export"):
+        raise HTTPError(404, f"no route {path} "
+                             f"(POST /v1/{{{','.join((*api.OPERATIONS, 'export'))}}})")
+    if method != "POST":
+        raise HTTPError(405, "use POST")
+    try:
+        req = json.loads(body or b"{}")
+    except json.JSONDecodeError as e:
+        raise HTTPError(400, f"invalid JSON: {e}") from None
+    if op == "export":
+        return export_stream(req if isinstance(req, dict) else {})
+    try:
+        return await service.submit(op, req)
+    except api.RequestError as e:
+        raise HTTPError(400, str(e)) from None
+    except LLMError as e:
+        raise HTTPError(502, str(e), {"Retry-After": str(RETRY_AFTER)}
+                        if e.kind in ("rate_limit", "server", "timeout", "connection")
+                        else {}) from None
+
+async def handle(service: Service, reader, writer):
+    try:
+        while True:
+            parsed = keep = None
+            try:
+                parsed = await _read_request(reader)
+                if parsed is None:
+                    break
+                method, path, headers, body = parsed
+                keep = headers.get("connection", "").lower() != "close"
+                status, payload, extra = 200, await dispatch(service, method, path, body), {}
+            except HTTPError as e:
+                # rejected before its body was read (413, bad request line) → the
+                # rest of it is still on the socket, so this connection can't go on
+                status, payload, extra = e.status, {"error": str(e)}, e.headers
+                keep = parsed is not None and keep
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            except Exception as e:
+                status, payload, extra, keep = 500, {"error": f"{type(e).__name__}: {e}"}, {}, False
+            if isinstance(payload, Stream):
+                if not await _send_stream(writer, payload, keep):
+                    break
+                continue
+            writer.write(_response(status, payload, extra, keep))
+            await writer.drain()
+            if not keep:
+                break
+    finally:
+        writer.close()
+
+async def _send_stream(writer, stream: Stream, keep_alive: bool) -> bool:
+    """
+    Chunked response; each chunk is produced off the event loop (rendering
+    is CPU work).  → False when the stream failed midway and the
+    connection must be dropped (the 200 status has already gone out).
+    """
+    head = ["HTTP/1.1 200 OK", f"Content-Type: {stream.content_type}",
+            "Transfer-Encoding: chunked",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    if stream.filename:
+        head.append(f'Content-Disposition: attachment; filename="{stream.filename}"')
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode())
+    try:
+        while (chunk := await asyncio.to_thread(next, stream.chunks, None)) is not None:
+            writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            await writer.drain()
+    except Exception as e:
+        print(f"export stream failed: {type(e).__name__}: {e}", file=sys.stderr)
+        return False
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+    return keep_alive
+
+async def serve(host="127.0.0.1", port=8080, workers=WORKERS, queue_size=QUEUE_SIZE,
+                timeout=JOB_TIMEOUT, ready=None):
+    """Run until cancelled.  ready(server) fires once the socket is listening."""
+    service = Service(workers, queue_size, timeout)
+    service.start_workers()
+    server = await asyncio.start_server(lambda r, w: handle(service, r, w), host, port)
+    if ready:
+        ready(server)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+        from mf_copy.clients import aclose_clients      # deferred like the openai import
+        await aclose_clients()
+
+# ────────────────────────────────────────────────────────────
+# 3.  CLI
+# ────────────────────────────────────────────────────────────
+def add_arguments(ap):
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--workers", type=int, default=WORKERS, help="operations in flight")
+    ap.add_argument("--queue", type=int, default=QUEUE_SIZE, help="waiting jobs before 503s")
+    ap.add_argument("--timeout", type=float, default=JOB_TIMEOUT, help="seconds per job")
+    ap.add_argument("--max-calls", type=int, default=llm_async.DEFAULT_CONCURRENCY,
+                    help="concurrent API calls per model")
+
+def run(args):
+    llm_async.DEFAULT_CONCURRENCY = args.max_calls
+    print(f"mf_copy service on http://{args.host}:{args.port} · {args.workers} workers · "
+          f"queue {args.queue} · {args.max_calls} calls/model", file=sys.stderr)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.queue, args.timeout))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="HTTP API for the copy engine.")
+    add_arguments(ap)
+    ap.add_argument("--model", help="OpenAI model (default: engine default)")
+    args = ap.parse_args(argv)
+    engine.configure(model=args.model)
+    return run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
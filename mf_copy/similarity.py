@@ -0,0 +1,108 @@
+# ✍️ Motley Fool AI Copywriter — similarity
+# ----------------------------------------------------------
+# Local, CPU‑only text similarity (stdlib; no model call):
+# • Word 5‑gram shingles hashed with crc32 — stable across processes,
+#   so fingerprints can be stored next to the history
+# • Containment (share of A's shingles found in B) flags a copied line
+#   or paragraph even when the rest of the piece is new — whole‑piece
+#   Jaccard / MinHash would dilute it below any useful threshold
+# • ExemplarIndex: trait examples / demo lines vs a draft
+# • fingerprints(): mod‑p sample (hash % SAMPLE == 0) of the shingles —
+#   an unbiased containment estimate at 1/SAMPLE of the index size;
+#   mf_copy.history looks them up in an indexed table
+# • diverse(): drops near‑duplicate headlines / CTAs (char 4‑gram
+#   Jaccard) and keeps the N most mutually different
+# ----------------------------------------------------------
+
+import re, zlib
+from dataclasses import asdict, dataclass
+
+SHINGLE_WORDS = 5          # word n‑gram length
+SAMPLE = 4                 # stored fingerprints: shingles with hash % SAMPLE == 0
+EXEMPLAR_OVERLAP = 0.5     # share of an exemplar line's shingles found in the draft
+HISTORY_OVERLAP = 0.3      # share of the draft's fingerprints found in one past piece
+VARIANT_SIMILARITY = 0.6   # char 4‑gram Jaccard at which two variants are "the same"
+
+_WORD = re.compile(r"[\w'’]+")
+
+# ────────────────────────────────────────────────────────────
+# 1.  Shingles & measures
+# ────────────────────────────────────────────────────────────
+def words(text: str) -> list[str]:
+    return [w.replace("’", "'") for w in _WORD.findall((text or "").lower())]
+
+def shingles(text: str, n: int = SHINGLE_WORDS) -> set[int]:
+    """crc32 of every word n‑gram (texts shorter than n: the whole text)."""
+    ws = words(text)
+    if len(ws) < n:
+        return {zlib.crc32(" ".join(ws).encode())} if ws else set()
+    return {zlib.crc32(" ".join(ws[i:i + n]).encode()) for i in range(len(ws) - n + 1)}
+
+def fingerprints(text: str, n: int = SHINGLE_WORDS, sample: int = SAMPLE) -> set[int]:
+    return {h for h in shingles(text, n) if h % sample == 0}
+
+def containment(a: set, b: set) -> float:
+    """Share of *a* found in *b*."""
+    return len(a & b) / len(a) if a else 0.0
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+def char_grams(text: str, k: int = 4) -> set[str]:
+    t = " ".join(words(text))
+    return {t[i:i + k] for i in range(max(1, len(t) - k + 1))}
+
+# ────────────────────────────────────────────────────────────
+# 2.  Variant sets
+# ────────────────────────────────────────────────────────────
+def diverse(items: list, n: int, threshold: float = VARIANT_SIMILARITY) -> list[str]:
+    """
+    At most *n* of *items*, near duplicates (Jaccard ≥ threshold against an
+    earlier item) dropped; if more remain, greedy max‑min from the first —
+    each pick is the one least like anything picked so far.  Model order kept.
+    """
+    kept, grams = [], []
+    for item in items:
+        if not isinstance(item, str) or not item.strip():
+            continue
+        g = char_grams(item)
+        if any(jaccard(g, h) >= threshold for h in grams):
+            continue
+        kept.append(item)
+        grams.append(g)
+    if len(kept) <= n:
+        return kept
+    chosen = [0]
+    closest = [jaccard(grams[0], g) for g in grams]        # max similarity to the picks
+    while len(chosen) < n:
+        i = min((j for j in range(len(kept)) if j not in chosen), key=closest.__getitem__)
+        chosen.append(i)
+        closest = [max(c, jaccard(grams[i], g)) for c, g in zip(closest, grams)]
+    return [kept[i] for i in sorted(chosen)]
+
+# ────────────────────────────────────────────────────────────
+# 3.  Copy overlap
+# ────────────────────────────────────────────────────────────
+@dataclass
+class Overlap:
+    source: str         # "exemplar" | "history"
+    ref: str            # "Urgency #2", "#1234"
+    text: str           # the exemplar line / the past piece's title
+    score: float        # containment, 0–1
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+class ExemplarIndex:
+    """Shingled exemplar lines; check() is a few set intersections (microseconds)."""
+
+    def __init__(self, exemplars: dict[str, str], n: int = SHINGLE_WORDS):
+        self.n = n
+        self.items = [(ref, text, shingles(text, n)) for ref, text in exemplars.items()
+                      if len(words(text)) >= n]
+
+    def check(self, copy: str, threshold: float = EXEMPLAR_OVERLAP) -> list[Overlap]:
+        got = shingles(copy, self.n)
+        hits = [Overlap("exemplar", ref, text, round(c, 2)) for ref, text, sh in self.items
+                if (c := containment(sh, got)) >= threshold]
+        return sorted(hits, key=lambda o: -o.score)
@@ -0,0 +1,145 @@
+# ✍️ Motley Fool AI Copywriter — incremental JSON field reader
+# ----------------------------------------------------------
+# Streams a flat JSON object such as {"plan": "...", "copy": "..."}
+# and reports each top‑level string value as it grows, so the UI can
+# render `copy` while the rest of the object is still arriving.
+# ----------------------------------------------------------
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f",
+            "n": "\n", "r": "\r", "t": "\t"}
+_HEX = frozenset("0123456789abcdefABCDEF")
+
+class JsonFieldStream:
+    """
+    Feed raw text chunks; each feed() returns [(key, value_so_far, done), …]
+    for the top‑level string fields that changed in that chunk.
+    Non‑string values are skipped.  Malformed input never raises — the
+    caller still parses the complete text with json.loads at the end.
+    """
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.done: set[str] = set()
+        self._state = "start"     # start | key | colon | value | string | other | after
+        self._key: list[str] = []
+        self._buf: list[str] = []
+        self._esc = ""            # pending escape sequence (may span chunks)
+        self._depth = 0           # nesting inside a skipped non‑string value
+        self._in_str = False      # inside a string within a skipped value
+        self._high = None         # pending high surrogate from a \\u escape
+
+    # ---- public ------------------------------------------------
+    def feed(self, chunk: str) -> list[tuple[str, str, bool]]:
+        changed: dict[str, bool] = {}
+        for ch in chunk:
+            self._step(ch, changed)
+        if self._state == "string" and self._buf:
+            changed.setdefault(self._current, False)
+        return [(k, self._value(k), d) for k, d in changed.items()]
+
+    def get(self, key: str, default: str = "") -> str:
+        return self._value(key) if key in self.values or self._is_current(key) else default
+
+    # ---- internals ---------------------------------------------
+    @property
+    def _current(self) -> str:
+        return "".join(self._key)
+
+    def _is_current(self, key):
+        return self._state == "string" and self._current == key
+
+    def _value(self, key):
+        if self._is_current(key):
+            return self.values.get(key, "") + "".join(self._buf)
+        return self.values.get(key, "")
+
+    def _flush(self):
+        if self._buf:
+            key = self._current
+            self.values[key] = self.values.get(key, "") + "".join(self._buf)
+            self._buf = []
+
+    def _step(self, ch, changed):
+        st = self._state
+        if st in ("start", "after"):
+            if ch == '"':
+                self._key, self._state = [], "key"
+        elif st == "key":
+            if self._esc:
+                self._key.append(_ESCAPES.get(ch, ch))
+                self._esc = ""
+            elif ch == "\\":
+                self._esc = "\\"
+            elif ch == '"':
+                self._state = "colon"
+            else:
+                self._key.append(ch)
+        elif st == "colon":
+            if ch == ":":
+                self._state = "value"
+        elif st == "value":
+            if ch == '"':
+                self.values.setdefault(self._current, "")
+                self._state = "string"
+            elif not ch.isspace():
+                self._depth = 1 if ch in "[{" else 0
+                self._in_str = False
+                self._state = "other"
+        elif st == "string":
+            self._string_char(ch, changed)
+        elif st == "other":
+            self._skip_char(ch)
+
+    def _string_char(self, ch, changed):
+        if self._esc.startswith("\\u"):
+            if ch not in _HEX:                   # malformed \u escape → kept as text
+                self._buf.append(self._esc)
+                self._esc = ""
+                return self._string_char(ch, changed)
+            self._esc += ch
+            if len(self._esc) < 6:
+                return
+            code = int(self._esc[2:], 16)
+            self._esc = ""
+            if 0xD800 <= code < 0xDC00:
+                self._high = code
+                return
+            if 0xDC00 <= code < 0xE000 and self._high is not None:
+                code = 0x10000 + ((self._high - 0xD800) << 10) + (code - 0xDC00)
+            self._high = None
+            self._buf.append(chr(code))
+        elif self._esc:
+            if ch == "u":
+                self._esc += ch
+                return
+            self._buf.append(_ESCAPES.get(ch, ch))
+            self._esc = ""
+        elif ch == "\\":
+            self._esc = "\\"
+        elif ch == '"':
+            self._flush()
+            key = self._current
+            self.done.add(key)
+            changed[key] = True
+            self._state = "after"
+        else:
+            self._buf.append(ch)
+
+    def _skip_char(self, ch):
+        if self._in_str:
+            if self._esc:
+                self._esc = ""
+            elif ch == "\\":
+                self._esc = "\\"
+            elif ch == '"':
+                self._in_str = False
+        elif ch == '"':
+            self._in_str = True
+        elif ch in "[{":
+            self._depth += 1
+        elif ch in "]}":
+            self._depth -= 1
+            if self._depth < 0:
+                self._state = "after"
+        elif ch == "," and self._depth == 0:
+            self._state = "after"
@@ -0,0 +1,261 @@
+# ✍️ Motley Fool AI Copywriter — trait sweeps (A/B test matrices)
+# ----------------------------------------------------------
+# • Grid {trait: levels} — a level is a band ("low" / "mid" / "high")
+#   or a slider score; traits not swept keep the base settings
+# • The prompt only distinguishes three bands per trait, so each swept
+#   score is snapped to one score per band (the first one the grid asks
+#   for, else the band's middle): cells the band logic can't tell
+#   apart become one prompt
+# • Cells are keyed by a hash of their draft messages; the unique
+#   prompts run concurrently (at most `workers` pipelines in flight)
+#   and each result fans back out to every cell that shares it
+# • grid() → rows × columns comparison table · write_matrix() → CSV or
+#   JSONL test matrix (the JSONL feeds `python -m mf_copy export`)
+#
+#   python -m mf_copy sweep --brief brief.json \
+#       --grid Urgency=low,mid,high --grid Social_Proof=low,high --matrix matrix.csv
+# ----------------------------------------------------------
+
+import asyncio, csv, hashlib, itertools, json, math, time
+
+from mf_copy import engine
+from mf_copy.engine import TRAIT_DEFAULTS, band_score, trait_band
+from mf_copy.export import title_of
+from mf_copy.llm_async import run
+from mf_copy.scheduler import LLMError
+from mf_copy.tracing import annotate, traced
+
+BANDS = ("low", "mid", "high")
+_BAND_ALIASES = {"low": "low", "lo": "low", "mid": "mid", "medium": "mid", "med": "mid",
+                 "high": "high", "hi": "high"}
+MAX_CELLS = 64          # a grid larger than this is almost certainly a typo
+WORKERS = 4             # generation pipelines in flight per sweep
+
+# ────────────────────────────────────────────────────────────
+# 1.  Grid → cells
+# ────────────────────────────────────────────────────────────
+def parse_grid(spec) -> dict[str, list]:
+    """
+    {trait: [levels]} from a dict, a list of "Trait=low,high" strings or
+    one "Urgency=low,mid,high; FOMO=2,9" string.
+    """
+    if isinstance(spec, dict):
+        return {name: (levels.split(",") if isinstance(levels, str) else
+                       list(levels) if isinstance(levels, (list, tuple)) else [levels])
+                for name, levels in spec.items()}
+    parts = spec.split(";") if isinstance(spec, str) else [str(p) for p in spec or []]
+    grid = {}
+    for part in (p.strip() for p in parts if p.strip()):
+        name, sep, levels = part.partition("=")
+        if not sep:
+            raise ValueError(f"grid entries look like Trait=low,high (got {part!r})")
+        grid[name.strip()] = [l.strip() for l in levels.split(",") if l.strip()]
+    return grid
+
+def _level(name: str, level) -> tuple[str, str, int | None]:
+    """(label, band, score asked for — None for a band name)."""
+    if isinstance(level, str) and level.strip().isdigit():
+        level = int(level)
+    if isinstance(level, int) and not isinstance(level, bool):
+        if not 1 <= level <= 10:
+            raise ValueError(f"{name}: score must be 1–10 (got {level})")
+        return str(level), trait_band(name, level), level
+    band = _BAND_ALIASES.get(str(level).strip().lower())
+    if band is None:
+        raise ValueError(f"{name}: level must be low, mid, high or a score 1–10 (got {level!r})")
+    return band, band, None
+
+def axes(grid: dict) -> dict[str, list[dict]]:
+    """
+    {trait: [{level, band, score}, …]} — score is what the prompt gets: per
+    band, the first score the grid asks for, else the band's middle.
+    """
+    if not grid:
+        raise ValueError("grid needs at least one trait, e.g. {\"Urgency\": [\"low\", \"high\"]}")
+    out = {}
+    for name, levels in grid.items():
+        if name not in TRAIT_DEFAULTS:
+            raise ValueError(f"Unknown trait {name!r} (options: {', '.join(TRAIT_DEFAULTS)})")
+        parsed, seen = [], set()
+        for label, band, score in (_level(name, l) for l in levels):
+            if label not in seen:
+                seen.add(label)
+                parsed.append((label, band, score))
+        if not parsed:
+            raise ValueError(f"{name}: no levels")
+        first = {}
+        for _, band, score in parsed:
+            if score is not None:
+                first.setdefault(band, score)
+        out[name] = [{"level": label, "band": band,
+                      "score": first.get(band) or band_score(name, band)}
+                     for label, band, _ in parsed]
+    return out
+
+def cells(ax: dict, base: dict | None = None) -> list[dict]:
+    """Every combination of the axes' levels → [{cell, levels, bands, traits}]."""
+    size = math.prod(len(levels) for levels in ax.values())
+    if size > MAX_CELLS:
+        raise ValueError(f"{size} cells — at most {MAX_CELLS} per sweep")
+    base = {**TRAIT_DEFAULTS, **(base or {})}
+    names = list(ax)
+    return [{"cell": f"C{i}",
+             "levels": {n: l["level"] for n, l in zip(names, combo)},
+             "bands": {n: l["band"] for n, l in zip(names, combo)},
+             "traits": {**base, **{n: l["score"] for n, l in zip(names, combo)}}}
+            for i, combo in enumerate(itertools.product(*ax.values()), 1)]
+
+def prompt_hash(copy_type, traits, brief, length_choice, original=None) -> str:
+    msgs = engine.generation_messages(copy_type, traits, brief, length_choice, original)
+    return hashlib.sha1(json.dumps(msgs, ensure_ascii=False).encode()).hexdigest()
+
+def plan(copy_type, traits, brief, length_choice, grid, original=None) -> dict:
+    """
+    The sweep without any API call → {axes, cells, prompts}; each cell names
+    its prompt ("P1" …) and prompts = {id: {traits, cells: [cell ids]}}.
+    """
+    ax = axes(grid)
+    cs = cells(ax, traits)
+    ids, prompts = {}, {}
+    for c in cs:
+        h = prompt_hash(copy_type, c["traits"], brief, length_choice, original)
+        if h not in ids:
+            ids[h] = f"P{len(ids) + 1}"
+            prompts[ids[h]] = {"traits": c["traits"], "cells": []}
+        c["prompt"] = ids[h]
+        prompts[ids[h]]["cells"].append(c["cell"])
+    return {"copy_type": copy_type, "country": brief["country"], "length": length_choice,
+            "axes": {n: [l["level"] for l in levels] for n, levels in ax.items()},
+            "cells": cs, "prompts": prompts}
+
+# ────────────────────────────────────────────────────────────
+# 2.  Run
+# ────────────────────────────────────────────────────────────
+@traced("sweep")
+async def asweep(copy_type, traits, brief, length_choice, grid, original=None,
+                 critique=False, variants=False, best_of=None, workers=WORKERS,
+                 on_done=None) -> dict:
+    """
+    plan() plus one full generation per unique prompt, run concurrently.
+    Each prompt entry gains the pipeline's result ({plan, draft, copy, qa …})
+    and its seconds; a prompt whose calls fail carries {"error"} instead of
+    sinking the rest.  on_done(prompt_id, entry) fires as each one lands.
+    """
+    out = plan(copy_type, traits, brief, length_choice, grid, original)
+    annotate(cells=len(out["cells"]), prompts=len(out["prompts"]))
+    gate = asyncio.Semaphore(max(1, workers))
+
+    async def one(pid, entry):
+        async with gate:
+            t0 = time.perf_counter()
+            try:
+                entry.update(await engine.agenerate(copy_type, entry["traits"], brief,
+                                                    length_choice, original, critique,
+                                                    variants, best_of=best_of))
+            except LLMError as e:
+                entry["error"] = str(e)
+            entry["seconds"] = round(time.perf_counter() - t0, 2)
+        if on_done:
+            on_done(pid, entry)
+
+    await asyncio.gather(*(one(pid, e) for pid, e in out["prompts"].items()))
+    return out
+
+def sweep(copy_type, traits, brief, length_choice, grid, **kwargs) -> dict:
+    """Blocking wrapper around asweep for scripts (on the shared loop)."""
+    return run(asweep, copy_type, traits, brief, length_choice, grid, **kwargs)
+
+# ────────────────────────────────────────────────────────────
+# 3.  Fan‑out: comparison grid & test‑matrix file
+# ────────────────────────────────────────────────────────────
+def fan_out(result: dict) -> list[dict]:
+    """
+    One record per cell with its prompt's result (shared = cells on that
+    prompt) — {copy, title, country …}, so export.write_zip takes them as is.
+    """
+    rows = []
+    for c in result["cells"]:
+        p = result["prompts"][c["prompt"]]
+        copy = p.get("copy") or ""
+        status = "error" if p.get("error") else "ok" if copy else "planned"
+        label = " ".join(f"{n} {v}" for n, v in c["levels"].items())
+        rows.append({**c, "shared": len(p["cells"]), "status": status, "copy": copy,
+                     "headline": title_of(copy) if copy else "", "qa": p.get("qa"),
+                     "error": p.get("error"), "title": f"{c['cell']} {label}",
+                     "copy_type": result["copy_type"], "country": result["country"],
+                     "length": result["length"]})
+    return rows
+
+def summary(rec: dict) -> str:
+    """"P2 ✓ Don't miss these 3 AI stocks" — one comparison‑grid cell."""
+    if rec["status"] != "ok":
+        return f"{rec['prompt']} {rec['status']}"
+    qa = rec["qa"] or {}
+    mark = "✓" if qa.get("passed") else f"✗{len(qa.get('failed') or [])}" if qa else ""
+    return f"{rec['prompt']} {mark} {rec['headline'][:60]}".replace("  ", " ")
+
+def grid(result: dict, rows: list | None = None, cols: str | None = None,
+         show=summary) -> list[list[str]]:
+    """
+    Comparison table, header row first: *cols* (default: the second swept
+    trait) across, every other swept trait down the side.
+    """
+    names = list(result["axes"])
+    cols = cols if cols in names else names[1] if len(names) > 1 else None
+    rows = [n for n in (rows or names) if n != cols]
+    across = result["axes"][cols] if cols else [""]
+    header = [" · ".join(n.replace("_", " ") for n in rows),
+              *(f"{cols.replace('_', ' ')}: {l}" if cols else "result" for l in across)]
+    table: dict[tuple, dict] = {}
+    for rec in fan_out(result):
+        key = tuple(rec["levels"][n] for n in rows)
+        table.setdefault(key, {})[rec["levels"].get(cols, "")] = show(rec)
+    return [header] + [[" · ".join(key) or "—", *(got.get(l, "") for l in across)]
+                       for key, got in table.items()]
+
+def to_markdown(table: list[list[str]]) -> str:
+    esc = [[str(v).replace("|", "\\|") for v in row] for row in table]
+    return "\n".join(["| " + " | ".join(esc[0]) + " |",
+                      "|" + "---|" * len(esc[0]),
+                      *("| " + " | ".join(row) + " |" for row in esc[1:])])
+
+def matrix_rows(result: dict) -> list[dict]:
+    """Flat test‑matrix rows (one per cell) for CSV."""
+    names = list(result["axes"])
+    out = []
+    for rec in fan_out(result):
+        qa = rec["qa"] or {}
+        out.append({"cell": rec["cell"], "prompt": rec["prompt"], "shared": rec["shared"],
+                    **{n: rec["levels"][n] for n in names},
+                    **{f"{n}_score": rec["traits"][n] for n in names},
+                    "status": rec["status"], "qa_passed": qa.get("passed", ""),
+                    "qa_failed": ",".join(qa.get("failed") or []),
+                    "words": len(rec["copy"].split()), "headline": rec["headline"],
+                    "copy_type": result["copy_type"], "country": result["country"],
+                    "length": result["length"], "copy": rec["copy"],
+                    "error": rec["error"] or ""})
+    return out
+
+def write_matrix(result: dict, f, fmt: str = "csv") -> int:
+    """
+    The test matrix onto text file *f* → rows written.  "csv": flat columns;
+    "jsonl": fan_out() records, one per line (`python -m mf_copy export` reads them).
+    """
+    if fmt == "csv":
+        rows = matrix_rows(result)
+        w = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["cell"])
+        w.writeheader()
+        w.writerows(rows)
+        return len(rows)
+    if fmt != "jsonl":
+        raise ValueError("matrix format must be csv or jsonl")
+    recs = fan_out(result)
+    for rec in recs:
+        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    return len(recs)
+
+def save_matrix(result: dict, path: str) -> int:
+    """write_matrix() to *path*, the format taken from its suffix (.csv / .jsonl)."""
+    fmt = "jsonl" if str(path).lower().endswith((".jsonl", ".json")) else "csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        return write_matrix(result, f, fmt)
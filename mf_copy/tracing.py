@@ -0,0 +1,296 @@
+# ✍️ Motley Fool AI Copywriter — per‑stage tracing
+# ----------------------------------------------------------
+# • span("draft") / span("qa") … nest via contextvars, so async
+#   stages (gather, create_task) land under the right parent
+# • A span opened with nothing active starts a new run (trace ID)
+# • LLM spans carry wall time, time‑to‑first‑token, prompt /
+#   completion / cached tokens, attempts and estimated cost
+# • Finished runs → JSONL (OpenTelemetry field names), an in‑memory
+#   ring for the Streamlit panel, and — when opentelemetry is
+#   installed and MF_COPY_OTEL=on — real OTel spans
+#
+#   python -m mf_copy.tracing .cache/traces.jsonl --last 50
+# ----------------------------------------------------------
+
+import argparse, contextvars, functools, inspect, json, os, secrets, statistics, sys, threading, time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+TRACE_ENABLED = os.environ.get("MF_COPY_TRACE", "on").lower() not in ("0", "off", "false")
+TRACE_PATH = os.environ.get("MF_COPY_TRACE_PATH", ".cache/traces.jsonl")
+OTEL_ENABLED = os.environ.get("MF_COPY_OTEL", "off").lower() in ("1", "on", "true")
+RECENT_RUNS = 50
+
+# USD per 1M tokens: (input, cached input, output)
+PRICES = {
+    "gpt-4.1":      (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4o":       (2.50, 1.25, 10.00),
+    "gpt-4o-mini":  (0.15, 0.075, 0.60),
+}
+
+def estimate_cost(model: str, prompt: int, cached: int, completion: int) -> float | None:
+    name = next((n for n in sorted(PRICES, key=len, reverse=True) if model.startswith(n)), None)
+    if name is None:
+        return None
+    p_in, p_cached, p_out = PRICES[name]
+    return round(((prompt - cached) * p_in + cached * p_cached + completion * p_out) / 1e6, 6)
+
+# ────────────────────────────────────────────────────────────
+# 1.  Spans
+# ────────────────────────────────────────────────────────────
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int = 0
+    attributes: dict = field(default_factory=dict)
+    status: str = "ok"
+    run: list = field(default_factory=list, repr=False)   # root only: every span in the run
+
+    @property
+    def wall_ms(self) -> float:
+        return round((self.end_ns - self.start_ns) / 1e6, 1)
+
+    def as_record(self) -> dict:
+        """OpenTelemetry span field names, one JSON object per line."""
+        return {"traceId": self.trace_id, "spanId": self.span_id,
+                "parentSpanId": self.parent_id, "name": self.name,
+                "startTimeUnixNano": self.start_ns, "endTimeUnixNano": self.end_ns,
+                "attributes": {**self.attributes, "wall_ms": self.wall_ms},
+                "status": {"code": "ERROR" if self.status != "ok" else "OK",
+                           "message": "" if self.status == "ok" else self.status}}
+
+_CURRENT: contextvars.ContextVar[Span | None] = contextvars.ContextVar("mf_copy_span", default=None)
+_RUNS: deque = deque(maxlen=RECENT_RUNS)          # finished runs: list[Span] each
+_LOCK = threading.Lock()
+
+def current_span() -> Span | None:
+    return _CURRENT.get()
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a stage.  With no active span this starts a new run (fresh trace ID)."""
+    if not TRACE_ENABLED:
+        yield None
+        return
+    parent = _CURRENT.get()
+    s = Span(name, parent.trace_id if parent else secrets.token_hex(16), secrets.token_hex(8),
+             parent.span_id if parent else None, time.time_ns(), attributes=dict(attributes))
+    s._root = parent._root if parent else s
+    with _LOCK:
+        s._root.run.append(s)
+    token = _CURRENT.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        if not type(e).__name__.endswith(("RerunException", "StopException")):
+            s.status = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _CURRENT.reset(token)
+        if parent is None:
+            _finish(s)
+
+def traced(name: str):
+    """Decorator form of span() for sync and async functions."""
+    def wrap(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def run(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+        else:
+            @functools.wraps(fn)
+            def run(*args, **kwargs):
+                with span(name):
+                    return fn(*args, **kwargs)
+        return run
+    return wrap
+
+def annotate(**attributes):
+    """Add attributes to the active span (no‑op outside a span)."""
+    s = _CURRENT.get()
+    if s is not None:
+        s.attributes.update(attributes)
+
+def _get(obj, name, default=0):
+    if obj is None:
+        return default
+    value = obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+    return default if value is None else value
+
+def annotate_usage(model: str, usage, ttft_s: float | None = None):
+    """Token counts and cost from an API usage block onto the active span."""
+    prompt, completion = _get(usage, "prompt_tokens"), _get(usage, "completion_tokens")
+    cached = _get(_get(usage, "prompt_tokens_details", None), "cached_tokens")
+    annotate(model=model, prompt_tokens=prompt, completion_tokens=completion,
+             cached_tokens=cached, cost_usd=estimate_cost(model, prompt, cached, completion),
+             **({"ttft_ms": round(ttft_s * 1000, 1)} if ttft_s is not None else {}))
+
+# ────────────────────────────────────────────────────────────
+# 2.  Export
+# ────────────────────────────────────────────────────────────
+ROLLUP = ("prompt_tokens", "cached_tokens", "completion_tokens", "retries", "cost_usd")
+
+def totals(s: Span | None = None) -> dict:
+    """
+    Tokens / retries / cost of the calls made so far beneath *s* (default:
+    the active span) — usable before the run finishes and is rolled up.
+    """
+    s = s or _CURRENT.get()
+    if s is None:
+        return {}
+    with _LOCK:
+        run = list(s._root.run)
+    parents = {x.span_id: x.parent_id for x in run}
+    out = dict.fromkeys(ROLLUP, 0)
+    for x in run:
+        if "prompt_tokens" not in x.attributes and "attempts" not in x.attributes:
+            continue
+        p = x.span_id
+        while p is not None and p != s.span_id:
+            p = parents.get(p)
+        if p is None:
+            continue
+        a = x.attributes
+        for k in ROLLUP:
+            out[k] += (a.get("attempts", 1) - 1 if k == "retries" else a.get(k) or 0)
+    out["cost_usd"] = round(out["cost_usd"], 6)
+    return out
+
+def _roll_up(spans: list[Span]):
+    """Stage spans get the summed tokens / retries / cost of the LLM calls beneath them."""
+    by_id = {s.span_id: s for s in spans}
+    for s in spans:
+        if "attempts" in s.attributes:
+            s.attributes["retries"] = s.attributes["attempts"] - 1
+    calls = [s for s in spans if "attempts" in s.attributes or "prompt_tokens" in s.attributes]
+    for s in calls:
+        parent = by_id.get(s.parent_id)
+        while parent is not None:
+            for k in ROLLUP:
+                if s.attributes.get(k):
+                    parent.attributes[k] = round(parent.attributes.get(k, 0) + s.attributes[k], 6)
+            parent = by_id.get(parent.parent_id)
+
+def _finish(root: Span):
+    spans = sorted(root.run, key=lambda s: s.start_ns)
+    _roll_up(spans)
+    with _LOCK:
+        _RUNS.append(spans)
+        if TRACE_PATH:
+            os.makedirs(os.path.dirname(os.path.abspath(TRACE_PATH)), exist_ok=True)
+            with open(TRACE_PATH, "a", encoding="utf-8") as f:
+                for s in spans:
+                    f.write(json.dumps(s.as_record(), ensure_ascii=False, default=str) + "\n")
+    if OTEL_ENABLED:
+        _to_otel(spans)
+
+def _to_otel(spans):
+    """Replay a finished run into the OpenTelemetry SDK (if installed & configured)."""
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return
+    tracer = trace.get_tracer("mf_copy")
+    live = {}
+    for s in spans:
+        ctx = trace.set_span_in_context(live[s.parent_id]) if s.parent_id in live else None
+        o = tracer.start_span(s.name, context=ctx, start_time=s.start_ns,
+                              attributes={k: v for k, v in s.attributes.items()
+                                          if isinstance(v, (str, bool, int, float))})
+        if s.status != "ok":
+            o.set_status(trace.Status(trace.StatusCode.ERROR, s.status))
+        live[s.span_id] = o
+    for s in reversed(spans):
+        live[s.span_id].end(end_time=s.end_ns)
+
+def recent_runs() -> list[list[Span]]:
+    """Finished runs, newest last (root span first in each)."""
+    with _LOCK:
+        return list(_RUNS)
+
+def last_run() -> list[Span] | None:
+    runs = recent_runs()
+    return runs[-1] if runs else None
+
+def tree(spans: list[Span]) -> list[tuple[int, Span]]:
+    """(depth, span) in depth‑first order, siblings by start time."""
+    kids: dict = {}
+    for s in spans:
+        kids.setdefault(s.parent_id, []).append(s)
+    out = []
+    def walk(parent_id, d):
+        for s in sorted(kids.get(parent_id, []), key=lambda s: s.start_ns):
+            out.append((d, s))
+            walk(s.span_id, d + 1)
+    walk(spans[0].parent_id if spans else None, 0)
+    return out
+
+# ────────────────────────────────────────────────────────────
+# 3.  CLI summary
+# ────────────────────────────────────────────────────────────
+def load(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _pct(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round((len(ordered) - 1) * p / 100))]
+
+def summarise(records: list[dict], last: int | None = None) -> dict:
+    """{stage: {n, p50_ms, p95_ms, mean_ms, ttft_p50_ms, tokens, cost_usd, errors, retries}}."""
+    if last:
+        keep = list(dict.fromkeys(r["traceId"] for r in records))[-last:]
+        records = [r for r in records if r["traceId"] in set(keep)]
+    stages: dict[str, list[dict]] = {}
+    for r in records:
+        stages.setdefault(r["name"], []).append(r)
+    out = {}
+    for name, rs in stages.items():
+        walls = [r["attributes"]["wall_ms"] for r in rs]
+        ttfts = [r["attributes"]["ttft_ms"] for r in rs if r["attributes"].get("ttft_ms")]
+        out[name] = {
+            "n": len(rs),
+            "p50_ms": _pct(walls, 50), "p95_ms": _pct(walls, 95),
+            "mean_ms": round(statistics.mean(walls), 1),
+            "ttft_p50_ms": _pct(ttfts, 50) if ttfts else None,
+            "tokens": sum((r["attributes"].get("prompt_tokens") or 0)
+                          + (r["attributes"].get("completion_tokens") or 0) for r in rs),
+            "cost_usd": round(sum(r["attributes"].get("cost_usd") or 0 for r in rs), 4),
+            "errors": sum(r["status"]["code"] == "ERROR" for r in rs),
+            "retries": sum(r["attributes"].get("retries") or 0 for r in rs),
+        }
+    return dict(sorted(out.items(), key=lambda kv: -kv[1]["p95_ms"]))
+
+COLS = ("n", "p50_ms", "p95_ms", "mean_ms", "ttft_p50_ms", "tokens", "cost_usd", "errors", "retries")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Summarise mf_copy trace spans (slowest first).")
+    ap.add_argument("path", nargs="?", default=TRACE_PATH)
+    ap.add_argument("--last", type=int, help="only the most recent N runs")
+    ap.add_argument("--json", action="store_true", help="print the summary as JSON")
+    a = ap.parse_args(argv)
+
+    records = load(a.path)
+    summary = summarise(records, a.last)
+    if a.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+    runs = len({r["traceId"] for r in records}) if not a.last else min(a.last, len(
+        {r["traceId"] for r in records}))
+    print(f"{runs} runs · {a.path}")
+    print(f"{'stage':<22}" + "".join(f"{c:>12}" for c in COLS))
+    for name, row in summary.items():
+        print(f"{name:<22}" + "".join(f"{'–' if row[c] is None else row[c]:>12}" for c in COLS))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
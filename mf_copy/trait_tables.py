@@ -0,0 +1,119 @@
+# ✍️ Motley Fool AI Copywriter — compiled trait tables
+# ----------------------------------------------------------
+# traits_config.json is validated once and turned into per‑trait
+# lookup tables indexed by slider score (1–10):
+# • band     → "high" / "mid" / "low"
+# • rule     → Hard‑Requirement string (or None)
+# • exemplar → whether that score unlocks the winner exemplars
+# • guide    → pre‑rendered trait‑guide line (without numbering)
+# The file is re‑read only when its mtime changes.
+# ----------------------------------------------------------
+
+import json, pathlib, threading, time
+from dataclasses import dataclass
+
+SCORES = range(1, 11)
+CHECK_EVERY = 1.0        # seconds between mtime checks
+
+class TraitConfigError(ValueError):
+    """traits_config.json is missing keys or has inconsistent thresholds."""
+
+# ────────────────────────────────────────────────────────────
+# 1.  Validation
+# ────────────────────────────────────────────────────────────
+def validate_config(cfg: dict) -> dict:
+    if not isinstance(cfg, dict) or not cfg:
+        raise TraitConfigError("traits_config.json must be a non‑empty object")
+    for name, t in cfg.items():
+        for key in ("high_threshold", "low_threshold", "high_rule", "low_rule"):
+            if key not in t:
+                raise TraitConfigError(f"{name}: missing {key!r}")
+        hi, lo = t["high_threshold"], t["low_threshold"]
+        if not (isinstance(hi, int) and isinstance(lo, int) and 1 <= lo < hi <= 10):
+            raise TraitConfigError(f"{name}: need 1 ≤ low_threshold < high_threshold ≤ 10 "
+                                   f"(got {lo}, {hi})")
+        for key in ("high_rule", "mid_rule", "low_rule"):
+            if key in t and not isinstance(t[key], str):
+                raise TraitConfigError(f"{name}: {key} must be a string")
+        if not isinstance(t.get("sections", []), list):
+            raise TraitConfigError(f"{name}: sections must be a list")
+    return cfg
+
+# ────────────────────────────────────────────────────────────
+# 2.  Tables
+# ────────────────────────────────────────────────────────────
+@dataclass(frozen=True, eq=False)      # hashed by identity → usable as a cache key
+class TraitTables:
+    cfg: dict
+    band: dict          # name → tuple of 11 (index = score, 0 unused)
+    rule: dict
+    exemplar: dict
+    guide: dict
+
+    def at(self, table: str, name: str, score: int):
+        """Lookup with the score clamped to 1–10 (thresholds are validated in range)."""
+        return getattr(self, table)[name][min(10, max(1, int(score)))]
+
+def _band(t, score):
+    if score >= t["high_threshold"]:
+        return "high"
+    if score <= t["low_threshold"]:
+        return "low"
+    return "mid"
+
+def _guide_line(name, score, examples):
+    shots = 3 if score >= 8 else 2 if score >= 4 else 1
+    quoted = " / ".join(f"“{s}”" for s in examples[:shots])
+    return f"{name.replace('_',' ')} ({score}/10) — e.g. {quoted}"
+
+def compile_tables(cfg: dict, examples: dict) -> TraitTables:
+    band, rule, exemplar, guide = {}, {}, {}, {}
+    for name, t in cfg.items():
+        band[name] = (None,) + tuple(_band(t, s) for s in SCORES)
+        rule[name] = (None,) + tuple(t.get(f"{band[name][s]}_rule") or None for s in SCORES)
+        exemplar[name] = (False,) + tuple(bool(t.get("high_exemplar_allowed"))
+                                          and s >= t["high_threshold"] for s in SCORES)
+    for name, shots in examples.items():
+        guide[name] = (None,) + tuple(_guide_line(name, s, shots) for s in SCORES)
+    return TraitTables(cfg, band, rule, exemplar, guide)
+
+# ────────────────────────────────────────────────────────────
+# 3.  mtime‑watched loader
+# ────────────────────────────────────────────────────────────
+class WatchedTables:
+    """
+    Process‑wide holder: get() stat()s the file at most once per CHECK_EVERY
+    seconds and recompiles only when its mtime changed.  A broken edit keeps serving the last good tables
+    (see .error) instead of taking the app down mid‑session.
+    """
+
+    def __init__(self, path, examples: dict):
+        self.path, self.examples = pathlib.Path(path), examples
+        self.error: str | None = None
+        self._mtime = None
+        self._checked = 0.0
+        self._tables: TraitTables | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> TraitTables:
+        now = time.monotonic()
+        if self._tables is not None and now - self._checked < CHECK_EVERY:
+            return self._tables
+        self._checked = now
+        mtime = self.path.stat().st_mtime_ns
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._reload(mtime)
+        return self._tables
+
+    def _reload(self, mtime):
+        try:
+            cfg = validate_config(json.loads(self.path.read_text(encoding="utf-8")))
+        except (ValueError, OSError) as e:          # JSONDecodeError is a ValueError
+            if self._tables is None:
+                raise
+            self.error = f"{type(e).__name__}: {e}"
+        else:
+            self._tables, self.error = compile_tables(cfg, self.examples), None
+        self._mtime = mtime
@@ -0,0 +1,82 @@
+# ✍️ Motley Fool AI Copywriter — token usage & prompt‑cache counters
+# ----------------------------------------------------------
+# • Records the `usage` block of every API reply, per call type
+#   ("draft", "patch", "adapt", …)
+# • prompt_tokens_details.cached_tokens → provider prefix‑cache hit rate
+# • Mean latency of warm (cached prefix) vs cold calls
+# ----------------------------------------------------------
+
+import threading
+from dataclasses import asdict, dataclass
+
+@dataclass
+class CallUsage:
+    calls: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+    warm_calls: int = 0          # calls where part of the prompt was served from cache
+    warm_s: float = 0.0
+    cold_s: float = 0.0
+
+    def as_dict(self) -> dict:
+        cold_calls = self.calls - self.warm_calls
+        return {**asdict(self),
+                "hit_rate": round(self.cached_tokens / self.prompt_tokens, 3)
+                            if self.prompt_tokens else 0.0,
+                "warm_ms": round(self.warm_s / self.warm_calls * 1000, 1) if self.warm_calls else None,
+                "cold_ms": round(self.cold_s / cold_calls * 1000, 1) if cold_calls else None}
+
+def _get(obj, name, default=0):
+    """usage fields arrive as SDK objects or plain dicts (cache replays, tests)."""
+    if obj is None:
+        return default
+    value = obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+    return default if value is None else value
+
+class UsageLog:
+    """Process‑wide counters, safe to share across Streamlit sessions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_label: dict[str, CallUsage] = {}
+
+    def record(self, label: str, usage, elapsed: float = 0.0):
+        if usage is None:
+            return
+        cached = _get(_get(usage, "prompt_tokens_details", None), "cached_tokens")
+        with self._lock:
+            row = self._by_label.setdefault(label, CallUsage())
+            row.calls += 1
+            row.prompt_tokens += _get(usage, "prompt_tokens")
+            row.completion_tokens += _get(usage, "completion_tokens")
+            row.cached_tokens += cached
+            if cached:
+                row.warm_calls += 1
+                row.warm_s += elapsed
+            else:
+                row.cold_s += elapsed
+
+    def stats(self) -> dict:
+        """{label: {...}} plus a "total" row."""
+        with self._lock:
+            rows = {k: CallUsage(**asdict(v)) for k, v in self._by_label.items()}
+        total = CallUsage()
+        for row in rows.values():
+            for f in asdict(total):
+                setattr(total, f, getattr(total, f) + getattr(row, f))
+        return {**{k: v.as_dict() for k, v in sorted(rows.items())}, "total": total.as_dict()}
+
+    def clear(self):
+        with self._lock:
+            self._by_label.clear()
+
+_USAGE: UsageLog | None = None
+_USAGE_LOCK = threading.Lock()
+
+def get_usage() -> UsageLog:
+    global _USAGE
+    with _USAGE_LOCK:
+        if _USAGE is None:
+            _USAGE = UsageLog()
+        return _USAGE
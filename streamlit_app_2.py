@@ -9,42 +9,37 @@
 # • Slider behaviour driven by external traits_config.json (3‑band logic)
 # ----------------------------------------------------------
 
-import time, json, pathlib
-from io import BytesIO
-from textwrap import dedent
+import io, sqlite3, tempfile, time
+from contextlib import contextmanager
 
 import streamlit as st
-from openai import OpenAI
-from docx import Document
+
+from mf_copy import engine, export, sweep
+from mf_copy.api import COPY_TYPES
+from mf_copy.budget import ContextOverflowError, token_counter
+from mf_copy.cache import get_cache
+from mf_copy.clients import get_pool_stats
+from mf_copy.history import HISTORY_ENABLED, KINDS, get_history
+from mf_copy.llm_async import run
+from mf_copy.localise import localise
+from mf_copy import tracing
+from mf_copy.scheduler import LLMError
+from mf_copy.usage import get_usage
+from mf_copy.engine import (BEST_OF, COUNTRY_RULES, LENGTH_RULES, TRAIT_DEFAULTS,
+                            aadapt_markets, abest_draft, adraft, agenerate, alongform,
+                            apolish, aupdate, brief_key, generate_variants, source_hash,
+                            uses_longform)
 
 # ────────────────────────────────────────────────────────────
 # 0.  Global toggles
 # ────────────────────────────────────────────────────────────
-USE_STREAMING = False     # live token stream
-AUTO_QA      = True       # self‑critique & auto‑fix loop
-
-# ---- Model & token ceiling ---------------------------------
-MAX_OUTPUT_TOKENS = 10_000   # safe for GPT‑4‑32k context
-
-# ---- Length buckets (words) --------------------------------
-LENGTH_RULES = {
-    "📏 Short (100–200 words)":        (100, 220),
-    "📐 Medium (200–500 words)":       (200, 550),
-    "📖 Long (500–1500 words)":        (500, 1600),
-    "📚 Extra Long (1500–3000 words)": (1500, 3200),
-    "📜 Scrolling Monster (3000+ words)": (3000, None),  # None = open‑ended
-}
+USE_STREAMING = True      # live token stream (default for the checkbox)
 
 # ────────────────────────────────────────────────────────────
 # 1.  OpenAI client & config
 # ────────────────────────────────────────────────────────────
-client = OpenAI(api_key=st.secrets.openai_api_key)
-OPENAI_MODEL = st.secrets.get("openai_model", "gpt-4.1")
-
-# ────────────────────────────────────────────────────────────
-# 1A.  Load slider‑rule configuration
-# ────────────────────────────────────────────────────────────
-TRAIT_CFG = json.loads(pathlib.Path("traits_config.json").read_text())
+engine.configure(api_key=st.secrets.openai_api_key,
+                 model=st.secrets.get("openai_model", "gpt-4.1"))
 
 # ────────────────────────────────────────────────────────────
 # 2.  Streamlit page & CSS
@@ -69,350 +64,152 @@ def _init(**defaults):
     for k, v in defaults.items():
         st.session_state.setdefault(k, v)
 
-_init(generated_copy="", adapted_copy="", internal_plan="", length_choice="")
-
-def line(label: str, value: str) -> str:
-    return f"- {label}: {value}\n" if value.strip() else ""
-
-# ────────────────────────────────────────────────────────────
-# 3A.  Slider‑rule helpers (json‑driven)
-# ────────────────────────────────────────────────────────────
-def trait_rules(traits: dict) -> list[str]:
-    """
-    Return Hard‑Requirement rule strings triggered by slider settings.
-    Implements 3‑band logic (high / medium / low) based on traits_config.json
-    """
-    out: list[str] = []
-    for name, score in traits.items():
-        cfg = TRAIT_CFG.get(name)
-        if not cfg:
-            continue
-
-        # ★ UPDATED — three‑band evaluation
-        if score >= cfg["high_threshold"]:
-            out.append(cfg["high_rule"])
-        elif score <= cfg["low_threshold"]:
-            out.append(cfg["low_rule"])
-        else:
-            # mid‑band present?
-            mid_rule = cfg.get("mid_rule")
-            if mid_rule:
-                out.append(mid_rule)
-    return out
-
-def allow_exemplar(traits: dict) -> bool:
-    """True if *any* trait permits high‑level exemplars and slider meets threshold."""
-    for name, score in traits.items():
-        cfg = TRAIT_CFG.get(name, {})
-        if cfg.get("high_exemplar_allowed") and score >= cfg["high_threshold"]:
-            return True
-    return False
-
-# ────────────────────────────────────────────────────────────
-# 4.  Prompt components
-# ────────────────────────────────────────────────────────────
-COUNTRY_RULES = {
-    "Australia":      "Use Australian English, prices in AUD, reference the ASX.",
-    "United Kingdom": "Use British English, prices in GBP, reference the FTSE.",
-    "Canada":         "Use Canadian English, prices in CAD, reference the TSX.",
-    "United States":  "Use American English, prices in USD, reference the S&P 500.",
-}
-
-SYSTEM_PROMPT = dedent("""
-You are The Motley Fool’s senior direct‑response copy chief.
-
-• Voice: plain English, optimistic, inclusive, lightly playful but always expert.
-• Draw from Ogilvy clarity, Sugarman narrative, Halbert urgency, Cialdini persuasion.
-• Use **Markdown headings** (##, ###) and standard `-` bullets for lists.
-• Never promise guaranteed returns; keep compliance in mind.
-• The reference examples are for inspiration only — do NOT reuse phrases verbatim.
-• Return ONLY the requested copy – no meta commentary, no code fences.
-
-{country_rules}
-
-At the very end of the piece, append this italic line (no quotes):
-*Past performance is not a reliable indicator of future results.*
-""").strip()
-
-# --- Trait exemplars (3 each) --------------------------------
-TRAIT_EXAMPLES = {
-    "Urgency": [
-        "This isn't a drill — once midnight hits, your chance to secure these savings is gone forever.",
-        "Time’s ticking — when the clock hits zero tonight, you’re out of luck.",
-        "You have exactly one shot. Miss today’s deadline, and it's gone forever."
-    ],
-    "Data_Richness": [
-        "Last year alone, our recommendations averaged returns 220% higher than the market average.",
-        "Our analysis has identified 73% higher returns than the average ASX investor over three consecutive years.",
-        "More than 85% of our recommended stocks outperformed the market last fiscal year alone."
-    ],
-    "Social_Proof": [
-        "Thousands of investors trust Motley Fool every year to transform their financial future.",
-        "Australia’s leading financial experts have rated us #1 three years in a row.",
-        "Join over 125,000 smart investors who rely on Motley Fool’s stock advice every month."
-    ],
-    "Comparative_Framing": [
-        "Think back to those who seized early opportunities in the smartphone revolution.",
-        "Imagine being among the first to see Netflix’s potential in 2002. That’s the kind of opportunity we’re talking about.",
-        "Just like the early days of Tesla, these stocks could define your investing success for years."
-    ],
-    "Imagery": [
-        "When that switch flips, the next phase could accelerate even faster.",
-        "Think of it as a snowball rolling downhill—small at first, but soon unstoppable.",
-        "Like a rocket on the launch pad, the countdown has begun and liftoff is imminent."
-    ],
-    "Conversational_Tone": [
-        "Look — investing can feel complicated, but what if it didn't have to be?",
-        "We get it—investing can seem overwhelming. But what if you had someone guiding you every step of the way?",
-        "Here’s the truth: investing doesn’t have to be complicated. Let’s simplify this together."
-    ],
-    "FOMO": [
-        "Opportunities like these pass quickly — and regret can last forever.",
-        "Don’t be the one who has to tell their friends, ‘I missed out when I had the chance.’",
-        "By tomorrow, your chance to act will be history. Don’t live with that regret."
-    ],
-    "Repetition": [
-        "This offer is for today only. Today only means exactly that: today only.",
-        "Act now. This offer expires tonight. Again, it expires tonight—no exceptions.",
-        "This is a limited-time deal. Limited-time means exactly that: limited-time."
-    ],
-}
-
-def trait_guide(traits: dict) -> str:
-    out = []
-    for i, (name, score) in enumerate(traits.items(), 1):
-        shots = 3 if score >= 8 else 2 if score >= 4 else 1
-        examples = " / ".join(f"“{s}”" for s in TRAIT_EXAMPLES[name][:shots])
-        out.append(f"{i}. {name.replace('_',' ')} ({score}/10) — e.g. {examples}")
-    return "\n".join(out)
-
-# --- Micro demos --------------------------------------------
-EMAIL_MICRO = """
-### Example Email
-**Subject Line:** Last chance to lock in $119 Motley Fool membership  
-**Greeting:** Hi Sarah,  
-**Body:** Tonight at midnight, your opportunity to save 60 % disappears. Thousands of Australians already rely on our ASX stock tips—now it’s your turn. Click before the timer hits zero and start investing smarter.  
-**CTA:** Activate my membership  
-**Sign‑off:** The Motley Fool Australia Team
-""".strip()
-
-SALES_MICRO = """
-### Example Sales Page
-## Headline  
-One Day Only—Unlock the Silver Pass for $119  
-
-### Introduction  
-Imagine having two extra experts on your side every month…
-
-### Key Benefits  
-- Double the stock picks, triple the insight  
-- ASX, growth & dividend coverage in one pass  
-- 400,000+ Aussie investors already on board  
-
-### Detailed Body  
-Scroll down and you’ll see why the Silver Pass could be your portfolio’s inflection point. But remember—the $119 price tag vanishes at 11:59 pm tonight.  
-
-### CTA  
-**Yes! Secure My Pass Now**
-""".strip()
-
-# --- Reference winners (few‑shot exemplars) -----------------
-SALES_WINNER = """(same as before)""".strip()
-EMAIL_WINNER = """(same as before)""".strip()
-
-# --- Structural skeletons -----------------------------------
-EMAIL_STRUCT = """
-### Subject Line
-### Greeting
-### Body (benefits, urgency, proofs)
-### Call‑to‑Action
-### Sign‑off
-""".strip()
-
-SALES_STRUCT = """
-## Headline
-### Introduction
-### Key Benefit Paragraphs
-### Detailed Body
-### Call‑to‑Action
-""".strip()
-
-# ────────────────────────────────────────────────────────────
-# 5.  Prompt builder
-# ────────────────────────────────────────────────────────────
-def build_prompt(copy_type, copy_struct, traits, brief, length_choice, original=None):
-    exemplar = EMAIL_MICRO if copy_type.startswith("📧") else SALES_MICRO
-
-    # --- attach few‑shot winners only when allowed -------------
-    if allow_exemplar(traits):
-        exemplar += "\n\n" + (SALES_WINNER if copy_type == "📝 Sales Page" else EMAIL_WINNER)
-    # -----------------------------------------------------------
-
-    hard_list = trait_rules(traits)
-    hard_block = "#### Hard Requirements\n" + "\n".join(hard_list) if hard_list else ""
-    edit_block = f"\n\n### ORIGINAL COPY\n{original}\n### END ORIGINAL" if original else ""
-
-    min_len, max_len = LENGTH_RULES[length_choice]
-    length_block = (f"#### Length Requirement\nWrite between **{min_len} and {max_len} words**."
-                    if max_len else
-                    f"#### Length Requirement\nWrite **at least {min_len} words**.")
-
-    return f"""
-{trait_guide(traits)}
-
-{exemplar}
-
-#### Structure to Follow
-{copy_struct}
-
-{hard_block}
-
-#### Campaign Brief
-{line('Hook', brief['hook'])}{line('Details', brief['details'])}{line('Offer', f"Special {brief['offer_price']} (Retail {brief['retail_price']}), Term {brief['offer_term']}")}{line('Reports', brief['reports'])}{line('Stocks to Tease', brief['stocks_to_tease'])}{line('Quotes/News', brief['quotes_news'])}
-
-{length_block}
-
-Please limit bullet lists to three or fewer and favour full‑sentence paragraphs elsewhere.
-
-### END INSTRUCTIONS
-""".strip()
+_init(generated_copy="", adaptations={}, internal_plan="", length_choice="",
+      variants=None, qa_report=None, copy_traits=None, candidates=None, sections=None,
+      history_id=None, fork_of=None, sweep_result=None,
+      **{f"trait_{k}": v for k, v in TRAIT_DEFAULTS.items()})
+
+# A fork from the History tab lands here on the next rerun, before the
+# brief widgets exist (their keys can't be written once they're drawn)
+_fork = st.session_state.pop("pending_fork", None)
+if _fork:
+    for k, v in (_fork["brief"] or {}).items():
+        if k != "country":                  # the country selectbox is set below
+            st.session_state[f"brief_{k}"] = v
+    for k, v in (_fork["traits"] or {}).items():
+        st.session_state[f"trait_{k}"] = v
+    for k, options in (("country", COUNTRY_RULES), ("copy_type", COPY_TYPES),
+                       ("length", LENGTH_RULES)):
+        if _fork[k] in options:
+            st.session_state[f"gen_{k}"] = _fork[k]
+
+def throttled(render, every=0.15):
+    """Wrap a Streamlit render call so token streams redraw at most every *every* s."""
+    last = [0.0]
+    def call(text):
+        now = time.monotonic()
+        if now - last[0] >= every:
+            last[0] = now
+            render(text)
+    return call
+
+@contextmanager
+def api_errors(action):
+    """Show a failed OpenAI call as an error box instead of a traceback (or a None)."""
+    try:
+        yield
+    except (LLMError, ContextOverflowError) as e:
+        st.error(f"{action} failed — {e}")
+        st.stop()
+
+def remember(kind, copy, usage=None, **fields):
+    """Store a result in the history → its id (a storage error only warns)."""
+    if not HISTORY_ENABLED or not copy:
+        return None
+    try:
+        return get_history().save(kind, copy, model=engine.OPENAI_MODEL,
+                                  usage=tracing.totals() if usage is None else usage, **fields)
+    except sqlite3.Error as e:
+        st.warning(f"Couldn't save to history — {e}")
+
+def download(label, copy, fmt, stem, key, container=st):
+    """One‑click download; the file is rendered on click (cached per content hash)."""
+    def data():
+        with tracing.span(f"export.{fmt}", chars=len(copy)):
+            return export.render(copy, fmt)
+    container.download_button(label, data, export.file_name(stem, fmt), export.mime(fmt), key=key)
+
+def open_piece(piece):
+    """Load a stored result into the Generate tab — no API call."""
+    st.session_state.generated_copy = piece["copy"]
+    st.session_state.internal_plan = piece["plan"] or ""
+    st.session_state.variants = piece["variants"]
+    st.session_state.qa_report = piece["qa"]
+    st.session_state.copy_traits = piece["traits"]
+    st.session_state.candidates = None
+    st.session_state.sections = None
+    st.session_state.history_id = piece["id"]
 
 # ────────────────────────────────────────────────────────────
-# 6.  Unified LLM helper
+# 4.  UI – Generate tab
 # ────────────────────────────────────────────────────────────
-def run_chat(messages, stream=False, expect_json=False, max_tokens=MAX_OUTPUT_TOKENS):
-    for attempt in range(5):
-        try:
-            if stream:
-                resp = client.chat.completions.create(model=OPENAI_MODEL,
-                                                      messages=messages,
-                                                      stream=True,
-                                                      max_tokens=max_tokens)
-                ph, text = st.empty(), ""
-                for c in resp:
-                    text += c.choices[0].delta.content or ""
-                    ph.markdown(text)
-                return text.strip()
-            else:
-                kwargs = {"max_tokens": max_tokens}
-                if expect_json:
-                    kwargs["response_format"] = {"type": "json_object"}
-                resp = client.chat.completions.create(model=OPENAI_MODEL,
-                                                      messages=messages,
-                                                      **kwargs)
-                return resp.choices[0].message.content.strip()
-        except Exception:
-            time.sleep(2 ** attempt)
-
-# ────────────────────────────────────────────────────────────
-# 7A.  AI Pair‑editor
-# ────────────────────────────────────────────────────────────
-def self_qa(draft, copy_type):
-    if not AUTO_QA:
-        return draft
-
-    min_len, _ = LENGTH_RULES.get(st.session_state.length_choice, (0, None))
-    if min_len and len(draft.split()) < min_len:
-        crit = f"- Draft is only {len(draft.split())} words (< {min_len}). Please expand."
-    else:
-        crit = ""
-
-    if not crit:
-        crit = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[{"role":"system","content":"You are an obsessive editorial QA bot."},
-                      {"role":"user","content":f"""
-Check copy for:
-• Hard requirements
-• Structure matches {copy_type}
-• Disclaimer present
-Return ONLY “PASS” or bullet fixes.
---- COPY ---
-{draft}
---- END ---
-"""}]
-        ).choices[0].message.content
-
-    if "PASS" in crit.upper():
-        return draft
-
-    patched = client.chat.completions.create(
-        model=OPENAI_MODEL,
-        messages=[{"role":"system","content":"Revise copy to address feedback."},
-                  {"role":"user","content":f"""
-Apply fixes, output full revised copy ONLY.
-### FIXES
-{crit}
-### ORIGINAL
-{draft}
-"""}]
-    ).choices[0].message.content.strip()
-    return patched
-
-# ────────────────────────────────────────────────────────────
-# 7B.  Variant generator helper
-# ────────────────────────────────────────────────────────────
-def generate_variants(base_copy: str, n: int = 5):
-    prompt = f"""
-Write {n} alternative subject‑line/headline ideas AND {n} alternative CTA button labels
-for the copy below, preserving tone and urgency.
-Return JSON: {{ "headlines": [...], "ctas": [...] }}
-
---- COPY ---
-{base_copy}
---- END COPY ---
-"""
-    resp = client.chat.completions.create(
-        model=OPENAI_MODEL,
-        messages=[{"role":"system","content":"You are a world‑class copywriter."},
-                  {"role":"user","content":prompt}],
-        response_format={"type":"json_object"},
-        temperature=0.8
-    )
-    return json.loads(resp.choices[0].message.content)
-
-# ────────────────────────────────────────────────────────────
-# 8.  UI – Generate tab
-# ────────────────────────────────────────────────────────────
-tab_gen, tab_adapt = st.tabs(["✍️ Generate Copy", "🌐 Adapt Copy"])
+tab_gen, tab_adapt, tab_hist = st.tabs(["✍️ Generate Copy", "🌐 Adapt Copy", "🗂️ History"])
 
 with tab_gen:
     # --- Sliders
     with st.sidebar.expander("🎚️ Linguistic Trait Intensity", True):
         with st.form("trait_form"):
             trait_scores = {
-                "Urgency":             st.slider("Urgency & Time Sensitivity", 1, 10, 8),
-                "Data_Richness":       st.slider("Data‑Richness & Numerical Emphasis", 1, 10, 7),
-                "Social_Proof":        st.slider("Social Proof & Testimonials", 1, 10, 6),
-                "Comparative_Framing": st.slider("Comparative Framing", 1, 10, 6),
-                "Imagery":             st.slider("Imagery & Metaphors", 1, 10, 7),
-                "Conversational_Tone": st.slider("Conversational Tone", 1, 10, 8),
-                "FOMO":                st.slider("FOMO", 1, 10, 7),
-                "Repetition":          st.slider("Repetition for Emphasis", 1, 10, 5),
+                "Urgency":             st.slider("Urgency & Time Sensitivity", 1, 10, key="trait_Urgency"),
+                "Data_Richness":       st.slider("Data‑Richness & Numerical Emphasis", 1, 10, key="trait_Data_Richness"),
+                "Social_Proof":        st.slider("Social Proof & Testimonials", 1, 10, key="trait_Social_Proof"),
+                "Comparative_Framing": st.slider("Comparative Framing", 1, 10, key="trait_Comparative_Framing"),
+                "Imagery":             st.slider("Imagery & Metaphors", 1, 10, key="trait_Imagery"),
+                "Conversational_Tone": st.slider("Conversational Tone", 1, 10, key="trait_Conversational_Tone"),
+                "FOMO":                st.slider("FOMO", 1, 10, key="trait_FOMO"),
+                "Repetition":          st.slider("Repetition for Emphasis", 1, 10, key="trait_Repetition"),
             }
             update_traits = st.form_submit_button("🔄 Update Copy")
 
+    # --- Response cache counters
+    with st.sidebar.expander("🗄️ Response Cache"):
+        stats = get_cache().stats()
+        st.caption(f"Hits {stats['hits']} · Misses {stats['misses']} · "
+                   f"Hit rate {stats['hit_rate']:.0%} · Stored {stats['disk_items']}")
+        if st.button("Clear cache", key="cache_clear"):
+            get_cache().clear()
+
+    # --- Provider prompt‑cache usage (cached prompt tokens per call type)
+    counter = token_counter(engine.OPENAI_MODEL)
+    if counter != "tiktoken":
+        st.sidebar.warning(f"Token counts: {counter} — budgets and context trimming "
+                           "use guessed numbers.")
+    with st.sidebar.expander("🧮 Prompt Cache"):
+        usage = get_usage().stats()
+        if len(usage) == 1:
+            st.caption("No API calls yet.")
+        for label, u in usage.items():
+            timing = (f" · warm {u['warm_ms']} ms / cold {u['cold_ms']} ms"
+                      if u["warm_ms"] and u["cold_ms"] else "")
+            st.caption(f"**{label}** · {u['calls']} calls · "
+                       f"{u['cached_tokens']}/{u['prompt_tokens']} prompt tokens cached "
+                       f"({u['hit_rate']:.0%}){timing}")
+
+    # --- HTTP connection reuse (pool shared by every session in this process)
+    with st.sidebar.expander("🔌 Connections"):
+        pool = get_pool_stats().stats()
+        versions = " · ".join(f"{v} {n}" for v, n in pool["http_versions"].items())
+        st.caption(f"Requests {pool['requests']} · New connections {pool['new_connections']} "
+                   f"(avg {pool['avg_connect_ms']} ms) · Reused {pool['reuse_rate']:.0%}"
+                   + (f" · {versions}" if versions else ""))
+
     # --- Inputs
-    country   = st.selectbox("🌐 Target Country", list(COUNTRY_RULES))
-    copy_type = st.selectbox("Copy Type", ["📧 Email", "📝 Sales Page"])
-    length_choice = st.selectbox("Desired Length", list(LENGTH_RULES))
+    country   = st.selectbox("🌐 Target Country", list(COUNTRY_RULES), key="gen_country")
+    copy_type = st.selectbox("Copy Type", COPY_TYPES, key="gen_copy_type")
+    length_choice = st.selectbox("Desired Length", list(LENGTH_RULES), key="gen_length")
     st.session_state.length_choice = length_choice
 
     st.subheader("Campaign Brief")
-    hook    = st.text_area("🪝 Campaign Hook")
-    details = st.text_area("📦 Product / Offer Details")
+    hook    = st.text_area("🪝 Campaign Hook", key="brief_hook")
+    details = st.text_area("📦 Product / Offer Details", key="brief_details")
 
     c1, c2, c3 = st.columns(3)
-    offer_price  = c1.text_input("Special Offer Price")
-    retail_price = c2.text_input("Retail Price")
-    offer_term   = c3.text_input("Subscription Term")
+    offer_price  = c1.text_input("Special Offer Price", key="brief_offer_price")
+    retail_price = c2.text_input("Retail Price", key="brief_retail_price")
+    offer_term   = c3.text_input("Subscription Term", key="brief_offer_term")
 
-    reports         = st.text_area("📑 Included Reports")
-    stocks_to_tease = st.text_input("📈 Stocks to Tease (optional)")
+    reports         = st.text_area("📑 Included Reports", key="brief_reports")
+    stocks_to_tease = st.text_input("📈 Stocks to Tease (optional)", key="brief_stocks_to_tease")
     st.subheader("📰 Quotes or Recent News (optional)")
-    quotes_news = st.text_area("Add quotes, stats, or timely news to reference")
+    quotes_news = st.text_area("Add quotes, stats, or timely news to reference",
+                               key="brief_quotes_news")
 
     show_critique = st.checkbox("🧐 Show AI critique after draft", value=False)
+    prefetch_variants = st.checkbox("🎯 Also draft 5 alt headlines & CTAs", value=False)
+    stream_copy = st.checkbox("⚡ Stream copy as it's written", value=USE_STREAMING)
+    best_of = st.number_input("🏆 Drafts to compare (best of N)", 1, 5, BEST_OF,
+                              help="Drafts are written in parallel and scored by the local QA "
+                                   "rules; only the best is polished. Costs N drafts.")
 
     def brief():
         return {"country": country, "hook": hook, "details": details,
@@ -420,73 +217,102 @@ with tab_gen:
                 "offer_term": offer_term, "reports": reports,
                 "stocks_to_tease": stocks_to_tease, "quotes_news": quotes_news}
 
-    copy_struct = EMAIL_STRUCT if copy_type.startswith("📧") else SALES_STRUCT
-
     # ────────── Core generator ────────── #
+    def lineage():
+        """History ids the new copy may repeat: the piece it updates or forks."""
+        return tuple(i for i in (st.session_state.history_id, st.session_state.fork_of) if i)
+
     def generate(old=None):
-        prompt_core = build_prompt(copy_type, copy_struct,
-                                   trait_scores, brief(), length_choice, old)
-        user_instr = dedent("""
-        ### TASK
-        1. Create a concise INTERNAL bullet plan covering:
-           • Hook & opening flow
-           • Placement of proof, urgency, CTA
-           • Any standout stats, metaphors, social proof you intend to use
-        2. Then write the final copy.
-
-        Respond ONLY as valid JSON with exactly two keys:
-        {
-          "plan": "<the bullet outline>",
-          "copy": "<the finished marketing copy>"
-        }
-        """).strip()
-
-        msgs = [
-            {"role":"system",
-             "content": SYSTEM_PROMPT.format(country_rules=COUNTRY_RULES[country])},
-            {"role":"user",
-             "content": user_instr + "\n\n" + prompt_core}
-        ]
+        if stream_copy:
+            # ---- Streamed draft; QA starts once the copy field closes ----
+            live = st.empty()
+            with st.spinner("Crafting copy…"):
+                out = run(agenerate, copy_type, trait_scores, brief(), length_choice, old,
+                          critique=show_critique, variants=prefetch_variants,
+                          on_copy=throttled(live.markdown), best_of=best_of,
+                          exclude=lineage())
+            live.empty()
+            st.session_state.internal_plan = out["plan"]
+            st.session_state.candidates = out.get("candidates")
+            st.session_state.sections = out.get("sections")
+            if out["critique"]:
+                st.info(out["critique"])
+            st.session_state.variants = out["variants"]
+            st.session_state.qa_report = out["qa"]
+            return out["copy"]
 
         # ---- Spinner #1: draft generation -------------------
-        with st.spinner("Crafting copy…"):
-            raw_json = run_chat(msgs, expect_json=True)
-
-        try:
-            data = json.loads(raw_json)
-        except json.JSONDecodeError:
-            data = {"plan": "", "copy": raw_json}
-
-        st.session_state.internal_plan = data["plan"].strip()
-
-        # ---- Spinner #2: QA & polish ------------------------
+        longform = uses_longform(length_choice, old)
+        with st.spinner("Writing sections in parallel…" if longform else
+                        "Crafting copy…" if best_of == 1 else f"Crafting {best_of} drafts…"):
+            data = (run(alongform, copy_type, trait_scores, brief(), length_choice)
+                    if longform else
+                    run(adraft, copy_type, trait_scores, brief(), length_choice, old)
+                    if best_of == 1 else
+                    run(abest_draft, copy_type, trait_scores, brief(), length_choice, old,
+                        best_of))
+
+        st.session_state.internal_plan = data["plan"]
+        st.session_state.candidates = data.get("candidates")
+        st.session_state.sections = data.get("sections")
+
+        # ---- Spinner #2: QA, critique & variants in parallel ---
         with st.spinner("Polishing copy…"):
-            draft = self_qa(data["copy"].strip(), copy_type)
-
-            # ---- Optional critique (moved *inside* same spinner) ----
-            if show_critique:
-                crit = client.chat.completions.create(
-                    model=OPENAI_MODEL,
-                    messages=[
-                        {"role": "system", "content": "Give concise, constructive feedback."},
-                        {"role": "user", "content": f"""
-        In 3 bullets – one strength, one weakness, one improvement.
-        --- COPY ---
-        {draft}
-        --- END ---
-        """}]
-                ).choices[0].message.content
-                st.info(crit)
-        # ------------------------------------------------------------
-
-        return draft
+            out = run(apolish, data["copy"], copy_type, length_choice,
+                      critique=show_critique, variants=prefetch_variants, traits=trait_scores,
+                      handled=("length", "bullets") if longform else (), exclude=lineage(),
+                      source=brief_key(copy_type, brief(), length_choice))
+
+        if out["critique"]:
+            st.info(out["critique"])
+        st.session_state.variants = out["variants"]
+        st.session_state.qa_report = out["qa"]
+        return out["copy"]
+
+    def remember_copy(kind, parent_id):
+        st.session_state.history_id = remember(
+            kind, st.session_state.generated_copy, copy_type=copy_type, country=country,
+            length=length_choice, brief=brief(), traits=dict(trait_scores),
+            plan=st.session_state.internal_plan, variants=st.session_state.variants,
+            qa=st.session_state.qa_report, parent_id=parent_id,
+            source_hash=brief_key(copy_type, brief(), length_choice))
 
     # --- Buttons
     if st.button("✨ Generate Copy", key="gen_generate"):
-        st.session_state.generated_copy = generate()
+        with api_errors("Generation"), tracing.span("app.generate", copy_type=copy_type,
+                                                        length=length_choice):
+            st.session_state.generated_copy = generate()
+            st.session_state.copy_traits = dict(trait_scores)
+            remember_copy("generate", st.session_state.fork_of)
+        st.session_state.fork_of = None
 
     if update_traits and st.session_state.generated_copy:
-        st.session_state.generated_copy = generate(st.session_state.generated_copy)
+        if st.session_state.copy_traits is None:
+            with api_errors("Update"), tracing.span("app.update"):
+                st.session_state.generated_copy = generate(st.session_state.generated_copy)
+                st.session_state.copy_traits = dict(trait_scores)
+                remember_copy("update", st.session_state.history_id)
+        else:
+            # Only sections touched by a trait that crossed a band boundary are re‑edited
+            with st.spinner("Updating copy…"), api_errors("Update"), tracing.span("app.update"):
+                upd = run(aupdate, st.session_state.generated_copy, copy_type,
+                          st.session_state.copy_traits, trait_scores, brief(), length_choice,
+                          exclude=lineage(), variants=prefetch_variants)
+                st.session_state.generated_copy = upd["copy"]
+                st.session_state.copy_traits = dict(trait_scores)
+                if upd["mode"] == "full":
+                    st.session_state.internal_plan = upd["plan"]
+                    if upd["variants"] is not None:       # else keep the ones on screen
+                        st.session_state.variants = upd["variants"]
+                    st.session_state.candidates = st.session_state.sections = None
+                if upd["mode"] != "skipped":
+                    st.session_state.qa_report = upd["qa"]
+                    remember_copy("update", st.session_state.history_id)
+            if upd["mode"] == "skipped":
+                st.info("No trait crossed a band boundary — copy unchanged (no API call).")
+            elif upd["mode"] == "sections":
+                st.caption(f"Re‑edited: {', '.join(upd['sections'])} "
+                           f"({', '.join(n.replace('_', ' ') for n in upd['changed'])})")
 
     # --- Display & post‑gen tools
     if st.session_state.generated_copy:
@@ -496,80 +322,289 @@ with tab_gen:
         # ---------- NEW: optional chain‑of‑thought ----------------
         with st.expander("🔍 Show Internal Plan (AI outline)"):
             st.markdown(st.session_state.internal_plan or "_No plan captured_")
+            if st.session_state.sections:
+                st.caption(f"Written as {len(st.session_state.sections)} sections in parallel:")
+                st.dataframe([{"section": s["section"] + (f" ({s['part']}/{s['parts']})"
+                                                          if s["parts"] > 1 else ""),
+                               "target": s["words"], "words": s["written"],
+                               "revised": "; ".join(s["fixes"]) or "—"}
+                              for s in st.session_state.sections], hide_index=True)
+
+        qa = st.session_state.qa_report
+        for o in (qa or {}).get("overlaps") or []:
+            st.warning(f"♻️ {o['score']:.0%} of "
+                       + (f"exemplar “{o['text']}” ({o['ref']}) reappears in this copy"
+                          if o["source"] == "exemplar" else
+                          f"this copy already appears in saved piece {o['ref']} “{o['text']}”")
+                       + " — consider rewording.")
+        if qa:
+            with st.expander(f"🧪 QA checks — {'all passed' if qa['passed'] else 'auto‑fixed: ' + ', '.join(qa['failed'])}"):
+                st.caption(f"{len(qa['checks'])} local checks in {qa['elapsed_ms']} ms")
+                for v in qa["violations"]:
+                    st.markdown(f"- **{v['check']}** — {v['fix']}")
+                if st.session_state.candidates:
+                    st.caption(f"Best of {len(st.session_state.candidates)} drafts "
+                               "(local score, 0 = clean):")
+                    st.dataframe([{"draft": i + 1, "score": c["score"], "words": c["words"],
+                                   "failed": ", ".join(c["failed"]) or "—",
+                                   "chosen": "✅" if c["chosen"] else ""}
+                                  for i, c in enumerate(st.session_state.candidates)],
+                                 hide_index=True)
         # ----------------------------------------------------------
 
         st.code(st.session_state.generated_copy, language="markdown")
 
         # variant grid
         if st.button("🎯 Generate 5 Alt Headlines & CTAs", key="gen_variants"):
-            with st.spinner("Brainstorming variants…"):
-                variants = generate_variants(st.session_state.generated_copy)
+            with st.spinner("Brainstorming variants…"), api_errors("Variants"), \
+                    tracing.span("app.variants"):
+                st.session_state.variants = generate_variants(st.session_state.generated_copy)
 
+        variants = st.session_state.variants
+        if variants:
             st.subheader("📰 Headline Ideas")
             cols = st.columns(5)
-            for i, text in enumerate(variants["headlines"]):
+            for i, text in enumerate(variants["headlines"][:5]):
                 with cols[i]:
                     st.markdown(f"**{i+1}.** {text}")
                     st.radio(f"head_{i}", ["👍", "👎"], horizontal=True, label_visibility="collapsed")
 
             st.subheader("🔘 CTA Button Ideas")
             cols = st.columns(5)
-            for i, text in enumerate(variants["ctas"]):
+            for i, text in enumerate(variants["ctas"][:5]):
                 with cols[i]:
                     st.markdown(f"**{i+1}.** {text}")
                     st.radio(f"cta_{i}", ["👍", "👎"], horizontal=True, label_visibility="collapsed")
 
-        col1, col2 = st.columns(2)
-        if col1.button("💾 Save DOCX", key="gen_save"):
-            doc = Document(); doc.add_paragraph(st.session_state.generated_copy)
-            buf = BytesIO(); doc.save(buf); buf.seek(0)
-            st.download_button("📥 Download DOCX", buf, "mf_copy.docx",
-                               mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                               key="gen_download")
-        if col2.button("🗑️ Clear", key="gen_clear"):
+        col1, col2, col3 = st.columns([1, 2, 2])
+        fmt = col1.selectbox("Format", list(export.FORMATS), format_func=str.upper,
+                             key="gen_format", label_visibility="collapsed")
+        download(f"💾 Save {fmt.upper()}", st.session_state.generated_copy, fmt, "mf_copy",
+                 "gen_download", col2)
+        if col3.button("🗑️ Clear", key="gen_clear"):
             st.session_state.generated_copy = ""
             st.session_state.internal_plan = ""
-            st.experimental_rerun()
+            st.session_state.variants = None
+            st.session_state.qa_report = None
+            st.session_state.copy_traits = None
+            st.session_state.candidates = None
+            st.session_state.sections = None
+            st.session_state.history_id = None
+            st.rerun()
+
+    # --- A/B trait sweep: one brief × a grid of trait bands
+    with st.expander("🧪 A/B Trait Sweep"):
+        st.caption("Unswept traits keep the sidebar settings. Cells the 3‑band rules can't "
+                   "tell apart share one prompt, so each unique prompt is generated once.")
+        swept = st.multiselect("Traits to sweep", list(TRAIT_DEFAULTS), max_selections=3,
+                               format_func=lambda n: n.replace("_", " "), key="sweep_traits")
+        grid = {name: st.multiselect(name.replace("_", " "), sweep.BANDS, ["low", "high"],
+                                     key=f"sweep_{name}") for name in swept}
+        grid = {name: levels for name, levels in grid.items() if levels}
+        if grid:
+            planned = sweep.plan(copy_type, trait_scores, brief(), length_choice, grid)
+            n_cells, n_prompts = len(planned["cells"]), len(planned["prompts"])
+            if st.button(f"🧪 Run Sweep — {n_cells} cells → {n_prompts} generations",
+                         key="sweep_run"):
+                with st.spinner(f"Generating {n_prompts} variants…"), api_errors("Sweep"), \
+                        tracing.span("app.sweep", cells=n_cells, prompts=n_prompts):
+                    result = run(sweep.asweep, copy_type, trait_scores, brief(),
+                                 length_choice, grid, best_of=best_of)
+                    share = {k: v / n_prompts if k == "cost_usd" else v // n_prompts
+                             for k, v in tracing.totals().items()}
+                for pid, p in result["prompts"].items():
+                    if p.get("error"):
+                        st.error(f"{pid} failed — {p['error']}")
+                    else:
+                        remember("generate", p["copy"], usage=share, copy_type=copy_type,
+                                 country=country, length=length_choice, brief=brief(),
+                                 traits=p["traits"], plan=p["plan"], qa=p["qa"],
+                                 source_hash=brief_key(copy_type, brief(), length_choice))
+                st.session_state.sweep_result = result
+
+        result = st.session_state.sweep_result
+        if result:
+            table = sweep.grid(result)
+            st.dataframe([dict(zip(table[0], row)) for row in table[1:]], hide_index=True)
+            for pid, tab in zip(result["prompts"], st.tabs(list(result["prompts"]))):
+                with tab:
+                    p = result["prompts"][pid]
+                    st.caption(" | ".join(" · ".join(f"{n.replace('_', ' ')} {v}"
+                                                     for n, v in c["levels"].items())
+                                          for c in result["cells"] if c["prompt"] == pid))
+                    st.markdown(p.get("copy") or f"_Failed — {p.get('error')}_")
+
+            def matrix_csv(r=result):
+                buf = io.StringIO()
+                sweep.write_matrix(r, buf, "csv")
+                return buf.getvalue().encode("utf-8-sig")      # Excel reads the emoji
+
+            c1, c2 = st.columns(2)
+            c1.download_button("📊 Test Matrix (CSV)", matrix_csv, "mf_sweep_matrix.csv",
+                               "text/csv", key="sweep_csv")
+            c2.download_button("🗂️ Every Cell (DOCX ZIP)",
+                               lambda r=result: b"".join(export.iter_zip(sweep.fan_out(r))),
+                               "mf_sweep.zip", "application/zip", key="sweep_zip")
 
 # ────────────────────────────────────────────────────────────
-# 9.  UI – Adapt tab
+# 5.  UI – Adapt tab
 # ────────────────────────────────────────────────────────────
 with tab_adapt:
-    st.markdown("### Paste the original copy and select a **target country**.")
+    st.markdown("### Paste the original copy and select one or more **target countries**.")
     original_text = st.text_area("Original Copy", height=250)
 
     colA, colB = st.columns(2)
     source_c = colA.selectbox("Original Country", list(COUNTRY_RULES))
-    target_c = colB.selectbox("Target Country",
-                              [c for c in COUNTRY_RULES if c != source_c])
-
-    if st.button("🌐 Adapt Copy", key="adapt_button") and original_text.strip():
-        msgs = [
-            {"role":"system",
-             "content": SYSTEM_PROMPT.format(country_rules=COUNTRY_RULES[target_c])},
-            {"role":"user",
-             "content": (
-                 f"Adapt the following marketing copy for a {target_c} audience.\n"
-                 "Update spelling, currency, market references; preserve tone & structure.\n\n"
-                 "--- ORIGINAL COPY START ---\n"
-                 f"{original_text}\n"
-                 "--- ORIGINAL COPY END ---\n"
-                 "### END INSTRUCTIONS"
-             )}
-        ]
-        with st.spinner("Adapting…"):
-            st.session_state.adapted_copy = run_chat(msgs)
-
-    if st.session_state.adapted_copy:
+    others = [c for c in COUNTRY_RULES if c != source_c]
+    targets = colB.multiselect("Target Countries", others, default=others[:1])
+    depth = st.radio("Adaptation", ["🤖 Rules + AI tone pass", "⚡ Rules only (instant, no API call)"],
+                     horizontal=True)
+    mode = "only" if depth.startswith("⚡") else "prepass"
+    src = (source_hash(original_text), mode)
+    adaptations = st.session_state.adaptations        # {((source_hash, mode), country): copy}
+
+    if st.button("🌐 Adapt Copy", key="adapt_button") and original_text.strip() and targets:
+        # One concurrent call per market; markets already adapted from this source are skipped
+        todo = [t for t in targets if (src, t) not in adaptations]
+        if not todo:
+            st.info("Every selected market is already adapted from this copy (no API call).")
+        else:
+            with st.spinner(f"Adapting into {len(todo)} market{'s' if len(todo) > 1 else ''}…"), \
+                    tracing.span("app.adapt", source=source_c, targets=",".join(todo)):
+                results = run(aadapt_markets, original_text, todo,
+                              source_c=source_c, mode=mode)
+                # The markets ran concurrently, so the run's usage is shared out evenly
+                share = {k: v / len(todo) if k == "cost_usd" else v // len(todo)
+                         for k, v in tracing.totals().items()}
+            for country, out in results.items():
+                if isinstance(out, LLMError):
+                    st.error(f"Adaptation for {country} failed — {out}")
+                else:
+                    adaptations[src, country] = out
+                    remember("adapt", out, usage=share, country=country,
+                             source_hash=src[0])
+
+    ready = [t for t in targets if (src, t) in adaptations]
+    if ready:
         st.subheader("🌐 Adapted Copy")
-        st.markdown(st.session_state.adapted_copy)
-
-        b1, b2 = st.columns(2)
-        if b1.button("💾 Save DOCX", key="adapt_save"):
-            doc = Document(); doc.add_paragraph(st.session_state.adapted_copy)
-            buf = BytesIO(); doc.save(buf); buf.seek(0)
-            st.download_button("📥 Download DOCX", buf, "mf_adapted.docx",
-                               mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                               key="adapt_download")
-        if b2.button("🗑️ Clear Adapted", key="adapt_clear"):
-            st.session_state.adapted_copy = ""
+        for country, tab in zip(ready, st.tabs(ready)):
+            with tab:
+                st.markdown(adaptations[src, country])
+                local = localise(original_text, country, source_c)
+                with st.expander(f"🔤 Rule‑based changes — {local.summary()}"):
+                    for c in local.changes:
+                        st.markdown(f"- *{c.kind}* · {c.before} → **{c.after}**"
+                                    + (f" ×{c.count}" if c.count > 1 else ""))
+                col1, col2 = st.columns([1, 4])
+                fmt = col1.selectbox("Format", list(export.FORMATS), format_func=str.upper,
+                                     key=f"adapt_format_{country}", label_visibility="collapsed")
+                download(f"💾 Save {fmt.upper()}", adaptations[src, country], fmt,
+                         f"mf_adapted_{export.slug(country)}", f"adapt_download_{country}", col2)
+        if st.button("🗑️ Clear Adapted", key="adapt_clear"):
+            st.session_state.adaptations = {}
+
+# ────────────────────────────────────────────────────────────
+# 6.  UI – History tab  (recall / fork past results, no API call)
+# ────────────────────────────────────────────────────────────
+with tab_hist:
+    if not HISTORY_ENABLED:
+        st.caption("History is switched off (MF_COPY_HISTORY=off).")
+    else:
+        history = get_history()
+        query = st.text_input("🔎 Search hooks, briefs, plans and copy", key="hist_query")
+        f1, f2, f3, f4 = st.columns(4)
+        filters = {"country":   f1.multiselect("Country", list(COUNTRY_RULES), key="hist_country"),
+                   "copy_type": f2.multiselect("Copy Type", COPY_TYPES, key="hist_type"),
+                   "kind":      f3.multiselect("Kind", KINDS, key="hist_kind")}
+        days = f4.selectbox("Saved", [None, 1, 7, 30, 90], key="hist_days",
+                            format_func=lambda d: "any time" if d is None else f"last {d} days")
+        if days:
+            filters["since"] = time.time() - days * 86400
+
+        t0 = time.perf_counter()
+        rows = history.search(query, limit=100, **filters)
+        totals = history.stats()
+        st.caption(f"{len(rows)}{'+' if len(rows) == 100 else ''} shown · {totals['pieces']} stored "
+                   f"(${totals['cost_usd']:.2f} of API calls) · "
+                   f"{(time.perf_counter() - t0) * 1000:.0f} ms")
+
+        if rows:
+            st.dataframe([{"id": r["id"],
+                           "saved": time.strftime("%Y-%m-%d %H:%M", time.localtime(r["created"])),
+                           "kind": r["kind"], "country": r["country"], "type": r["copy_type"],
+                           "words": r["words"], "title": r["title"],
+                           "match": (r["snippet"] or "").replace("**", "")}
+                          for r in rows], hide_index=True)
+            by_id = {r["id"]: r for r in rows}
+
+            z1, z2 = st.columns([2, 3])
+            formats = z1.multiselect("ZIP formats", list(export.FORMATS), default=["docx"],
+                                     format_func=str.upper, key="hist_formats",
+                                     label_visibility="collapsed") or ["docx"]
+            ids = list(by_id)
+
+            def bulk_zip():
+                """Every listed piece → ZIP in a temp file, loaded and written one at a time."""
+                with tracing.span("export.zip", pieces=len(ids), formats=",".join(formats)):
+                    out = tempfile.TemporaryFile()
+                    export.write_zip(export.history_pieces(ids, history), out, formats)
+                    out.seek(0)
+                return out
+
+            z2.download_button(f"📦 Export these {len(rows)} as ZIP", bulk_zip,
+                               "mf_copy_history.zip", "application/zip", key="hist_zip")
+            pick = st.selectbox("Piece", list(by_id), key="hist_pick",
+                                format_func=lambda i: f"#{i} · {by_id[i]['kind']} · "
+                                                      f"{by_id[i]['country'] or '—'} · {by_id[i]['title']}")
+            piece = history.get(pick)
+            if piece:
+                cost = piece["cost_usd"]
+                st.caption(f"{piece['copy_type'] or 'adaptation'} · {piece['length'] or '—'} · "
+                           f"{piece['words']} words · {piece['model'] or '—'} · "
+                           f"{piece['prompt_tokens'] + piece['completion_tokens']} tokens"
+                           + (f" (${cost:.4f})" if cost else "")
+                           + (f" · from #{piece['parent_id']}" if piece["parent_id"] else ""))
+                with st.expander("📄 Copy", True):
+                    st.markdown(piece["copy"])
+                if piece["brief"]:
+                    with st.expander("🪝 Brief & traits"):
+                        st.json({"brief": piece["brief"], "traits": piece["traits"]})
+
+                h1, h2, h3 = st.columns(3)
+                if h1.button("📂 Open in editor", key="hist_open"):
+                    open_piece(piece)
+                    st.session_state.fork_of = None
+                    st.rerun()
+                if h2.button("🍴 Fork brief", key="hist_fork",
+                             help="Open it and load its brief, settings and traits into the "
+                                  "Generate tab; the next Generate is saved as a fork of it."):
+                    open_piece(piece)
+                    st.session_state.fork_of = piece["id"]
+                    st.session_state.pending_fork = piece
+                    st.rerun()
+                if h3.button("🗑️ Delete", key="hist_delete"):
+                    history.delete(piece["id"])
+                    st.rerun()
+
+# ────────────────────────────────────────────────────────────
+# 7.  Sidebar – last run trace (drawn last so it includes this rerun)
+# ────────────────────────────────────────────────────────────
+with st.sidebar.expander("⏱️ Last Run Trace"):
+    last = tracing.last_run()
+    if not last:
+        st.caption("No traced runs yet.")
+    else:
+        root = last[0]
+        st.caption(f"Run `{root.trace_id[:12]}` · {root.name} · {root.wall_ms:,.0f} ms · "
+                   f"est. ${root.attributes.get('cost_usd') or 0:.4f}")
+        st.dataframe([{
+            "stage":    "· " * depth + s.name + ("" if s.status == "ok" else " ⚠️"),
+            "ms":       s.wall_ms,
+            "ttft ms":  s.attributes.get("ttft_ms"),
+            "tokens":   (f"{s.attributes['prompt_tokens']} in ({s.attributes.get('cached_tokens', 0)} "
+                         f"cached) / {s.attributes.get('completion_tokens', 0)} out"
+                         if "prompt_tokens" in s.attributes else
+                         "cache hit" if s.attributes.get("cache_hit") else ""),
+            "attempts": s.attributes.get("attempts"),
+            "$":        s.attributes.get("cost_usd"),
+        } for depth, s in tracing.tree(last)], hide_index=True)
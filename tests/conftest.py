@@ -0,0 +1,29 @@
+# Offline defaults for the suite: no history / cache files, no rate limit.
+# Tests that need the API take the `fake_api` fixture (mf_copy.fake_openai).
+import os, sys
+
+os.environ.setdefault("MF_COPY_HISTORY", "off")
+os.environ.setdefault("MF_COPY_CACHE", "off")
+os.environ.setdefault("MF_COPY_TPM", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+@pytest.fixture(scope="session")
+def fake_api():
+    """In‑process OpenAI stand‑in with the engine pointed at it → the server."""
+    from mf_copy import engine
+    from mf_copy.fake_openai import serve_in_thread
+    srv = serve_in_thread(ttft=0.0, token_latency=0.0)
+    engine.configure(api_key="test", base_url=srv.base_url)
+    yield srv
+    srv.shutdown()
+
+@pytest.fixture(autouse=True)
+def _keep_engine_settings():
+    """CLI entry points call engine.configure() — put the fake_api binding back."""
+    from mf_copy import engine
+    settings, model = dict(engine._SETTINGS), engine.OPENAI_MODEL
+    yield
+    engine.OPENAI_MODEL = model
+    engine.configure(**settings)
@@ -0,0 +1,47 @@
+import pytest
+
+from mf_copy import api
+from mf_copy.engine import TRAIT_DEFAULTS
+
+REQ = {"hook": "AI boom", "details": "Three chip stocks", "copy_type": "sales",
+       "length": "long", "country": "uk", "traits": {"urgency": 9}}
+
+def test_normalise_accepts_fragments_and_fills_defaults():
+    n = api.normalise(REQ)
+    assert (n["copy_type"], n["length"], n["brief"]["country"]) == \
+        ("📝 Sales Page", "📖 Long (500–1500 words)", "United Kingdom")
+    assert n["traits"] == {**TRAIT_DEFAULTS, "Urgency": 9}
+    nested = api.normalise({"brief": {"hook": "AI boom"}})
+    assert (nested["copy_type"], nested["brief"]["country"]) == ("📧 Email", "Australia")
+
+@pytest.mark.parametrize("req", [
+    [], {}, {"hook": "x", "brief": "AI boom"}, {"hook": "x", "country": "Mars"},
+    {"hook": "x", "traits": {"Urgency": 11}}, {"hook": "x", "traits": ["Urgency"]},
+    {"hook": "x", "best_of": 0}, {"hook": "x", "length": "o"}])
+def test_bad_requests_are_request_errors(req):
+    with pytest.raises(api.RequestError):
+        api.normalise(req)
+
+def test_prompt_needs_no_api_call():
+    out = api.run("prompt", {"hook": "AI boom", "details": "Three chip stocks"})
+    assert [m["role"] for m in out["messages"]] == ["system", "user"]
+    assert "AI boom" in out["messages"][-1]["content"] and out["max_tokens"] > 0
+
+def test_check_only_qa_and_sweep_plan_stay_local():
+    out = api.run("qa", {"copy": "Too short.", "fix": False})
+    assert not out["changed"] and not out["qa"]["passed"]
+    plan = api.run("sweep", {"hook": "AI boom", "grid": {"urgency": ["low", "high"]},
+                             "dry_run": True})
+    assert len(plan["cells"]) == 2
+    for bad in ({"copy": ""}, {"copy": "x", "n": 0}):
+        with pytest.raises(api.RequestError):
+            api.run("variants", bad)
+    with pytest.raises(api.RequestError):
+        api.run("nope", {})
+
+def test_generate_and_adapt(fake_api):
+    out = api.generate({"hook": "AI boom", "details": "Three chip stocks"})
+    assert out["copy"] and out["qa"] is not None
+    adapted = api.adapt({"copy": out["copy"], "targets": "uk, us"})
+    assert set(adapted) == {"United Kingdom", "United States"}
+    assert all("copy" in r for r in adapted.values())
@@ -0,0 +1,66 @@
+import asyncio, json
+
+import pytest
+
+from mf_copy import batch
+from mf_copy.engine import COUNTRY_RULES, LENGTH_RULES
+
+SHORT, LONG = "📏 Short (100–200 words)", "📖 Long (500–1500 words)"
+ROWS = [{"id": "b1", "hook": "AI boom", "details": "Chip stocks", "country": "us"},
+        {"hook": "Dividends", "details": "Bank shares", "length": "Medium"}]
+
+def test_pick_resolves_fragments_and_aliases():
+    assert batch._pick(LENGTH_RULES, "Short,Long", "length") == [SHORT, LONG]
+    assert batch._pick(COUNTRY_RULES, "us, uk,us", "country") == ["United States",
+                                                                  "United Kingdom"]
+    assert batch._pick(COUNTRY_RULES, "all", "country") == list(COUNTRY_RULES)
+    assert batch._pick(COUNTRY_RULES, None, "country") == []
+    for bad in ("o", "Nowhere"):
+        with pytest.raises(SystemExit):
+            batch._pick(LENGTH_RULES, bad, "length")
+
+def test_expand_jobs_uses_row_values_unless_overridden():
+    presets = {"default": {}, "calm": {"Urgency": 2}}
+    jobs = batch.expand_jobs(ROWS, presets)
+    assert [(j["brief_id"], j["country"], j["length"], j["preset"]) for j in jobs] == [
+        ("b1", "United States", SHORT, "default"), ("b1", "United States", SHORT, "calm"),
+        ("brief2", "Australia", "📐 Medium (200–500 words)", "default"),
+        ("brief2", "Australia", "📐 Medium (200–500 words)", "calm")]
+    assert jobs[0]["brief"]["country"] == "United States"
+    assert len({j["job_id"] for j in jobs}) == 4
+    wide = batch.expand_jobs(ROWS, presets, countries=["Canada"], lengths=[SHORT, LONG])
+    assert len(wide) == 8 and {j["country"] for j in wide} == {"Canada"}
+    assert batch.expand_jobs(ROWS, presets) == jobs                 # stable ids for resume
+
+def test_completed_ids_skip_errors_and_torn_lines(tmp_path):
+    out = tmp_path / "results.jsonl"
+    out.write_text('{"job_id": "a", "status": "ok"}\n{"job_id": "b", "status": "error"}\n'
+                   '{"job_id": "c", "sta')
+    assert batch.completed_ids(out) == {"a"}
+    assert batch.completed_ids(tmp_path / "missing.jsonl") == set()
+
+def test_pacer_backs_off_and_recovers():
+    p = batch.Pacer(60)
+    p.failed(); p.failed()
+    assert p.interval == 4.0
+    for _ in range(20):
+        p.succeeded()
+    assert p.interval == p.base == 1.0
+
+def test_run_batch_appends_one_line_per_job(fake_api, tmp_path):
+    jobs = batch.expand_jobs(ROWS[:1], {"default": {}, "calm": {"Urgency": 2}})
+    out = tmp_path / "results.jsonl"
+    counts = asyncio.run(batch.run_batch(jobs, out, workers=2, per_minute=0, log=lambda m: None))
+    recs = [json.loads(l) for l in out.read_text().splitlines()]
+    assert counts == {"ok": 2, "error": 0}
+    assert {r["job_id"] for r in recs} == {j["job_id"] for j in jobs}
+    assert all(r["status"] == "ok" and r["copy"] for r in recs)
+
+def test_dry_run_lists_jobs(tmp_path, capsys):
+    briefs = tmp_path / "briefs.csv"
+    briefs.write_text("id,hook,details\nb1,AI boom,Chip stocks\n")
+    assert batch.main([str(briefs), "-o", str(tmp_path / "out.jsonl"), "--dry-run",
+                       "--countries", "uk,ca", "--lengths", "Short,Long"]) == 0
+    jobs = [json.loads(l) for l in capsys.readouterr().out.splitlines()]
+    assert [(j["country"], j["length"]) for j in jobs] == [
+        ("United Kingdom", SHORT), ("United Kingdom", LONG), ("Canada", SHORT), ("Canada", LONG)]
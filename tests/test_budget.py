@@ -0,0 +1,58 @@
+import warnings
+
+import pytest
+
+from mf_copy import api, engine
+from mf_copy.budget import (FIXED_BUDGETS, MIN_OUTPUT, TRIM_MARK, ContextOverflowError,
+                            ContextOverflowWarning, context_window, count_tokens,
+                            embedded_copy, fit_context, message_tokens, output_budget,
+                            words_budget)
+
+pytestmark = pytest.mark.filterwarnings("ignore::mf_copy.budget.TokenEstimateWarning")
+
+def rewrite(copy):
+    return [{"role": "system", "content": "You edit copy."},
+            {"role": "user", "content": f"Tighten it.\n### ORIGINAL COPY\n{copy}\n### END ORIGINAL"}]
+
+def test_counting_and_windows():
+    assert count_tokens("") == 0 < count_tokens("hello") < count_tokens("hello there, world")
+    assert message_tokens([]) < message_tokens(rewrite("x"))
+    assert context_window("gpt-4o-2024-08-06") == 128_000
+    assert context_window("gpt-4-32k-0613") == 32_768 and context_window("gpt-4") == 8_192
+    assert context_window("something-else") == 128_000
+
+def test_embedded_copy_is_found_in_the_last_user_message():
+    assert embedded_copy(rewrite("The piece.")) == "The piece."
+    assert embedded_copy([{"role": "user", "content": "no markers"}]) == ""
+
+def test_output_budgets_by_call_type():
+    assert output_budget("qa") == FIXED_BUDGETS["qa"]
+    assert output_budget("draft", bounds=(100, 200)) > words_budget((100, 200))
+    assert words_budget((500, None)) == words_budget((500, 750))       # open‑ended → 1.5× floor
+    short, long = (output_budget("rewrite", rewrite("word " * n)) for n in (50, 2000))
+    assert MIN_OUTPUT <= short < long
+    assert output_budget("chat", ceiling=1234) == 1234
+
+def test_fit_context_passes_small_prompts_through():
+    msgs = rewrite("Short copy.")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", ContextOverflowWarning)
+        assert fit_context(msgs, 500, "gpt-4") == (msgs, 500)
+
+def test_fit_context_trims_the_embedded_copy():
+    msgs = rewrite("First line. " + "filler words here " * 5000 + "Last line.")
+    with pytest.warns(ContextOverflowWarning):
+        out, budget = fit_context(msgs, 2000, "gpt-4")
+    copy = embedded_copy(out)
+    assert TRIM_MARK in copy and copy.startswith("First line.") and copy.endswith("Last line.")
+    assert message_tokens(out, "gpt-4") + budget <= context_window("gpt-4")
+
+def test_fit_context_raises_when_nothing_can_be_trimmed():
+    msgs = [{"role": "user", "content": "word " * 20_000}]
+    with pytest.raises(ContextOverflowError):
+        fit_context(msgs, 500, "gpt-4")
+
+def test_overflow_is_a_bad_request_in_the_api(monkeypatch):
+    monkeypatch.setattr(engine, "OPENAI_MODEL", "gpt-4")
+    with pytest.raises(api.RequestError, match="no room"):
+        api.run("prompt", {"hook": "AI boom", "details": "chip stocks " * 20_000})
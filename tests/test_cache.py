@@ -0,0 +1,66 @@
+import pytest
+
+from mf_copy import cache, engine
+from mf_copy.cache import ResponseCache, cache_key, is_cacheable
+
+MSGS = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "Café\r\n"}]
+
+@pytest.fixture
+def store():
+    return ResponseCache(":memory:", ttl=60, mem_items=2, disk_items=3)
+
+def test_key_is_canonical():
+    decomposed = [MSGS[0], {"content": "Café\n  ", "role": "user", "name": "x"}]
+    assert cache_key("m", MSGS) == cache_key("m", decomposed)
+    assert cache_key("m", MSGS, max_tokens=None) == cache_key("m", MSGS)
+    assert cache_key("m", MSGS, max_tokens=100) != cache_key("m", MSGS)
+    assert cache_key("other", MSGS) != cache_key("m", MSGS)
+
+def test_sampled_calls_bypass(monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_ENABLED", True)
+    assert is_cacheable() and is_cacheable(n=1)
+    assert not is_cacheable(temperature=0.8) and not is_cacheable(temperature=0)
+    assert not is_cacheable(n=3)
+    monkeypatch.setattr(cache, "CACHE_ENABLED", False)
+    assert not is_cacheable()
+
+def test_ttl_expiry(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    store.put("k", "v")
+    now[0] += 59
+    assert store.get("k") == "v"
+    now[0] += 2
+    assert store.get("k") is None
+    assert store.stats()["misses"] == 1
+
+def test_lru_falls_back_to_disk(store):
+    for k in "abc":
+        store.put(k, k.upper())
+    assert list(store._mem) == ["b", "c"]
+    assert store.get("a") == "A"                       # evicted from memory, still on disk
+    assert store.counters["disk_hits"] == 1 and list(store._mem) == ["c", "a"]
+    assert store.get("a") == "A" and store.counters["mem_hits"] == 1
+
+def test_disk_eviction_keeps_most_recent(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    for k in "abcde":
+        now[0] += 1
+        store.put(k, k)
+    store.evict()
+    assert store.stats()["disk_items"] == 3 and store.counters["evictions"] == 2
+    store._mem.clear()
+    assert [store.get(k) for k in "abcde"] == [None, None, "c", "d", "e"]
+
+def test_run_chat_serves_repeats_but_not_sampled_calls(fake_api, store, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_ENABLED", True)
+    monkeypatch.setattr(engine, "get_cache", lambda: store)
+    msgs = [{"role": "user", "content": "Say hi (cache test)."}]
+    before = fake_api.stats.requests
+    first = engine.run_chat(msgs, max_tokens=50)
+    assert engine.run_chat(msgs, max_tokens=50) == first
+    assert fake_api.stats.requests == before + 1
+    engine.run_chat(msgs, max_tokens=50, temperature=0.7)
+    engine.run_chat(msgs, max_tokens=50, temperature=0.7)
+    assert fake_api.stats.requests == before + 3
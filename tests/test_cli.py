@@ -0,0 +1,32 @@
+import json
+
+from mf_copy import cli
+
+def brief(tmp_path, **fields):
+    path = tmp_path / "brief.json"
+    path.write_text(json.dumps({"hook": "AI boom", "details": "Three chip stocks", **fields}))
+    return str(path)
+
+def test_prompt_prints_the_messages(tmp_path, capsys):
+    assert cli.main(["prompt", "--brief", brief(tmp_path), "--country", "uk"]) == 0
+    out = capsys.readouterr().out
+    assert out.startswith("### system") and "British English" in out
+
+def test_bad_input_exits_2(tmp_path, capsys):
+    assert cli.main(["prompt", "--brief", str(tmp_path / "missing.json")]) == 2
+    assert cli.main(["prompt", "--brief", brief(tmp_path, brief="AI boom")]) == 2
+    assert cli.main(["prompt", "--brief", brief(tmp_path), "--length", "o"]) == 2
+    assert capsys.readouterr().err.count("error:") == 3
+
+def test_check_only_qa_as_json(tmp_path, capsys):
+    copy = tmp_path / "copy.md"
+    copy.write_text("Too short.")
+    assert cli.main(["qa", str(copy), "--check-only", "--json"]) == 0
+    out = json.loads(capsys.readouterr().out)
+    assert out["copy"] == "Too short." and not out["qa"]["passed"]
+
+def test_generate_writes_the_copy(fake_api, tmp_path):
+    out = tmp_path / "copy.md"
+    assert cli.main(["generate", "--brief", brief(tmp_path), "--api-key", "test",
+                     "--base-url", fake_api.base_url, "-o", str(out)]) == 0
+    assert out.read_text().strip()
@@ -0,0 +1,59 @@
+import asyncio
+
+from mf_copy import batch, clients, engine, llm_async
+
+URL = "http://127.0.0.1:9/v1"
+
+async def _client(key="a"):
+    return clients.get_async_client(api_key=key, base_url=URL)
+
+def bound():
+    return engine._SETTINGS["api_key"], engine._SETTINGS["base_url"]
+
+def test_sync_clients_are_pooled_and_closed_on_change():
+    a = clients.get_client(api_key="a", base_url=URL)
+    assert clients.get_client(api_key="a", base_url=URL) is a
+    b = clients.get_client(api_key="b", base_url=URL)
+    clients.close_clients(keep=("b", URL))
+    assert a.is_closed() and not b.is_closed()
+    clients.close_clients(keep=bound())
+    assert b.is_closed()
+
+def test_stale_async_clients_on_the_shared_loop_are_closed():
+    a = llm_async.run(_client)
+    assert llm_async.run(_client) is a                      # one per loop and key
+    clients.close_clients(keep=bound())
+    llm_async.run(asyncio.sleep, 0)                         # let the close run
+    assert a.is_closed() and llm_async.run(_client) is not a
+    clients.close_clients(keep=bound())
+
+def test_private_loop_clients_close_before_it_ends():
+    async def main():
+        c = await _client()
+        await clients.aclose_clients()
+        return c, asyncio.get_running_loop() in clients._ASYNC
+    c, pooled = asyncio.run(main())
+    assert c.is_closed() and not pooled
+
+def test_batch_run_closes_its_loop_clients(fake_api, tmp_path, monkeypatch):
+    made = []
+    def spy(**kw):
+        made.append(get(**kw))
+        return made[-1]
+    get = clients.get_async_client
+    monkeypatch.setattr(clients, "get_async_client", spy)
+    briefs = tmp_path / "briefs.csv"
+    briefs.write_text("id,hook,details\nb1,AI boom,Chip stocks\n")
+    engine.configure(api_key="test", base_url=fake_api.base_url)
+    monkeypatch.setattr(engine, "configure", lambda **kw: None)   # keep the fake_api binding
+    assert batch.main([str(briefs), "-o", str(tmp_path / "out.jsonl"),
+                       "--per-minute", "0"]) == 0
+    assert made and all(c.is_closed() for c in made)
+
+def test_pool_stats_count_reused_connections(fake_api):
+    stats = clients.get_pool_stats()
+    stats.clear()
+    for _ in range(3):
+        engine.run_chat([{"role": "user", "content": "Hi"}], use_cache=False, max_tokens=16)
+    s = stats.stats()
+    assert s["requests"] == 3 and s["reused"] >= 2 and 0 < s["reuse_rate"] <= 1
@@ -0,0 +1,61 @@
+import io, zipfile
+
+import pytest
+
+from mf_copy import export
+from mf_copy.export import blocks, render, spans, title_of
+
+COPY = ("### Subject Line\nThe **AI boom** is *here*\n\n- one\n  - nested\n1. first\n---\n"
+        "See [our report](https://fool.com/report).\n\n"
+        "*Past performance is not a reliable indicator of future results.*")
+
+def test_blocks_and_spans():
+    assert [(b.kind, b.level) for b in blocks(COPY)] == [
+        ("heading", 3), ("para", 0), ("bullet", 0), ("bullet", 1), ("number", 0),
+        ("rule", 0), ("para", 0), ("disclaimer", 0)]
+    assert spans("**a *b* c**") == [("a ", True, False, None), ("b", True, True, None),
+                                    (" c", True, False, None)]
+    assert title_of(COPY) == "The AI boom is here"
+
+def test_links_keep_balanced_parentheses():
+    url = "https://en.wikipedia.org/wiki/Moat_(economics)"
+    assert spans(f"a [moat]({url}).") == [("a ", False, False, None), ("moat", False, False, url),
+                                          (".", False, False, None)]
+
+@pytest.mark.parametrize("url", ["javascript:alert(1)", "JavaScript:alert(1)",
+                                 "data:text/html,<script>x</script>", "vbscript:x"])
+def test_html_links_only_for_web_and_mail(url):
+    out = render(f"[here]({url})", "html", cache=False).decode()
+    assert "<a " not in out and "<script>" not in out and "here (" in out
+
+def test_html_and_text_renderings():
+    out = render(COPY, "html", cache=False).decode()
+    assert "<title>The AI boom is here</title>" in out
+    assert '<a href="https://fool.com/report">our report</a>' in out
+    assert '<a href="mailto:x@fool.com">' in render("[mail](mailto:x@fool.com)", "html").decode()
+    assert 'class="disclaimer"' in out and out.count("<ul>") == 1
+    text = render(COPY, "txt").decode()
+    assert text.startswith("Subject Line") and "• one" in text and "1. first" in text
+    with pytest.raises(ValueError):
+        render(COPY, "pdf")
+
+def test_docx_renders():
+    pytest.importorskip("docx")
+    assert render(COPY, "docx", cache=False)[:2] == b"PK"
+
+def test_render_cache_hits_and_size_bound():
+    cache = export.RenderCache(max_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"123456")
+    assert cache.get("a") is None and cache.get("b") == b"123456"
+    assert cache.stats() == {"hits": 1, "misses": 1, "items": 1, "bytes": 6}
+    assert render(COPY, "md") is render(COPY, "md")
+
+def test_zip_streams_members_and_manifest():
+    pieces = [{"copy": COPY, "country": "Canada"}, {"copy": ""}, {"copy": "Plain", "title": "X"}]
+    data = b"".join(export.iter_zip(pieces, ["md", "txt"], chunk=1))
+    names = zipfile.ZipFile(io.BytesIO(data)).namelist()
+    assert names == ["0001_canada_the_ai_boom_is_here.md", "0001_canada_the_ai_boom_is_here.txt",
+                     "0002_x.md", "0002_x.txt", "manifest.csv"]
+    assert export.write_zip(pieces, io.BytesIO(), ["html"]) == 2
+    assert export.slug("AI boom: 3 stocks!") == "ai_boom_3_stocks"
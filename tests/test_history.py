@@ -0,0 +1,80 @@
+import pytest
+
+from mf_copy import engine
+from mf_copy.history import COMMON_DF, History, fts_query
+from mf_copy.similarity import fingerprints
+
+BRIEF = {"hook": "AI boom", "details": "Three chip stocks"}
+PIECE = " ".join(f"Sentence {i} about chip stocks riding the AI boom with word{i} in it."
+                 for i in range(40))
+
+@pytest.fixture
+def h():
+    return History(":memory:")
+
+def test_fts_query_is_safe():
+    assert fts_query('ai boo"m OR') == '"ai" "boo" "m" "OR"*'
+    assert fts_query("  ") is None
+
+def test_save_get_and_search(h):
+    a = h.save("generate", "### Subject\nChip stocks for the AI boom", brief=BRIEF,
+               country="Australia", traits={"Urgency": 8}, qa={"passed": True})
+    b = h.save("adapt", "Dividend shares for retirees", country="Canada", parent_id=a)
+    got = h.get(a)
+    assert got["title"] == "AI boom" and got["traits"] == {"Urgency": 8}
+    assert [r["id"] for r in h.search("chip boo")] == [a]
+    assert [r["id"] for r in h.search(country="Canada")] == [b]
+    assert h.count(kind=["generate", "adapt"]) == 2 and h.count("dividend") == 1
+    assert h.delete(b) and h.get(b) is None
+    with pytest.raises(ValueError):
+        h.save("draft", "x")
+
+def test_overlaps_find_reused_copy(h):
+    pid = h.save("generate", PIECE, brief=BRIEF)
+    hits = h.overlaps("New intro line. " + PIECE)
+    assert [(o.source, o.ref) for o in hits] == [("history", f"#{pid}")]
+    assert h.overlaps("Completely unrelated words about bonds and the weather " * 5) == []
+
+def df(h):
+    return {r["hash"]: r["df"] for r in h._db.execute("SELECT hash, df FROM shingle_df")}
+
+def test_delete_takes_its_fingerprints_out_of_the_counts(h):
+    keep = h.save("generate", PIECE)
+    before = df(h)
+    gone = h.save("generate", PIECE + " One more sentence about a brand new topic here.")
+    assert h.delete(gone) and df(h) == before
+    assert not h.delete(gone)
+    h.delete(keep)
+    assert df(h) == {}
+
+def test_deleted_copies_stop_making_fingerprints_common(h):
+    ids = [h.save("generate", PIECE) for _ in range(COMMON_DF + 1)]
+    assert h.overlaps(PIECE) == []                      # in every piece → not evidence
+    for pid in ids[1:]:
+        h.delete(pid)
+    assert df(h) == dict.fromkeys(fingerprints(PIECE), 1)
+    assert [o.ref for o in h.overlaps(PIECE)] == [f"#{ids[0]}"]
+
+# ---- regression: a regenerate / update used to be flagged against its own saves
+def test_overlaps_skip_the_pieces_lineage(h):
+    first = h.save("generate", PIECE, brief=BRIEF)
+    update = h.save("update", PIECE + " Updated close.", parent_id=first)
+    assert h.lineage([update]) == {first, update}
+    assert h.overlaps(PIECE, exclude=(update,)) == []
+    other = h.save("generate", PIECE, brief={"hook": "Someone else"})
+    assert [o.ref for o in h.overlaps(PIECE, exclude=(update,))] == [f"#{other}"]
+
+def test_overlaps_skip_earlier_runs_of_the_same_brief(h):
+    h.save("generate", PIECE, brief=BRIEF, source_hash="brief-1")
+    assert h.overlaps(PIECE, source="brief-1") == []
+    assert len(h.overlaps(PIECE, source="brief-2")) == 1
+
+def test_originality_ignores_reruns_of_the_brief(h, monkeypatch):
+    monkeypatch.setattr(engine, "HISTORY_ENABLED", True)
+    monkeypatch.setattr(engine, "get_history", lambda: h)
+    key = engine.brief_key("📧 Email", BRIEF, "📏 Short (100–200 words)")
+    first = h.save("generate", PIECE, brief=BRIEF, source_hash=key)
+    history = [o for o in engine.originality(PIECE) if o["source"] == "history"]
+    assert [o["ref"] for o in history] == [f"#{first}"]
+    assert not any(o["source"] == "history" for o in engine.originality(PIECE, (), key))
+    assert not any(o["source"] == "history" for o in engine.originality(PIECE, (first,)))
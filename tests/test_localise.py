@@ -0,0 +1,27 @@
+from mf_copy.localise import detect_market, localise
+
+AU = "Our favourite ASX 200 picks cost $119 — organise your superannuation. Colour!"
+
+def test_australia_to_us():
+    r = localise(AU, "United States")
+    assert r.text == ("Our favorite S&P 500 picks cost $119 — organize your 401(k). Color!")
+    assert r.source == ("Australia",)
+    assert r.counts() == {"index": 1, "account": 1, "spelling": 3} and r.total == 5
+
+def test_us_to_uk_converts_prices_and_spelling():
+    r = localise("The color of the S&P 500 at US$99 in your 401(k). Analyze it.",
+                 "United Kingdom")
+    assert r.text == "The colour of the FTSE 100 at £99 in your pension. Analyse it."
+    assert r.counts()["currency"] == 1
+
+def test_canada_mixes_spelling_systems():
+    assert localise("Organise the colour", "Canada", "United Kingdom").text == \
+        "Organize the colour"
+
+def test_detect_market():
+    assert detect_market(AU) == "Australia"
+    assert detect_market("plain text") is None
+
+def test_nothing_to_change():
+    r = localise("Plain words only.", "Australia", "United Kingdom")
+    assert r.text == "Plain words only." and r.summary() == "no changes"
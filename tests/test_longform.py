@@ -0,0 +1,78 @@
+import json
+
+from mf_copy import longform as lf
+from mf_copy.engine import EMAIL_STRUCT
+from mf_copy.qa_rules import MAX_BULLET_LISTS
+
+def outline(*sections, plan="- hook"):
+    return json.dumps({"plan": plan, "sections": list(sections)})
+
+def filler(tag, n):
+    return " ".join(f"{tag}{i}" for i in range(n))
+
+def test_parse_outline_restores_the_skeleton():
+    plan, secs = lf.parse_outline(outline(
+        {"heading": "Subject line", "words": 10},
+        {"heading": "#### The chip shortage", "points": "Why now", "words": 400, "list": True},
+        {"heading": "### Sign-off", "words": 10}), EMAIL_STRUCT, 1000)
+    heads = [s["heading"] for s in secs]
+    assert plan == "- hook"
+    assert heads == ["### Subject Line", "### Greeting", "### Body (benefits, urgency, proofs)",
+                     "### Call‑to‑Action", "#### The chip shortage", "### Sign‑off"]
+    assert [s["list"] for s in secs] == [False, False, False, False, True, False]
+
+def test_unusable_outline_falls_back():
+    for raw in ("not json", outline(), json.dumps([1, 2])):
+        _, secs = lf.parse_outline(raw, EMAIL_STRUCT, 1000)
+        assert [s["heading"] for s in secs] == lf.structure(EMAIL_STRUCT)
+        assert [s["list"] for s in secs] == [False, False, True, False, False]
+
+def test_allocate_and_split_into_parts():
+    secs = lf.allocate([{"heading": "### A", "points": "", "words": 5},
+                        {"heading": "### B", "points": "", "words": 0},
+                        {"heading": "### C", "points": "", "words": 1300}], 2000)
+    assert secs[0]["words"] == lf.MIN_WORDS
+    cs = lf.chunks(secs)
+    assert [(c.section, c.part, c.parts) for c in cs][-3:] == [("### C", 1, 3), ("### C", 2, 3),
+                                                                ("### C", 3, 3)]
+    assert all(c.words <= lf.CHUNK_WORDS for c in cs)
+    assert [c.heading for c in cs if c.section == "### C"] == ["### C", "", ""]
+
+def test_bullet_lists_are_budgeted():
+    secs = [{"heading": f"### S{i}", "points": "", "words": 900, "list": True}
+            for i in range(MAX_BULLET_LISTS + 2)]
+    cs = lf.chunks(secs)
+    assert sum(c.lists for c in cs) == MAX_BULLET_LISTS
+    assert all(c.part == 1 for c in cs if c.lists)
+    assert "No bullet lists" in lf.chunk_task(cs, len(cs) - 1)
+    assert "At most one short bullet list" in lf.chunk_task(cs, 0)
+
+def test_clean_and_stitch():
+    head, cont = lf.Chunk("### A", "", 50, "### A"), lf.Chunk("", "", 50, "### A", 2, 2)
+    head.text = lf.clean(head, "```markdown\nBody text.\n*Past performance is not a "
+                               "reliable indicator of future results.*\n```")
+    cont.text = lf.clean(cont, "### A\nMore text.")
+    assert (head.text, cont.text) == ("### A\nBody text.", "More text.")
+    assert lf.stitch([head, cont]).endswith("future results.*")
+    assert lf.stitch([head, cont], 1) == "### A\nBody text."
+
+def test_seam_issues():
+    cs = [lf.Chunk("### Subject Line", "", lf.MIN_WORDS, "### Subject Line"),
+          lf.Chunk("### A", "", 100, "### A"), lf.Chunk("### B", "", 100, "### B"),
+          lf.Chunk("### C", "", 100, "### C", lists=1)]
+    cs[0].text = "### Subject Line\nBig news"                        # one‑liner: never resized
+    cs[1].text = "### A\n" + filler("a", 100)
+    cs[2].text = "### B\n" + filler("b", 30) + "\n\n- one\n- two"
+    cs[3].text = "### C\n" + filler("c", 100) + "\n\n- x\n\nProse.\n\n- y"
+    issues = lf.seam_issues(cs)
+    assert 0 not in issues and 1 not in issues
+    assert any(f.startswith("Expand") for f in issues[2])
+    assert any("full‑sentence paragraphs" in f for f in issues[2])
+    assert issues[3] == ["Keep one bullet list (it has 2); turn the rest into "
+                         "full‑sentence paragraphs."]
+
+def test_seam_issues_spot_repeats():
+    cs = [lf.Chunk("### A", "", 60, "### A"), lf.Chunk("### B", "", 60, "### B")]
+    cs[0].text = "### A\n" + filler("a", 60)
+    cs[1].text = "### B\n" + filler("a", 60)
+    assert len(lf.seam_issues(cs)[1]) == 2                        # restated opener + repeat
@@ -0,0 +1,56 @@
+from mf_copy.engine import EMAIL_STRUCT
+from mf_copy.patching import (DISCLAIMER_LINE, join_disclaimer, plan_patches, splice,
+                              split_disclaimer)
+from mf_copy.qa_rules import Violation
+from mf_copy.sections import find_section, heading_matches, split_sections, struct_headings
+
+BODY = ("### Subject Line\nThe AI boom\n\n### Greeting\nHi there,\n\n"
+        "### Body (benefits, urgency, proofs)\nThree chip stocks.\n\n"
+        "### Call‑to‑Action\nJoin today.\n\n### Sign‑off\nThe team\n")
+
+def test_split_sections_keeps_offsets_and_preamble():
+    secs = split_sections("Intro line\n" + BODY)
+    assert secs[0].heading == "" and secs[0].text == "Intro line\n"
+    assert [s.heading for s in secs[1:]] == struct_headings(EMAIL_STRUCT)
+    copy = "Intro line\n" + BODY
+    assert all(copy[s.start:s.end] == s.text for s in secs)
+
+def test_bold_labels_count_as_headings():
+    secs = split_sections("**Subject Line:** Big news\n\n**CTA:** Join now")
+    assert [s.heading for s in secs] == ["Subject Line", "CTA"]
+    assert heading_matches("Call‑to‑Action", "CTA")
+
+def test_heading_matching_is_loose():
+    assert heading_matches("Key Benefit Paragraphs", "Benefits")
+    assert heading_matches("Body (benefits, urgency, proofs)", "Body")
+    assert not heading_matches("Greeting", "Sign‑off")
+    assert find_section(split_sections(BODY), "Sign-off").heading == "Sign‑off"
+
+def test_disclaimer_round_trip():
+    body, line = split_disclaimer(f"{BODY}\n{DISCLAIMER_LINE}\n")
+    assert DISCLAIMER_LINE not in body and line == DISCLAIMER_LINE
+    assert join_disclaimer(body).endswith(f"\n\n{DISCLAIMER_LINE}")
+
+def test_whole_piece_checks_fall_back_to_a_rewrite():
+    assert plan_patches(BODY, [Violation("length", "Expand.")], EMAIL_STRUCT) is None
+    assert plan_patches(BODY, [Violation("bullets", "Fewer lists.")], EMAIL_STRUCT) is None
+
+def test_fixes_grouped_per_section():
+    jobs = plan_patches(BODY, [Violation("urgency", "Add a deadline.", "Subject Line"),
+                               Violation("urgency", "Add a deadline.", "Call‑to‑Action"),
+                               Violation("data", "Cite a figure."),
+                               Violation("disclaimer", "Append it.")], EMAIL_STRUCT)
+    assert [(j.heading, j.fixes) for j in jobs] == [
+        ("Subject Line", ["Add a deadline."]), ("Call‑to‑Action", ["Add a deadline."]),
+        ("Body (benefits, urgency, proofs)", ["Cite a figure."])]
+
+def test_splice_replaces_and_inserts():
+    body = BODY.replace("### Greeting\nHi there,\n\n", "")
+    jobs = plan_patches(body, [Violation("heading", "Add it.", "Greeting"),
+                               Violation("urgency", "Deadline.", "Subject Line")], EMAIL_STRUCT)
+    insert = next(j for j in jobs if not j.original)
+    assert insert.start == insert.end and insert.level == "###"
+    out = splice(body, jobs, ["### Greeting\nHello,", "The AI boom ends at midnight"])
+    assert [s.heading for s in split_sections(out)] == struct_headings(EMAIL_STRUCT)
+    assert "### Subject Line\nThe AI boom ends at midnight\n\n### Greeting\nHello,\n\n" in out
+    assert out.endswith("### Sign‑off\nThe team\n")
@@ -0,0 +1,62 @@
+from mf_copy.engine import EMAIL_STRUCT
+from mf_copy.qa_rules import (MAX_BULLET_LISTS, check_bullets, check_copy, check_data,
+                              check_disclaimer, check_length, check_urgency,
+                              count_bullet_lists, score_copy)
+from mf_copy.sections import split_sections
+
+DISCLAIMER = "*Past performance is not a reliable indicator of future results.*"
+
+def email(body="Three chip stocks for the AI boom.", subject="The AI boom offer ends today",
+          cta="Join before midnight."):
+    return (f"### Subject Line\n{subject}\n\n### Greeting\nHi there,\n\n"
+            f"### Body (benefits, urgency, proofs)\n{body}\n\n"
+            f"### Call‑to‑Action\n{cta}\n\n### Sign‑off\nThe team\n\n{DISCLAIMER}")
+
+def test_length_bounds():
+    assert check_length("word " * 50, (100, 200))[0].check == "length"
+    assert "Tighten" in check_length("word " * 250, (100, 200))[0].fix
+    assert check_length("word " * 150, (100, 200)) == []
+    assert check_length("word " * 5000, (100, None)) == []
+
+def test_disclaimer_must_close_the_piece():
+    assert check_disclaimer(email()) == []
+    assert "Append" in check_disclaimer("### Subject Line\nHi")[0].fix
+    moved = check_disclaimer(f"{DISCLAIMER}\n\nMore copy after it.")
+    assert "final line" in moved[0].fix
+
+def test_missing_heading_names_its_section():
+    copy = email().replace("### Greeting\nHi there,\n\n", "")
+    report = check_copy(copy, EMAIL_STRUCT)
+    assert [(v.check, v.section) for v in report.violations] == [("heading", "Greeting")]
+
+def test_urgency_bands():
+    copy = email()
+    assert check_urgency(copy, split_sections(copy), "high") == []
+    calm = email(subject="The AI boom", cta="Join us.")
+    assert {v.section for v in check_urgency(calm, split_sections(calm), "high")} == \
+        {"Subject Line", "Call‑to‑Action"}
+    assert "midnight" in check_urgency(copy, split_sections(copy), "mid")[0].fix
+    assert check_urgency(calm, split_sections(calm), "low") == []
+    everyday = email(subject="Start investing today", cta="Join us today.")
+    assert check_urgency(everyday, split_sections(everyday), "low") == []
+
+def test_data_bands():
+    assert check_data("Returns of 312% since 2002.", "low")[0].check == "data"
+    assert check_data("No figures here.", "high")[0].check == "data"
+    assert check_data("No figures here.", "low") == []
+
+def test_bullet_lists_counted_as_runs():
+    text = "- a\n- b\n\n- c\n\nProse.\n\n1. one\n2. two\n\nMore.\n\n* x\n"
+    assert count_bullet_lists(text) == 3
+    many = "\n\nProse.\n\n".join("- item" for _ in range(MAX_BULLET_LISTS + 1))
+    assert check_bullets(text) == []
+    assert check_bullets(many)[0].check == "bullets"
+
+def test_report_and_score():
+    bounds = (5, 200)
+    good = check_copy(email(), EMAIL_STRUCT, bounds, {"Urgency": "high"})
+    assert good.passed and "urgency" in good.checks
+    bad = check_copy(email().replace(DISCLAIMER, ""), EMAIL_STRUCT, bounds)
+    assert bad.failed_checks == ["disclaimer"]
+    assert bad.as_dict()["failed"] == ["disclaimer"]
+    assert score_copy(email(), good, bounds) > score_copy(email(), bad, bounds)
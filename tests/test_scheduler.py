@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from mf_copy import scheduler
+from mf_copy.scheduler import CircuitBreaker, CircuitOpenError, LLMError, Scheduler, classify
+
+MODEL = "test-model"
+
+def server_error(status=500):
+    req = httpx.Request("POST", "https://api.test/v1/chat/completions")
+    return openai.InternalServerError("boom", response=httpx.Response(status, request=req),
+                                      body=None)
+
+def tripped(cooldown=0.0) -> Scheduler:
+    """A scheduler whose breaker for MODEL is open (cooldown already over by default)."""
+    s = Scheduler(rpm=0, tpm=0)
+    s._breakers[MODEL] = b = CircuitBreaker(threshold=1, cooldown=cooldown)
+    b.failure()
+    return s
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(scheduler, "backoff", lambda attempt, hint=None: 0.0)
+
+def test_classify():
+    assert classify(server_error()) == "server"
+    assert classify(server_error(409)) == "server"
+    assert classify(KeyError("x")) is None
+
+def test_breaker_opens_then_fails_fast():
+    b = CircuitBreaker(threshold=2, cooldown=60)
+    b.failure()
+    assert b.state == "closed" and b.before("chat", MODEL) is False
+    b.failure()
+    assert b.state == "open" and b.trips == 1
+    with pytest.raises(CircuitOpenError):
+        b.before("chat", MODEL)
+
+def test_half_open_allows_one_probe():
+    b = tripped().breaker(MODEL)
+    assert b.before("chat", MODEL) is True and b.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        b.before("chat", MODEL)            # second caller while the probe is out
+    b.success()
+    assert b.state == "closed" and b.failures == 0
+
+def test_failed_probe_reopens():
+    b = tripped().breaker(MODEL)
+    b.before("chat", MODEL)
+    b.failure()
+    assert b.state == "open" and b.trips == 2
+
+def test_retries_server_errors_then_raises_llm_error():
+    s, calls = Scheduler(rpm=0, tpm=0), []
+    s._breakers[MODEL] = CircuitBreaker(threshold=100)
+    def send():
+        calls.append(1)
+        raise server_error()
+    with pytest.raises(LLMError) as e:
+        s.call(send, MODEL)
+    assert e.value.kind == "server" and len(calls) == scheduler.POLICIES["server"].max_attempts
+
+def test_breaker_cuts_retries_short():
+    s, calls = Scheduler(rpm=0, tpm=0), []
+    def send():
+        calls.append(1)
+        raise server_error()
+    with pytest.raises(CircuitOpenError):
+        s.call(send, MODEL)
+    assert len(calls) == scheduler.BREAKER_THRESHOLD and s.breaker(MODEL).state == "open"
+
+def test_probe_success_closes_the_breaker():
+    s = tripped()
+    assert s.call(lambda: ("ok", None), MODEL) == "ok"
+    assert s.breaker(MODEL).state == "closed"
+
+# ---- regressions: a probe that never reports back used to wedge the breaker
+def test_probe_with_non_api_error_is_released():
+    s = tripped()
+    def send():
+        raise KeyError("bug in a callback")
+    with pytest.raises(KeyError):
+        s.call(send, MODEL)
+    assert s.call(lambda: ("ok", None), MODEL) == "ok"
+    assert s.breaker(MODEL).state == "closed"
+
+def test_cancelled_probe_is_released():
+    s = tripped()
+
+    async def main():
+        async def hang():
+            await asyncio.sleep(10)
+        task = asyncio.create_task(s.acall(hang, MODEL))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        async def ok():
+            return "ok", None
+        return await s.acall(ok, MODEL)
+
+    assert asyncio.run(main()) == "ok"
+    assert s.breaker(MODEL).state == "closed"
@@ -0,0 +1,86 @@
+import asyncio, io, json, zipfile
+
+import pytest
+
+from mf_copy import service
+from mf_copy.clients import aclose_clients
+
+async def send(reader, writer, method, path, body=b"", headers=""):
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n{headers}\r\n"
+                 .encode() + body)
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode().split("\r\n")
+    fields = dict(h.split(": ", 1) for h in head[1:] if h)
+    if fields.get("Transfer-Encoding") == "chunked":
+        data = b""
+        while size := int((await reader.readline()).strip(), 16):
+            data += (await reader.readexactly(size + 2))[:-2]
+        await reader.readline()
+    else:
+        data = await reader.readexactly(int(fields["Content-Length"]))
+    return int(head[0].split()[1]), fields, data
+
+def with_service(check, **kw):
+    """Run check(reader, writer) against a live service on a free port."""
+    async def main():
+        svc = service.Service(**{"workers": 2, "queue_size": 4, "timeout": 30, **kw})
+        svc.start_workers()
+        server = await asyncio.start_server(lambda r, w: service.handle(svc, r, w),
+                                            "127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+        try:
+            return await check(reader, writer)
+        finally:
+            writer.close()
+            server.close()
+            await svc.stop()
+            await aclose_clients()
+    return asyncio.run(main())
+
+def test_routes_and_keep_alive():
+    async def check(r, w):
+        assert (await send(r, w, "GET", "/healthz"))[0] == 200
+        assert (await send(r, w, "GET", "/v1/nope"))[0] == 404
+        assert (await send(r, w, "GET", "/v1/prompt"))[0] == 405
+        status, head, body = await send(r, w, "POST", "/v1/prompt", b"{not json")
+        assert status == 400 and head["Connection"] == "keep-alive"
+        status, _, body = await send(r, w, "POST", "/v1/prompt",
+                                     b'{"hook": "x", "brief": "AI boom"}')
+        assert status == 400 and "brief must be an object" in json.loads(body)["error"]
+        status, _, body = await send(r, w, "POST", "/v1/prompt", b'{"hook": "AI boom"}')
+        assert status == 200 and json.loads(body)["messages"]
+        assert json.loads((await send(r, w, "GET", "/v1/stats"))[2])["workers"] == 2
+    with_service(check)
+
+def test_oversized_body_closes_the_connection(monkeypatch):
+    monkeypatch.setattr(service, "MAX_BODY", 10)
+    async def check(r, w):
+        status, head, _ = await send(r, w, "POST", "/v1/prompt", b'{"hook": "AI boom"}')
+        assert status == 413 and head["Connection"] == "close"
+        assert await r.read() == b""                   # the unread body isn't parsed as a request
+    with_service(check)
+
+def test_queue_full_is_503():
+    async def main():
+        svc = service.Service(workers=0, queue_size=1)
+        waiting = asyncio.create_task(svc.submit("generate", {"hook": "x"}))
+        await asyncio.sleep(0)
+        with pytest.raises(service.HTTPError) as e:
+            await svc.submit("generate", {"hook": "x"})
+        waiting.cancel()
+        return e.value
+    err = asyncio.run(main())
+    assert err.status == 503 and err.headers["Retry-After"]
+
+def test_generate_and_export(fake_api):
+    async def check(r, w):
+        status, _, body = await send(r, w, "POST", "/v1/generate",
+                                     b'{"hook": "AI boom", "details": "Chip stocks"}')
+        assert status == 200
+        copy = json.loads(body)["copy"]
+        pieces = json.dumps({"pieces": [{"copy": copy, "title": "AI"}], "formats": "md,html"})
+        status, head, data = await send(r, w, "POST", "/v1/export", pieces.encode())
+        assert status == 200 and head["Content-Type"] == "application/zip"
+        return zipfile.ZipFile(io.BytesIO(data)).namelist()
+    names = with_service(check)
+    assert {n.rsplit(".", 1)[-1] for n in names} >= {"md", "html"}
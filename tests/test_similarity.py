@@ -0,0 +1,30 @@
+from mf_copy.similarity import (ExemplarIndex, containment, diverse, fingerprints, jaccard,
+                                shingles)
+
+PARA = ("Three chip stocks could ride the next leg of the AI boom while most investors "
+        "are still looking the other way")
+
+def test_shingles_are_stable_and_case_blind():
+    assert shingles(PARA) == shingles(PARA.upper())
+    assert shingles("two words") and len(shingles("two words")) == 1
+    assert shingles("") == set()
+    assert fingerprints(PARA) <= shingles(PARA)
+
+def test_containment_spots_a_reused_passage():
+    piece = ("A completely fresh opening about dividends, franking credits and the banks "
+             "that pay them every half. " + PARA + ". Then a new close that asks the reader "
+             "to join before the doors shut on Friday afternoon.")
+    assert containment(shingles(PARA), shingles(piece)) == 1.0
+    assert jaccard(shingles(PARA), shingles(piece)) < 0.5     # whole‑piece Jaccard dilutes it
+    assert containment(set(), shingles(piece)) == 0.0
+
+def test_exemplar_index():
+    idx = ExemplarIndex({"demo line 1": PARA, "short": "too short"})
+    assert [o.ref for o in idx.check("Intro. " + PARA)] == ["demo line 1"]
+    assert idx.check("Nothing in common with any exemplar at all here.") == []
+
+def test_diverse_drops_near_duplicates():
+    items = ["Buy now and save big today", "Buy now and save big today!",
+             "A wholly different headline here"]
+    assert diverse(items, 2) == ["Buy now and save big today",
+                                 "A wholly different headline here"]
@@ -0,0 +1,50 @@
+import json
+
+from mf_copy.stream_json import JsonFieldStream
+
+DOC = json.dumps({"plan": "- hook\n- proof", "meta": {"n": [1, "x}"]}, "score": 3,
+                  "copy": "Line \"one\"\nCafé 🚀 \\ done"})
+
+def feed_all(text, size):
+    s, seen = JsonFieldStream(), []
+    for i in range(0, len(text), size):
+        seen += s.feed(text[i:i + size])
+    return s, seen
+
+def test_any_chunking_yields_the_parsed_values():
+    for size in (1, 2, 3, 7, len(DOC)):
+        s, _ = feed_all(DOC, size)
+        assert s.values == {"plan": "- hook\n- proof",
+                            "copy": "Line \"one\"\nCafé 🚀 \\ done"}, size
+        assert s.done == {"plan", "copy"}
+
+def test_partial_values_grow_and_finish_once():
+    _, seen = feed_all(DOC, 4)
+    copy = [(v, d) for k, v, d in seen if k == "copy"]
+    assert all(b[0].startswith(a[0]) for a, b in zip(copy, copy[1:]))
+    assert [d for _, d in copy].count(True) == 1 and copy[-1][1]
+    assert not any(k in ("meta", "score") for k, _, _ in seen)
+
+def test_get_reads_an_open_field():
+    s = JsonFieldStream()
+    s.feed('{"plan": "a", "copy": "Hello wor')
+    assert s.get("copy") == "Hello wor" and "copy" not in s.done
+    assert s.get("missing", "-") == "-"
+
+def test_escapes_split_across_chunks():
+    s = JsonFieldStream()
+    for part in ('{"copy": "x\\', 'u00', 'e9 \\ud83d', '\\ude80"}'):
+        s.feed(part)
+    assert s.values["copy"] == "xé 🚀"
+
+def test_malformed_input_never_raises():
+    s = JsonFieldStream()
+    s.feed('not json {"copy": "ok"} ]]] "')
+    s.feed('\\')
+
+def test_malformed_unicode_escape_is_kept_as_text():
+    s = JsonFieldStream()
+    s.feed('{"copy": "ab\\uZZZZ", "plan": "x\\u12')
+    s.feed('"}')
+    assert s.values == {"copy": "ab\\uZZZZ", "plan": "x\\u12"}
+    assert s.done == {"copy", "plan"}
@@ -0,0 +1,45 @@
+import pytest
+
+from mf_copy import sweep
+from mf_copy.engine import TRAIT_DEFAULTS, band_score, make_brief
+
+BRIEF = make_brief(hook="AI boom", details="Three chip stocks", country="Australia")
+
+def test_parse_grid_forms_agree():
+    want = {"Urgency": ["low", "high"], "FOMO": ["2", "9"]}
+    assert sweep.parse_grid("Urgency=low,high; FOMO=2,9") == want
+    assert sweep.parse_grid(["Urgency=low,high", "FOMO=2,9"]) == want
+    assert sweep.parse_grid({"Urgency": "low,high", "FOMO": ["2", "9"]}) == want
+    with pytest.raises(ValueError):
+        sweep.parse_grid("Urgency")
+
+def test_axes_snap_scores_to_one_per_band():
+    ax = sweep.axes({"Urgency": ["low", 2, "3", "hi", "2"]})
+    assert [(l["level"], l["band"], l["score"]) for l in ax["Urgency"]] == [
+        ("low", "low", 2), ("2", "low", 2), ("3", "low", 2),
+        ("high", "high", band_score("Urgency", "high"))]
+
+def test_axes_reject_bad_input():
+    for grid in ({}, {"Nope": ["low"]}, {"Urgency": [11]}, {"Urgency": ["loud"]}):
+        with pytest.raises(ValueError):
+            sweep.axes(grid)
+
+def test_cells_cross_the_axes_over_the_base():
+    cs = sweep.cells(sweep.axes({"Urgency": ["low", "high"], "FOMO": ["low", "mid", "high"]}),
+                     {"Imagery": 2})
+    assert len(cs) == 6 and cs[0]["cell"] == "C1"
+    assert cs[0]["bands"] == {"Urgency": "low", "FOMO": "low"}
+    assert all(c["traits"]["Imagery"] == 2 for c in cs)
+    assert set(cs[0]["traits"]) == set(TRAIT_DEFAULTS)
+
+def test_cells_cap():
+    grid = {name: ["low", "mid", "high"] for name in list(TRAIT_DEFAULTS)[:4]}
+    with pytest.raises(ValueError):
+        sweep.cells(sweep.axes(grid))
+
+def test_plan_dedupes_cells_with_the_same_prompt():
+    length = next(iter(sweep.engine.LENGTH_RULES))
+    p = sweep.plan("📧 Email", TRAIT_DEFAULTS, BRIEF, length, {"Urgency": [1, 2, "high"]})
+    assert [c["prompt"] for c in p["cells"]] == ["P1", "P1", "P2"]
+    assert p["prompts"]["P1"]["cells"] == ["C1", "C2"]
+    assert p["axes"] == {"Urgency": ["1", "2", "high"]}
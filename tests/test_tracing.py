@@ -0,0 +1,73 @@
+import asyncio, json
+
+import pytest
+
+from mf_copy import tracing
+from mf_copy.tracing import annotate, annotate_usage, span
+
+@pytest.fixture(autouse=True)
+def trace_file(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(tracing, "TRACE_PATH", str(path))
+    monkeypatch.setattr(tracing, "TRACE_ENABLED", True)
+    return path
+
+def call(name, prompt, completion, attempts=1):
+    with span(f"llm.{name}"):
+        annotate_usage("gpt-4.1", {"prompt_tokens": prompt, "completion_tokens": completion,
+                                   "prompt_tokens_details": {"cached_tokens": 0}})
+        annotate(attempts=attempts)
+
+def test_cost_by_model_prefix():
+    assert tracing.estimate_cost("gpt-4.1-mini-2025-04-14", 1_000_000, 0, 0) == 0.40
+    assert tracing.estimate_cost("gpt-4.1", 1_000_000, 1_000_000, 0) == 0.50
+    assert tracing.estimate_cost("unknown", 10, 0, 10) is None
+
+def test_nested_spans_form_one_run_with_rolled_up_totals(trace_file):
+    with span("app.generate") as root:
+        with span("draft"):
+            call("draft", 1000, 500, attempts=2)
+        with span("qa"):
+            call("qa", 200, 50)
+            assert tracing.totals()["prompt_tokens"] == 200      # only beneath "qa"
+        assert tracing.totals(root)["retries"] == 1
+    spans = tracing.last_run()
+    assert spans[0] is root and {s.trace_id for s in spans} == {root.trace_id}
+    assert [(d, s.name) for d, s in tracing.tree(spans)] == [
+        (0, "app.generate"), (1, "draft"), (2, "llm.draft"), (1, "qa"), (2, "llm.qa")]
+    assert root.attributes["prompt_tokens"] == 1200 and root.attributes["retries"] == 1
+    assert root.attributes["cost_usd"] == tracing.estimate_cost("gpt-4.1", 1200, 0, 550)
+    records = [json.loads(l) for l in trace_file.read_text().splitlines()]
+    assert [r["name"] for r in records][0] == "app.generate" and len(records) == 5
+
+def test_async_tasks_land_under_their_parent():
+    @tracing.traced("stage")
+    async def stage(i):
+        await asyncio.sleep(0)
+        call(f"c{i}", 10, 1)
+
+    async def main():
+        with span("root"):
+            await asyncio.gather(stage(1), stage(2))
+    asyncio.run(main())
+    spans = tracing.last_run()
+    parents = {s.span_id: s.name for s in spans}
+    assert sorted(parents[s.parent_id] for s in spans if s.name.startswith("llm.")) == \
+        ["stage", "stage"]
+    assert spans[0].attributes["prompt_tokens"] == 20
+
+def test_errors_mark_the_span():
+    with pytest.raises(KeyError):
+        with span("broken"):
+            raise KeyError("x")
+    assert tracing.last_run()[0].status.startswith("KeyError")
+
+def test_summary_ranks_slowest_stage_first(trace_file, capsys):
+    for _ in range(3):
+        with span("run"):
+            call("draft", 100, 10)
+    summary = tracing.summarise(tracing.load(str(trace_file)), last=2)
+    assert summary["llm.draft"]["n"] == 2 and summary["llm.draft"]["tokens"] == 220
+    assert list(summary)[0] == "run"
+    assert tracing.main([str(trace_file), "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["run"]["n"] == 3
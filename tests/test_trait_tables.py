@@ -0,0 +1,56 @@
+import json, os
+
+import pytest
+
+from mf_copy import trait_tables
+from mf_copy.trait_tables import (TraitConfigError, WatchedTables, compile_tables,
+                                  validate_config)
+
+CFG = {"Urgency": {"high_threshold": 8, "low_threshold": 3, "high_rule": "- Add a deadline.",
+                   "mid_rule": "- Soft timing.", "low_rule": "", "high_exemplar_allowed": True},
+       "Imagery": {"high_threshold": 7, "low_threshold": 2, "high_rule": "- Paint it.",
+                   "low_rule": "- Plain words."}}
+EXAMPLES = {"Urgency": ["Now", "Tonight", "Last call", "Extra"]}
+
+def test_validation():
+    assert validate_config(CFG) is CFG
+    for bad in ({}, [], {"X": {"high_threshold": 8}},
+                {"X": {**CFG["Imagery"], "low_threshold": 8}},
+                {"X": {**CFG["Imagery"], "high_rule": 3}},
+                {"X": {**CFG["Imagery"], "sections": "Headline"}}):
+        with pytest.raises(TraitConfigError):
+            validate_config(bad)
+
+def test_tables_by_score():
+    t = compile_tables(CFG, EXAMPLES)
+    assert [t.at("band", "Urgency", s) for s in (1, 3, 4, 7, 8, 10)] == \
+        ["low", "low", "mid", "mid", "high", "high"]
+    assert t.at("band", "Urgency", 0) == "low" and t.at("band", "Urgency", 99) == "high"
+    assert t.at("rule", "Urgency", 9) == "- Add a deadline."
+    assert t.at("rule", "Urgency", 1) is None                   # empty rule → none
+    assert t.at("rule", "Imagery", 5) is None                   # no mid rule
+    assert t.at("exemplar", "Urgency", 8) and not t.at("exemplar", "Urgency", 7)
+    assert not t.at("exemplar", "Imagery", 10)
+    assert t.at("guide", "Urgency", 9) == "Urgency (9/10) — e.g. “Now” / “Tonight” / “Last call”"
+    assert t.at("guide", "Urgency", 1) == "Urgency (1/10) — e.g. “Now”"
+
+def test_watched_tables_reload_on_change_and_keep_last_good(tmp_path, monkeypatch):
+    monkeypatch.setattr(trait_tables, "CHECK_EVERY", 0)
+    path = tmp_path / "traits.json"
+    path.write_text(json.dumps(CFG))
+    w = WatchedTables(path, EXAMPLES)
+    first = w.get()
+    assert w.get() is first                                      # unchanged file → same tables
+    path.write_text(json.dumps({"Imagery": CFG["Imagery"]}))
+    os.utime(path, ns=(1, 1))
+    second = w.get()
+    assert second is not first and list(second.band) == ["Imagery"]
+    path.write_text("{broken")
+    os.utime(path, ns=(2, 2))
+    assert w.get() is second and w.error.startswith("JSONDecodeError")
+
+def test_broken_file_on_first_load_raises(tmp_path):
+    path = tmp_path / "traits.json"
+    path.write_text("{}")
+    with pytest.raises(TraitConfigError):
+        WatchedTables(path, EXAMPLES).get()
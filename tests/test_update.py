@@ -0,0 +1,33 @@
+import pytest
+
+from mf_copy import engine
+from mf_copy.llm_async import run
+
+TRAITS = dict(engine.TRAIT_DEFAULTS)
+BRIEF = engine.make_brief(hook="AI boom", details="Three chip stocks", country="Australia")
+SHORT = "📏 Short (100–200 words)"
+
+@pytest.fixture(scope="module")
+def piece(fake_api):
+    return engine.generate("📧 Email", TRAITS, BRIEF, SHORT)["copy"]
+
+def update(copy, **moved):
+    return run(engine.aupdate, copy, "📧 Email", TRAITS, {**TRAITS, **moved}, BRIEF, SHORT)
+
+def test_no_band_crossed_is_skipped(fake_api, piece):
+    before = fake_api.stats.requests
+    out = update(piece, Urgency=TRAITS["Urgency"] + 1)
+    assert (out["mode"], out["copy"], out["qa"]) == ("skipped", piece, None)
+    assert fake_api.stats.requests == before
+
+def test_band_change_re_edits_its_sections(piece):
+    out = update(piece, Urgency=1)
+    assert out["mode"] == "sections" and out["sections"] and out["qa"] is not None
+    assert "Urgency" in out["changed"]
+
+def test_full_regeneration_returns_variants_only_when_asked(piece):
+    out = update(piece, Conversational_Tone=1)
+    assert out["mode"] == "full" and out["plan"] and out["variants"] is None
+    out = run(engine.aupdate, piece, "📧 Email", TRAITS, {**TRAITS, "Conversational_Tone": 1},
+              BRIEF, SHORT, variants=True)
+    assert set(out["variants"]) == {"headlines", "ctas"}